@@ -0,0 +1,86 @@
+# backend/backend/database.py
+"""
+Database connection settings shared by settings.py and settings_production.py.
+
+Two ways to reuse connections, chosen by DB_POOL:
+
+- DB_POOL=true (PostgreSQL with psycopg 3 and psycopg-pool installed): every
+  worker process keeps a psycopg connection pool of DB_POOL_MIN_SIZE to
+  DB_POOL_MAX_SIZE connections. A request borrows one and returns it when it
+  ends; if none frees up within DB_POOL_TIMEOUT seconds the request fails
+  instead of opening more. Django requires CONN_MAX_AGE=0 with a pool.
+- Otherwise each worker thread keeps its own persistent connection for
+  CONN_MAX_AGE seconds. Not under SERVER_MODE=asgi: there every request runs
+  its ORM calls on a thread of its own that ends with the request, so a kept
+  connection would never be reused or closed. ASGI mode closes connections
+  at the end of each request instead; use DB_POOL=true to reuse them.
+
+CONN_HEALTH_CHECKS makes Django ping a reused connection before its first
+query in a request, so connections dropped by the server are replaced rather
+than failing the request.
+
+Either way the connections one server instance can hold are bounded by
+workers x DB_POOL_MAX_SIZE (pool) or workers x threads (persistent), so keep
+that times the number of instances below the server's max_connections. See
+gunicorn.conf.py for the worker and thread counts.
+"""
+import logging
+import os
+
+import dj_database_url
+
+logger = logging.getLogger(__name__)
+
+
+def _env_bool(name, default):
+    return os.getenv(name, default).lower() == 'true'
+
+
+def asgi_mode():
+    return os.getenv('SERVER_MODE', 'wsgi').lower() == 'asgi'
+
+
+def pool_available():
+    try:
+        import psycopg  # noqa: F401
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def connection_options(engine):
+    """CONN_MAX_AGE, CONN_HEALTH_CHECKS and pool OPTIONS for one database"""
+    options = {
+        'CONN_MAX_AGE': 0 if asgi_mode() else int(os.getenv('CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': _env_bool('CONN_HEALTH_CHECKS', 'True'),
+    }
+    if not _env_bool('DB_POOL', 'False') or 'postgresql' not in engine:
+        return options
+    if not pool_available():
+        logger.warning("⚠️ DB_POOL is set but psycopg 3 / psycopg-pool are not installed; using persistent connections")
+        return options
+
+    options['CONN_MAX_AGE'] = 0
+    options['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', os.getenv('GUNICORN_THREADS', '4'))),
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+            # Connections idle this long are closed down to min_size
+            'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+        },
+    }
+    return options
+
+
+def database_config(url=None, **settings):
+    """
+    A DATABASES entry: `url` (a database URL) or `settings` (an explicit
+    entry), with the connection reuse settings above applied
+    """
+    config = dj_database_url.parse(url) if url else dict(settings)
+    reuse = connection_options(config['ENGINE'])
+    config['OPTIONS'] = {**config.get('OPTIONS', {}), **reuse.pop('OPTIONS', {})}
+    config.update(reuse)
+    return config
@@ -3,7 +3,8 @@ from pathlib import Path
 import os
 from dotenv import load_dotenv
 from datetime import timedelta
-import dj_database_url
+
+from .database import database_config
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -87,11 +88,26 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.db_router.ReplicaPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
 ]
 
+# ============================================================================
+# INSTRUMENTATION (core/instrumentation.py)
+# ============================================================================
+# Per-view timing, query and outbound HTTP histograms at /metrics, and a log
+# line for every request slower than SLOW_REQUEST_SECONDS
+INSTRUMENTATION_ENABLED = os.getenv('INSTRUMENTATION_ENABLED', 'True').lower() == 'true'
+SLOW_REQUEST_SECONDS = float(os.getenv('SLOW_REQUEST_SECONDS', '1.0'))
+SLOW_REQUEST_TOP_QUERIES = int(os.getenv('SLOW_REQUEST_TOP_QUERIES', '5'))
+# When set, /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+if INSTRUMENTATION_ENABLED:
+    # Outermost, so the wall time covers every other middleware
+    MIDDLEWARE.insert(0, 'core.instrumentation.RequestMetricsMiddleware')
+
 ROOT_URLCONF = 'backend.urls'
 
 # ============================================================================
@@ -118,33 +134,52 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # DATABASE CONFIGURATION
 # ============================================================================
 
+# Connection reuse (persistent connections or a psycopg pool) is configured
+# through env vars, see backend/database.py
 if os.getenv('DATABASE_URL'):
     # Production: Use DATABASE_URL from hosting provider
     DATABASES = {
-        'default': dj_database_url.config(
-            default=os.getenv('DATABASE_URL'),
-            conn_max_age=600,
-            conn_health_checks=True,
-        )
+        'default': database_config(os.getenv('DATABASE_URL'))
     }
 else:
     # Development: PostgreSQL 18 Local Configuration
     DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.postgresql',
-            'NAME': os.getenv('POSTGRES_DB', 'advision_db'),
-            'USER': os.getenv('POSTGRES_USER', 'advision_user'),
-            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
-            'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
-            'PORT': os.getenv('POSTGRES_PORT', '5432'),
-            'ATOMIC_REQUESTS': True,  # Better for PostgreSQL 18
-            'CONN_MAX_AGE': 600,  # Connection pooling
-        }
+        'default': database_config(
+            ENGINE='django.db.backends.postgresql',
+            NAME=os.getenv('POSTGRES_DB', 'advision_db'),
+            USER=os.getenv('POSTGRES_USER', 'advision_user'),
+            PASSWORD=os.getenv('POSTGRES_PASSWORD', ''),
+            HOST=os.getenv('POSTGRES_HOST', 'localhost'),
+            PORT=os.getenv('POSTGRES_PORT', '5432'),
+            ATOMIC_REQUESTS=True,  # Better for PostgreSQL 18
+        )
     }
 
 # PostgreSQL 18 Specific Settings
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# ============================================================================
+# READ REPLICAS
+# ============================================================================
+# Comma-separated database URLs. Read-only analytics views read from these;
+# everything else, and every write, uses the primary (core/db_router.py)
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()
+]
+for index, url in enumerate(DATABASE_REPLICA_URLS):
+    DATABASES[f'replica_{index}'] = {
+        **database_config(url),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
+# Reads stay on the primary this long after a user's data changes; keep it
+# above the replication lag tolerated below
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '30'))
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '10'))
+REPLICA_HEALTH_CHECK_SECONDS = int(os.getenv('REPLICA_HEALTH_CHECK_SECONDS', '15'))
+
 # ============================================================================
 # PASSWORD VALIDATION
 # ============================================================================
@@ -236,6 +271,36 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# ============================================================================
+# CACHE
+# ============================================================================
+# With REDIS_URL every worker and instance shares one cache: quotas, replica
+# pins and health, analytics caches. Otherwise each process has its own
+# memory cache and enforces those per process
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+
+# ============================================================================
+# API QUOTAS (per user, per endpoint class; core/services/quotas.py)
+# ============================================================================
+# A scope allows `burst` requests at once, refilled at `rate` per `period`
+# seconds, with at most `concurrency` in flight (0 = no cap). Over either
+# limit a request gets a 429 with Retry-After
+QUOTAS_ENABLED = os.getenv('QUOTAS_ENABLED', 'True').lower() == 'true'
+API_QUOTAS = {
+    'text_generation': {'rate': 20, 'period': 60, 'burst': 5, 'concurrency': 3},
+    'image_generation': {'rate': 6, 'period': 60, 'burst': 2, 'concurrency': 1},
+    'platform_sync': {'rate': 4, 'period': 60, 'burst': 2, 'concurrency': 1},
+}
+# In-flight slots a crashed worker never released expire after this; keep it
+# above the slowest request (image generation waits up to 90s per provider)
+QUOTA_INFLIGHT_TTL = int(os.getenv('QUOTA_INFLIGHT_TTL', '300'))
+
 # ============================================================================
 # ALLAUTH CONFIGURATION
 # ============================================================================
@@ -297,6 +362,38 @@ GOOGLE_OAUTH_REDIRECT_URI = f"{FRONTEND_URL}/auth/google/callback"
 OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
 STABILITY_API_KEY = os.getenv('STABILITY_API_KEY')
 
+# Overridable so load tests can point generation at a local stub
+OPENROUTER_API_URL = os.getenv('OPENROUTER_API_URL', 'https://openrouter.ai/api/v1/chat/completions')
+
+# ============================================================================
+# OUTBOUND HTTP (pooling, retries, circuit breakers; see core/utils/http.py)
+# ============================================================================
+# Defaults for every provider; HTTP_PROVIDERS overrides them per provider
+# (keys: timeout, retries, retry_posts, max_connections, max_keepalive,
+# breaker_failures, breaker_reset)
+HTTP_CLIENT_TIMEOUT = float(os.getenv('HTTP_CLIENT_TIMEOUT', '30'))
+# Connections per worker and provider; calls beyond it wait for one
+HTTP_CLIENT_MAX_CONNECTIONS = int(os.getenv('HTTP_CLIENT_MAX_CONNECTIONS', '500'))
+HTTP_CLIENT_MAX_KEEPALIVE = int(os.getenv('HTTP_CLIENT_MAX_KEEPALIVE', '50'))
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', '2'))
+# Backoff before retry n is random in [0, HTTP_RETRY_BACKOFF x 2^n], capped
+HTTP_RETRY_BACKOFF = float(os.getenv('HTTP_RETRY_BACKOFF', '0.25'))
+HTTP_RETRY_BACKOFF_MAX = float(os.getenv('HTTP_RETRY_BACKOFF_MAX', '5'))
+# Retries allowed as a fraction of calls, per provider
+HTTP_RETRY_BUDGET = float(os.getenv('HTTP_RETRY_BUDGET', '0.2'))
+HTTP_BREAKER_FAILURES = int(os.getenv('HTTP_BREAKER_FAILURES', '5'))
+HTTP_BREAKER_RESET = float(os.getenv('HTTP_BREAKER_RESET', '30'))
+HTTP_PROVIDERS = {
+    'openrouter': {'timeout': 30},
+    # Image generation takes a while; one retry at most
+    'pollinations': {'timeout': 90, 'retries': 1},
+    'stability': {'timeout': 90, 'retries': 1},
+    'google': {'timeout': 10},
+    # Webhook posts only announce a report, so repeating one is harmless
+    'slack': {'timeout': 10, 'retry_posts': True, 'max_connections': 10},
+    'discord': {'timeout': 10, 'retry_posts': True, 'max_connections': 10},
+}
+
 # ============================================================================
 # AD PLATFORM API CREDENTIALS (For syncing campaigns)
 # ============================================================================
@@ -307,12 +404,46 @@ GOOGLE_ADS_CLIENT_SECRET = os.getenv('GOOGLE_ADS_CLIENT_SECRET', '')
 FACEBOOK_APP_ID = os.getenv('FACEBOOK_APP_ID', '')
 FACEBOOK_APP_SECRET = os.getenv('FACEBOOK_APP_SECRET', '')
 
+# ============================================================================
+# EVENT INGESTION (buffered impression/click/conversion counters)
+# ============================================================================
+# Seconds between buffer flushes; 0 writes every batch synchronously
+EVENT_FLUSH_INTERVAL = float(os.getenv('EVENT_FLUSH_INTERVAL', '1.0'))
+# Flush early once this many rows have pending deltas
+EVENT_BUFFER_MAX_ROWS = int(os.getenv('EVENT_BUFFER_MAX_ROWS', '5000'))
+# How long an event id is remembered for de-duplication
+EVENT_DEDUP_TTL = int(os.getenv('EVENT_DEDUP_TTL', str(60 * 60 * 24)))
+# How long an accepted id stays claimed before its delta is stored; a worker
+# that dies in between releases its events to client retries after this
+EVENT_PENDING_CLAIM_TTL = int(os.getenv('EVENT_PENDING_CLAIM_TTL', '120'))
+
+# ============================================================================
+# ANALYTICS PARTITIONING (PostgreSQL only, python manage.py manage_partitions)
+# ============================================================================
+# Monthly partitions are kept created this far ahead
+ANALYTICS_PARTITION_MONTHS_AHEAD = int(os.getenv('ANALYTICS_PARTITION_MONTHS_AHEAD', '3'))
+# Months of history kept per table before partitions are expired; 0 keeps everything
+ANALYTICS_RETENTION_MONTHS = {
+    'daily': int(os.getenv('DAILY_ANALYTICS_RETENTION_MONTHS', '0')) or None,
+    'hourly': int(os.getenv('HOURLY_ANALYTICS_RETENTION_MONTHS', '0')) or None,
+}
+# Drop expired partitions instead of moving them to the archive schema
+ANALYTICS_RETENTION_DROP = os.getenv('ANALYTICS_RETENTION_DROP', 'False').lower() == 'true'
+
 # ============================================================================
 # REPORT GENERATION PATH
 # ============================================================================
 REPORT_STORAGE_PATH = os.path.join(BASE_DIR, 'reports')
 os.makedirs(REPORT_STORAGE_PATH, exist_ok=True)
 
+# Scheduled report runner (python manage.py run_report_schedules)
+# 'process' renders PDFs in a process pool, 'thread' in a thread pool
+REPORT_RENDER_EXECUTOR = os.getenv('REPORT_RENDER_EXECUTOR', 'process')
+REPORT_RENDER_WORKERS = int(os.getenv('REPORT_RENDER_WORKERS', '0')) or None
+# Override delivery channels per format with dotted paths, e.g.
+# {'slack': 'core.services.report_delivery.RecordingDelivery'}
+REPORT_DELIVERY_BACKENDS = {}
+
 # ============================================================================
 # OPTIONAL: CELERY (For async tasks - not required for basic functionality)
 # ============================================================================
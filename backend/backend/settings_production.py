@@ -1,10 +1,11 @@
 # backend/backend/settings_production.py
 import os
-import dj_database_url
 
 # Import base settings FIRST
 from .settings import *
 
+from django.core.exceptions import ImproperlyConfigured
+
 # ============================================================================
 # CRITICAL: Override ALLAUTH settings (Must come right after import)
 # ============================================================================
@@ -58,16 +59,17 @@ SECURE_HSTS_PRELOAD = True
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 USE_X_FORWARDED_HOST = True
 
+# /metrics exposes per-view traffic and timings; never serve it unauthenticated
+if INSTRUMENTATION_ENABLED and not METRICS_TOKEN:
+    raise ImproperlyConfigured(
+        'METRICS_TOKEN is required in production while INSTRUMENTATION_ENABLED is on'
+    )
+
 # ============================================================================
 # DATABASE - PostgreSQL on Render
 # ============================================================================
-DATABASES = {
-    'default': dj_database_url.config(
-        default=os.getenv('DATABASE_URL'),
-        conn_max_age=600,
-        conn_health_checks=True,
-    )
-}
+# DATABASES (including read replicas and connection pooling) comes from
+# settings.py, built from DATABASE_URL
 
 # ============================================================================
 # STATIC FILES (WhiteNoise)
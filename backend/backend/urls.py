@@ -15,6 +15,10 @@ urlpatterns = [
     path('api/', include('core.urls')),
 ]
 
+if settings.INSTRUMENTATION_ENABLED:
+    from core.instrumentation import metrics_view
+    urlpatterns.append(path('metrics', metrics_view, name='metrics'))
+
 # Serve media files in development
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
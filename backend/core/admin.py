@@ -4,7 +4,7 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from .models import (
     User, Campaign, AdContent, ImageAsset, Comment,
     DailyAnalytics, CampaignAnalyticsSummary, GeneratedReport, AdPlatformConnection, SyncedCampaign, ABTest, ABTestVariation,
-    PredictiveModel, Prediction, ReportSchedule
+    PredictiveModel, Prediction, ReportSchedule, ReportArtifact, HourlyAnalytics, UserRecommendation
 )
 
 
@@ -175,8 +175,8 @@ class SyncedCampaignAdmin(admin.ModelAdmin):
 
 @admin.register(ABTest)
 class ABTestAdmin(admin.ModelAdmin):
-    list_display = ('name', 'campaign', 'status', 'winner', 'is_significant', 'created_at')
-    list_filter = ('status', 'is_significant')
+    list_display = ('name', 'campaign', 'status', 'analysis_mode', 'winner', 'is_significant', 'created_at')
+    list_filter = ('status', 'analysis_mode', 'is_significant')
     search_fields = ('name', 'campaign__title')
 
 @admin.register(ABTestVariation)
@@ -184,6 +184,28 @@ class ABTestVariationAdmin(admin.ModelAdmin):
     list_display = ('name', 'ab_test', 'impressions', 'clicks', 'conversions', 'ctr')
     search_fields = ('name', 'ab_test__name')
 
+@admin.register(HourlyAnalytics)
+class HourlyAnalyticsAdmin(admin.ModelAdmin):
+    list_display = ('campaign', 'hour', 'impressions', 'clicks', 'conversions', 'spend_micros')
+    list_filter = ('campaign__platform',)
+    search_fields = ('campaign__title',)
+    date_hierarchy = 'hour'
+    list_select_related = ('campaign',)
+    raw_id_fields = ('campaign',)
+
+@admin.register(UserRecommendation)
+class UserRecommendationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'period_end', 'rules_version', 'is_stale', 'computed_at')
+    list_filter = ('is_stale', 'rules_version')
+    search_fields = ('user__email',)
+    readonly_fields = ('computed_at',)
+
+@admin.register(ReportArtifact)
+class ReportArtifactAdmin(admin.ModelAdmin):
+    list_display = ('report_type', 'user', 'campaign', 'template_version', 'hit_count', 'last_accessed_at')
+    list_filter = ('report_type', 'template_version')
+    search_fields = ('user__email', 'campaign__title', 'fingerprint')
+
 @admin.register(ReportSchedule)
 class ReportScheduleAdmin(admin.ModelAdmin):
     list_display = ('name', 'user', 'frequency', 'format', 'is_active', 'next_run')
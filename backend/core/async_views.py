@@ -0,0 +1,61 @@
+# backend/core/async_views.py
+"""
+Base for views whose handlers are `async def` because they mostly wait on
+outbound HTTP (see core/utils/http.py).
+
+adrf's APIView awaits async handlers on the event loop under ASGI (and on a
+short-lived loop under WSGI) and runs authentication in a thread. The
+database work those views do must run in a thread too (`db_sync_to_async`).
+Under ASGI that thread belongs to the request, so any connection it opens is
+closed, or handed back to the pool with DB_POOL=true, as soon as the work is
+done. Otherwise a request that waits a minute on an upstream would hold a
+connection the whole time. Persistent connections under WSGI are kept as
+usual.
+
+Under WSGI the handler's event loop ends with the request, so the outbound
+HTTP clients opened on it are closed when the handler returns.
+"""
+import functools
+
+from adrf.views import APIView
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections, transaction
+
+from core.utils.http import aclose_clients
+
+
+def db_sync_to_async(func):
+    """sync_to_async for ORM work, returning expired connections when done"""
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run)
+
+
+class AsyncAPIView(APIView):
+    """APIView for async handlers; see the module docstring"""
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # ATOMIC_REQUESTS can't wrap an async view; handlers make their
+        # db_sync_to_async steps atomic themselves
+        return transaction.non_atomic_requests(super().as_view(**initkwargs))
+
+    def initial(self, request, *args, **kwargs):
+        # Authentication may have queried the user
+        try:
+            super().initial(request, *args, **kwargs)
+        finally:
+            close_old_connections()
+
+    async def async_dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().async_dispatch(request, *args, **kwargs)
+        finally:
+            # Under WSGI this loop ends with the request
+            if not isinstance(request, ASGIRequest):
+                await aclose_clients()
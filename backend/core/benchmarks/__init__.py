@@ -0,0 +1,112 @@
+# backend/core/benchmarks/__init__.py
+"""
+Benchmark suites for performance-sensitive code paths.
+
+Suites live in the modules listed in SUITE_MODULES and register themselves with
+@register. `python manage.py run_benchmarks [suite ...]` runs them inside a
+transaction that is rolled back afterwards, so suites may seed whatever data
+they need.
+
+Suites can also assert limits with Benchmark.check(); a run with failed
+checks, or (given --baseline) timings that regressed past the tolerance,
+exits non-zero so CI can gate on it.
+"""
+import importlib
+import time
+
+import numpy as np
+
+SUITE_MODULES = [
+    'core.benchmarks.traffic_assignment',
+    'core.benchmarks.reports',
+    'core.benchmarks.hourly_analytics',
+    'core.benchmarks.recommendations',
+    'core.benchmarks.api',
+    'core.benchmarks.indexes',
+    'core.benchmarks.keys',
+    'core.benchmarks.quotas',
+    'core.benchmarks.instrumentation',
+    'core.benchmarks.outbound_http',
+]
+
+# Units whose values are durations, compared against a --baseline report
+TIMING_UNITS = ('us/call', 'ms')
+
+_SUITES = {}
+
+
+def register(name, description=''):
+    """Register a suite function taking a Benchmark"""
+    def decorator(func):
+        _SUITES[name] = (func, description)
+        return func
+    return decorator
+
+
+def get_suites():
+    """All registered suites as {name: (func, description)}"""
+    for module in SUITE_MODULES:
+        importlib.import_module(module)
+    return dict(_SUITES)
+
+
+class Benchmark:
+    """Measurements collected during one suite run"""
+
+    def __init__(self, name, params=None):
+        self.name = name
+        self.params = params or {}
+        self.results = []
+        self.failures = []
+
+    def param(self, key, default=None, cast=str):
+        """A --param KEY=VALUE given on the command line, cast, or `default`"""
+        if key not in self.params:
+            return default
+        return cast(self.params[key])
+
+    def record(self, metric, value, unit, **extra):
+        """Record a single measured value"""
+        result = {'metric': metric, 'value': value, 'unit': unit}
+        result.update(extra)
+        self.results.append(result)
+        return result
+
+    def check(self, metric, value, limit, unit, **extra):
+        """Record `value` and fail the run if it exceeds `limit`"""
+        passed = value <= limit
+        result = self.record(metric, value, unit, limit=limit, passed=passed, **extra)
+        if not passed:
+            self.failures.append(f"{self.name}: {metric} is {value} {unit}, limit {limit}")
+        return result
+
+    def time(self, metric, func, number=1000, repeat=20, warmup=1):
+        """
+        Time `func` in `repeat` batches of `number` calls
+
+        Percentiles are taken over the per-call time of each batch, which keeps
+        timer overhead out of sub-microsecond measurements.
+
+        Returns:
+            dict: the recorded result, times in microseconds per call
+        """
+        for _ in range(warmup):
+            func()
+
+        samples = np.empty(repeat)
+        for i in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples[i] = (time.perf_counter() - start) / number
+
+        samples *= 1e6
+        return self.record(
+            metric,
+            round(float(np.percentile(samples, 50)), 3),
+            'us/call',
+            p95=round(float(np.percentile(samples, 95)), 3),
+            mean=round(float(samples.mean()), 3),
+            ops_per_sec=round(float(1e6 / samples.mean()), 1),
+            calls=number * repeat,
+        )
@@ -0,0 +1,104 @@
+# backend/core/benchmarks/api.py
+"""
+End-to-end API latency and query counts for synthetic tenants.
+
+Each tenant is one user with N campaigns x `days` of DailyAnalytics, seeded
+with SyntheticAnalyticsService. Every endpoint is called through the DRF test client: the
+first (cold cache) request's query count is checked against QUERY_LIMITS,
+then warm requests are timed for p50/p95.
+
+Params (run_benchmarks api --param key=value):
+    tenants  comma separated campaign counts (default 10,100)
+    days     days of analytics per campaign (default 365)
+    repeat   timed requests per endpoint (default 20)
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from core.benchmarks import register
+from core.models import User, Campaign, ABTest, ABTestVariation
+from core.services.synthetic_analytics import SyntheticAnalyticsService
+from core.utils.timezone_utils import today
+
+DEFAULT_TENANTS = '10,100'
+DEFAULT_DAYS = 365
+DEFAULT_REPEAT = 20
+
+# Cold-request query ceilings; they must not grow with tenant size
+QUERY_LIMITS = {
+    'dashboard stats': 9,
+    'weekly report': 11,
+    'analytics summary': 5,
+    'campaign list': 4,
+    'a/b test analysis': 3,
+}
+
+
+def _seed_tenant(campaign_count, days, seed):
+    first_day = today() - timedelta(days=days - 1)
+    user = User.objects.create(email=f'benchmark-api-{campaign_count}@example.com')
+    campaigns = Campaign.objects.bulk_create([
+        Campaign(
+            user=user,
+            title=f'Benchmark campaign {i}',
+            platform='facebook',
+            budget=1000,
+            start_date=first_day,
+            end_date=today() + timedelta(days=30),
+        )
+        for i in range(campaign_count)
+    ])
+
+    SyntheticAnalyticsService.generate(Campaign.objects.filter(user=user), days=days, seed=seed)
+
+    ab_test = ABTest.objects.create(campaign=campaigns[0], name='Benchmark test', status='running')
+    ABTestVariation.objects.bulk_create([
+        ABTestVariation(ab_test=ab_test, name=name, impressions=20000, clicks=clicks_, conversions=clicks_ // 10)
+        for name, clicks_ in (('A', 600), ('B', 680))
+    ])
+    return user, campaigns, ab_test
+
+
+def _endpoints(campaigns, ab_test):
+    return {
+        'dashboard stats': '/api/dashboard/stats/',
+        'weekly report': '/api/reports/weekly/',
+        'analytics summary': f'/api/analytics/summary/?campaign_id={campaigns[0].id}',
+        'campaign list': '/api/campaigns/',
+        'a/b test analysis': f'/api/ab-tests/{ab_test.id}/analyze/',
+    }
+
+
+@register('api', 'Endpoint p50/p95 latency and query-count ceilings for synthetic tenants')
+def run(benchmark):
+    tenants = [int(size) for size in benchmark.param('tenants', DEFAULT_TENANTS).split(',')]
+    days = benchmark.param('days', DEFAULT_DAYS, int)
+    repeat = benchmark.param('repeat', DEFAULT_REPEAT, int)
+
+    # The test client sends Host: testserver, which only the test runner allows
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        for campaign_count in tenants:
+            user, campaigns, ab_test = _seed_tenant(campaign_count, days, seed=campaign_count)
+            client = APIClient()
+            client.force_authenticate(user=user)
+            tenant = f'{campaign_count}x{days}'
+
+            for name, url in _endpoints(campaigns, ab_test).items():
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.get(url)
+                if response.status_code != 200:
+                    benchmark.failures.append(f"{benchmark.name}: {name} returned {response.status_code}")
+                    continue
+
+                benchmark.check(f'{name} queries [{tenant}]', len(queries), QUERY_LIMITS[name], 'queries')
+                benchmark.time(
+                    f'{name} [{tenant}]',
+                    lambda: client.get(url),
+                    number=1,
+                    repeat=repeat,
+                    warmup=0,
+                )
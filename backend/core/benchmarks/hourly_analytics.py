@@ -0,0 +1,142 @@
+# backend/core/benchmarks/hourly_analytics.py
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import numpy as np
+from django.db import connection
+
+from core.benchmarks import register
+from core.models import User, Campaign, DailyAnalytics, HourlyAnalytics
+from core.services.analytics_aggregation import AnalyticsAggregationService
+from core.services.hourly_analytics import HourlyAnalyticsService
+from core.utils.timezone_utils import today
+
+CAMPAIGNS = 20
+DAYS = 90
+BATCH_SIZE = 5000
+
+
+def _table_bytes(model):
+    """Heap plus index size of a model's table, or None if the backend can't tell"""
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_total_relation_size(%s)', [table])
+            return cursor.fetchone()[0]
+        if connection.vendor == 'sqlite':
+            try:
+                cursor.execute(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name IN "
+                    "(SELECT name FROM sqlite_master WHERE tbl_name = %s)",
+                    [table]
+                )
+            except Exception:
+                return None
+            return cursor.fetchone()[0]
+    return None
+
+
+def _record_storage(benchmark, model, rows):
+    size = _table_bytes(model)
+    if size is None:
+        return
+    benchmark.record(
+        f'{model.__name__} storage',
+        round(size / rows, 1),
+        'bytes/row',
+        rows=rows,
+        total_kb=round(size / 1024, 1),
+        backend=connection.vendor,
+    )
+
+
+@register('hourly_analytics', 'HourlyAnalytics insert throughput, storage per row, rollup and weekday/hour breakdowns')
+def run(benchmark):
+    user = User.objects.create(email='benchmark-hourly@example.com')
+    campaigns = Campaign.objects.bulk_create([
+        Campaign(
+            user=user,
+            title=f'Benchmark campaign {i}',
+            platform='instagram',
+            budget=100,
+            start_date=today() - timedelta(days=DAYS),
+            end_date=today(),
+        )
+        for i in range(CAMPAIGNS)
+    ])
+
+    rng = np.random.default_rng(7)
+    hours = CAMPAIGNS * DAYS * 24
+    impressions = rng.integers(0, 2000, hours)
+    clicks = rng.binomial(impressions, 0.03)
+    conversions = rng.binomial(clicks, 0.1)
+    spend_micros = clicks * rng.integers(200_000, 900_000, hours)
+
+    first_hour = datetime.combine(today() - timedelta(days=DAYS - 1), datetime.min.time(), dt_timezone.utc)
+    hourly_rows = []
+    i = 0
+    # Time-ordered, as live ingestion writes them
+    for hour_offset in range(DAYS * 24):
+        hour = first_hour + timedelta(hours=hour_offset)
+        for campaign in campaigns:
+            hourly_rows.append(HourlyAnalytics(
+                campaign=campaign,
+                hour=hour,
+                impressions=int(impressions[i]),
+                clicks=int(clicks[i]),
+                conversions=int(conversions[i]),
+                spend_micros=int(spend_micros[i]),
+            ))
+            i += 1
+
+    start = time.perf_counter()
+    HourlyAnalytics.objects.bulk_create(hourly_rows, batch_size=BATCH_SIZE)
+    elapsed = time.perf_counter() - start
+    benchmark.record('HourlyAnalytics bulk insert', round(hours / elapsed), 'rows/s', rows=hours, seconds=round(elapsed, 3))
+
+    daily_rows = [
+        DailyAnalytics(
+            campaign=campaign,
+            user=user,
+            date=today() - timedelta(days=day),
+            impressions=24000,
+            clicks=700,
+            conversions=70,
+            spend=Decimal('350.00'),
+        )
+        for campaign in campaigns
+        for day in range(DAYS)
+    ]
+    start = time.perf_counter()
+    DailyAnalytics.objects.bulk_create(daily_rows, batch_size=BATCH_SIZE)
+    elapsed = time.perf_counter() - start
+    benchmark.record(
+        'DailyAnalytics bulk insert',
+        round(len(daily_rows) / elapsed),
+        'rows/s',
+        rows=len(daily_rows),
+        seconds=round(elapsed, 3),
+    )
+
+    _record_storage(benchmark, HourlyAnalytics, hours)
+    _record_storage(benchmark, DailyAnalytics, len(daily_rows))
+
+    start = time.perf_counter()
+    written = HourlyAnalyticsService.rollup()
+    elapsed = time.perf_counter() - start
+    benchmark.record('rollup to DailyAnalytics', round(elapsed * 1000, 1), 'ms', hourly_rows=hours, daily_rows=written)
+
+    def cold(func):
+        def run_uncached():
+            AnalyticsAggregationService.invalidate([user.pk])
+            return func()
+        return run_uncached
+
+    heatmap = lambda: HourlyAnalyticsService.hour_of_week_heatmap(user)
+    benchmark.time('hour-of-week heatmap (uncached)', cold(heatmap), number=1, repeat=10)
+    benchmark.time('hour-of-week heatmap (cached)', heatmap, number=100, repeat=10)
+
+    weekdays = lambda: AnalyticsAggregationService.weekday_performance(user)
+    benchmark.time('weekday breakdown (uncached)', cold(weekdays), number=5, repeat=10)
+    benchmark.time('weekday breakdown (cached)', weekdays, number=100, repeat=10)
@@ -0,0 +1,162 @@
+# backend/core/benchmarks/indexes.py
+"""
+Query plans and timings of the hot ownership and analytics access paths.
+
+Seeds many tenants so one tenant's rows are a small slice of each table, runs
+ANALYZE, then checks with EXPLAIN that every query in ACCESS_PATHS is answered
+through one of its expected indexes (a failed check fails the run) and times it.
+
+Scale it up with the params to compare plans at production sizes.
+
+Params: tenants (default 50), campaigns per tenant (default 10), days (default 180)
+"""
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Sum
+
+from core.benchmarks import register
+from core.models import User, Campaign, AdContent, ImageAsset, DailyAnalytics
+from core.services.synthetic_analytics import SyntheticAnalyticsService
+from core.utils.timezone_utils import start_of_day, today
+
+DEFAULT_TENANTS = 50
+DEFAULT_CAMPAIGNS = 10
+DEFAULT_DAYS = 180
+CONTENT_PER_CAMPAIGN = 20
+
+# Name -> (queryset factory taking (user, today), acceptable index names per vendor)
+ACCESS_PATHS = {
+    'active campaigns': (
+        lambda user, day: Campaign.objects.filter(user=user, is_active=True, end_date__gte=day),
+        {'sqlite': ['campaign_user_active_idx'], 'postgresql': ['campaign_user_active_idx']},
+    ),
+    'campaign list': (
+        lambda user, day: Campaign.objects.filter(user=user).order_by('-created_at'),
+        {'sqlite': ['campaign_user_created_idx'], 'postgresql': ['campaign_user_created_idx']},
+    ),
+    # Tenant scans on the denormalized user column, each followed by the
+    # campaign-join form it replaced, for comparison. PostgreSQL may rightly
+    # hash-join the join forms instead, so only their timings count there
+    'ads created this week': (
+        lambda user, day: AdContent.objects.filter(
+            user=user, created_at__gte=start_of_day(day - timedelta(days=7))
+        ),
+        {'sqlite': ['adcontent_user_created_idx'], 'postgresql': ['adcontent_user_created_idx']},
+    ),
+    'ads created this week (campaign join)': (
+        lambda user, day: AdContent.objects.filter(
+            campaign__user=user, created_at__gte=start_of_day(day - timedelta(days=7))
+        ),
+        {'sqlite': ['adcontent_campaign_idx']},
+    ),
+    'images created this week': (
+        lambda user, day: ImageAsset.objects.filter(
+            user=user, created_at__gte=start_of_day(day - timedelta(days=7))
+        ),
+        {'sqlite': ['imageasset_user_created_idx'], 'postgresql': ['imageasset_user_created_idx']},
+    ),
+    'images created this week (campaign join)': (
+        lambda user, day: ImageAsset.objects.filter(
+            campaign__user=user, created_at__gte=start_of_day(day - timedelta(days=7))
+        ),
+        {'sqlite': ['imageasset_campaign_idx']},
+    ),
+    'two-week analytics aggregate': (
+        lambda user, day: DailyAnalytics.objects.filter(
+            user=user, date__gte=day - timedelta(days=14), date__lte=day
+        ).values('user').annotate(impressions=Sum('impressions'), clicks=Sum('clicks')),
+        {'sqlite': ['dailyanalytics_user_date_idx'], 'postgresql': ['dailyanalytics_user_date_idx']},
+    ),
+    'two-week analytics aggregate (campaign join)': (
+        lambda user, day: DailyAnalytics.objects.filter(
+            campaign__user=user, date__gte=day - timedelta(days=14), date__lte=day
+        ).values('campaign__user').annotate(impressions=Sum('impressions'), clicks=Sum('clicks')),
+        {'sqlite': ['core_dailyanalytics_campaign_id_date']},
+    ),
+    # Timed only: the BRIN index pays off once the table is large and rows
+    # arrive in date order, which the seeded data is neither
+    'cross-tenant date range': (
+        lambda user, day: DailyAnalytics.objects.filter(date=day - timedelta(days=1)),
+        {},
+    ),
+}
+
+
+def _seed(tenants, campaigns_per_tenant, days):
+    users = User.objects.bulk_create([
+        User(email=f'benchmark-indexes-{i}@example.com') for i in range(tenants)
+    ])
+    first_day = today() - timedelta(days=days - 1)
+    campaigns = Campaign.objects.bulk_create([
+        Campaign(
+            user=user,
+            title=f'Benchmark campaign {i}',
+            platform='instagram',
+            budget=500,
+            start_date=first_day,
+            end_date=today() + timedelta(days=(i % 3 - 1) * 30),
+            is_active=i % 4 != 0,
+        )
+        for user in users
+        for i in range(campaigns_per_tenant)
+    ])
+    AdContent.objects.bulk_create([
+        AdContent(campaign=campaign, user_id=campaign.user_id, text=f'Ad {i}', tone='casual', platform='instagram')
+        for campaign in campaigns
+        for i in range(CONTENT_PER_CAMPAIGN)
+    ], batch_size=5000)
+    ImageAsset.objects.bulk_create([
+        ImageAsset(campaign=campaign, user_id=campaign.user_id, prompt=f'Image {i}')
+        for campaign in campaigns
+        for i in range(CONTENT_PER_CAMPAIGN)
+    ], batch_size=5000)
+    SyntheticAnalyticsService.generate(
+        Campaign.objects.filter(user__in=users), days=days, seed=41
+    )
+    return users
+
+
+def _with_partition_indexes(names):
+    """Add the per-partition copies of `names` on partitioned tables (PostgreSQL)"""
+    if connection.vendor != 'postgresql':
+        return names
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = ANY(ARRAY(SELECT to_regclass(name) FROM unnest(%s::text[]) AS name))",
+            [names]
+        )
+        return names + [row[0] for row in cursor.fetchall()]
+
+
+def _plan_uses(plan, names):
+    return any(name in plan for name in names)
+
+
+@register('indexes', 'EXPLAIN checks and timings for the indexed ownership and analytics queries')
+def run(benchmark):
+    tenants = benchmark.param('tenants', DEFAULT_TENANTS, int)
+    campaigns_per_tenant = benchmark.param('campaigns', DEFAULT_CAMPAIGNS, int)
+    days = benchmark.param('days', DEFAULT_DAYS, int)
+
+    users = _seed(tenants, campaigns_per_tenant, days)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+    user = users[len(users) // 2]
+    day = today()
+    for name, (build, expected) in ACCESS_PATHS.items():
+        queryset = build(user, day)
+        names = expected.get(connection.vendor)
+        if names:
+            plan = queryset.explain()
+            benchmark.check(
+                f'{name} plan',
+                0 if _plan_uses(plan, _with_partition_indexes(names)) else 1,
+                0,
+                'unindexed',
+                expected=' or '.join(names),
+                plan=' | '.join(line.strip() for line in plan.splitlines()),
+            )
+        benchmark.time(name, lambda: list(build(user, day)), number=5, repeat=10)
@@ -0,0 +1,135 @@
+# backend/core/benchmarks/instrumentation.py
+"""
+Overhead and output of the request instrumentation (core/instrumentation.py).
+
+Checks that:
+- timing a query costs under 20 us on top of the query itself;
+- the middleware adds under 100 us to a request, histograms included;
+- a request's queries are counted, for a sync view and for an async view
+  whose ORM work runs in a thread;
+- /metrics serves every histogram, and only with the bearer token when
+  METRICS_TOKEN is set;
+- a slow request is logged with its top queries.
+
+Params: queries (per timed request, default 20)
+"""
+import json
+import logging
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+from django.test.utils import override_settings
+
+from core import instrumentation
+from core.benchmarks import register
+from core.instrumentation import RequestMetricsMiddleware, RequestStats
+
+DEFAULT_QUERIES = 20
+
+METRIC_NAMES = (
+    'advision_request_duration_seconds',
+    'advision_request_db_queries',
+    'advision_request_db_duration_seconds',
+    'advision_request_outbound_http_duration_seconds',
+    'advision_response_size_bytes',
+)
+
+
+def _select_one():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@register('instrumentation', 'Request instrumentation overhead, query counting and /metrics output')
+def run(benchmark):
+    queries = benchmark.param('queries', DEFAULT_QUERIES, int)
+    instrumented = instrumentation._time_query in connection.execute_wrappers
+    benchmark.check('query wrapper not installed', int(not instrumented), 0, 'errors')
+
+    bare = benchmark.time('SELECT 1, outside a request', _select_one, number=500, repeat=20)
+    token = instrumentation._current.set(RequestStats())
+    try:
+        timed = benchmark.time('SELECT 1, inside a request', _select_one, number=500, repeat=20)
+    finally:
+        instrumentation._current.reset(token)
+    benchmark.check('per-query overhead', round(max(timed['value'] - bare['value'], 0), 2), 20, 'us')
+
+    request = RequestFactory().get('/api/campaigns/')
+    empty = HttpResponse(b'{}', content_type='application/json')
+    middleware = RequestMetricsMiddleware(lambda request: empty)
+    plain = benchmark.time('view alone', lambda: empty, number=500, repeat=20)
+    wrapped = benchmark.time('view through middleware', lambda: middleware(request), number=500, repeat=20)
+    benchmark.check('middleware overhead', round(wrapped['p95'] - plain['p95'], 2), 100, 'us')
+
+    def view(request):
+        for _ in range(queries):
+            _select_one()
+        return HttpResponse()
+
+    stats = RequestStats()
+    token = instrumentation._current.set(stats)
+    try:
+        view(request)
+    finally:
+        instrumentation._current.reset(token)
+    benchmark.check('sync view queries missed', abs(stats.queries - queries), 0, 'queries', counted=stats.queries)
+
+    from asgiref.sync import async_to_sync, sync_to_async
+
+    async def async_view():
+        await sync_to_async(view)(request)
+
+    stats = RequestStats()
+    token = instrumentation._current.set(stats)
+    try:
+        async_to_sync(async_view)()
+    finally:
+        instrumentation._current.reset(token)
+    benchmark.check('async view queries missed', abs(stats.queries - queries), 0, 'queries', counted=stats.queries)
+
+    client = Client()
+    # The test client sends Host: testserver, which only the test runner allows
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        with override_settings(METRICS_TOKEN=''):
+            body = client.get('/metrics').content.decode()
+        with override_settings(METRICS_TOKEN='benchmark-token'):
+            anonymous = client.get('/metrics').status_code
+            wrong = client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong-token').status_code
+            authorized = client.get('/metrics', HTTP_AUTHORIZATION='Bearer benchmark-token').status_code
+    missing = [name for name in METRIC_NAMES if f'# TYPE {name} histogram' not in body]
+    benchmark.check('metrics missing from /metrics', len(missing), 0, 'metrics', missing=missing)
+    benchmark.check(
+        '/metrics served without the token',
+        int(anonymous != 401) + int(wrong != 401), 0, 'errors',
+        anonymous=anonymous, wrong_token=wrong,
+    )
+    benchmark.check('/metrics refused with the token', int(authorized != 200), 0, 'errors', status=authorized)
+
+    capture = _Capture()
+    logger = logging.getLogger('core.instrumentation')
+    logger.addHandler(capture)
+    try:
+        with override_settings(SLOW_REQUEST_SECONDS=0):
+            middleware = RequestMetricsMiddleware(view)
+            middleware(request)
+    finally:
+        logger.removeHandler(capture)
+    entries = [json.loads(message.split(' ', 1)[1]) for message in capture.messages if message.startswith('slow_request ')]
+    top = entries[-1]['top_queries'] if entries else []
+    benchmark.check(
+        'slow request log without top queries',
+        int(not top or top[0]['count'] != queries), 0, 'errors',
+        logged=len(entries), top=top[:1],
+    )
@@ -0,0 +1,146 @@
+# backend/core/benchmarks/keys.py
+"""
+Insert throughput and primary key index size by key type.
+
+Appends the same DailyAnalytics-shaped rows into scratch tables keyed by
+uuid4, uuid7 (core.utils.ids) and a bigint identity, then measures each
+table's primary key index. Random uuid4 keys split pages all over the index;
+time-ordered keys only ever fill its right edge, which PostgreSQL packs full
+(SQLite splits index pages evenly either way, so there the gain shows up as
+insert throughput rather than size). The run fails if uuid7 ids come out of
+order or, on PostgreSQL, if the uuid7 index is not smaller than the uuid4 one.
+
+Params: rows (default 200000), batch (rows per INSERT batch, default 2000)
+"""
+import time
+import uuid
+from datetime import timedelta
+
+from django.db import connection
+
+from core.benchmarks import register
+from core.utils.ids import uuid7
+from core.utils.timezone_utils import today
+
+DEFAULT_ROWS = 200_000
+DEFAULT_BATCH = 2000
+CAMPAIGNS = 50
+
+# Key name -> id factory; None means the database assigns a bigint
+KEY_TYPES = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+    'bigint': None,
+}
+
+
+def _table(key):
+    return f'benchmark_keys_{key}'
+
+
+def _create(key, factory):
+    postgres = connection.vendor == 'postgresql'
+    if factory is None:
+        id_column = (
+            'id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY' if postgres
+            else 'id integer PRIMARY KEY'
+        )
+    else:
+        id_column = f"id {'uuid' if postgres else 'char(32)'} PRIMARY KEY"
+    campaign_column = f"campaign_id {'uuid' if postgres else 'char(32)'} NOT NULL"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE {_table(key)} ({id_column}, {campaign_column}, '
+            f'date date NOT NULL, impressions integer NOT NULL)'
+        )
+
+
+def _db_value(value):
+    return str(value) if connection.vendor == 'postgresql' else value.hex
+
+
+def _insert(key, factory, rows, batch):
+    """Append `rows` rows in batches, ids generated as each batch is written"""
+    campaigns = [_db_value(uuid.uuid4()) for _ in range(CAMPAIGNS)]
+    first_day = today() - timedelta(days=rows // CAMPAIGNS)
+    if factory is None:
+        sql = f'INSERT INTO {_table(key)} (campaign_id, date, impressions) VALUES (%s, %s, %s)'
+    else:
+        sql = f'INSERT INTO {_table(key)} (id, campaign_id, date, impressions) VALUES (%s, %s, %s, %s)'
+
+    start = time.perf_counter()
+    with connection.cursor() as cursor:
+        for offset in range(0, rows, batch):
+            values = []
+            for i in range(offset, min(offset + batch, rows)):
+                row = (campaigns[i % CAMPAIGNS], first_day + timedelta(days=i // CAMPAIGNS), i % 5000)
+                values.append(row if factory is None else (_db_value(factory()),) + row)
+            cursor.executemany(sql, values)
+    return time.perf_counter() - start
+
+
+def _sizes(key):
+    """(primary key index bytes, table bytes), or None if the backend can't tell"""
+    table = _table(key)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT pg_relation_size(%s), pg_relation_size(%s)', [f'{table}_pkey', table]
+            )
+            return cursor.fetchone()
+        if connection.vendor == 'sqlite':
+            try:
+                # An INTEGER PRIMARY KEY is the rowid and has no separate index
+                cursor.execute(
+                    "SELECT COALESCE(SUM(CASE WHEN name = %s THEN pgsize END), 0), "
+                    "SUM(CASE WHEN name = %s THEN pgsize END) FROM dbstat",
+                    [f'sqlite_autoindex_{table}_1', table]
+                )
+            except Exception:
+                return None
+            return cursor.fetchone()
+    return None
+
+
+@register('keys', 'Insert throughput and primary key index size for uuid4, uuid7 and bigint keys')
+def run(benchmark):
+    rows = benchmark.param('rows', DEFAULT_ROWS, int)
+    batch = benchmark.param('batch', DEFAULT_BATCH, int)
+
+    ids = [uuid7() for _ in range(10_000)]
+    benchmark.check(
+        'uuid7 out-of-order ids', sum(a >= b for a, b in zip(ids, ids[1:])), 0, 'ids', generated=len(ids)
+    )
+    benchmark.time('uuid4 generation', uuid.uuid4, number=10_000, repeat=10)
+    benchmark.time('uuid7 generation', uuid7, number=10_000, repeat=10)
+
+    index_bytes = {}
+    for key, factory in KEY_TYPES.items():
+        _create(key, factory)
+        elapsed = _insert(key, factory, rows, batch)
+        benchmark.record(f'{key} insert', round(rows / elapsed), 'rows/s', rows=rows, seconds=round(elapsed, 3))
+
+        sizes = _sizes(key)
+        if sizes is None:
+            continue
+        index_bytes[key], table_bytes = sizes
+        benchmark.record(
+            f'{key} primary key index',
+            round(index_bytes[key] / 1024, 1),
+            'KB',
+            bytes_per_row=round(index_bytes[key] / rows, 1),
+            table_kb=round(table_bytes / 1024, 1),
+            backend=connection.vendor,
+        )
+
+    if connection.vendor == 'postgresql':
+        benchmark.check(
+            'uuid7/uuid4 index size',
+            round(index_bytes['uuid7'] / index_bytes['uuid4'], 3),
+            0.9,
+            'ratio',
+        )
+
+    with connection.cursor() as cursor:
+        for key in KEY_TYPES:
+            cursor.execute(f'DROP TABLE {_table(key)}')
@@ -0,0 +1,148 @@
+# backend/core/benchmarks/outbound_http.py
+"""
+Behaviour and cost of the outbound HTTP layer (core/utils/http.py), against
+a local stub server.
+
+Checks that:
+- sequential calls to one provider reuse a single keep-alive connection;
+- a GET failing with 503 twice succeeds on the third attempt, while a POST
+  (not retry_posts) is sent once;
+- under a provider that always fails, retries stay within the retry budget;
+- once the circuit opens, calls fail fast without reaching the server, and
+  after the reset one successful trial call closes it again;
+- fetch() adds under 200 us per call over a bare httpx.Client (p50);
+- afetch() goes through the same pool and policies.
+
+Params: calls (default 200)
+"""
+import asyncio
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from django.test.utils import override_settings
+
+from core.benchmarks import register
+from core.utils.http import RETRY_BUDGET_MAX, CircuitOpenError, aclose_clients, afetch, fetch
+
+DEFAULT_CALLS = 200
+BREAKER_FAILURES = 3
+BREAKER_RESET = 0.2
+RETRY_BUDGET = 0.2
+
+
+class _Stub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        self.hits = {}
+        self.peers = set()
+        self.fail_first = {}
+        self.lock = threading.Lock()
+        super().__init__(('127.0.0.1', 0), _Handler)
+
+    def url(self, path):
+        return f'http://127.0.0.1:{self.server_address[1]}{path}'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """/ok answers 200, /fail 503, /flaky 503 for its first `fail_first` hits"""
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; don't let Nagle hold the body
+    disable_nagle_algorithm = True
+
+    def _answer(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        server = self.server
+        with server.lock:
+            hits = server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            server.peers.add(self.client_address)
+        failing = self.path == '/fail' or hits <= server.fail_first.get(self.path, 0)
+        self.send_response(503 if failing else 200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    do_GET = do_POST = _answer
+
+    def log_message(self, *args):
+        pass
+
+
+def _provider(label):
+    # Fresh per run: breaker and budget state live as long as the process
+    return f'benchmark-{label}-{uuid.uuid4().hex[:8]}'
+
+
+@register('outbound_http', 'Outbound HTTP pooling, retries, retry budget and circuit breaker')
+def run(benchmark):
+    calls = benchmark.param('calls', DEFAULT_CALLS, int)
+    stub = _Stub()
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+
+    pooled, retried, budgeted, breaker, timed, async_ = (
+        _provider(label) for label in ('pool', 'retry', 'budget', 'breaker', 'timing', 'async')
+    )
+    providers = {
+        name: {'timeout': 5, 'retries': 2, 'breaker_failures': 10 ** 6}
+        for name in (pooled, retried, budgeted, timed, async_)
+    }
+    providers[breaker] = {'timeout': 5, 'retries': 0, 'breaker_failures': BREAKER_FAILURES, 'breaker_reset': BREAKER_RESET}
+
+    try:
+        with override_settings(HTTP_PROVIDERS=providers, HTTP_RETRY_BACKOFF=0.001, HTTP_RETRY_BUDGET=RETRY_BUDGET):
+            stub.peers.clear()
+            for _ in range(20):
+                fetch(pooled, 'GET', stub.url('/ok'))
+            benchmark.check('connections for 20 calls', len(stub.peers), 1, 'connections')
+
+            stub.fail_first['/flaky'] = 2
+            status = fetch(retried, 'GET', stub.url('/flaky')).status_code
+            benchmark.check('GET not recovered by retries', int(status != 200), 0, 'errors', attempts=stub.hits['/flaky'])
+            fetch(retried, 'POST', stub.url('/fail'))
+            benchmark.check('POST attempts', stub.hits['/fail'], 1, 'attempts')
+
+            stub.hits['/fail'] = 0
+            for _ in range(calls):
+                fetch(budgeted, 'GET', stub.url('/fail'))
+            retries = stub.hits['/fail'] - calls
+            allowed = RETRY_BUDGET_MAX + RETRY_BUDGET * calls
+            benchmark.check('retries over budget', max(retries - allowed, 0), 0, 'retries', retries=retries, calls=calls)
+
+            stub.hits['/fail'] = 0
+            for _ in range(BREAKER_FAILURES):
+                fetch(breaker, 'GET', stub.url('/fail'))
+            start = time.perf_counter()
+            try:
+                fetch(breaker, 'GET', stub.url('/fail'))
+                short_circuited = False
+            except CircuitOpenError:
+                short_circuited = True
+            benchmark.check(
+                'circuit not open after failures', int(not short_circuited or stub.hits['/fail'] != BREAKER_FAILURES),
+                0, 'errors', hits=stub.hits['/fail'],
+            )
+            benchmark.record('fail fast', round((time.perf_counter() - start) * 10 ** 6, 1), 'us')
+            time.sleep(BREAKER_RESET)
+            trial = fetch(breaker, 'GET', stub.url('/ok')).status_code
+            closed = fetch(breaker, 'GET', stub.url('/ok')).status_code
+            benchmark.check('circuit not closed after trial', int(trial != 200 or closed != 200), 0, 'errors')
+
+            with httpx.Client() as client:
+                bare = benchmark.time('bare httpx.Client GET', lambda: client.get(stub.url('/ok')), number=20, repeat=20)
+            through = benchmark.time('fetch() GET', lambda: fetch(timed, 'GET', stub.url('/ok')), number=20, repeat=20)
+            benchmark.check('fetch() overhead', round(max(through['value'] - bare['value'], 0), 1), 200, 'us')
+
+            async def concurrent():
+                try:
+                    responses = await asyncio.gather(*(afetch(async_, 'GET', stub.url('/ok')) for _ in range(20)))
+                finally:
+                    await aclose_clients()
+                return sum(response.status_code != 200 for response in responses)
+
+            benchmark.check('afetch() failures', asyncio.run(concurrent()), 0, 'requests')
+    finally:
+        stub.shutdown()
+        stub.server_close()
@@ -0,0 +1,122 @@
+# backend/core/benchmarks/quotas.py
+"""
+Cost and correctness of the per-user quotas (core/services/quotas.py).
+
+Runs against the configured default cache (the Lua path when it is Redis)
+and checks that:
+- a scope allows exactly `burst` requests at once and then asks the client
+  to wait one emission interval;
+- the in-flight cap refuses the request after `concurrency` unreleased ones;
+- under concurrent threads no more than `burst` requests get through;
+- acquire + release costs under a millisecond (p95);
+- an over-quota request to /api/generate/text/ is refused with a 429 and a
+  Retry-After header before the view runs.
+
+Params: threads (default 16), calls (attempts per thread, default 50)
+"""
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from core.benchmarks import register
+from core.models import User
+from core.services.quotas import RATE_LIMITED, TOO_MANY_IN_FLIGHT, QuotaService
+
+DEFAULT_THREADS = 16
+DEFAULT_CALLS = 50
+
+BURST = 5
+RATE_PER_SECOND = 10
+CONCURRENCY = 2
+
+QUOTAS = {
+    'benchmark_rate': {'rate': RATE_PER_SECOND, 'period': 1, 'burst': BURST},
+    'benchmark_concurrency': {'rate': 1000, 'period': 1, 'burst': 1000, 'concurrency': CONCURRENCY},
+    # Refills once an hour, so only the burst gets through during the run
+    'benchmark_contended': {'rate': 1, 'period': 3600, 'burst': 100, 'concurrency': 0},
+    'benchmark_cost': {'rate': 10 ** 9, 'period': 1, 'burst': 10 ** 9, 'concurrency': 10},
+    'text_generation': {'rate': 1, 'period': 60, 'burst': 2, 'concurrency': 1},
+}
+
+
+def _ident():
+    # Fresh per run so a shared cache can't carry state between runs
+    return f'benchmark:{uuid.uuid4().hex}'
+
+
+@register('quotas', 'Per-user rate limit and in-flight quota cost and correctness')
+def run(benchmark):
+    threads = benchmark.param('threads', DEFAULT_THREADS, int)
+    calls = benchmark.param('calls', DEFAULT_CALLS, int)
+    backend = type(caches['default']).__name__
+
+    # The test client sends Host: testserver, which only the test runner allows
+    with override_settings(
+        API_QUOTAS=QUOTAS, QUOTAS_ENABLED=True, OPENROUTER_API_KEY=None,
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+    ):
+        ident = _ident()
+        results = [QuotaService.acquire('benchmark_rate', ident) for _ in range(BURST + 1)]
+        benchmark.check(
+            'burst requests refused', sum(not allowed for allowed, _, _ in results[:BURST]), 0, 'requests',
+            backend=backend,
+        )
+        allowed, wait, reason = results[BURST]
+        benchmark.check('request past the burst allowed', int(allowed or reason != RATE_LIMITED), 0, 'requests')
+        # The next token is one interval away, less the time the burst took
+        benchmark.check('retry after error', round(abs(1 / RATE_PER_SECOND - wait), 3), 0.05, 's', wait=round(wait, 3))
+
+        ident = _ident()
+        held = [QuotaService.acquire('benchmark_concurrency', ident) for _ in range(CONCURRENCY + 1)]
+        benchmark.check(
+            'in-flight cap', int(not all(allowed for allowed, _, _ in held[:CONCURRENCY]) or held[-1][2] != TOO_MANY_IN_FLIGHT),
+            0, 'errors',
+        )
+        QuotaService.release('benchmark_concurrency', ident)
+        benchmark.check('slot freed by release', int(not QuotaService.acquire('benchmark_concurrency', ident)[0]), 0, 'errors')
+
+        ident = _ident()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            granted = sum(pool.map(
+                lambda _: sum(QuotaService.acquire('benchmark_contended', ident)[0] for _ in range(calls)),
+                range(threads),
+            ))
+        burst = QUOTAS['benchmark_contended']['burst']
+        benchmark.check(
+            'contended over-admission', abs(granted - burst), 0, 'requests',
+            granted=granted, attempts=threads * calls, threads=threads,
+        )
+
+        ident = _ident()
+
+        def acquire_and_release():
+            QuotaService.acquire('benchmark_cost', ident)
+            QuotaService.release('benchmark_cost', ident)
+
+        # Acquire and release are one cache round trip each on Redis
+        benchmark.time('cache round trip', lambda: caches['default'].get(ident), number=200, repeat=20)
+        result = benchmark.time('acquire + release', acquire_and_release, number=200, repeat=20)
+        benchmark.check('acquire + release p95', result['p95'], 1000, 'us', backend=backend)
+
+        user = User.objects.create(email=f'benchmark-quotas-{uuid.uuid4().hex[:8]}@example.com')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        responses = [
+            client.post('/api/generate/text/', {'prompt': 'benchmark'}, format='json')
+            for _ in range(QUOTAS['text_generation']['burst'] + 1)
+        ]
+        refused = responses[-1]
+        benchmark.check(
+            'over-quota request not refused',
+            int(refused.status_code != 429 or 'Retry-After' not in refused.headers),
+            0, 'errors', status=refused.status_code, retry_after=refused.headers.get('Retry-After'),
+        )
+        benchmark.time(
+            '429 response',
+            lambda: client.post('/api/generate/text/', {'prompt': 'benchmark'}, format='json'),
+            number=1, repeat=50, warmup=0,
+        )
@@ -0,0 +1,73 @@
+# backend/core/benchmarks/recommendations.py
+import time
+from datetime import timedelta
+
+from core.benchmarks import register
+from core.models import User, Campaign, DailyAnalytics
+from core.services.recommendations import RecommendationService, RULE_COUNT
+from core.services.report_data import ReportDataService
+from core.utils.timezone_utils import today
+
+USERS = 200
+CAMPAIGNS_PER_USER = 2
+DAYS = 14
+
+
+def _seed():
+    users = User.objects.bulk_create([
+        User(email=f'benchmark-recommendations-{i}@example.com')
+        for i in range(USERS)
+    ])
+    campaigns = Campaign.objects.bulk_create([
+        Campaign(
+            user=user,
+            title=f'Benchmark campaign {i}-{k}',
+            platform='facebook',
+            budget=100,
+            start_date=today() - timedelta(days=DAYS),
+            end_date=today() + timedelta(days=7),
+        )
+        for i, user in enumerate(users)
+        for k in range(CAMPAIGNS_PER_USER)
+    ])
+    DailyAnalytics.objects.bulk_create([
+        DailyAnalytics(
+            campaign=campaign,
+            user_id=campaign.user_id,
+            date=today() - timedelta(days=day),
+            impressions=1000 + 37 * i,
+            clicks=10 + (i * 7 + day) % 60,
+            conversions=(i + day) % 5,
+            spend=20 + i % 13,
+        )
+        for i, campaign in enumerate(campaigns)
+        for day in range(DAYS)
+    ], batch_size=2000)
+    return users
+
+
+@register('recommendations', 'Weekly recommendation rule evaluation: batch throughput and report reads')
+def run(benchmark):
+    users = _seed()
+
+    result = RecommendationService.refresh_all(force=True)
+    benchmark.record(
+        f'batch refresh, {USERS} users',
+        result['users_per_second'],
+        'users/s',
+        seconds=result['seconds'],
+        rules=RULE_COUNT,
+        rule_evaluations_per_second=result['rules_per_second'],
+    )
+
+    snapshot = ReportDataService.weekly_snapshot(ReportDataService.weekly_metrics(users[0]))
+    benchmark.time('evaluate rules (one snapshot)', lambda: RecommendationService.evaluate(snapshot), number=200)
+
+    user = users[0]
+    benchmark.time('weekly report (stored recommendations)', lambda: ReportDataService.weekly_report(user), number=20)
+
+    start = time.perf_counter()
+    for user in users[:20]:
+        RecommendationService.refresh(user)
+    elapsed = time.perf_counter() - start
+    benchmark.record('weekly report (re-evaluated)', round(elapsed / 20 * 1e6, 1), 'us/call')
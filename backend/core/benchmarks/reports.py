@@ -0,0 +1,87 @@
+# backend/core/benchmarks/reports.py
+import time
+from datetime import timedelta
+
+from core.benchmarks import register
+from core.models import User, Campaign
+from core.services.report_data import ReportDataService
+from core.services.synthetic_analytics import SyntheticAnalyticsService
+from core.utils.report_generator import ReportGenerator
+from core.utils.timezone_utils import today
+
+BATCH_SIZES = (1, 50, 500)
+
+# Days of analytics seeded per campaign; covers this week and last week
+DAYS = 14
+
+
+class _CountingSink:
+    """Writable file-like object that only counts bytes"""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        return len(data)
+
+
+def _seed(count):
+    first_day = today() - timedelta(days=DAYS - 1)
+    user = User.objects.create(email=f'benchmark-reports-{count}@example.com')
+    campaigns = Campaign.objects.bulk_create([
+        Campaign(
+            user=user,
+            title=f'Benchmark campaign {i}',
+            platform='facebook',
+            budget=100 + i,
+            start_date=first_day,
+            end_date=today() + timedelta(days=30),
+        )
+        for i in range(count)
+    ])
+    # Daily rows (and the summaries rebuilt from them) give the weekly report
+    # real data to aggregate
+    SyntheticAnalyticsService.generate(Campaign.objects.filter(user=user), days=DAYS, seed=count)
+    return user, campaigns
+
+
+@register('reports', 'PDF rendering throughput for 1, 50 and 500 campaign reports')
+def run(benchmark):
+    for count in BATCH_SIZES:
+        user, campaigns = _seed(count)
+
+        start = time.perf_counter()
+        analytics = ReportDataService.campaign_analytics(campaigns)
+        gathered = time.perf_counter()
+
+        total_bytes = 0
+        for campaign in campaigns:
+            sink = ReportGenerator.render(
+                ReportGenerator.campaign_story(campaign, analytics[campaign.id]),
+                _CountingSink()
+            )
+            total_bytes += sink.size
+        elapsed = time.perf_counter() - start
+
+        benchmark.record(
+            f'campaign reports x{count}',
+            round(count / elapsed, 1),
+            'pdf/s',
+            seconds=round(elapsed, 3),
+            data_seconds=round(gathered - start, 4),
+            avg_kb=round(total_bytes / count / 1024, 1),
+        )
+
+        start = time.perf_counter()
+        report = ReportDataService.weekly_report(user)
+        gathered = time.perf_counter()
+        ReportGenerator.render(ReportGenerator.weekly_story(report, user_email=user.email), _CountingSink())
+        elapsed = time.perf_counter() - start
+
+        benchmark.record(
+            f'weekly report, {count} campaigns',
+            round(elapsed * 1000, 1),
+            'ms',
+            data_ms=round((gathered - start) * 1000, 1),
+        )
@@ -0,0 +1,62 @@
+# backend/core/benchmarks/traffic_assignment.py
+import itertools
+import time
+
+from core.benchmarks import register
+from core.models import User, Campaign, ABTest, ABTestVariation
+from core.services.event_ingestion import EventBuffer
+from core.services.traffic_assignment import BUCKETS, TrafficAssignmentService
+from core.utils.timezone_utils import today
+
+
+@register('traffic_assignment', 'Visitor -> variation assignment latency')
+def run(benchmark):
+    user = User.objects.create(email='benchmark-assignment@example.com')
+    campaign = Campaign.objects.create(
+        user=user,
+        title='Benchmark campaign',
+        budget=100,
+        start_date=today(),
+        end_date=today(),
+    )
+    ab_test = ABTest.objects.create(
+        campaign=campaign,
+        name='Benchmark test',
+        status='running',
+        traffic_split={'A': 50, 'B': 30, 'C': 20},
+    )
+    for name in ('A', 'B', 'C'):
+        ABTestVariation.objects.create(ab_test=ab_test, name=name)
+
+    start = time.perf_counter()
+    TrafficAssignmentService.invalidate(ab_test.id)
+    TrafficAssignmentService.get_table(ab_test.id)
+    benchmark.record('compile table (cold, 2 queries)', round((time.perf_counter() - start) * 1e6, 1), 'us')
+
+    visitors = itertools.count()
+    test_id = ab_test.id
+    benchmark.time(
+        'assign (cached table)',
+        lambda: TrafficAssignmentService.assign(test_id, next(visitors)),
+        number=5000,
+    )
+
+    # Exposure recording into a private buffer that never flushes during the run
+    buffer = EventBuffer(interval=3600)
+    table = TrafficAssignmentService.get_table(test_id)
+
+    def assign_and_record():
+        assignment = TrafficAssignmentService.assign(test_id, next(visitors), table=table)
+        buffer.add({('ab_variation', assignment['variation_id'], 'impressions'): 1})
+
+    benchmark.time('assign + buffered exposure', assign_and_record, number=5000)
+
+    # Observed split over a large visitor population
+    counts = {name: 0 for name in table.names}
+    population = 100000
+    for visitor in range(population):
+        counts[table.lookup(TrafficAssignmentService.bucket(test_id, visitor))[0]] += 1
+    for name, count in counts.items():
+        target = ab_test.traffic_split[name]
+        benchmark.record(f'share of {name}', round(count / population * 100, 2), '%', target=target)
+    benchmark.record('buckets', BUCKETS, 'count')
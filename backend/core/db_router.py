@@ -0,0 +1,218 @@
+# backend/core/db_router.py
+"""
+Read-replica routing for the read-only analytics views.
+
+Replicas are the DATABASES aliases starting with REPLICA_PREFIX (configured
+from DATABASE_REPLICA_URLS). Nothing is routed to them implicitly: only views
+using ReplicaReadMixin read from a replica, for the duration of the request,
+and every write still goes to the primary.
+
+A replica is skipped when:
+- the user is pinned: they (or a bulk write on their data) changed something
+  in the last REPLICA_PIN_SECONDS, so they read their own writes from the
+  primary;
+- its last health check failed or showed more than REPLICA_MAX_LAG_SECONDS of
+  replication lag (checked at most every REPLICA_HEALTH_CHECK_SECONDS);
+- a query on it fails mid-request, in which case the view is re-run on the
+  primary and the replica is marked down until the next check.
+
+Pins and health live in the default cache, so workers share them only when
+that cache is shared.
+"""
+import logging
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, InterfaceError, OperationalError, connections
+
+from core.utils.db import is_postgres
+
+logger = logging.getLogger(__name__)
+
+REPLICA_PREFIX = 'replica'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Alias reads are routed to in the current request; None means the primary
+_read_alias = ContextVar('read_alias', default=None)
+
+# Seconds the replica is behind; 0 on a primary or a standby that has
+# replayed everything it received
+_POSTGRES_LAG_SQL = (
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith(REPLICA_PREFIX)]
+
+
+def _pin_key(user_id):
+    return f'db:pinned:{user_id}'
+
+
+def _health_key(alias):
+    return f'db:replica_ok:{alias}'
+
+
+def pin_to_primary(user_ids):
+    """Serve these users' reads from the primary for REPLICA_PIN_SECONDS"""
+    if not replica_aliases():
+        return
+    cache.set_many({_pin_key(user_id): True for user_id in set(user_ids)}, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id):
+    return bool(cache.get(_pin_key(user_id)))
+
+
+def replica_lag(alias):
+    """Replication lag of a replica in seconds; raises if it can't be reached"""
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        cursor.execute(_POSTGRES_LAG_SQL if is_postgres(connection) else 'SELECT 0')
+        return float(cursor.fetchone()[0])
+
+
+def check_replica(alias):
+    """Probe a replica and cache whether it may serve reads"""
+    try:
+        lag = replica_lag(alias)
+    except (OperationalError, InterfaceError) as e:
+        logger.warning(f"⚠️ Replica {alias} unreachable: {e}")
+        healthy = False
+    else:
+        healthy = lag <= settings.REPLICA_MAX_LAG_SECONDS
+        if not healthy:
+            logger.warning(f"⚠️ Replica {alias} is {lag:.1f}s behind, reading from the primary")
+    cache.set(_health_key(alias), healthy, settings.REPLICA_HEALTH_CHECK_SECONDS)
+    return healthy
+
+
+def mark_replica_down(alias):
+    cache.set(_health_key(alias), False, settings.REPLICA_HEALTH_CHECK_SECONDS)
+
+
+def read_database_for(user):
+    """Alias the user's analytics reads should use: a healthy replica or the primary"""
+    aliases = replica_aliases()
+    if not aliases or (user.is_authenticated and is_pinned(user.pk)):
+        return DEFAULT_DB_ALIAS
+    random.shuffle(aliases)
+    for alias in aliases:
+        healthy = cache.get(_health_key(alias))
+        if healthy is None:
+            healthy = check_replica(alias)
+        if healthy:
+            return alias
+    return DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def use_primary():
+    """
+    Read from the primary inside a replica view, for data that is computed
+    and written back (a replica could make the write stale)
+    """
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """Route reads inside ReplicaReadMixin views to the chosen replica"""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db.startswith(REPLICA_PREFIX):
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    APIView mixin sending the view's reads to a replica.
+
+    Only for views that don't depend on reading what they write themselves.
+    `self.read_db` is the alias in use, for querysets evaluated after the view
+    returns (e.g. streamed responses), which must pin it with .using().
+    """
+    read_db = DEFAULT_DB_ALIAS
+    _primary_only = False
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # After authentication, so stickiness can be looked up for the user
+        if not self._primary_only:
+            self.read_db = read_database_for(request.user)
+        _read_alias.set(None if self.read_db == DEFAULT_DB_ALIAS else self.read_db)
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _read_alias.set(None)
+        try:
+            try:
+                return super().dispatch(request, *args, **kwargs)
+            except (OperationalError, InterfaceError) as e:
+                if self.read_db == DEFAULT_DB_ALIAS:
+                    raise
+                logger.warning(f"⚠️ Replica {self.read_db} failed ({e}), retrying on the primary")
+                mark_replica_down(self.read_db)
+                self.read_db = DEFAULT_DB_ALIAS
+                self._primary_only = True
+                _read_alias.set(None)
+                return super().dispatch(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+
+
+class ReplicaPinMiddleware:
+    """Pin users to the primary after a successful mutating request"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if self._mutated(request, response):
+            self._pin(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self._mutated(request, response):
+            # request.user may still be a lazy session lookup, which can't run on the event loop
+            await sync_to_async(self._pin)(request)
+        return response
+
+    def _mutated(self, request, response):
+        return request.method not in SAFE_METHODS and response.status_code < 400
+
+    def _pin(self, request):
+        # DRF copies the authenticated user onto the Django request
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            pin_to_primary([user.pk])
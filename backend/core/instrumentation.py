@@ -0,0 +1,242 @@
+# backend/core/instrumentation.py
+"""
+Per-request performance instrumentation.
+
+RequestMetricsMiddleware (first in MIDDLEWARE while INSTRUMENTATION_ENABLED)
+measures every request: wall time, database queries and their time,
+outbound HTTP time per provider and response size, labelled by view (its URL
+name). They are exported as Prometheus histograms at /metrics, and a request
+slower than SLOW_REQUEST_SECONDS is logged as one JSON line with the SQL
+that took the most time.
+
+Queries are timed by an execute wrapper installed on every new database
+connection, outbound calls by the shared HTTP client (core/utils/http.py,
+which also exports per-attempt latency, retries and circuit breaker trips per
+provider) or record_outbound(). Both find the current request's stats through a context
+variable, which asgiref carries into sync_to_async threads, so work an async
+view hands to a thread is counted too. Outside a request (celery, commands)
+they do nothing.
+
+Each worker process keeps its own metrics. With more than one, set
+PROMETHEUS_MULTIPROC_DIR to a directory the workers share (gunicorn.conf.py
+empties it at startup) and /metrics aggregates all of them; otherwise a
+scrape sees only the worker that served it.
+"""
+import hmac
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+logger = logging.getLogger(__name__)
+
+# Longest SQL text kept per entry in a slow request log line
+MAX_SQL_LENGTH = 500
+
+REQUEST_SECONDS = Histogram(
+    'advision_request_duration_seconds', 'Request wall time', ['view', 'method', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+DB_QUERIES = Histogram(
+    'advision_request_db_queries', 'Database queries per request', ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+DB_SECONDS = Histogram(
+    'advision_request_db_duration_seconds', 'Time spent in database queries per request', ['view'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+HTTP_SECONDS = Histogram(
+    'advision_request_outbound_http_duration_seconds', 'Time spent on outbound HTTP per request and provider',
+    ['view', 'provider'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 90, 120),
+)
+RESPONSE_BYTES = Histogram(
+    'advision_response_size_bytes', 'Response body size', ['view'],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+
+# Per outbound attempt, from core/utils/http.py
+OUTBOUND_SECONDS = Histogram(
+    'advision_outbound_http_duration_seconds', 'Outbound HTTP attempt latency', ['provider', 'outcome'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 90, 120),
+)
+OUTBOUND_RETRIES = Counter('advision_outbound_http_retries', 'Outbound HTTP retries', ['provider'])
+SHORT_CIRCUITED = Counter(
+    'advision_outbound_http_short_circuited', 'Outbound calls failed fast by an open circuit', ['provider'],
+)
+CIRCUIT_OPENED = Counter('advision_outbound_http_circuit_opened', 'Times a provider circuit opened', ['provider'])
+
+# Stats of the request being served; None outside one
+_current = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    """What one request spent its time on"""
+    __slots__ = ('queries', 'db_seconds', 'query_log', 'http_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.query_log = []
+        self.http_seconds = {}
+
+    def add_query(self, sql, seconds):
+        self.queries += 1
+        self.db_seconds += seconds
+        self.query_log.append((sql, seconds))
+
+    def add_http(self, provider, seconds):
+        self.http_seconds[provider] = self.http_seconds.get(provider, 0.0) + seconds
+
+    def top_queries(self, limit):
+        """The `limit` statements with the most total time, identical SQL grouped"""
+        totals = {}
+        for sql, seconds in self.query_log:
+            count, total = totals.get(sql, (0, 0.0))
+            totals[sql] = (count + 1, total + seconds)
+        ranked = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {'sql': sql[:MAX_SQL_LENGTH], 'count': count, 'ms': round(total * 1000, 2)}
+            for sql, (count, total) in ranked
+        ]
+
+
+def record_outbound(provider, seconds):
+    """Count `seconds` of outbound HTTP to `provider` against the current request"""
+    stats = _current.get()
+    if stats is not None:
+        stats.add_http(provider, seconds)
+
+
+@contextmanager
+def outbound(provider):
+    """Time a block of outbound calls (e.g. an SDK upload) as `provider`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_outbound(provider, time.perf_counter() - start)
+
+
+def _time_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add_query(sql, time.perf_counter() - start)
+
+
+def _instrument_connection(sender, connection, **kwargs):
+    # Fires on every connect, but the wrapper list lives as long as the
+    # connection object, which reconnects
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+def install():
+    """Time queries on every database connection opened from now on"""
+    connection_created.connect(_instrument_connection, dispatch_uid='core.instrumentation')
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else 'unmatched'
+
+
+def _response_bytes(response):
+    if not response.streaming:
+        return len(response.content)
+    if response.has_header('Content-Length'):
+        return int(response['Content-Length'])
+    return None
+
+
+def _observe(request, response, stats, seconds):
+    view = _view_name(request)
+    if view == 'metrics':
+        return
+    REQUEST_SECONDS.labels(view, request.method, f'{response.status_code // 100}xx').observe(seconds)
+    DB_QUERIES.labels(view).observe(stats.queries)
+    DB_SECONDS.labels(view).observe(stats.db_seconds)
+    for provider, provider_seconds in stats.http_seconds.items():
+        HTTP_SECONDS.labels(view, provider).observe(provider_seconds)
+    size = _response_bytes(response)
+    if size is not None:
+        RESPONSE_BYTES.labels(view).observe(size)
+
+    if seconds >= settings.SLOW_REQUEST_SECONDS:
+        logger.warning('slow_request %s', json.dumps({
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'ms': round(seconds * 1000, 1),
+            'db_queries': stats.queries,
+            'db_ms': round(stats.db_seconds * 1000, 1),
+            'http_ms': {provider: round(value * 1000, 1) for provider, value in stats.http_seconds.items()},
+            'response_bytes': size,
+            'top_queries': stats.top_queries(settings.SLOW_REQUEST_TOP_QUERIES),
+        }))
+
+
+class RequestMetricsMiddleware:
+    """Measure each request; see the module docstring"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        _observe(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        _observe(request, response, stats, time.perf_counter() - start)
+        return response
+
+
+def metrics_view(request):
+    """Prometheus exposition of the histograms above"""
+    if settings.METRICS_TOKEN:
+        expected = f'Bearer {settings.METRICS_TOKEN}'
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), expected):
+            return HttpResponse(status=401)
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,35 @@
+# backend/core/management/commands/check_replicas.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import InterfaceError, OperationalError
+
+from core.db_router import replica_aliases, replica_lag
+
+
+class Command(BaseCommand):
+    help = 'Report reachability and replication lag of the read replicas'
+
+    def handle(self, *args, **options):
+        aliases = replica_aliases()
+        if not aliases:
+            self.stdout.write('No replicas configured (set DATABASE_REPLICA_URLS); all reads use the primary')
+            return
+
+        failed = 0
+        for alias in aliases:
+            try:
+                lag = replica_lag(alias)
+            except (OperationalError, InterfaceError) as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'❌ {alias}: unreachable ({e})'))
+                continue
+            if lag > settings.REPLICA_MAX_LAG_SECONDS:
+                failed += 1
+                self.stdout.write(self.style.WARNING(
+                    f'⚠️  {alias}: {lag:.1f}s behind (limit {settings.REPLICA_MAX_LAG_SECONDS}s)'
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✅ {alias}: {lag:.1f}s behind'))
+
+        if failed:
+            raise CommandError(f'{failed} of {len(aliases)} replica(s) would be skipped')
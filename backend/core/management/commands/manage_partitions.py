@@ -0,0 +1,95 @@
+# backend/core/management/commands/manage_partitions.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.services.partitioning import PartitionService, PARTITIONED_TABLES
+from core.utils.db import is_postgres
+from core.utils.timezone_utils import today
+
+
+class Command(BaseCommand):
+    help = 'Partition the analytics tables by month and apply retention (PostgreSQL only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tables',
+            nargs='*',
+            help=f"Tables to manage: {', '.join(PARTITIONED_TABLES)} (default: all)",
+        )
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='One-time: rebuild the tables as partitioned tables (locks them while copying)',
+        )
+        parser.add_argument(
+            '--ahead',
+            type=int,
+            default=settings.ANALYTICS_PARTITION_MONTHS_AHEAD,
+            help='Keep partitions created this many months ahead',
+        )
+        parser.add_argument(
+            '--retain-months',
+            type=int,
+            help='Expire partitions older than this many months (default: ANALYTICS_RETENTION_MONTHS)',
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Drop expired partitions instead of moving them to the archive schema (default: ANALYTICS_RETENTION_DROP)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Print the SQL without running it',
+        )
+
+    def handle(self, *args, **options):
+        if not is_postgres(connection):
+            self.stdout.write(self.style.WARNING(
+                f'⏭️  Partitioning needs PostgreSQL; {connection.vendor} tables are left as they are'
+            ))
+            return
+
+        names = options['tables'] or list(PARTITIONED_TABLES)
+        unknown = [name for name in names if name not in PARTITIONED_TABLES]
+        if unknown:
+            raise CommandError(
+                f"Unknown table(s): {', '.join(unknown)}. Available: {', '.join(PARTITIONED_TABLES)}"
+            )
+        day = today()
+        drop = options['drop'] or settings.ANALYTICS_RETENTION_DROP
+
+        for name in names:
+            model, column = PARTITIONED_TABLES[name]
+            table = model._meta.db_table
+            partitioned = PartitionService.is_partitioned(model)
+
+            if not partitioned and not options['convert']:
+                raise CommandError(f'{table} is not partitioned yet; run with --convert first')
+            if partitioned:
+                if options['convert']:
+                    self.stdout.write(f'⏭️  {table} is already partitioned')
+                statements = PartitionService.ensure_future(model, column, day, options['ahead'])
+            else:
+                statements = PartitionService.convert(model, column, day, options['ahead'])
+
+            retain = options['retain_months'] or settings.ANALYTICS_RETENTION_MONTHS.get(name)
+
+            if options['dry_run']:
+                # Expiry of a table that is only being converted can't be planned yet
+                if retain and partitioned:
+                    statements += PartitionService.expire(model, day, retain, drop=drop)
+                for statement in statements:
+                    self.stdout.write(f'{statement};')
+                continue
+
+            PartitionService.execute(statements)
+            expired = PartitionService.expire(model, day, retain, drop=drop) if retain else []
+            PartitionService.execute(expired)
+
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {table}: {len(statements)} statements run, '
+                f"{sum(1 for statement in expired if 'DETACH' in statement)} partitions expired, "
+                f'{len(PartitionService.partitions(model))} partitions'
+            ))
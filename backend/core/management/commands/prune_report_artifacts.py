@@ -0,0 +1,32 @@
+# backend/core/management/commands/prune_report_artifacts.py
+from django.core.management.base import BaseCommand
+
+from core.services.report_artifacts import ReportArtifactService, ARTIFACT_TTL_DAYS
+
+
+class Command(BaseCommand):
+    help = 'Evict stale cached report artifacts and delete their Cloudinary objects'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ttl-days',
+            type=int,
+            default=ARTIFACT_TTL_DAYS,
+            help=f'Evict artifacts not served for this many days (default: {ARTIFACT_TTL_DAYS})',
+        )
+        parser.add_argument(
+            '--max-artifacts',
+            type=int,
+            default=None,
+            help='Keep at most this many artifacts, evicting the least recently served',
+        )
+
+    def handle(self, *args, **options):
+        result = ReportArtifactService.prune(
+            ttl_days=options['ttl_days'],
+            max_artifacts=options['max_artifacts']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Evicted {result['expired']} expired, {result['evicted']} over budget "
+            f"and {result['outdated']} outdated report artifacts"
+        ))
@@ -0,0 +1,36 @@
+# backend/core/management/commands/refresh_recommendations.py
+from django.core.management.base import BaseCommand
+
+from core.services.recommendations import RecommendationService, RULE_COUNT
+
+
+class Command(BaseCommand):
+    help = 'Evaluate the weekly recommendation rules for users whose stored results are stale'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-evaluate every active user, not only stale ones',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Users written per bulk upsert (default: 200)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'🔄 Evaluating {RULE_COUNT} rules...')
+
+        result = RecommendationService.refresh_all(
+            batch_size=options['batch_size'],
+            force=options['force']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Refreshed {result['users']} users in {result['seconds']}s "
+            f"({result['users_per_second']} users/s, {result['rules_per_second']} rule evaluations/s)"
+        ))
+        if result['failed']:
+            self.stdout.write(self.style.WARNING(f"⚠️ {result['failed']} users failed, see logs"))
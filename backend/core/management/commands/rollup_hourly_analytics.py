@@ -0,0 +1,50 @@
+# backend/core/management/commands/rollup_hourly_analytics.py
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.hourly_analytics import HourlyAnalyticsService
+from core.utils.timezone_utils import today
+
+
+class Command(BaseCommand):
+    help = 'Derive DailyAnalytics rows from HourlyAnalytics'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=2,
+            help='Roll up this many days ending today (default: 2)',
+        )
+        parser.add_argument(
+            '--start',
+            type=str,
+            help='First day to roll up (YYYY-MM-DD), overrides --days',
+        )
+        parser.add_argument(
+            '--end',
+            type=str,
+            help='Last day to roll up (YYYY-MM-DD, default: today)',
+        )
+        parser.add_argument(
+            '--campaign',
+            type=str,
+            action='append',
+            help='Only roll up this campaign ID (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            end_date = datetime.strptime(options['end'], '%Y-%m-%d').date() if options['end'] else today()
+            start_date = (
+                datetime.strptime(options['start'], '%Y-%m-%d').date()
+                if options['start'] else end_date - timedelta(days=options['days'] - 1)
+            )
+        except ValueError:
+            raise CommandError('Dates must use the YYYY-MM-DD format')
+
+        written = HourlyAnalyticsService.rollup(start_date, end_date, options['campaign'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Rolled up {written} daily analytics rows from {start_date} to {end_date}'
+        ))
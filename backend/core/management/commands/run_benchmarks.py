@@ -0,0 +1,132 @@
+# backend/core/management/commands/run_benchmarks.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.benchmarks import Benchmark, get_suites, TIMING_UNITS
+
+
+class Command(BaseCommand):
+    help = 'Run performance benchmark suites (all suites if none are given)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'suites',
+            nargs='*',
+            help='Names of the suites to run',
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='List the available suites and exit',
+        )
+        parser.add_argument(
+            '--json',
+            dest='json_path',
+            help='Write the results to this JSON file',
+        )
+        parser.add_argument(
+            '--keep-data',
+            action='store_true',
+            help='Commit the data seeded by the suites instead of rolling it back',
+        )
+        parser.add_argument(
+            '--param',
+            dest='params',
+            action='append',
+            default=[],
+            metavar='KEY=VALUE',
+            help='Suite parameter, e.g. --param tenants=10,100,1000 (repeatable)',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='Earlier --json report; fail if a timing regressed past --tolerance',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.5,
+            help='Allowed slowdown against --baseline as a fraction (default: 0.5 = 50%%)',
+        )
+
+    def handle(self, *args, **options):
+        available = get_suites()
+
+        if options['list']:
+            for name, (func, description) in sorted(available.items()):
+                self.stdout.write(f"{name:<24} {description}")
+            return
+
+        names = options['suites'] or sorted(available)
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise CommandError(
+                f"Unknown suite(s): {', '.join(unknown)}. "
+                f"Available: {', '.join(sorted(available))}"
+            )
+
+        params = {}
+        for param in options['params']:
+            key, sep, value = param.partition('=')
+            if not sep:
+                raise CommandError(f"--param must be KEY=VALUE, got '{param}'")
+            params[key] = value
+
+        baseline = {}
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+
+        report = {}
+        failures = []
+        for name in names:
+            func, description = available[name]
+            self.stdout.write(self.style.MIGRATE_HEADING(f"▶ {name}"))
+            benchmark = Benchmark(name, params)
+
+            with transaction.atomic():
+                func(benchmark)
+                if not options['keep_data']:
+                    transaction.set_rollback(True)
+
+            for result in benchmark.results:
+                self.stdout.write(f"  {self._format(result)}")
+            report[name] = benchmark.results
+            failures.extend(benchmark.failures)
+            failures.extend(self._regressions(name, benchmark.results, baseline, options['tolerance']))
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(report, f, indent=2, default=str)
+            self.stdout.write(self.style.SUCCESS(f"✅ Results written to {options['json_path']}"))
+
+        if failures:
+            for failure in failures:
+                self.stderr.write(f"  ❌ {failure}")
+            raise CommandError(f"{len(failures)} benchmark check(s) failed")
+
+    @staticmethod
+    def _regressions(suite, results, baseline, tolerance):
+        """Timings slower than the same metric in the baseline report by more than `tolerance`"""
+        previous = {result['metric']: result for result in baseline.get(suite, [])}
+        regressions = []
+        for result in results:
+            before = previous.get(result['metric'])
+            if not before or result['unit'] not in TIMING_UNITS or before['unit'] != result['unit']:
+                continue
+            if before['value'] and result['value'] > before['value'] * (1 + tolerance):
+                regressions.append(
+                    f"{suite}: {result['metric']} regressed to {result['value']} {result['unit']} "
+                    f"from {before['value']} (+{(result['value'] / before['value'] - 1) * 100:.0f}%)"
+                )
+        return regressions
+
+    @staticmethod
+    def _format(result):
+        extra = ', '.join(
+            f"{key}={value}" for key, value in result.items()
+            if key not in ('metric', 'value', 'unit')
+        )
+        line = f"{result['metric']:<40} {result['value']:>12} {result['unit']}"
+        return f"{line}  ({extra})" if extra else line
@@ -0,0 +1,63 @@
+# backend/core/management/commands/run_report_schedules.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services.report_delivery import RecordingDelivery
+from core.services.report_scheduler import ReportScheduleRunner, CLAIM_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Generate and deliver due scheduled reports'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for due schedules instead of exiting',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=60,
+            help='Seconds between polls with --loop (default: 60)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=CLAIM_BATCH_SIZE,
+            help=f'Schedules claimed per batch (default: {CLAIM_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Rendering workers (default: CPU count)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Render and record reports but replace every delivery channel with a local stand-in',
+        )
+
+    def handle(self, *args, **options):
+        deliverers = None
+        if options['dry_run']:
+            recorder = RecordingDelivery()
+            deliverers = {fmt: recorder for fmt in ('pdf', 'email', 'slack', 'discord')}
+
+        runner = ReportScheduleRunner(deliverers=deliverers, render_workers=options['workers'])
+
+        while True:
+            result = runner.run_pending(limit=options['batch_size'])
+            if result['claimed']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ Processed {result['claimed']} schedules: "
+                    f"{result['delivered']} delivered, {result['failed']} failed"
+                ))
+            elif not options['loop']:
+                self.stdout.write("No report schedules due")
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -369,8 +369,8 @@ class Command(BaseCommand):
         self.stdout.write('-' * 70)
 
         total_campaigns = Campaign.objects.filter(user=demo_user).count()
-        total_ads = AdContent.objects.filter(campaign__user=demo_user).count()
-        total_analytics = DailyAnalytics.objects.filter(campaign__user=demo_user).count()
+        total_ads = AdContent.objects.filter(user=demo_user).count()
+        total_analytics = DailyAnalytics.objects.filter(user=demo_user).count()
 
         self.stdout.write(f"\n✅ {total_campaigns} Campaigns created")
         self.stdout.write(f"✅ {total_ads} Ad variations")
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_alter_adcontent_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='abtest',
+            name='analysis_mode',
+            field=models.CharField(choices=[('fixed', 'Fixed Horizon'), ('sequential', 'Sequential (Bayesian)')], default='fixed', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='abtest',
+            name='posterior',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:20
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_abtest_sequential_analysis'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportArtifact',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('report_type', models.CharField(choices=[('campaign', 'Campaign Report'), ('weekly', 'Weekly Report')], max_length=20)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('template_version', models.IntegerField()),
+                ('url', models.URLField(max_length=500)),
+                ('public_id', models.CharField(blank=True, max_length=255)),
+                ('hit_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_accessed_at', models.DateTimeField(auto_now_add=True)),
+                ('campaign', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='report_artifacts', to='core.campaign')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_artifacts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_accessed_at'], name='core_report_last_ac_6a0ee2_idx')],
+                'constraints': [models.UniqueConstraint(fields=('report_type', 'user', 'campaign', 'fingerprint', 'template_version'), name='unique_report_artifact')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from core.utils.db import PostgresOnlyRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_report_artifact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HourlyAnalytics',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('hour', models.DateTimeField(help_text='Start of the hour (UTC)')),
+                ('impressions', models.PositiveIntegerField(default=0)),
+                ('clicks', models.PositiveIntegerField(default=0)),
+                ('conversions', models.PositiveIntegerField(default=0)),
+                ('spend_micros', models.BigIntegerField(default=0, help_text='Spend in millionths of the currency unit')),
+                ('campaign', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='hourly_analytics', to='core.campaign')),
+            ],
+            options={
+                'verbose_name_plural': 'Hourly Analytics',
+                'constraints': [models.UniqueConstraint(fields=('campaign', 'hour'), name='unique_hourly_analytics')],
+            },
+        ),
+        # Block range index: a few pages cover years of append-only hours
+        PostgresOnlyRunSQL(
+            sql='CREATE INDEX core_hourlyanalytics_hour_brin ON core_hourlyanalytics USING brin (hour)',
+            reverse_sql='DROP INDEX IF EXISTS core_hourlyanalytics_hour_brin',
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_hourly_analytics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRecommendation',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='weekly_recommendations', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('metrics', models.JSONField(default=dict)),
+                ('recommendations', models.JSONField(default=list)),
+                ('next_steps', models.JSONField(default=list)),
+                ('period_end', models.DateField()),
+                ('rules_version', models.IntegerField()),
+                ('is_stale', models.BooleanField(db_index=True, default=False)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:37
+
+from django.db import migrations, models
+
+from core.utils.db import ConcurrentAddIndex, PostgresOnlyRunSQL
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built CONCURRENTLY on PostgreSQL, which cannot run inside a
+    # transaction; this keeps the tables writable while they build
+    atomic = False
+
+    dependencies = [
+        ('core', '0016_user_recommendation'),
+    ]
+
+    operations = [
+        ConcurrentAddIndex(
+            model_name='adcontent',
+            index=models.Index(fields=['campaign', 'created_at'], name='adcontent_campaign_idx'),
+        ),
+        ConcurrentAddIndex(
+            model_name='campaign',
+            index=models.Index(fields=['user', 'is_active', 'end_date'], name='campaign_user_active_idx'),
+        ),
+        ConcurrentAddIndex(
+            model_name='campaign',
+            index=models.Index(fields=['user', '-created_at'], name='campaign_user_created_idx'),
+        ),
+        ConcurrentAddIndex(
+            model_name='imageasset',
+            index=models.Index(fields=['campaign', 'created_at'], name='imageasset_campaign_idx'),
+        ),
+        # Tenant aggregates (weekly report, summaries) read these columns only,
+        # so the per-campaign date range is answered from the index alone
+        PostgresOnlyRunSQL(
+            sql=(
+                'CREATE INDEX CONCURRENTLY IF NOT EXISTS core_dailyanalytics_covering ON core_dailyanalytics '
+                '(campaign_id, date) INCLUDE (impressions, clicks, conversions, spend)'
+            ),
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS core_dailyanalytics_covering',
+        ),
+        # Cross-tenant date scans (schedules, exports, retention); rows arrive in date order
+        PostgresOnlyRunSQL(
+            sql=(
+                'CREATE INDEX CONCURRENTLY IF NOT EXISTS core_dailyanalytics_date_brin '
+                'ON core_dailyanalytics USING brin (date)'
+            ),
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS core_dailyanalytics_date_brin',
+        ),
+    ]
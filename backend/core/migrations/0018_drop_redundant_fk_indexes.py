@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_analytics_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='adcontent',
+            name='campaign',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='ad_content', to='core.campaign'),
+        ),
+        migrations.AlterField(
+            model_name='campaign',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='campaigns', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='dailyanalytics',
+            name='campaign',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_analytics', to='core.campaign'),
+        ),
+        migrations.AlterField(
+            model_name='imageasset',
+            name='campaign',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='images', to='core.campaign'),
+        ),
+    ]
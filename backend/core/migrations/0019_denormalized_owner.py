@@ -0,0 +1,78 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:02
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from core.utils.db import ConcurrentAddIndex
+
+OWNED_MODELS = ('adcontent', 'imageasset', 'dailyanalytics')
+BACKFILL_BATCH = 500
+
+
+def backfill_owner(apps, schema_editor):
+    """Copy campaign.user onto existing rows, one UPDATE per owner and batch of campaigns"""
+    Campaign = apps.get_model('core', 'Campaign')
+    campaigns_by_user = defaultdict(list)
+    for campaign_id, user_id in Campaign.objects.values_list('id', 'user_id').iterator():
+        campaigns_by_user[user_id].append(campaign_id)
+
+    for model_name in OWNED_MODELS:
+        model = apps.get_model('core', model_name)
+        for user_id, campaign_ids in campaigns_by_user.items():
+            for start in range(0, len(campaign_ids), BACKFILL_BATCH):
+                model.objects.filter(
+                    campaign_id__in=campaign_ids[start:start + BACKFILL_BATCH],
+                    user__isnull=True,
+                ).update(user_id=user_id)
+
+
+def owner_field(null):
+    return models.ForeignKey(
+        db_index=False,
+        editable=False,
+        null=null,
+        on_delete=django.db.models.deletion.CASCADE,
+        related_name='+',
+        to=settings.AUTH_USER_MODEL,
+    )
+
+
+class Migration(migrations.Migration):
+
+    # The backfill commits batch by batch instead of holding the row locks of
+    # three whole tables until the migration ends, and the owner indexes are
+    # built CONCURRENTLY on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('core', '0018_drop_redundant_fk_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # Nullable first so existing rows can be backfilled, then tightened
+    operations = [
+        *[
+            migrations.AddField(model_name=model_name, name='user', field=owner_field(null=True))
+            for model_name in OWNED_MODELS
+        ],
+        migrations.RunPython(backfill_owner, migrations.RunPython.noop),
+        *[
+            migrations.AlterField(model_name=model_name, name='user', field=owner_field(null=False))
+            for model_name in OWNED_MODELS
+        ],
+        ConcurrentAddIndex(
+            model_name='adcontent',
+            index=models.Index(fields=['user', 'created_at'], name='adcontent_user_created_idx'),
+        ),
+        ConcurrentAddIndex(
+            model_name='imageasset',
+            index=models.Index(fields=['user', 'created_at'], name='imageasset_user_created_idx'),
+        ),
+        ConcurrentAddIndex(
+            model_name='dailyanalytics',
+            index=models.Index(fields=['user', 'date'], name='dailyanalytics_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:46
+
+import core.utils.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_denormalized_owner'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='abtestvariation',
+            name='id',
+            field=models.UUIDField(default=core.utils.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='dailyanalytics',
+            name='id',
+            field=models.UUIDField(default=core.utils.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='prediction',
+            name='id',
+            field=models.UUIDField(default=core.utils.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:22
+
+from django.db import migrations, models
+
+from core.utils.db import ConcurrentAddIndex, ConcurrentRemoveIndex
+
+
+class Migration(migrations.Migration):
+
+    # Index changes run CONCURRENTLY on PostgreSQL, outside a transaction
+    atomic = False
+
+    dependencies = [
+        ('core', '0020_time_ordered_fact_keys'),
+    ]
+
+    operations = [
+        ConcurrentRemoveIndex(
+            model_name='campaign',
+            name='campaign_user_active_idx',
+        ),
+        ConcurrentAddIndex(
+            model_name='campaign',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user', 'end_date'], name='campaign_user_active_idx'),
+        ),
+    ]
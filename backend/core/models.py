@@ -9,12 +9,16 @@ from django.utils import timezone as django_timezone
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .managers import CustomUserManager
+from .utils.ids import uuid7
 from cryptography.fernet import Fernet
 import base64
 import logging
+from decimal import Decimal
 
 logger = logging.getLogger(__name__)
 
+MICROS_PER_UNIT = 1_000_000
+
 # -----------------------------------------------------------------
 # USER MODEL
 # -----------------------------------------------------------------
@@ -54,7 +58,8 @@ class Campaign(models.Model):
         ('tiktok', 'TikTok'),
     )
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='campaigns')
+    # Lookups by user use the composite indexes below
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='campaigns', db_index=False)
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     start_date = models.DateField()
@@ -64,13 +69,58 @@ class Campaign(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
     
+    class Meta:
+        indexes = [
+            # Active-campaign counts: user + end_date range over active rows.
+            # Partial, since SQLite compares booleans as a bare `is_active`
+            # term that can't match an index column
+            models.Index(
+                fields=['user', 'end_date'], condition=models.Q(is_active=True), name='campaign_user_active_idx'
+            ),
+            # Per-user listings, newest first
+            models.Index(fields=['user', '-created_at'], name='campaign_user_created_idx'),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets sync_owner_columns skip saves that did not change the owner
+        instance._loaded_user_id = instance.__dict__.get('user_id')
+        return instance
+    
     def __str__(self):
         return self.title
 
+# -----------------------------------------------------------------
+# CAMPAIGN-OWNED ROWS
+# -----------------------------------------------------------------
+class CampaignOwnedModel(models.Model):
+    """
+    Child of a Campaign carrying a copy of campaign.user, so per-tenant scans
+    filter one table instead of joining Campaign. save() fills it in when
+    the row is created; bulk writers must set user_id themselves, and
+    sync_owner_columns re-points the rows when a campaign changes owner.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+        editable=False,
+        db_index=False,  # covered by each model's (user, ...) index
+    )
+    
+    class Meta:
+        abstract = True
+    
+    def save(self, *args, **kwargs):
+        if self._state.adding or self.user_id is None:
+            self.user_id = self.campaign.user_id
+        super().save(*args, **kwargs)
+
 # -----------------------------------------------------------------
 # AD CONTENT MODEL
 # -----------------------------------------------------------------
-class AdContent(models.Model):
+class AdContent(CampaignOwnedModel):
     TONE_CHOICES = (
         ('formal', 'Formal'),
         ('casual', 'Casual'),
@@ -78,7 +128,7 @@ class AdContent(models.Model):
         ('persuasive', 'Persuasive'),
     )
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='ad_content')
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='ad_content', db_index=False)
     text = models.TextField()
     tone = models.CharField(max_length=20, choices=TONE_CHOICES)
     platform = models.CharField(max_length=20, choices=Campaign.PLATFORM_CHOICES)
@@ -89,6 +139,12 @@ class AdContent(models.Model):
     clicks = models.IntegerField(default=0)
     conversions = models.IntegerField(default=0)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['campaign', 'created_at'], name='adcontent_campaign_idx'),
+            models.Index(fields=['user', 'created_at'], name='adcontent_user_created_idx'),
+        ]
+    
     @property
     def ctr(self):
         if self.views == 0:
@@ -104,9 +160,9 @@ class AdContent(models.Model):
 # -----------------------------------------------------------------
 # IMAGE ASSET MODEL
 # -----------------------------------------------------------------
-class ImageAsset(models.Model):
+class ImageAsset(CampaignOwnedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='images')
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='images', db_index=False)
     
     # Change from FileField to URLField for Cloudinary
     image = models.URLField(max_length=500, blank=True)  # Cloudinary URL
@@ -116,13 +172,21 @@ class ImageAsset(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     impressions = models.IntegerField(default=0)
     clicks = models.IntegerField(default=0)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['campaign', 'created_at'], name='imageasset_campaign_idx'),
+            models.Index(fields=['user', 'created_at'], name='imageasset_user_created_idx'),
+        ]
 
 # -----------------------------------------------------------------
 # DAILY ANALYTICS MODEL
 # -----------------------------------------------------------------
-class DailyAnalytics(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='daily_analytics')
+class DailyAnalytics(CampaignOwnedModel):
+    # Time-ordered so appends stay at the end of the primary key index
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    # Lookups by campaign use the (campaign, date) unique index
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='daily_analytics', db_index=False)
     date = models.DateField()
     
     impressions = models.IntegerField(default=0)
@@ -141,6 +205,9 @@ class DailyAnalytics(models.Model):
         unique_together = ('campaign', 'date')
         ordering = ['-date']
         verbose_name_plural = 'Daily Analytics'
+        indexes = [
+            models.Index(fields=['user', 'date'], name='dailyanalytics_user_date_idx'),
+        ]
     
     def save(self, *args, **kwargs):
         if self.impressions > 0:
@@ -154,6 +221,41 @@ class DailyAnalytics(models.Model):
     def __str__(self):
         return f"{self.campaign.title} - {self.date}"
 
+# -----------------------------------------------------------------
+# HOURLY ANALYTICS
+# -----------------------------------------------------------------
+class HourlyAnalytics(models.Model):
+    """
+    Hour-grained fact table; DailyAnalytics is rolled up from it.
+
+    Rows are kept narrow because there are 24 per campaign-day: a bigint key
+    instead of a UUID, raw counters only (ratios are derived on read) and
+    spend as integer micros. On PostgreSQL `hour` also gets a BRIN index,
+    which stays tiny because rows are inserted in time order.
+    """
+    id = models.BigAutoField(primary_key=True)
+    # Lookups by campaign use the (campaign, hour) unique index
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='hourly_analytics', db_index=False)
+    hour = models.DateTimeField(help_text="Start of the hour (UTC)")
+
+    impressions = models.PositiveIntegerField(default=0)
+    clicks = models.PositiveIntegerField(default=0)
+    conversions = models.PositiveIntegerField(default=0)
+    spend_micros = models.BigIntegerField(default=0, help_text="Spend in millionths of the currency unit")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'hour'], name='unique_hourly_analytics'),
+        ]
+        verbose_name_plural = 'Hourly Analytics'
+
+    @property
+    def spend(self):
+        return Decimal(self.spend_micros) / MICROS_PER_UNIT
+
+    def __str__(self):
+        return f"{self.campaign.title} - {self.hour:%Y-%m-%d %H}:00"
+
 # -----------------------------------------------------------------
 # CAMPAIGN ANALYTICS SUMMARY
 # -----------------------------------------------------------------
@@ -182,6 +284,63 @@ class CampaignAnalyticsSummary(models.Model):
         self.total_conversions = sum(d.conversions for d in daily_data)
         self.total_spend = sum(d.spend for d in daily_data)
         
+        self._derive_metrics()
+        self.save()
+    
+    @classmethod
+    def rebuild(cls, campaign_ids):
+        """
+        Recompute the summaries of many campaigns with one grouped query and
+        one upsert, for callers that bulk-write DailyAnalytics (which sends no
+        signals). Also stales the owners' precomputed recommendations, since
+        the upsert sends no post_save either.
+        
+        Returns:
+            int: number of summaries written
+        """
+        campaign_ids = list(campaign_ids)
+        totals = {
+            row['campaign_id']: row
+            for row in DailyAnalytics.objects.filter(campaign_id__in=campaign_ids)
+            .values('campaign_id')
+            .annotate(
+                impressions=models.Sum('impressions'),
+                clicks=models.Sum('clicks'),
+                conversions=models.Sum('conversions'),
+                spend=models.Sum('spend'),
+            )
+            .order_by()
+        }
+        
+        summaries = []
+        for campaign_id in campaign_ids:
+            row = totals.get(campaign_id, {})
+            summary = cls(
+                campaign_id=campaign_id,
+                total_impressions=row.get('impressions') or 0,
+                total_clicks=row.get('clicks') or 0,
+                total_conversions=row.get('conversions') or 0,
+                total_spend=row.get('spend') or Decimal('0'),
+            )
+            summary._derive_metrics()
+            summaries.append(summary)
+        
+        cls.objects.bulk_create(
+            summaries,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['campaign'],
+            update_fields=[
+                'total_impressions', 'total_clicks', 'total_conversions', 'total_spend', 'avg_ctr',
+                'avg_cpc', 'avg_conversion_rate', 'roas', 'performance_score', 'last_updated',
+            ],
+        )
+        UserRecommendation.objects.filter(
+            user__campaigns__id__in=campaign_ids, is_stale=False
+        ).update(is_stale=True)
+        return len(summaries)
+    
+    def _derive_metrics(self):
         if self.total_impressions > 0:
             self.avg_ctr = round((self.total_clicks / self.total_impressions) * 100, 2)
         
@@ -194,7 +353,6 @@ class CampaignAnalyticsSummary(models.Model):
             self.roas = round(revenue / float(self.total_spend), 2)
         
         self.performance_score = self._calculate_performance_score()
-        self.save()
     
     def _calculate_performance_score(self):
         score = 0
@@ -227,6 +385,34 @@ class CampaignAnalyticsSummary(models.Model):
     def __str__(self):
         return f"Summary for {self.campaign.title}"
 
+# -----------------------------------------------------------------
+# PRECOMPUTED RECOMMENDATIONS
+# -----------------------------------------------------------------
+class UserRecommendation(models.Model):
+    """
+    Weekly report metrics and the recommendations the rule engine derived
+    from them. Marked stale whenever the user's campaigns, content or
+    analytics change; report endpoints read it instead of re-evaluating.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='weekly_recommendations'
+    )
+
+    metrics = models.JSONField(default=dict)
+    recommendations = models.JSONField(default=list)
+    next_steps = models.JSONField(default=list)
+
+    period_end = models.DateField()
+    rules_version = models.IntegerField()
+    is_stale = models.BooleanField(default=False, db_index=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Recommendations for {self.user.email}"
+
 # -----------------------------------------------------------------
 # COMMENT MODEL
 # -----------------------------------------------------------------
@@ -317,6 +503,11 @@ class ABTest(models.Model):
         ('completed', 'Completed'),
     )
     
+    ANALYSIS_MODE_CHOICES = (
+        ('fixed', 'Fixed Horizon'),
+        ('sequential', 'Sequential (Bayesian)'),
+    )
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='ab_tests')
     name = models.CharField(max_length=255)
@@ -330,10 +521,14 @@ class ABTest(models.Model):
     success_metric = models.CharField(max_length=50, default='ctr')
     confidence_level = models.FloatField(default=95.0)
     min_sample_size = models.IntegerField(default=1000)
+    analysis_mode = models.CharField(max_length=20, choices=ANALYSIS_MODE_CHOICES, default='fixed')
     
     winner = models.CharField(max_length=10, blank=True)
     is_significant = models.BooleanField(default=False)
     p_value = models.FloatField(null=True, blank=True)
+    # Latest posterior per variation for sequential tests:
+    # {name: {'probability_to_be_best': float, 'expected_loss': float}}
+    posterior = models.JSONField(default=dict, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -342,7 +537,7 @@ class ABTest(models.Model):
         return f"{self.name} - {self.campaign.title}"
 
 class ABTestVariation(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     ab_test = models.ForeignKey(ABTest, on_delete=models.CASCADE, related_name='variations')
     name = models.CharField(max_length=50)
     
@@ -368,6 +563,18 @@ class ABTestVariation(models.Model):
             return 0
         return round((self.conversions / self.clicks) * 100, 2)
     
+    COUNTER_FIELDS = ('impressions', 'clicks', 'conversions')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets update_sequential_ab_test skip saves that did not change a counter
+        instance._loaded_counters = instance.counters()
+        return instance
+    
+    def counters(self):
+        return tuple(self.__dict__.get(field) for field in self.COUNTER_FIELDS)
+    
     def __str__(self):
         return f"{self.ab_test.name} - Variation {self.name}"
 
@@ -398,7 +605,7 @@ class PredictiveModel(models.Model):
         return f"{self.get_model_type_display()} - {self.user.email}"
 
 class Prediction(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     model = models.ForeignKey(PredictiveModel, on_delete=models.CASCADE, related_name='predictions')
     campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='predictions')
     
@@ -469,6 +676,45 @@ class GeneratedReport(models.Model):
     def __str__(self):
         return f"Report - {self.schedule.name} - {self.created_at.strftime('%Y-%m-%d')}"
 
+class ReportArtifact(models.Model):
+    """
+    A rendered report, keyed by the hash of the data it shows and the layout
+    version, so unchanged reports are served instead of re-rendered.
+    """
+    REPORT_TYPE_CHOICES = (
+        ('campaign', 'Campaign Report'),
+        ('weekly', 'Weekly Report'),
+    )
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    report_type = models.CharField(max_length=20, choices=REPORT_TYPE_CHOICES)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='report_artifacts')
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, null=True, blank=True, related_name='report_artifacts')
+    
+    fingerprint = models.CharField(max_length=64)
+    template_version = models.IntegerField()
+    
+    url = models.URLField(max_length=500)
+    public_id = models.CharField(max_length=255, blank=True)
+    
+    hit_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['report_type', 'user', 'campaign', 'fingerprint', 'template_version'],
+                name='unique_report_artifact'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['last_accessed_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_report_type_display()} - {self.fingerprint[:12]}"
+
 # ============================================================================
 # USER API KEYS (NEW SECURE METHOD)
 # ============================================================================
@@ -684,4 +930,90 @@ def update_summary_on_analytics_delete(sender, instance, **kwargs):
             summary.save()
             logger.info(f"✅ Updated summary after analytics deletion for: {instance.campaign.title}")
     except Exception as e:
-        logger.error(f"❌ Failed to update summary on delete: {e}")
\ No newline at end of file
+        logger.error(f"❌ Failed to update summary on delete: {e}")
+
+@receiver(post_save, sender=DailyAnalytics)
+@receiver(post_delete, sender=DailyAnalytics)
+@receiver(post_save, sender=HourlyAnalytics)
+@receiver(post_delete, sender=HourlyAnalytics)
+def invalidate_analytics_breakdowns(sender, instance, **kwargs):
+    """Stale the owner's cached weekday/hour breakdowns"""
+    from core.services.analytics_aggregation import AnalyticsAggregationService
+    if isinstance(instance, CampaignOwnedModel):
+        user_id = instance.user_id
+    else:
+        user_id = Campaign.objects.filter(pk=instance.campaign_id).values_list('user_id', flat=True).first()
+    if user_id:
+        AnalyticsAggregationService.invalidate([user_id])
+
+@receiver(post_save, sender=Campaign)
+def sync_owner_columns(sender, instance, created, update_fields=None, **kwargs):
+    """Re-point the denormalized user column of the campaign's rows after an owner change"""
+    if update_fields and not {'user', 'user_id'} & set(update_fields):
+        return
+    loaded_user_id = getattr(instance, '_loaded_user_id', None)
+    instance._loaded_user_id = instance.user_id
+    if created or loaded_user_id == instance.user_id:
+        return
+    for model in (AdContent, ImageAsset, DailyAnalytics):
+        model.objects.filter(campaign=instance).exclude(user_id=instance.user_id).update(user_id=instance.user_id)
+
+@receiver(post_save, sender=Campaign)
+@receiver(post_delete, sender=Campaign)
+@receiver(post_save, sender=CampaignAnalyticsSummary)
+@receiver(post_save, sender=AdContent)
+@receiver(post_delete, sender=AdContent)
+@receiver(post_save, sender=ImageAsset)
+@receiver(post_delete, sender=ImageAsset)
+@receiver(post_delete, sender=DailyAnalytics)
+def mark_recommendations_stale(sender, instance, **kwargs):
+    """
+    Flag the owner's precomputed recommendations for re-evaluation. Daily
+    analytics saves are covered by the summary refresh they trigger.
+    """
+    if isinstance(instance, (Campaign, CampaignOwnedModel)):
+        user_id = instance.user_id
+    else:
+        user_id = Campaign.objects.filter(pk=instance.campaign_id).values_list('user_id', flat=True).first()
+    if user_id:
+        UserRecommendation.objects.filter(user_id=user_id, is_stale=False).update(is_stale=True)
+
+@receiver(post_save, sender=ABTestVariation)
+def update_sequential_ab_test(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Re-evaluate the stopping rule of a sequential A/B test whenever one of
+    its variation counters changes, and drop its compiled traffic split when
+    the set of variations may have changed.
+    """
+    if created or not update_fields or 'name' in update_fields:
+        from core.services.traffic_assignment import TrafficAssignmentService
+        TrafficAssignmentService.invalidate(instance.ab_test_id)
+    
+    if created:
+        instance._loaded_counters = instance.counters()
+        return
+    if update_fields and not set(ABTestVariation.COUNTER_FIELDS) & set(update_fields):
+        return
+    # The posterior is a 20,000-draw simulation; only redo it for new counts
+    loaded_counters = getattr(instance, '_loaded_counters', None)
+    instance._loaded_counters = instance.counters()
+    if loaded_counters == instance._loaded_counters:
+        return
+    
+    try:
+        from core.services.sequential_testing import SequentialTestingService
+        SequentialTestingService.update(instance.ab_test)
+    except Exception as e:
+        logger.error(f"❌ Failed to update sequential analysis for {instance.ab_test_id}: {e}")
+
+@receiver(post_save, sender=ABTest)
+@receiver(post_delete, sender=ABTest)
+def invalidate_traffic_split(sender, instance, **kwargs):
+    """Drop the compiled traffic split when a test changes"""
+    from core.services.traffic_assignment import TrafficAssignmentService
+    TrafficAssignmentService.invalidate(instance.pk)
+
+@receiver(post_delete, sender=ABTestVariation)
+def invalidate_traffic_split_on_variation_delete(sender, instance, **kwargs):
+    from core.services.traffic_assignment import TrafficAssignmentService
+    TrafficAssignmentService.invalidate(instance.ab_test_id)
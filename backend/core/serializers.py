@@ -204,10 +204,10 @@ class ABTestSerializer(serializers.ModelSerializer):
             'id', 'campaign', 'campaign_title', 'name', 'description', 
             'status', 'start_date', 'end_date', 'traffic_split', 
             'success_metric', 'confidence_level', 'min_sample_size',
-            'winner', 'is_significant', 'p_value', 'variations',
-            'created_at', 'updated_at'
+            'analysis_mode', 'winner', 'is_significant', 'p_value', 'posterior',
+            'variations', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'winner', 'is_significant', 'p_value', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'winner', 'is_significant', 'p_value', 'posterior', 'created_at', 'updated_at']
 
 # ============================================================================
 # PREDICTIVE ANALYTICS
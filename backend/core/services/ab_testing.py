@@ -1,13 +1,24 @@
 # backend/core/services/ab_testing.py - COMPLETE FILE
+import hashlib
+import json
 import numpy as np
 from scipy import stats
+from django.core.cache import cache
 from core.utils.timezone_utils import now
 
+# (successes, trials) counter fields for each supported success metric
+METRIC_FIELDS = {
+    'ctr': ('clicks', 'impressions'),
+    'conversion_rate': ('conversions', 'clicks'),
+}
+
+ANALYSIS_CACHE_TIMEOUT = 60 * 60
+
 class ABTestingService:
     """Service for A/B testing analysis and management"""
     
     @staticmethod
-    def calculate_statistical_significance(variation_a, variation_b, metric='ctr'):
+    def calculate_statistical_significance(variation_a, variation_b, metric='ctr', alpha=0.05):
         """
         Calculate if there's a statistically significant difference between variations
         """
@@ -38,7 +49,7 @@ class ABTestingService:
             # Perform chi-square test
             chi2, p_value, dof, expected = stats.chi2_contingency(observed)
             
-            is_significant = p_value < 0.05
+            is_significant = p_value < alpha
             
             ctr_a = variation_a.ctr
             ctr_b = variation_b.ctr
@@ -84,7 +95,7 @@ class ABTestingService:
             ])
             
             chi2, p_value, dof, expected = stats.chi2_contingency(observed)
-            is_significant = p_value < 0.05
+            is_significant = p_value < alpha
             
             conv_rate_a = variation_a.conversion_rate
             conv_rate_b = variation_b.conversion_rate
@@ -110,9 +121,10 @@ class ABTestingService:
         return {'significant': False, 'p_value': 1.0, 'winner': None}
     
     @staticmethod
-    def check_minimum_sample_size(ab_test):
+    def check_minimum_sample_size(ab_test, variations=None):
         """Check if test has reached minimum sample size"""
-        variations = ab_test.variations.all()
+        if variations is None:
+            variations = ab_test.variations.all()
         
         for variation in variations:
             if variation.impressions < ab_test.min_sample_size:
@@ -121,63 +133,191 @@ class ABTestingService:
         return True
     
     @staticmethod
-    def analyze_test(ab_test):
-        """Analyze A/B test and determine winner"""
+    def significance_level(ab_test):
+        """Alpha implied by the test's confidence level (95.0 -> 0.05)"""
+        alpha = round(1 - (ab_test.confidence_level or 95.0) / 100, 6)
+        return min(max(alpha, 0.001), 0.5)
+    
+    @staticmethod
+    def adjust_p_values(p_values, method='holm'):
+        """
+        Family-wise error correction for post-hoc comparisons
+        
+        Args:
+            p_values: Sequence of raw p-values
+            method: 'holm' (step-down) or 'bonferroni'
+            
+        Returns:
+            np.ndarray: Adjusted p-values in the original order
+        """
+        p_values = np.asarray(p_values, dtype=float)
+        m = len(p_values)
+        if m == 0:
+            return p_values
+        
+        if method == 'bonferroni':
+            return np.minimum(p_values * m, 1.0)
+        
+        order = np.argsort(p_values)
+        stepped = (m - np.arange(m)) * p_values[order]
+        adjusted = np.empty(m)
+        adjusted[order] = np.minimum(np.maximum.accumulate(stepped), 1.0)
+        return adjusted
+    
+    @staticmethod
+    def _analysis_cache_key(ab_test, variations, correction):
+        """Cache key that changes whenever the test settings or any counter change"""
+        fingerprint = json.dumps([
+            ab_test.status, ab_test.success_metric, ab_test.confidence_level,
+            ab_test.min_sample_size, correction,
+            [(v.name, v.impressions, v.clicks, v.conversions) for v in variations],
+        ])
+        digest = hashlib.sha1(fingerprint.encode()).hexdigest()
+        return f'abtest:analysis:{ab_test.id}:{digest}'
+    
+    @staticmethod
+    def analyze_test(ab_test, variations=None, correction='holm'):
+        """
+        Analyze A/B test and determine winner
+        
+        Runs one k-way chi-square test over all variations, then compares the
+        best variation against every other one with Holm (or Bonferroni)
+        corrected two-proportion z-tests. Results are cached until a counter
+        or a test setting changes.
+        
+        Args:
+            ab_test: ABTest object
+            variations: Optional pre-loaded variations, to avoid a second query
+            correction: 'holm' or 'bonferroni'
+        
+        Tests in sequential mode are analysed by SequentialTestingService instead.
+        """
+        if ab_test.analysis_mode == 'sequential':
+            from core.services.sequential_testing import SequentialTestingService
+            return SequentialTestingService.analyze(ab_test, variations)
+        
         if ab_test.status != 'running':
             return {'error': 'Test is not running'}
         
-        if not ABTestingService.check_minimum_sample_size(ab_test):
+        if variations is None:
+            variations = list(ab_test.variations.all().order_by('name'))
+        
+        cache_key = ABTestingService._analysis_cache_key(ab_test, variations, correction)
+        analysis = cache.get(cache_key)
+        if analysis is None:
+            analysis = ABTestingService._run_analysis(ab_test, variations, correction)
+            cache.set(cache_key, analysis, ANALYSIS_CACHE_TIMEOUT)
+        
+        if analysis.get('status') == 'completed':
+            if (ab_test.winner != analysis['winner'] or not ab_test.is_significant
+                    or ab_test.p_value != analysis['p_value']):
+                ab_test.winner = analysis['winner']
+                ab_test.is_significant = True
+                ab_test.p_value = analysis['p_value']
+                ab_test.save(update_fields=['winner', 'is_significant', 'p_value', 'updated_at'])
+        
+        return analysis
+    
+    @staticmethod
+    def _run_analysis(ab_test, variations, correction):
+        if len(variations) < 2:
+            return {'error': 'Need at least 2 variations'}
+        
+        if not ABTestingService.check_minimum_sample_size(ab_test, variations):
             return {
                 'status': 'insufficient_data',
                 'message': f'Need at least {ab_test.min_sample_size} impressions per variation'
             }
         
-        variations = list(ab_test.variations.all().order_by('name'))
-        
-        if len(variations) < 2:
-            return {'error': 'Need at least 2 variations'}
+        success_field, trial_field = METRIC_FIELDS.get(ab_test.success_metric, METRIC_FIELDS['ctr'])
+        names = [v.name for v in variations]
+        successes = np.array([getattr(v, success_field) for v in variations], dtype=float)
+        trials = np.array([getattr(v, trial_field) for v in variations], dtype=float)
+        alpha = ABTestingService.significance_level(ab_test)
         
-        results = []
-        
-        for i in range(len(variations)):
-            for j in range(i + 1, len(variations)):
-                var_a = variations[i]
-                var_b = variations[j]
-                
-                result = ABTestingService.calculate_statistical_significance(
-                    var_a, var_b, ab_test.success_metric
-                )
-                
-                results.append({
-                    'variation_a': var_a.name,
-                    'variation_b': var_b.name,
-                    'result': result
-                })
-        
-        if results and results[0]['result']['significant']:
-            winner_name = results[0]['result']['winner']
-            ab_test.winner = winner_name
-            ab_test.is_significant = True
-            ab_test.p_value = results[0]['result']['p_value']
-            ab_test.save()
-            
+        if (trials <= 0).any():
             return {
-                'status': 'completed',
-                'winner': winner_name,
-                'significant': True,
-                'details': results[0]['result']
+                'status': 'insufficient_data',
+                'message': f'Every variation needs at least one {trial_field[:-1]} to compare {ab_test.success_metric}'
             }
+        
+        successes = np.minimum(successes, trials)
+        rates = successes / trials
+        
+        # Omnibus k x 2 test: is any variation different from the others?
+        observed = np.column_stack([successes, trials - successes])
+        if observed.sum(axis=0).min() == 0:
+            chi2, p_value = 0.0, 1.0
         else:
+            chi2, p_value, dof, expected = stats.chi2_contingency(observed)
+        
+        # Post-hoc: best variation against each of the others
+        best = int(np.argmax(rates))
+        others = np.array([i for i in range(len(variations)) if i != best])
+        pooled = (successes[best] + successes[others]) / (trials[best] + trials[others])
+        se = np.sqrt(pooled * (1 - pooled) * (1 / trials[best] + 1 / trials[others]))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = np.where(se > 0, (rates[best] - rates[others]) / se, 0.0)
+        raw_p = 2 * stats.norm.sf(np.abs(z))
+        adjusted_p = ABTestingService.adjust_p_values(raw_p, correction)
+        
+        comparisons = []
+        for idx, other in enumerate(others):
+            improvement = 0
+            if rates[best] > 0:
+                improvement = (rates[best] - rates[other]) / rates[best] * 100
+            comparisons.append({
+                'variation_a': names[best],
+                'variation_b': names[other],
+                'metric_a': round(float(rates[best] * 100), 2),
+                'metric_b': round(float(rates[other] * 100), 2),
+                'improvement': float(improvement),
+                'p_value': float(raw_p[idx]),
+                'adjusted_p_value': float(adjusted_p[idx]),
+                'significant': bool(adjusted_p[idx] < alpha),
+            })
+        
+        omnibus = {
+            'test': 'chi2_contingency',
+            'chi2': float(chi2),
+            'p_value': float(p_value),
+            'alpha': alpha,
+            'correction': correction,
+            'variations': len(variations),
+        }
+        
+        if p_value < alpha and all(c['significant'] for c in comparisons):
+            runner_up = min(comparisons, key=lambda c: c['improvement'])
             return {
-                'status': 'inconclusive',
-                'message': 'No statistically significant winner yet',
-                'details': results
+                'status': 'completed',
+                'winner': names[best],
+                'significant': True,
+                'p_value': float(max(c['adjusted_p_value'] for c in comparisons)),
+                'omnibus': omnibus,
+                'comparisons': comparisons,
+                'details': {
+                    'significant': True,
+                    'p_value': runner_up['adjusted_p_value'],
+                    'winner': names[best],
+                    'confidence': (1 - runner_up['adjusted_p_value']) * 100,
+                    'metric_a': runner_up['metric_a'],
+                    'metric_b': runner_up['metric_b'],
+                    'improvement': runner_up['improvement'],
+                }
             }
+        
+        return {
+            'status': 'inconclusive',
+            'message': 'No statistically significant winner yet',
+            'omnibus': omnibus,
+            'details': comparisons
+        }
     
     @staticmethod
-    def get_recommendation(ab_test):
+    def get_recommendation(ab_test, analysis=None):
         """Get AI-powered recommendation for the test"""
-        analysis = ABTestingService.analyze_test(ab_test)
+        if analysis is None:
+            analysis = ABTestingService.analyze_test(ab_test)
         
         recommendations = []
         
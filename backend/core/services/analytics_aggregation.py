@@ -0,0 +1,152 @@
+# backend/core/services/analytics_aggregation.py
+"""
+Cached calendar breakdowns of a user's analytics.
+
+breakdown() groups DailyAnalytics or HourlyAnalytics by ISO weekday and/or
+hour of day in a single GROUP BY query (Extract* + Sum) and caches the cells.
+Cache keys embed a per-user data version that is bumped whenever the user's
+analytics change (signals on save/delete, and explicitly after bulk writes),
+so a cached breakdown is never served after its data moved; the timeout only
+bounds how long unused entries linger.
+"""
+from datetime import datetime, time
+from time import time_ns
+
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay
+
+from core.db_router import pin_to_primary
+from core.models import DailyAnalytics, HourlyAnalytics
+from core.utils.timezone_utils import make_aware
+
+BREAKDOWN_CACHE_TIMEOUT = 60 * 60
+
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# Source name -> (model, timestamp field, owner lookup)
+SOURCES = {
+    'daily': (DailyAnalytics, 'date', 'user'),
+    'hourly': (HourlyAnalytics, 'hour', 'campaign__user'),
+}
+
+DIMENSIONS = {
+    'weekday': ExtractIsoWeekDay,
+    'hour': ExtractHour,
+}
+
+
+def _version_key(user_id):
+    return f'analytics_version:{user_id}'
+
+
+class AnalyticsAggregationService:
+    """Group analytics by calendar dimensions in SQL, with caching"""
+
+    @staticmethod
+    def data_version(user_id):
+        # Seeded from the clock so an evicted version never reuses old keys
+        cache.add(_version_key(user_id), time_ns(), None)
+        return cache.get(_version_key(user_id))
+
+    @staticmethod
+    def invalidate(user_ids):
+        """Make every cached breakdown of these users stale"""
+        for user_id in set(user_ids):
+            try:
+                cache.incr(_version_key(user_id))
+            except ValueError:
+                cache.set(_version_key(user_id), time_ns(), None)
+        # Otherwise a lagging replica could refill the cache with old data
+        # under the new version
+        pin_to_primary(user_ids)
+
+    @staticmethod
+    def aggregate(queryset, dimensions, field):
+        """
+        One GROUP BY query over `queryset`
+
+        Returns:
+            list: one dict per non-empty cell with the dimension values and
+                summed impressions, clicks, conversions and row count
+        """
+        # Prefixed so 'hour' does not clash with HourlyAnalytics.hour
+        annotations = {f'by_{name}': DIMENSIONS[name](field) for name in dimensions}
+        cells = (
+            queryset
+            .annotate(**annotations)
+            .values(*annotations)
+            .annotate(
+                total_impressions=Sum('impressions'),
+                total_clicks=Sum('clicks'),
+                total_conversions=Sum('conversions'),
+                rows=Count('pk'),
+            )
+            .order_by(*annotations)
+        )
+        return [
+            {
+                **{name: cell[f'by_{name}'] for name in dimensions},
+                'impressions': cell['total_impressions'] or 0,
+                'clicks': cell['total_clicks'] or 0,
+                'conversions': cell['total_conversions'] or 0,
+                'rows': cell['rows'],
+            }
+            for cell in cells
+        ]
+
+    @staticmethod
+    def breakdown(user, dimensions=('weekday',), source='daily', campaign_id=None, since=None):
+        """
+        Cached aggregate() of a user's (or one of their campaigns') analytics
+
+        Args:
+            user: Owner of the analytics
+            dimensions: Any of 'weekday' (1 = Monday) and 'hour'
+            source: 'daily' or 'hourly'
+            campaign_id: Optional campaign to restrict to
+            since: Optional first date to include
+        """
+        dimensions = tuple(dimensions)
+        model, field, owner = SOURCES[source]
+        version = AnalyticsAggregationService.data_version(user.pk)
+        key = (
+            f"analytics_breakdown:{user.pk}:v{version}:{source}:{'-'.join(dimensions)}:"
+            f"{campaign_id or 'all'}:{since or 'all'}"
+        )
+
+        cells = cache.get(key)
+        if cells is not None:
+            return cells
+
+        queryset = model.objects.filter(**{owner: user})
+        if campaign_id:
+            queryset = queryset.filter(campaign_id=campaign_id)
+        if since:
+            bound = since if source == 'daily' else make_aware(datetime.combine(since, time.min))
+            queryset = queryset.filter(**{f'{field}__gte': bound})
+
+        cells = AnalyticsAggregationService.aggregate(queryset, dimensions, field)
+        cache.set(key, cells, BREAKDOWN_CACHE_TIMEOUT)
+        return cells
+
+    @staticmethod
+    def weekday_performance(user, campaign_id=None, since=None):
+        """
+        CTR per weekday from daily analytics, best first
+
+        Returns:
+            list: [{'day', 'impressions', 'clicks', 'ctr', 'days'}] for weekdays with data
+        """
+        results = []
+        for cell in AnalyticsAggregationService.breakdown(user, ('weekday',), 'daily', campaign_id, since):
+            impressions = cell['impressions']
+            results.append({
+                'day': WEEKDAYS[cell['weekday'] - 1],
+                'impressions': impressions,
+                'clicks': cell['clicks'],
+                'ctr': round(cell['clicks'] / impressions * 100, 2) if impressions > 0 else 0,
+                'days': cell['rows'],
+            })
+        results.sort(key=lambda x: x['ctr'], reverse=True)
+        return results
@@ -0,0 +1,205 @@
+# backend/core/services/analytics_export.py
+"""
+Streaming export of raw DailyAnalytics rows.
+
+Rows are read with QuerySet.iterator(chunk_size=...) (a server-side cursor on
+PostgreSQL) and encoded chunk by chunk into a generator that feeds a
+StreamingHttpResponse, so memory use does not depend on the number of rows.
+Parquet output needs pyarrow and is written one row group per chunk.
+
+Under ASGI, Django reads a sync iterator to the end before it sends the
+first byte, so the view hands the response aiter_chunks() instead: each
+chunk is encoded in the request's sync thread and sent as it is ready.
+"""
+import csv
+import importlib.util
+import json
+
+from asgiref.sync import sync_to_async
+
+from core.models import DailyAnalytics
+
+CHUNK_SIZE = 5000
+
+EXPORT_COLUMNS = (
+    'date', 'campaign_id', 'campaign', 'impressions', 'clicks',
+    'conversions', 'spend', 'ctr', 'cpc', 'cpa',
+)
+
+_QUERY_FIELDS = (
+    'date', 'campaign_id', 'campaign__title', 'impressions', 'clicks',
+    'conversions', 'spend', 'ctr', 'cpc', 'cpa',
+)
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+def parquet_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+class _Echo:
+    """csv.writer target that hands back each encoded line"""
+
+    def write(self, value):
+        return value
+
+
+class _ChunkSink:
+    """Write-only file object that buffers bytes until they are drained"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class AnalyticsExportService:
+    """Filter and encode DailyAnalytics rows for export"""
+
+    @staticmethod
+    def queryset(user, start_date, end_date, campaign_ids=None):
+        rows = DailyAnalytics.objects.filter(
+            user=user,
+            date__gte=start_date,
+            date__lte=end_date
+        )
+        if campaign_ids:
+            rows = rows.filter(campaign_id__in=campaign_ids)
+        # Matches the (campaign, date) unique index
+        return rows.order_by('campaign_id', 'date')
+
+    @staticmethod
+    def iter_rows(queryset, chunk_size=CHUNK_SIZE):
+        """Rows as tuples in EXPORT_COLUMNS order, read through a cursor"""
+        return queryset.values_list(*_QUERY_FIELDS).iterator(chunk_size=chunk_size)
+
+    @staticmethod
+    def _chunks(rows, chunk_size):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def stream_csv(rows, chunk_size=CHUNK_SIZE):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(EXPORT_COLUMNS)
+        for chunk in AnalyticsExportService._chunks(rows, chunk_size):
+            yield ''.join(
+                writer.writerow((day.isoformat(), campaign_id, title, *values))
+                for day, campaign_id, title, *values in chunk
+            )
+
+    @staticmethod
+    def stream_ndjson(rows, chunk_size=CHUNK_SIZE):
+        for chunk in AnalyticsExportService._chunks(rows, chunk_size):
+            yield ''.join(
+                json.dumps({
+                    'date': row[0].isoformat(),
+                    'campaign_id': str(row[1]),
+                    'campaign': row[2],
+                    'impressions': row[3],
+                    'clicks': row[4],
+                    'conversions': row[5],
+                    'spend': float(row[6]),
+                    'ctr': row[7],
+                    'cpc': float(row[8]),
+                    'cpa': float(row[9]),
+                }) + '\n'
+                for row in chunk
+            )
+
+    @staticmethod
+    def stream_parquet(rows, chunk_size=CHUNK_SIZE):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ('date', pa.date32()),
+            ('campaign_id', pa.string()),
+            ('campaign', pa.string()),
+            ('impressions', pa.int64()),
+            ('clicks', pa.int64()),
+            ('conversions', pa.int64()),
+            ('spend', pa.float64()),
+            ('ctr', pa.float64()),
+            ('cpc', pa.float64()),
+            ('cpa', pa.float64()),
+        ])
+
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression='snappy')
+        try:
+            for chunk in AnalyticsExportService._chunks(rows, chunk_size):
+                columns = list(zip(*chunk))
+                writer.write_table(pa.Table.from_arrays([
+                    pa.array(columns[0], pa.date32()),
+                    pa.array([str(c) for c in columns[1]], pa.string()),
+                    pa.array(columns[2], pa.string()),
+                    pa.array(columns[3], pa.int64()),
+                    pa.array(columns[4], pa.int64()),
+                    pa.array(columns[5], pa.int64()),
+                    pa.array([float(v) for v in columns[6]], pa.float64()),
+                    pa.array(columns[7], pa.float64()),
+                    pa.array([float(v) for v in columns[8]], pa.float64()),
+                    pa.array([float(v) for v in columns[9]], pa.float64()),
+                ], schema=schema))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+
+    @staticmethod
+    def stream(fmt, rows, chunk_size=CHUNK_SIZE):
+        """Encoded chunks of the export in the requested format"""
+        encoders = {
+            'csv': AnalyticsExportService.stream_csv,
+            'ndjson': AnalyticsExportService.stream_ndjson,
+            'parquet': AnalyticsExportService.stream_parquet,
+        }
+        return encoders[fmt](rows, chunk_size)
+
+    @staticmethod
+    async def aiter_chunks(chunks):
+        """
+        Async iterator over the chunks of stream(), for ASGI responses
+
+        Chunks are pulled one by one through sync_to_async, which keeps them
+        on one thread, so the rows' cursor and connection stay usable.
+        """
+        pull = sync_to_async(next)
+        try:
+            while (chunk := await pull(chunks, None)) is not None:
+                yield chunk
+        finally:
+            # Releases the cursor if the client went away mid-export
+            await sync_to_async(chunks.close)()
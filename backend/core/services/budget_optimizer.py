@@ -0,0 +1,280 @@
+# backend/core/services/budget_optimizer.py
+"""
+Budget allocation optimizer.
+
+Each campaign gets a diminishing-returns response curve fitted from its recent
+DailyAnalytics (conversions = a * spend ** b, with 0 < b < 1). The user's budget
+is then split so every campaign ends up at the same marginal conversions per
+dollar, subject to per-campaign bounds around the current spend level.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+import numpy as np
+from scipy import optimize
+from django.core.cache import cache
+from django.db.models import Count, FloatField, Max, Sum, Value
+from django.db.models.functions import Cast, Ln
+
+from core.models import Campaign, DailyAnalytics
+from core.utils.timezone_utils import today
+
+LOOKBACK_DAYS = 90
+MIN_DATA_POINTS = 5
+
+# Prior elasticity used when a campaign has too little data for a stable fit
+DEFAULT_ELASTICITY = 0.5
+MIN_ELASTICITY = 0.05
+MAX_ELASTICITY = 0.95
+
+# Allocation may move a campaign between half and double its current spend
+MIN_BUDGET_FACTOR = 0.5
+MAX_BUDGET_FACTOR = 2.0
+
+# Same revenue assumption as CampaignAnalyticsSummary.update_metrics
+REVENUE_PER_CONVERSION = 50
+
+CACHE_TIMEOUT = 60 * 60 * 24
+CACHE_VERSION = 1
+
+
+class BudgetOptimizer:
+    """Fit per-campaign response curves and solve the budget allocation"""
+
+    @staticmethod
+    def fit_response_curves(n, sx, sy, sxx, sxy):
+        """
+        Fit log(conversions) = log(a) + b * log(spend) for every campaign at once
+        from per-campaign sufficient statistics (counts and sums of the logs).
+
+        Returns:
+            tuple: (a, b) arrays, one entry per campaign
+        """
+        denom = n * sxx - sx * sx
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = (n * sxy - sx * sy) / denom
+
+        usable = (n >= MIN_DATA_POINTS) & (np.abs(denom) > 1e-9) & np.isfinite(slope)
+        b = np.where(usable, slope, DEFAULT_ELASTICITY)
+        b = np.clip(b, MIN_ELASTICITY, MAX_ELASTICITY)
+
+        # Re-fit the intercept for the (possibly clipped) slope
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_a = np.where(n > 0, (sy - b * sx) / np.maximum(n, 1), -np.inf)
+
+        return np.exp(log_a), b
+
+    @staticmethod
+    def allocate(a, b, baseline, cost, total):
+        """
+        Maximise sum(a * x ** b) subject to sum(cost * x) == total and
+        MIN_BUDGET_FACTOR * baseline <= x <= MAX_BUDGET_FACTOR * baseline.
+        The total is a hard cap: below what the floors add up to, the floors
+        are lowered in proportion until they fit it. Above what the ceilings
+        allow, every campaign gets its ceiling and _solve reports the rest.
+
+        The KKT conditions give x_i(lam) = clip((a_i b_i / (lam c_i)) ** (1 / (1 - b_i)));
+        sum(cost * x(lam)) is monotone in lam, so a scalar root find solves it.
+        """
+        lo = baseline * MIN_BUDGET_FACTOR
+        hi = baseline * MAX_BUDGET_FACTOR
+        total = max(float(total), 0.0)
+        floor = (cost * lo).sum()
+        if total < floor:
+            # Only the lowered floors spend exactly the total
+            return lo * (total / floor)
+        total = min(total, (cost * hi).sum())
+
+        if len(baseline) == 0 or (cost * (hi - lo)).sum() <= 1e-9:
+            return baseline
+
+        log_gain = np.log(np.maximum(a * b, 1e-300)) - np.log(cost)
+        exponent = 1.0 / (1.0 - b)
+
+        def spend_at(log_lam):
+            with np.errstate(over='ignore'):
+                x = np.exp((log_gain - log_lam) * exponent)
+            return np.clip(x, lo, hi)
+
+        # Marginal returns at the bounds bracket the multiplier
+        left = (log_gain + (b - 1) * np.log(hi)).min() - 1.0
+        right = (log_gain + (b - 1) * np.log(lo)).max() + 1.0
+
+        def residual(log_lam):
+            return (cost * spend_at(log_lam)).sum() - total
+
+        if residual(left) <= 0:
+            return hi
+        if residual(right) >= 0:
+            return lo
+
+        log_lam = optimize.brentq(residual, left, right, xtol=1e-10)
+        return spend_at(log_lam)
+
+    @staticmethod
+    def _fingerprint(user, campaigns, since, total_budget):
+        """Cache key component that changes whenever inputs change"""
+        stats = DailyAnalytics.objects.filter(
+            user=user,
+            date__gte=since
+        ).aggregate(last_update=Max('updated_at'), rows=Count('id'))
+
+        payload = json.dumps({
+            'campaigns': [
+                (str(c['id']), str(c['budget']), c['analytics_summary__performance_score'])
+                for c in campaigns
+            ],
+            'last_update': stats['last_update'].isoformat() if stats['last_update'] else None,
+            'rows': stats['rows'],
+            'since': since.isoformat(),
+            'total_budget': total_budget,
+        }, sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    @staticmethod
+    def recommend(user, total_budget=None):
+        """
+        Recommend a budget for every active campaign of the user.
+
+        Args:
+            user: User object
+            total_budget: Optional budget to distribute; defaults to the sum of
+                the current budgets of the active campaigns
+
+        Returns:
+            dict: recommendations in the shape used by BudgetRecommendationsView
+        """
+        since = today() - timedelta(days=LOOKBACK_DAYS)
+
+        campaigns = list(
+            Campaign.objects.filter(user=user, is_active=True).order_by('created_at').values(
+                'id', 'title', 'budget',
+                'analytics_summary__total_spend',
+                'analytics_summary__total_conversions',
+                'analytics_summary__performance_score',
+            )
+        )
+
+        cache_key = 'budget_optimizer:v{}:{}:{}'.format(
+            CACHE_VERSION, user.pk,
+            BudgetOptimizer._fingerprint(user, campaigns, since, total_budget)
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        result = BudgetOptimizer._solve(campaigns, since, total_budget)
+        cache.set(cache_key, result, CACHE_TIMEOUT)
+        return result
+
+    @staticmethod
+    def _solve(campaigns, since, total_budget):
+        n_groups = len(campaigns)
+        slot = {c['id']: i for i, c in enumerate(campaigns)}
+
+        # One grouped query returns the regression sums for every campaign,
+        # so the cost scales with campaigns rather than daily rows
+        log_spend = Ln(Cast('spend', FloatField()))
+        log_conversions = Ln(Cast('conversions', FloatField()) + Value(0.5))
+        stats = DailyAnalytics.objects.filter(
+            campaign_id__in=list(slot),
+            date__gte=since,
+            spend__gt=0
+        ).values('campaign_id').annotate(
+            n=Count('id'),
+            sx=Sum(log_spend),
+            sy=Sum(log_conversions),
+            sxx=Sum(log_spend * log_spend),
+            sxy=Sum(log_spend * log_conversions),
+            spend_total=Sum('spend'),
+        ).values_list('campaign_id', 'n', 'sx', 'sy', 'sxx', 'sxy', 'spend_total')
+
+        sums = np.zeros((6, n_groups))
+        for campaign_id, *values in stats:
+            sums[:, slot[campaign_id]] = [float(v or 0) for v in values]
+        n, sx, sy, sxx, sxy, spend_total = sums
+
+        a, b = BudgetOptimizer.fit_response_curves(n, sx, sy, sxx, sxy)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            baseline = np.where(n > 0, spend_total / np.maximum(n, 1), 0.0)
+
+        budgets = np.array([float(c['budget'] or 0) for c in campaigns])
+        optimizable = (baseline > 0) & (budgets > 0) & np.isfinite(a) & (a > 0)
+
+        factor = np.ones(n_groups)
+        fixed = budgets[~optimizable].sum()
+        if total_budget is not None and fixed > total_budget:
+            # Campaigns without a curve keep their current budgets unless
+            # those alone exceed the total; then they share it
+            factor[~optimizable] = total_budget / fixed
+        if optimizable.any():
+            # Budget dollars bought per dollar of daily spend, per campaign
+            cost = budgets[optimizable] / baseline[optimizable]
+            target = budgets[optimizable].sum()
+            if total_budget is not None:
+                target = max(float(total_budget) - fixed, 0.0)
+
+            allocated = BudgetOptimizer.allocate(
+                a[optimizable], b[optimizable], baseline[optimizable], cost, target
+            )
+            factor[optimizable] = allocated / baseline[optimizable]
+
+        expected_now = np.where(optimizable, a * np.power(baseline, b), 0.0)
+        expected_new = np.where(optimizable, a * np.power(baseline * factor, b), 0.0)
+
+        recommendations = []
+        for i, campaign in enumerate(campaigns):
+            total_spend = float(campaign['analytics_summary__total_spend'] or 0)
+            total_conversions = campaign['analytics_summary__total_conversions'] or 0
+            efficiency = campaign['analytics_summary__performance_score'] or 0
+            roi = (total_conversions * REVENUE_PER_CONVERSION) / total_spend if total_spend > 0 else 0
+
+            change = float(factor[i] - 1)
+            if not optimizable[i] or abs(change) < 0.05:
+                recommendation = 'maintain'
+            elif change > 0:
+                recommendation = 'increase'
+            else:
+                recommendation = 'decrease'
+
+            if optimizable[i]:
+                reason = (
+                    f'ROI: {roi:.2f}x, Performance: {efficiency}/100, '
+                    f'spend elasticity {b[i]:.2f} over {int(n[i])} days'
+                )
+            else:
+                reason = f'Not enough spend data in the last {LOOKBACK_DAYS} days to fit a response curve'
+
+            recommendations.append({
+                'campaign_id': str(campaign['id']),
+                'campaign_name': campaign['title'],
+                'current_budget': round(float(budgets[i]), 2),
+                'recommended_budget': round(float(budgets[i] * factor[i]), 2),
+                'recommendation': recommendation,
+                'suggested_change': f'{change * 100:+.0f}%' if recommendation != 'maintain' else '0%',
+                'roi': round(roi, 2),
+                'efficiency_score': efficiency,
+                'elasticity': round(float(b[i]), 3),
+                'expected_daily_conversions': round(float(expected_new[i]), 2),
+                'reason': reason,
+            })
+
+        current = expected_now.sum()
+        allocated_total = round(float((budgets * factor).sum()), 2)
+        result = {
+            'success': True,
+            'recommendations': recommendations,
+            'total_campaigns': len(recommendations),
+            'total_budget': allocated_total,
+            'expected_conversion_lift': round(
+                float((expected_new.sum() - current) / current * 100), 1
+            ) if current > 0 else 0,
+        }
+        if total_budget is not None:
+            # Never more than requested; positive when the ceilings kept part
+            # of it from being spent
+            result['requested_budget'] = round(float(total_budget), 2)
+            result['unallocated_budget'] = round(float(total_budget) - allocated_total, 2)
+        return result
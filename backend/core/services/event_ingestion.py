@@ -0,0 +1,463 @@
+# backend/core/services/event_ingestion.py
+"""
+Buffered counter ingestion for ABTestVariation and AdContent.
+
+Events are validated and de-duplicated when they arrive, then folded into
+per-row deltas. Deltas are flushed on an interval with one
+`UPDATE ... SET col = col + n` per group of rows sharing the same deltas, so
+thousands of events per second become a handful of short statements instead
+of a read-modify-write per event.
+
+Delivery is at least once: a batch is acknowledged only after its deltas are
+durable.
+- On the Redis cache backend, deltas are staged in a Redis hash (HINCRBY per
+  (target, pk, field)) in the same transaction that confirms the events'
+  claims, before the 202. A background thread in any worker moves the hash
+  aside under a lease, writes it to the database and deletes it; a flush that
+  fails or dies midway leaves it in place for the next one. A worker that
+  dies after the database commit but before the delete has that flush
+  counted twice.
+- Without Redis there is nothing durable but the database, so batches of
+  client events are written through before they are acknowledged. Only
+  deltas no client waits on (assignment exposures) are buffered in process
+  memory, and those still unflushed when a worker dies are lost.
+
+Event ids are de-duplicated per user. Each id is claimed atomically when its
+event is accepted (cache.add, or SET NX on Redis), so concurrent batches
+carrying the same id count it once. The claim is short-lived
+(EVENT_PENDING_CLAIM_TTL) until the event's delta is durable, then extended
+to the full dedup window (EVENT_DEDUP_TTL). If storing the deltas fails the
+claims are released and the request fails, so the client's retry is counted.
+"""
+import atexit
+import logging
+import threading
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+from core.models import ABTest, ABTestVariation, AdContent
+from core.utils.cache import redis_client
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ('impression', 'click', 'conversion')
+
+# target name -> (model, {event type: counter field}, ownership lookup)
+TARGETS = {
+    'ab_variation': (
+        ABTestVariation,
+        {'impression': 'impressions', 'click': 'clicks', 'conversion': 'conversions'},
+        'ab_test__campaign__user',
+    ),
+    'ad_content': (
+        AdContent,
+        {'impression': 'views', 'click': 'clicks', 'conversion': 'conversions'},
+        'campaign__user',
+    ),
+}
+
+MAX_BATCH_SIZE = 1000
+MAX_EVENT_COUNT = 10000
+
+
+# Redis keys: the hash deltas are staged in, the hash being flushed, and the
+# lease that lets one worker at a time flush
+STAGED_KEY = 'event:staged'
+FLUSHING_KEY = 'event:flushing'
+FLUSH_LEASE_KEY = 'event:flush-lease'
+# Longer than any flush takes; a flush outliving its lease may be repeated
+FLUSH_LEASE_SECONDS = 60
+
+
+def _claim(keys, ttl):
+    """Set each key that is not set yet, atomically; returns the keys set"""
+    client = redis_client()
+    if client is None:
+        return {key for key in keys if cache.add(key, 1, ttl)}
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.set(cache.make_and_validate_key(key), 1, nx=True, ex=ttl)
+    return {key for key, claimed in zip(keys, pipe.execute()) if claimed}
+
+
+class EventBuffer:
+    """Buffer of counter deltas, flushed with atomic F() increments"""
+
+    def __init__(self, interval=None, max_rows=None):
+        self.interval = interval if interval is not None else getattr(settings, 'EVENT_FLUSH_INTERVAL', 1.0)
+        self.max_rows = max_rows or getattr(settings, 'EVENT_BUFFER_MAX_ROWS', 5000)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = defaultdict(int)
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def add(self, deltas, claims=(), durable=False):
+        """
+        Store deltas until the next flush
+
+        Args:
+            deltas: Mapping of (target, pk, field) -> increment
+            claims: Dedup keys of the events behind the deltas, confirmed
+                once the deltas are durable
+            durable: The deltas must survive this process (a client is
+                acknowledged for them). Without Redis they are written
+                through instead of buffered
+
+        Raises if the deltas could not be stored; the claims are then left
+        unconfirmed
+        """
+        client = redis_client()
+        if client is not None:
+            size = self._stage(client, deltas, claims)
+        elif durable or self.interval <= 0:
+            self._write(deltas)
+            EventIngestionService.confirm(claims)
+            EventIngestionService.after_flush(deltas)
+            return
+        else:
+            with self._lock:
+                for key, value in deltas.items():
+                    self._pending[key] += value
+                size = len(self._pending)
+
+        if self.interval <= 0:
+            self.flush()
+            return
+
+        self._ensure_thread()
+        if size >= self.max_rows:
+            self._wakeup.set()
+
+    @staticmethod
+    def _stage(client, deltas, claims):
+        """
+        Add deltas to the Redis hash and confirm their claims, atomically
+
+        Returns:
+            int: number of rows with staged deltas
+        """
+        staged = cache.make_and_validate_key(STAGED_KEY)
+        ttl = getattr(settings, 'EVENT_DEDUP_TTL', 60 * 60 * 24)
+        pipe = client.pipeline(transaction=True)
+        for (target, pk, field), value in deltas.items():
+            pipe.hincrby(staged, f'{target}:{pk}:{field}', value)
+        for key in claims:
+            pipe.expire(cache.make_and_validate_key(key), ttl)
+        pipe.hlen(staged)
+        return pipe.execute()[-1]
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='event-buffer-flush', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ Event buffer flush failed: {e}")
+
+    def flush(self):
+        """
+        Write all buffered and staged deltas to the database
+
+        Returns:
+            int: number of rows updated
+        """
+        updated = self._flush_memory()
+        client = redis_client()
+        if client is not None:
+            updated += self._flush_staged(client)
+        return updated
+
+    def _flush_memory(self):
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, defaultdict(int)
+
+            try:
+                updated = self._write(batch)
+            except Exception:
+                # Put the deltas back so the next flush retries them
+                self._requeue(batch)
+                raise
+
+        EventIngestionService.after_flush(batch)
+        return updated
+
+    def _requeue(self, batch):
+        with self._lock:
+            for key, value in batch.items():
+                self._pending[key] += value
+
+    @staticmethod
+    def _flush_staged(client):
+        lease = cache.make_and_validate_key(FLUSH_LEASE_KEY)
+        token = uuid.uuid4().hex
+        if not client.set(lease, token, nx=True, ex=FLUSH_LEASE_SECONDS):
+            # Another worker is flushing
+            return 0
+
+        try:
+            staged = cache.make_and_validate_key(STAGED_KEY)
+            flushing = cache.make_and_validate_key(FLUSHING_KEY)
+            # A batch left by a failed or interrupted flush goes first. Only
+            # the lease holder deletes the staged hash, so it can't vanish
+            # between the check and the rename
+            if not client.exists(flushing):
+                if not client.exists(staged):
+                    return 0
+                client.rename(staged, flushing)
+
+            batch = {}
+            for name, value in client.hgetall(flushing).items():
+                target, pk, field = (name.decode() if isinstance(name, bytes) else name).split(':')
+                batch[(target, pk, field)] = int(value)
+
+            updated = EventBuffer._write(batch)
+            client.delete(flushing)
+        finally:
+            current = client.get(lease)
+            if current is not None and (current.decode() if isinstance(current, bytes) else current) == token:
+                client.delete(lease)
+
+        EventIngestionService.after_flush(batch)
+        return updated
+
+    @staticmethod
+    def _write(batch):
+        # Collapse to one delta vector per row, then group rows sharing a vector
+        rows = defaultdict(dict)
+        for (target, pk, field), value in batch.items():
+            if value:
+                rows[(target, pk)][field] = value
+
+        groups = defaultdict(list)
+        for (target, pk), fields in rows.items():
+            groups[(target, tuple(sorted(fields.items())))].append(pk)
+
+        updated = 0
+        with transaction.atomic():
+            # Deterministic statement and row order keeps concurrent flushes
+            # from different workers from deadlocking each other
+            for (target, fields), pks in sorted(groups.items(), key=lambda g: (g[0][0], g[0][1])):
+                model = TARGETS[target][0]
+                updated += model.objects.filter(pk__in=sorted(pks, key=str)).update(
+                    **{field: F(field) + value for field, value in fields}
+                )
+        return updated
+
+
+class EventIngestionService:
+    """Validate, de-duplicate and buffer counter events"""
+
+    @staticmethod
+    def parse(events):
+        """
+        Validate raw events
+
+        Returns:
+            tuple: (valid events, list of errors as {'index', 'error'})
+        """
+        valid, errors = [], []
+        for index, event in enumerate(events):
+            if not isinstance(event, dict):
+                errors.append({'index': index, 'error': 'Event must be an object'})
+                continue
+
+            target = event.get('target', 'ab_variation')
+            event_type = event.get('type')
+            if target not in TARGETS:
+                errors.append({'index': index, 'error': f'Unknown target: {target}'})
+                continue
+            if event_type not in EVENT_TYPES:
+                errors.append({'index': index, 'error': f'Unknown event type: {event_type}'})
+                continue
+            try:
+                target_id = str(uuid.UUID(str(event.get('target_id'))))
+            except ValueError:
+                errors.append({'index': index, 'error': 'target_id must be a UUID'})
+                continue
+
+            try:
+                count = int(event.get('count', 1))
+            except (TypeError, ValueError):
+                count = 0
+            if not 0 < count <= MAX_EVENT_COUNT:
+                errors.append({'index': index, 'error': f'count must be between 1 and {MAX_EVENT_COUNT}'})
+                continue
+
+            valid.append({
+                'id': str(event['id']) if event.get('id') else None,
+                'target': target,
+                'target_id': target_id,
+                'type': event_type,
+                'count': count,
+            })
+        return valid, errors
+
+    @staticmethod
+    def dedup_key(user, event_id):
+        # Per user: ids are chosen by clients, so one tenant's ids must not
+        # suppress another's events
+        return f'event:seen:{user.pk}:{event_id}'
+
+    @staticmethod
+    def deduplicate(user, events):
+        """
+        Claim the events' ids and drop those already claimed
+
+        Returns:
+            tuple: (events to count, dedup keys they claimed). The claims
+            last EVENT_PENDING_CLAIM_TTL until their deltas are durable
+        """
+        ttl = getattr(settings, 'EVENT_PENDING_CLAIM_TTL', 120)
+
+        unique, seen = [], set()
+        for event in events:
+            if event['id'] is None:
+                unique.append(event)
+            elif event['id'] not in seen:
+                seen.add(event['id'])
+                unique.append(event)
+
+        keys = [EventIngestionService.dedup_key(user, e['id']) for e in unique if e['id'] is not None]
+        if not keys:
+            return unique, []
+
+        claimed = _claim(keys, ttl)
+        return [
+            e for e in unique
+            if e['id'] is None or EventIngestionService.dedup_key(user, e['id']) in claimed
+        ], list(claimed)
+
+    @staticmethod
+    def confirm(claims):
+        """Hold written events' ids for the full dedup window"""
+        if not claims:
+            return
+        try:
+            ttl = getattr(settings, 'EVENT_DEDUP_TTL', 60 * 60 * 24)
+            for key in claims:
+                cache.touch(key, ttl)
+        except Exception as e:
+            # The deltas are written; at worst a late retry is counted again
+            logger.error(f"❌ Could not extend {len(claims)} event dedup claims: {e}")
+
+    @staticmethod
+    def release(claims):
+        """Forget the ids of events whose deltas could not be stored"""
+        if not claims:
+            return
+        try:
+            cache.delete_many(claims)
+        except Exception as e:
+            # They expire after EVENT_PENDING_CLAIM_TTL instead
+            logger.error(f"❌ Could not release {len(claims)} event dedup claims: {e}")
+
+    @staticmethod
+    def owned_targets(user, events):
+        """Ids of targets the user owns, one query per target type"""
+        requested = defaultdict(set)
+        for event in events:
+            requested[event['target']].add(event['target_id'])
+
+        owned = set()
+        for target, ids in requested.items():
+            model, fields, owner_lookup = TARGETS[target]
+            rows = model.objects.filter(pk__in=ids, **{owner_lookup: user}).values_list('pk', flat=True)
+            owned.update((target, str(pk)) for pk in rows)
+        return owned
+
+    @staticmethod
+    def ingest(user, events, buffer=None):
+        """
+        Accept a batch of events for the user's campaigns
+
+        Returns:
+            dict: accepted/duplicate/rejected counts and per-event errors.
+            Raises if the accepted events could not be stored
+        """
+        buffer = buffer or event_buffer
+        valid, errors = EventIngestionService.parse(events)
+
+        owned = EventIngestionService.owned_targets(user, valid)
+        accepted = []
+        for event in valid:
+            if (event['target'], event['target_id']) in owned:
+                accepted.append(event)
+            else:
+                errors.append({'id': event['id'], 'error': 'Target not found'})
+
+        fresh, claims = EventIngestionService.deduplicate(user, accepted)
+
+        deltas = defaultdict(int)
+        for event in fresh:
+            field = TARGETS[event['target']][1][event['type']]
+            deltas[(event['target'], event['target_id'], field)] += event['count']
+        if deltas:
+            try:
+                buffer.add(deltas, claims, durable=True)
+            except Exception:
+                # Not acknowledged, so the client's retry must be counted
+                EventIngestionService.release(claims)
+                raise
+
+        return {
+            'accepted': len(fresh),
+            'duplicates': len(accepted) - len(fresh),
+            'rejected': len(errors),
+            'errors': errors,
+        }
+
+    @staticmethod
+    def after_flush(batch):
+        """Re-evaluate running sequential tests whose counters just changed"""
+        variation_ids = {pk for (target, pk, field) in batch if target == 'ab_variation'}
+        if not variation_ids:
+            return
+
+        from core.services.sequential_testing import SequentialTestingService
+
+        tests = ABTest.objects.filter(
+            variations__id__in=variation_ids,
+            analysis_mode='sequential',
+            status='running'
+        ).distinct()
+        for ab_test in tests:
+            try:
+                SequentialTestingService.update(ab_test)
+            except Exception as e:
+                logger.error(f"❌ Sequential update failed for test {ab_test.id}: {e}")
+
+
+event_buffer = EventBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        event_buffer.flush()
+    except Exception as e:
+        logger.error(f"❌ Final event buffer flush failed: {e}")
@@ -0,0 +1,210 @@
+# backend/core/services/hourly_analytics.py
+"""
+Hour-grained analytics: rollup into DailyAnalytics and hour-of-week analysis.
+
+HourlyAnalytics is the source of truth when a campaign reports hourly data.
+rollup() re-derives the matching DailyAnalytics rows with one grouped query
+and one upsert, so it can be re-run for any range. The heatmap is the cached
+(ISO weekday, hour of day) breakdown of the hourly rows; best_times() picks
+the strongest posting window of each weekday from it.
+"""
+import logging
+from datetime import datetime, time, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+from core.models import (
+    Campaign, CampaignAnalyticsSummary, DailyAnalytics, HourlyAnalytics, MICROS_PER_UNIT
+)
+from core.services.analytics_aggregation import AnalyticsAggregationService, WEEKDAYS
+from core.utils.timezone_utils import make_aware, today
+
+logger = logging.getLogger(__name__)
+
+HEATMAP_DAYS = 90
+BEST_TIME_WINDOW_HOURS = 3
+# Windows with fewer impressions are too noisy to recommend
+MIN_WINDOW_IMPRESSIONS = 100
+
+_CENTS = Decimal('0.01')
+
+DAILY_UPDATE_FIELDS = ['impressions', 'clicks', 'conversions', 'spend', 'ctr', 'cpc', 'cpa', 'updated_at']
+
+
+def engagement_level(ctr):
+    if ctr > 5:
+        return 'Very High'
+    if ctr > 3:
+        return 'High'
+    if ctr > 1:
+        return 'Medium'
+    return 'Low'
+
+
+def format_hour_range(start, end):
+    """'6-9 PM', '11 AM-2 PM' for hours of the day (end exclusive, may be 24)"""
+    def split(hour):
+        hour %= 24
+        return (hour % 12 or 12), ('AM' if hour < 12 else 'PM')
+
+    start_hour, start_suffix = split(start)
+    end_hour, end_suffix = split(end)
+    if start_suffix == end_suffix:
+        return f"{start_hour}-{end_hour} {end_suffix}"
+    return f"{start_hour} {start_suffix}-{end_hour} {end_suffix}"
+
+
+class HourlyAnalyticsService:
+    """Roll up and analyse hour-grained analytics"""
+
+    @staticmethod
+    def rollup(start_date=None, end_date=None, campaign_ids=None):
+        """
+        Upsert DailyAnalytics for every campaign-day with hourly rows
+
+        Returns:
+            int: number of daily rows written
+        """
+        # Bare range bounds on `hour` (no date cast) so the BRIN index applies
+        hourly = HourlyAnalytics.objects.all()
+        if start_date:
+            hourly = hourly.filter(hour__gte=make_aware(datetime.combine(start_date, time.min)))
+        if end_date:
+            hourly = hourly.filter(hour__lt=make_aware(datetime.combine(end_date + timedelta(days=1), time.min)))
+        if campaign_ids:
+            hourly = hourly.filter(campaign_id__in=campaign_ids)
+
+        totals = (
+            hourly
+            .annotate(day=TruncDate('hour'))
+            .values('campaign_id', 'day')
+            .annotate(
+                total_impressions=Sum('impressions'),
+                total_clicks=Sum('clicks'),
+                total_conversions=Sum('conversions'),
+                total_spend_micros=Sum('spend_micros'),
+            )
+            .order_by()
+        )
+
+        totals = list(totals)
+        owners = dict(
+            Campaign.objects.filter(id__in={row['campaign_id'] for row in totals}).values_list('id', 'user_id')
+        )
+        rows = []
+        for row in totals:
+            impressions = row['total_impressions'] or 0
+            clicks = row['total_clicks'] or 0
+            conversions = row['total_conversions'] or 0
+            spend = (Decimal(row['total_spend_micros'] or 0) / MICROS_PER_UNIT).quantize(_CENTS, ROUND_HALF_UP)
+
+            # Same derivations as DailyAnalytics.save(), which bulk_create skips
+            rows.append(DailyAnalytics(
+                campaign_id=row['campaign_id'],
+                user_id=owners[row['campaign_id']],
+                date=row['day'],
+                impressions=impressions,
+                clicks=clicks,
+                conversions=conversions,
+                spend=spend,
+                ctr=round(clicks / impressions * 100, 2) if impressions else 0,
+                cpc=round(float(spend) / clicks, 2) if clicks else 0,
+                cpa=round(float(spend) / conversions, 2) if conversions else 0,
+            ))
+
+        if not rows:
+            return 0
+
+        with transaction.atomic():
+            DailyAnalytics.objects.bulk_create(
+                rows,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['campaign', 'date'],
+                update_fields=DAILY_UPDATE_FIELDS,
+            )
+
+        # bulk_create does not send post_save, so refresh the summaries and
+        # cached breakdowns here
+        CampaignAnalyticsSummary.rebuild(owners)
+        AnalyticsAggregationService.invalidate(owners.values())
+
+        logger.info(f"✅ Rolled up {len(rows)} daily analytics rows for {len(owners)} campaigns")
+        return len(rows)
+
+    @staticmethod
+    def hour_of_week_heatmap(user, campaign_id=None, days=HEATMAP_DAYS):
+        """
+        Impressions, clicks and CTR per (weekday, hour) over the last `days`
+
+        Returns:
+            dict: 7x24 matrices indexed [weekday][hour], Monday first
+        """
+        cells = AnalyticsAggregationService.breakdown(
+            user,
+            ('weekday', 'hour'),
+            source='hourly',
+            campaign_id=campaign_id,
+            since=today() - timedelta(days=days),
+        )
+
+        impressions = np.zeros((7, 24))
+        clicks = np.zeros((7, 24))
+        for cell in cells:
+            impressions[cell['weekday'] - 1, cell['hour']] = cell['impressions']
+            clicks[cell['weekday'] - 1, cell['hour']] = cell['clicks']
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ctr = np.where(impressions > 0, clicks / impressions * 100, 0.0)
+
+        return {
+            'days': list(WEEKDAYS),
+            'hours': list(range(24)),
+            'period_days': days,
+            'impressions': impressions.astype(int).tolist(),
+            'clicks': clicks.astype(int).tolist(),
+            'ctr': np.round(ctr, 2).tolist(),
+            'total_impressions': int(impressions.sum()),
+        }
+
+    @staticmethod
+    def best_times(heatmap, top=4, window=BEST_TIME_WINDOW_HOURS, min_impressions=MIN_WINDOW_IMPRESSIONS):
+        """
+        Highest-CTR `window`-hour slot of each weekday, best days first
+
+        Returns:
+            list: [{'day', 'time', 'engagement', 'ctr'}]
+        """
+        impressions = np.asarray(heatmap['impressions'], dtype=np.float64)
+        clicks = np.asarray(heatmap['clicks'], dtype=np.float64)
+        kernel = np.ones(window)
+
+        results = []
+        for day_index, day in enumerate(WEEKDAYS):
+            window_impressions = np.convolve(impressions[day_index], kernel, mode='valid')
+            window_clicks = np.convolve(clicks[day_index], kernel, mode='valid')
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                window_ctr = np.where(
+                    window_impressions >= min_impressions,
+                    window_clicks / window_impressions * 100,
+                    -1.0
+                )
+            start = int(window_ctr.argmax())
+            if window_ctr[start] < 0:
+                continue
+
+            ctr = float(window_ctr[start])
+            results.append({
+                'day': day,
+                'time': format_hour_range(start, start + window),
+                'engagement': engagement_level(ctr),
+                'ctr': round(ctr, 2),
+            })
+
+        results.sort(key=lambda x: x['ctr'], reverse=True)
+        return results[:top]
@@ -0,0 +1,249 @@
+# backend/core/services/partitioning.py
+"""
+Monthly range partitioning of the analytics fact tables (PostgreSQL only).
+
+convert() turns an existing table into a partitioned one in place: same name,
+same columns, indexes and constraints, so the ORM is unaffected. The primary
+key becomes (id, <partition key>) because PostgreSQL requires the key in
+every unique constraint; Django still treats `id` as the primary key.
+
+Partitions are named <table>_pYYYY_MM. A <table>_default partition catches
+rows outside the created months so inserts never fail. ensure_future() keeps
+partitions created ahead of time, and expire() detaches months older than the
+retention window. Detached months are moved to ARCHIVE_SCHEMA, or dropped.
+Expiring rows does not touch CampaignAnalyticsSummary, but anything
+recomputed afterwards only sees the retained months.
+
+Every method returns the SQL statements it would run, so callers can print
+them (dry run) or pass them to execute().
+"""
+import logging
+import re
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+from django.db import connection, models, transaction
+
+from core.models import DailyAnalytics, HourlyAnalytics
+from core.utils.db import is_postgres
+
+logger = logging.getLogger(__name__)
+
+# Name -> (model, partition key column)
+PARTITIONED_TABLES = {
+    'daily': (DailyAnalytics, 'date'),
+    'hourly': (HourlyAnalytics, 'hour'),
+}
+
+ARCHIVE_SCHEMA = 'analytics_archive'
+
+_PARTITION_SUFFIX = re.compile(r'_p(\d{4})_(\d{2})$')
+
+
+def _quote(name):
+    return connection.ops.quote_name(name)
+
+
+def month_start(value):
+    """First day of the month of a date or datetime"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.replace(day=1)
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y_%m}'
+
+
+def _bound(model, column, month):
+    """SQL literal for the first instant of `month` in the key column's type"""
+    if isinstance(model._meta.get_field(column), models.DateTimeField):
+        return f"'{month:%Y-%m-%d} 00:00:00+00'"
+    return f"'{month:%Y-%m-%d}'"
+
+
+def _range_sql(model, column, month):
+    return (
+        f"FOR VALUES FROM ({_bound(model, column, month)}) "
+        f"TO ({_bound(model, column, month + relativedelta(months=1))})"
+    )
+
+
+class PartitionService:
+    """Create, extend and expire monthly partitions of the analytics tables"""
+
+    @staticmethod
+    def is_partitioned(model):
+        if not is_postgres(connection):
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)",
+                [model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        return bool(row) and row[0] == 'p'
+
+    @staticmethod
+    def partitions(model):
+        """Names of the table's current partitions"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname",
+                [model._meta.db_table]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def convert(model, column, today, months_ahead=3):
+        """
+        Statements that rebuild `model`'s table as a partitioned table with one
+        partition per month of existing data up to `months_ahead` from today.
+        Run them in one transaction; the table is locked while rows are copied.
+        """
+        table = model._meta.db_table
+        legacy = f'{table}_legacy'
+        pk = model._meta.pk.column
+
+        with connection.cursor() as cursor:
+            # Constraints other than the primary key, re-added once the copy is done
+            cursor.execute(
+                "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conrelid = to_regclass(%s) AND contype IN ('u', 'f')",
+                [table]
+            )
+            constraints = cursor.fetchall()
+            # Plain indexes, excluding those backing the key and constraints
+            cursor.execute(
+                "SELECT indexdef FROM pg_indexes i "
+                "WHERE i.tablename = %s AND NOT EXISTS ("
+                "  SELECT 1 FROM pg_constraint c "
+                "  WHERE c.conindid = to_regclass(quote_ident(i.schemaname) || '.' || quote_ident(i.indexname))"
+                ")",
+                [table]
+            )
+            indexes = [row[0] for row in cursor.fetchall()]
+            cursor.execute(f"SELECT MIN({_quote(column)}), MAX({_quote(column)}) FROM {_quote(table)}")
+            first, last = cursor.fetchone()
+
+        first_month = month_start(first or today)
+        last_month = max(month_start(today) + relativedelta(months=months_ahead), month_start(last or today))
+
+        statements = [
+            f"ALTER TABLE {_quote(table)} RENAME TO {_quote(legacy)}",
+            f"CREATE TABLE {_quote(table)} (LIKE {_quote(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+            f"INCLUDING IDENTITY INCLUDING STORAGE) PARTITION BY RANGE ({_quote(column)})",
+        ]
+        month = first_month
+        while month <= last_month:
+            statements.append(
+                f"CREATE TABLE {_quote(partition_name(table, month))} PARTITION OF {_quote(table)} "
+                f"{_range_sql(model, column, month)}"
+            )
+            month += relativedelta(months=1)
+        statements += [
+            f"CREATE TABLE {_quote(table + '_default')} PARTITION OF {_quote(table)} DEFAULT",
+            f"INSERT INTO {_quote(table)} SELECT * FROM {_quote(legacy)}",
+            f"DROP TABLE {_quote(legacy)}",
+            f"ALTER TABLE {_quote(table)} ADD PRIMARY KEY ({_quote(pk)}, {_quote(column)})",
+        ]
+        statements += [
+            f"ALTER TABLE {_quote(table)} ADD CONSTRAINT {_quote(name)} {definition}"
+            for name, definition in constraints
+        ]
+        statements += indexes
+        if isinstance(model._meta.pk, models.AutoField):
+            # INCLUDING IDENTITY starts a fresh sequence
+            statements.append(
+                f"SELECT setval(pg_get_serial_sequence('{table}', '{pk}'), "
+                f"COALESCE((SELECT MAX({_quote(pk)}) FROM {_quote(table)}), 1))"
+            )
+        return statements
+
+    @staticmethod
+    def ensure_future(model, column, today, months_ahead=3):
+        """Statements creating any missing partition from this month to `months_ahead`"""
+        table = model._meta.db_table
+        default = f'{table}_default'
+        existing = set(PartitionService.partitions(model))
+        statements = []
+
+        month = month_start(today)
+        for _ in range(months_ahead + 1):
+            name = partition_name(table, month)
+            if name not in existing:
+                lower = _bound(model, column, month)
+                upper = _bound(model, column, month + relativedelta(months=1))
+                if default in existing:
+                    # Rows of this month that already landed in the default
+                    # partition have to move, or the new bound would overlap
+                    where = f"{_quote(column)} >= {lower} AND {_quote(column)} < {upper}"
+                    statements += [
+                        f"CREATE TABLE {_quote(name)} (LIKE {_quote(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+                        f"INSERT INTO {_quote(name)} SELECT * FROM {_quote(default)} WHERE {where}",
+                        f"DELETE FROM {_quote(default)} WHERE {where}",
+                        f"ALTER TABLE {_quote(table)} ATTACH PARTITION {_quote(name)} "
+                        f"{_range_sql(model, column, month)}",
+                    ]
+                else:
+                    statements.append(
+                        f"CREATE TABLE {_quote(name)} PARTITION OF {_quote(table)} "
+                        f"{_range_sql(model, column, month)}"
+                    )
+            month += relativedelta(months=1)
+        return statements
+
+    @staticmethod
+    def expire(model, today, retention_months, drop=False):
+        """
+        Statements detaching every monthly partition that ends before the
+        retention window, then archiving or dropping it
+        """
+        table = model._meta.db_table
+        cutoff = month_start(today) - relativedelta(months=retention_months)
+        statements = []
+        for name in PartitionService.partitions(model):
+            match = _PARTITION_SUFFIX.search(name)
+            if not match:
+                continue
+            if (int(match.group(1)), int(match.group(2))) >= (cutoff.year, cutoff.month):
+                continue
+            statements.append(f"ALTER TABLE {_quote(table)} DETACH PARTITION {_quote(name)}")
+            if drop:
+                statements.append(f"DROP TABLE {_quote(name)}")
+            else:
+                statements.append(f"ALTER TABLE {_quote(name)} SET SCHEMA {_quote(ARCHIVE_SCHEMA)}")
+        if statements and not drop:
+            statements.insert(0, f"CREATE SCHEMA IF NOT EXISTS {_quote(ARCHIVE_SCHEMA)}")
+        return statements
+
+    @staticmethod
+    def execute(statements):
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+
+    @staticmethod
+    def maintain(today, months_ahead=3, retention=None, drop=False):
+        """
+        Create upcoming partitions and expire old ones for every partitioned
+        table. `retention` maps table names (see PARTITIONED_TABLES) to months.
+
+        Returns:
+            dict: statements run per table; empty when not on PostgreSQL
+        """
+        retention = retention or {}
+        results = {}
+        for name, (model, column) in PARTITIONED_TABLES.items():
+            if not PartitionService.is_partitioned(model):
+                continue
+            statements = PartitionService.ensure_future(model, column, today, months_ahead)
+            if retention.get(name):
+                statements += PartitionService.expire(model, today, retention[name], drop=drop)
+            PartitionService.execute(statements)
+            results[name] = statements
+            logger.info(f"✅ Partition maintenance for {model._meta.db_table}: {len(statements)} statements")
+        return results
@@ -5,6 +5,7 @@ from decimal import Decimal
 import numpy as np
 from sklearn.linear_model import LinearRegression
 from core.models import Campaign, DailyAnalytics, PredictiveModel, Prediction
+from core.services.budget_optimizer import BudgetOptimizer
 
 class PredictiveAnalyticsService:
     """Service for ML-based predictions"""
@@ -150,55 +151,6 @@ class PredictiveAnalyticsService:
         }
     
     @staticmethod
-    def recommend_budget_allocation(user):
+    def recommend_budget_allocation(user, total_budget=None):
         """Recommend budget allocation across campaigns"""
-        campaigns = Campaign.objects.filter(
-            user=user,
-            is_active=True
-        )
-        
-        recommendations = []
-        
-        for campaign in campaigns:
-            # Get performance data
-            summary = campaign.analytics_summary
-            
-            if not summary:
-                continue
-            
-            # Calculate ROI
-            if summary.total_spend > 0:
-                roi = (summary.total_conversions * 50) / float(summary.total_spend)
-            else:
-                roi = 0
-            
-            # Calculate efficiency score
-            efficiency = summary.performance_score
-            
-            # Recommend budget change
-            if roi > 3 and efficiency > 70:
-                recommendation = 'increase'
-                suggested_change = '+20%'
-            elif roi < 1.5 or efficiency < 40:
-                recommendation = 'decrease'
-                suggested_change = '-20%'
-            else:
-                recommendation = 'maintain'
-                suggested_change = '0%'
-            
-            recommendations.append({
-                'campaign_id': str(campaign.id),
-                'campaign_name': campaign.title,
-                'current_budget': float(campaign.budget or 0),
-                'recommendation': recommendation,
-                'suggested_change': suggested_change,
-                'roi': round(roi, 2),
-                'efficiency_score': efficiency,
-                'reason': f'ROI: {roi:.2f}x, Performance: {efficiency}/100'
-            })
-        
-        return {
-            'success': True,
-            'recommendations': recommendations,
-            'total_campaigns': len(recommendations)
-        }
\ No newline at end of file
+        return BudgetOptimizer.recommend(user, total_budget=total_budget)
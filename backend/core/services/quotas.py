@@ -0,0 +1,155 @@
+# backend/core/services/quotas.py
+"""
+Per-user quotas for expensive endpoints: a rate limit and a cap on requests
+in flight, per endpoint class (scope). Scopes are configured in API_QUOTAS.
+
+The rate limit is a token bucket of `burst` requests refilled at `rate` per
+`period` seconds, implemented as GCRA: the bucket is a single number, the
+theoretical arrival time (TAT) of the next request, so a check is one read
+and one write. A request at `now` is allowed if TAT + interval - burst x
+interval <= now, and then moves TAT one interval forward. Otherwise the
+difference is how long the client has to wait.
+
+Both checks, and the in-flight increment, happen atomically:
+- on the Redis cache backend, in one Lua script (one round trip, on the
+  Redis server's clock, so every worker and instance shares the limits);
+- on any other backend, under a process lock. That is exact for the default
+  per-process memory cache. On other shared caches the limits are per
+  process, best effort.
+
+In-flight counters expire QUOTA_INFLIGHT_TTL seconds after the last acquire,
+so slots held by a worker that died mid-request free themselves.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.utils.cache import redis_client
+
+# Retry-After for a request refused because too many are in flight; when one
+# finishes can't be known
+CONCURRENCY_RETRY_SECONDS = 1
+
+RATE_LIMITED = 'rate'
+TOO_MANY_IN_FLIGHT = 'concurrency'
+
+# KEYS: TAT, in-flight counter. ARGV: interval, tolerance (burst x interval),
+# in-flight limit (0 = none), in-flight TTL. Returns {allowed, wait, reason}
+# with wait as a string, since Lua numbers come back as integers
+_ACQUIRE_LUA = """
+local limit = tonumber(ARGV[3])
+if limit > 0 then
+    local in_flight = tonumber(redis.call('GET', KEYS[2]) or '0')
+    if in_flight >= limit then
+        return {0, '0', 'concurrency'}
+    end
+end
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or '0'), now)
+local allow_at = tat + interval - tonumber(ARGV[2])
+if now < allow_at then
+    return {0, tostring(allow_at - now), 'rate'}
+end
+local ttl_ms = string.format('%d', math.max(math.ceil((tat + interval - now) * 1000), 1))
+redis.call('SET', KEYS[1], tostring(tat + interval), 'PX', ttl_ms)
+if limit > 0 then
+    redis.call('INCR', KEYS[2])
+    redis.call('EXPIRE', KEYS[2], ARGV[4])
+end
+return {1, '0', ''}
+"""
+
+_RELEASE_LUA = """
+if redis.call('DECR', KEYS[1]) <= 0 then
+    redis.call('DEL', KEYS[1])
+end
+"""
+
+_lock = threading.Lock()
+_scripts = {}
+
+
+def _script(client, source):
+    if source not in _scripts:
+        _scripts[source] = client.register_script(source)
+    return _scripts[source]
+
+
+class QuotaService:
+    """Acquire and release per-user quota for a scope in API_QUOTAS"""
+
+    @staticmethod
+    def _keys(scope, ident):
+        return f'quota:{scope}:{ident}:tat', f'quota:{scope}:{ident}:in_flight'
+
+    @staticmethod
+    def _limits(scope):
+        quota = settings.API_QUOTAS[scope]
+        interval = quota['period'] / quota['rate']
+        return interval, interval * quota.get('burst', 1), quota.get('concurrency', 0)
+
+    @staticmethod
+    def acquire(scope, ident):
+        """
+        Take one request's worth of quota
+
+        Args:
+            scope: key of API_QUOTAS
+            ident: who the quota belongs to (a user id, or an address)
+
+        Returns:
+            tuple: (allowed, seconds to wait before retrying, reason refused:
+            RATE_LIMITED, TOO_MANY_IN_FLIGHT or None). An allowed request
+            holds an in-flight slot (if the scope caps them) until release()
+        """
+        interval, tolerance, limit = QuotaService._limits(scope)
+        tat_key, in_flight_key = QuotaService._keys(scope, ident)
+
+        client = redis_client()
+        if client is not None:
+            allowed, wait, reason = _script(client, _ACQUIRE_LUA)(
+                keys=[cache.make_and_validate_key(tat_key), cache.make_and_validate_key(in_flight_key)],
+                args=[interval, tolerance, limit, settings.QUOTA_INFLIGHT_TTL],
+                client=client,
+            )
+            reason = reason.decode() if isinstance(reason, bytes) else reason
+            if reason == TOO_MANY_IN_FLIGHT:
+                return False, CONCURRENCY_RETRY_SECONDS, reason
+            return bool(allowed), float(wait), reason or None
+
+        with _lock:
+            in_flight = cache.get(in_flight_key, 0) if limit else 0
+            if limit and in_flight >= limit:
+                return False, CONCURRENCY_RETRY_SECONDS, TOO_MANY_IN_FLIGHT
+            now = time.time()
+            tat = max(cache.get(tat_key, now), now)
+            allow_at = tat + interval - tolerance
+            if now < allow_at:
+                return False, allow_at - now, RATE_LIMITED
+            cache.set(tat_key, tat + interval, tat + interval - now)
+            if limit:
+                cache.set(in_flight_key, in_flight + 1, settings.QUOTA_INFLIGHT_TTL)
+        return True, 0.0, None
+
+    @staticmethod
+    def release(scope, ident):
+        """Free the in-flight slot taken by a successful acquire()"""
+        if not QuotaService._limits(scope)[2]:
+            return
+        in_flight_key = QuotaService._keys(scope, ident)[1]
+
+        client = redis_client()
+        if client is not None:
+            _script(client, _RELEASE_LUA)(keys=[cache.make_and_validate_key(in_flight_key)], client=client)
+            return
+
+        with _lock:
+            in_flight = cache.get(in_flight_key, 0)
+            if in_flight > 1:
+                cache.set(in_flight_key, in_flight - 1, settings.QUOTA_INFLIGHT_TTL)
+            else:
+                cache.delete(in_flight_key)
@@ -0,0 +1,351 @@
+# backend/core/services/recommendations.py
+"""
+Rule-based recommendations for the weekly report.
+
+Rules are data: a `when` predicate over the weekly snapshot (see
+ReportDataService.weekly_snapshot) plus str.format templates rendered with the
+same snapshot. RecommendationService evaluates them once per data change and
+stores the result in UserRecommendation, which the report endpoints read.
+Bump RULES_VERSION whenever the tables change so stored results are redone.
+"""
+import logging
+import time
+
+from django.db.models import Q
+
+from core.models import User, UserRecommendation
+from core.services.report_data import ReportDataService
+from core.utils.timezone_utils import today as local_today
+
+logger = logging.getLogger(__name__)
+
+RULES_VERSION = 1
+
+MAX_RECOMMENDATIONS = 6
+MAX_NEXT_STEPS = 5
+AD_VARIATIONS_TARGET = 10
+
+PRIORITY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+
+RECOMMENDATION_FIELDS = ('category', 'priority', 'title', 'description', 'action', 'impact', 'metric', 'current', 'target')
+
+# Values templates need that are not stored in the snapshot
+DERIVED_VALUES = {
+    'ads_to_target': lambda m: AD_VARIATIONS_TARGET - m['ads_generated'],
+}
+
+WEEKLY_RULES = (
+    {
+        'id': 'low_ctr',
+        'when': lambda m: m['avg_ctr'] < 2,
+        'category': 'Performance',
+        'priority': 'high',
+        'title': 'Improve Click-Through Rate',
+        'description': 'Your weekly CTR is {avg_ctr}%, which is below the 3-5% industry benchmark. Test new headlines and visuals.',
+        'action': 'A/B Test Creatives',
+        'impact': '+50-100% potential CTR increase',
+        'metric': 'CTR',
+        'current': '{avg_ctr}%',
+        'target': '3-5%',
+    },
+    {
+        'id': 'excellent_ctr',
+        'when': lambda m: m['avg_ctr'] >= 5,
+        'category': 'Performance',
+        'priority': 'high',
+        'title': 'Excellent Performance - Scale Up',
+        'description': 'Your {avg_ctr}% CTR is outstanding! Scale your best campaigns to maximize results.',
+        'action': 'Increase Budget',
+        'impact': '+100-200% potential reach',
+        'metric': 'CTR',
+        'current': '{avg_ctr}%',
+        'target': 'Maintain',
+    },
+    {
+        'id': 'conversion_funnel',
+        'when': lambda m: m['conversion_rate'] < 5 and m['avg_ctr'] > 2,
+        'category': 'Optimization',
+        'priority': 'high',
+        'title': 'Optimize Conversion Funnel',
+        'description': 'You have good traffic ({avg_ctr}% CTR) but low conversions ({conversion_rate}%). Review landing pages.',
+        'action': 'Optimize Landing Page',
+        'impact': '+30-60% conversion increase',
+        'metric': 'Conversion Rate',
+        'current': '{conversion_rate}%',
+        'target': '5-10%',
+    },
+    {
+        'id': 'declining_engagement',
+        'when': lambda m: m['click_growth'] < -10,
+        'category': 'Engagement',
+        'priority': 'high',
+        'title': 'Reverse Declining Engagement',
+        'description': 'Engagement dropped {click_growth}% this week. Refresh ad creatives and review audience targeting.',
+        'action': 'Refresh Campaign',
+        'impact': 'Reverse negative trend',
+        'metric': 'Weekly Growth',
+        'current': '{click_growth}%',
+        'target': '+10%',
+    },
+    {
+        'id': 'growth_momentum',
+        'when': lambda m: m['click_growth'] > 20,
+        'category': 'Growth',
+        'priority': 'medium',
+        'title': 'Capitalize on Momentum',
+        'description': 'Strong {click_growth}% growth! Now is the time to increase investment and expand reach.',
+        'action': 'Scale Investment',
+        'impact': 'Maximize growth period',
+        'metric': 'Weekly Growth',
+        'current': '{click_growth}%',
+        'target': 'Sustain',
+    },
+    {
+        'id': 'best_day',
+        'when': lambda m: m['best_day_ctr'] > 0 and m['avg_ctr'] > 0 and m['best_day_ctr'] >= m['avg_ctr'] * 1.25,
+        'category': 'Timing',
+        'priority': 'medium',
+        'title': 'Schedule Around {best_day}',
+        'description': '{best_day} averages {best_day_ctr}% CTR versus {avg_ctr}% overall. Weight launches and budget toward it.',
+        'action': 'Adjust Ad Schedule',
+        'impact': 'Higher CTR per impression',
+        'metric': 'Best Day CTR',
+        'current': '{best_day_ctr}%',
+        'target': 'Shift budget to best day',
+    },
+    {
+        'id': 'ad_variations',
+        'when': lambda m: m['ads_generated'] < 5,
+        'category': 'Content',
+        'priority': 'medium',
+        'title': 'Increase Ad Variations',
+        'description': 'Only {ads_generated} ads created this week. More variations improve testing effectiveness.',
+        'action': 'Generate 5+ Variations',
+        'impact': '+25% optimization potential',
+        'metric': 'Content Volume',
+        'current': '{ads_generated} ads',
+        'target': '10+ ads/week',
+    },
+    {
+        'id': 'low_roas',
+        'when': lambda m: m['total_spend'] > 0 and m['roas'] < 2,
+        'category': 'Budget',
+        'priority': 'high',
+        'title': 'Improve Return on Ad Spend',
+        'description': 'Current ROAS is {roas}x. Review targeting and pause low-performing campaigns.',
+        'action': 'Optimize Budget Allocation',
+        'impact': '+50-100% ROAS improvement',
+        'metric': 'ROAS',
+        'current': '{roas}x',
+        'target': '3-5x',
+    },
+    {
+        'id': 'no_active_campaigns',
+        'when': lambda m: m['active_campaigns'] == 0,
+        'category': 'Campaigns',
+        'priority': 'high',
+        'title': 'Launch Active Campaigns',
+        'description': 'No active campaigns running. Create and launch campaigns to start generating results.',
+        'action': 'Create Campaign',
+        'impact': 'Begin generating ROI',
+        'metric': 'Active Campaigns',
+        'current': '0',
+        'target': '3-5',
+    },
+    {
+        'id': 'scale_top_campaign',
+        'when': lambda m: m['top_campaign'] and m['top_campaign']['score'] > 70,
+        'category': 'Scaling',
+        'priority': 'medium',
+        'title': 'Scale Top Performer: {top_campaign[title]}',
+        'description': 'This campaign has {top_campaign[score]}/100 score. Allocate more budget.',
+        'action': 'Increase Budget by 25%',
+        'impact': '+30-50% additional reach',
+        'metric': 'Performance Score',
+        'current': '{top_campaign[score]}/100',
+        'target': 'Maximize',
+    },
+)
+
+NEXT_STEP_RULES = (
+    {
+        'id': 'review_top_campaign',
+        'when': lambda m: m['top_campaign'],
+        'text': 'Review and scale best performer: {top_campaign[title]}',
+    },
+    {
+        'id': 'fix_worst_campaign',
+        'when': lambda m: m['worst_campaign'] and m['worst_campaign']['score'] < 50,
+        'text': 'Improve or pause low performer: {worst_campaign[title]} ({worst_campaign[score]}/100)',
+    },
+    {
+        'id': 'test_creatives',
+        'when': lambda m: m['avg_ctr'] < 3,
+        'text': 'Run A/B tests on headlines and visuals to improve {avg_ctr}% CTR',
+    },
+    {
+        'id': 'more_variations',
+        'when': lambda m: m['ads_generated'] < AD_VARIATIONS_TARGET,
+        'text': 'Generate {ads_to_target} more ad variations for testing',
+    },
+    {
+        'id': 'launch_campaigns',
+        'when': lambda m: m['active_campaigns'] < 3,
+        'text': 'Launch 2-3 new campaigns targeting different audiences',
+    },
+    {
+        'id': 'check_posting_times',
+        'when': lambda m: True,
+        'text': 'Check audience insights for optimal posting times',
+    },
+    {
+        'id': 'review_budget',
+        'when': lambda m: True,
+        'text': 'Review budget allocation across all campaigns',
+    },
+)
+
+RULE_COUNT = len(WEEKLY_RULES) + len(NEXT_STEP_RULES)
+
+_STORED_FIELDS = ['metrics', 'recommendations', 'next_steps', 'period_end', 'rules_version', 'is_stale', 'computed_at']
+
+
+class RecommendationService:
+    """Evaluate, store and serve weekly report recommendations"""
+
+    @staticmethod
+    def evaluate(snapshot):
+        """
+        Run every rule against a weekly snapshot
+
+        Returns:
+            tuple: (recommendations, next_steps), highest priority first
+        """
+        context = dict(snapshot)
+        context.update({name: derive(snapshot) for name, derive in DERIVED_VALUES.items()})
+
+        recommendations = [
+            {field: rule[field].format_map(context) for field in RECOMMENDATION_FIELDS}
+            for rule in WEEKLY_RULES
+            if rule['when'](snapshot)
+        ]
+        recommendations.sort(key=lambda x: PRIORITY_ORDER.get(x['priority'], 3))
+
+        next_steps = [
+            rule['text'].format_map(context)
+            for rule in NEXT_STEP_RULES
+            if rule['when'](snapshot)
+        ]
+
+        return recommendations[:MAX_RECOMMENDATIONS], next_steps[:MAX_NEXT_STEPS]
+
+    @staticmethod
+    def is_fresh(stored, today):
+        return (
+            not stored.is_stale
+            and stored.period_end == today
+            and stored.rules_version == RULES_VERSION
+        )
+
+    @staticmethod
+    def compute(user, today):
+        """Unsaved UserRecommendation with freshly evaluated rules"""
+        snapshot = ReportDataService.weekly_snapshot(ReportDataService.weekly_metrics(user, today))
+        return RecommendationService.from_snapshot(user, snapshot, today)
+
+    @staticmethod
+    def from_snapshot(user, snapshot, today):
+        recommendations, next_steps = RecommendationService.evaluate(snapshot)
+        return UserRecommendation(
+            user=user,
+            metrics=snapshot,
+            recommendations=recommendations,
+            next_steps=next_steps,
+            period_end=today,
+            rules_version=RULES_VERSION,
+            is_stale=False,
+        )
+
+    @staticmethod
+    def refresh(user, today=None):
+        today = today or local_today()
+        recommendation = RecommendationService.compute(user, today)
+        UserRecommendation.objects.bulk_create(
+            [recommendation],
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=_STORED_FIELDS,
+        )
+        return recommendation
+
+    @staticmethod
+    def get(user, today=None):
+        """The user's stored recommendations, re-evaluated only if stale"""
+        today = today or local_today()
+        stored = UserRecommendation.objects.filter(user=user).first()
+        if stored and RecommendationService.is_fresh(stored, today):
+            return stored
+        return RecommendationService.refresh(user, today)
+
+    @staticmethod
+    def refresh_all(today=None, batch_size=200, force=False):
+        """
+        Re-evaluate every active user whose stored recommendations are
+        missing, stale, from an earlier day or from older rules
+
+        Returns:
+            dict: counts and throughput of the run
+        """
+        today = today or local_today()
+        users = User.objects.filter(is_active=True).order_by('pk')
+        if not force:
+            users = users.filter(
+                Q(weekly_recommendations__isnull=True)
+                | Q(weekly_recommendations__is_stale=True)
+                | ~Q(weekly_recommendations__period_end=today)
+                | ~Q(weekly_recommendations__rules_version=RULES_VERSION)
+            )
+
+        started = time.perf_counter()
+        evaluate_seconds = 0.0
+        refreshed = 0
+        failed = 0
+        batch = []
+
+        def flush():
+            UserRecommendation.objects.bulk_create(
+                batch,
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=_STORED_FIELDS,
+            )
+            batch.clear()
+
+        for user in users.iterator(chunk_size=batch_size):
+            try:
+                snapshot = ReportDataService.weekly_snapshot(ReportDataService.weekly_metrics(user, today))
+                evaluate_start = time.perf_counter()
+                batch.append(RecommendationService.from_snapshot(user, snapshot, today))
+                evaluate_seconds += time.perf_counter() - evaluate_start
+            except Exception as e:
+                failed += 1
+                logger.error(f"❌ Failed to evaluate recommendations for {user.email}: {e}")
+                continue
+
+            refreshed += 1
+            if len(batch) >= batch_size:
+                flush()
+
+        if batch:
+            flush()
+
+        elapsed = time.perf_counter() - started
+        rules_evaluated = refreshed * RULE_COUNT
+        return {
+            'users': refreshed,
+            'failed': failed,
+            'rules_evaluated': rules_evaluated,
+            'seconds': round(elapsed, 3),
+            'users_per_second': round(refreshed / elapsed, 1) if elapsed > 0 else 0,
+            'rules_per_second': round(rules_evaluated / evaluate_seconds) if evaluate_seconds > 0 else 0,
+        }
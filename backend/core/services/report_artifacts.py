@@ -0,0 +1,191 @@
+# backend/core/services/report_artifacts.py
+"""
+Cache of rendered reports.
+
+A report is identified by its type, its owner (campaign or user), a hash of
+the exact data it shows and the layout TEMPLATE_VERSION. If all four match, the
+stored artifact is served instead of rendering and uploading a new PDF. A new
+artifact supersedes the older ones of the same owner, whose Cloudinary objects
+are deleted right away; prune() evicts artifacts that have not been served
+recently (TTL) or exceed a total budget (LRU).
+"""
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from core.models import ReportArtifact
+from core.utils.cloudinary_storage import CloudinaryStorage
+from core.utils.report_generator import ReportGenerator, TEMPLATE_VERSION
+from core.utils.timezone_utils import now
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_TTL_DAYS = 30
+
+# Weekly PDFs are streamed, not uploaded, so their bytes live in the cache
+WEEKLY_PDF_CACHE_TIMEOUT = 60 * 60
+
+
+class ReportArtifactService:
+    """Serve unchanged reports from previously rendered artifacts"""
+
+    @staticmethod
+    def fingerprint(payload):
+        """Stable hash of the data a report shows"""
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    @staticmethod
+    def campaign_payload(campaign, analytics_data):
+        return {
+            'campaign': {
+                'title': campaign.title,
+                'platform': campaign.platform,
+                'start_date': campaign.start_date,
+                'end_date': campaign.end_date,
+                'budget': campaign.budget,
+            },
+            'analytics': analytics_data,
+        }
+
+    @staticmethod
+    def campaign_report(campaign, analytics_data):
+        """
+        Campaign report URL, rendering and uploading only if the data or the
+        template changed since the last one
+
+        Returns:
+            dict: success, url, public_id and whether it came from the cache
+        """
+        fingerprint = ReportArtifactService.fingerprint(
+            ReportArtifactService.campaign_payload(campaign, analytics_data)
+        )
+        lookup = {
+            'report_type': 'campaign',
+            'user_id': campaign.user_id,
+            'campaign': campaign,
+            'fingerprint': fingerprint,
+            'template_version': TEMPLATE_VERSION,
+        }
+
+        artifact = ReportArtifact.objects.filter(**lookup).first()
+        if artifact is not None:
+            ReportArtifactService.touch(artifact)
+            return {
+                'success': True,
+                'url': artifact.url,
+                'public_id': artifact.public_id,
+                'cached': True,
+            }
+
+        result = ReportGenerator.generate_campaign_report(campaign, analytics_data)
+        if not result.get('success'):
+            return result
+
+        try:
+            with transaction.atomic():
+                artifact = ReportArtifact.objects.create(
+                    url=result['url'],
+                    public_id=result['public_id'] or '',
+                    **lookup
+                )
+        except IntegrityError:
+            # A concurrent request stored the same report first; keep theirs
+            CloudinaryStorage.delete_file(result['public_id'], resource_type='raw')
+            artifact = ReportArtifact.objects.get(**lookup)
+            return {
+                'success': True,
+                'url': artifact.url,
+                'public_id': artifact.public_id,
+                'cached': True,
+            }
+
+        superseded = ReportArtifact.objects.filter(
+            report_type='campaign',
+            campaign=campaign
+        ).exclude(pk=artifact.pk)
+        ReportArtifactService.delete_artifacts(superseded)
+
+        result['cached'] = False
+        return result
+
+    @staticmethod
+    def touch(artifact):
+        """Record a cache hit for LRU eviction"""
+        ReportArtifact.objects.filter(pk=artifact.pk).update(
+            hit_count=F('hit_count') + 1,
+            last_accessed_at=now()
+        )
+
+    @staticmethod
+    def weekly_pdf_cache_key(user, report):
+        fingerprint = ReportArtifactService.fingerprint({'email': user.email, 'report': report})
+        return f'report_artifact:weekly:v{TEMPLATE_VERSION}:{user.pk}:{fingerprint}'
+
+    @staticmethod
+    def get_weekly_pdf(user, report):
+        """Cached weekly PDF bytes, or None"""
+        return cache.get(ReportArtifactService.weekly_pdf_cache_key(user, report))
+
+    @staticmethod
+    def store_weekly_pdf(user, report, pdf_bytes):
+        cache.set(
+            ReportArtifactService.weekly_pdf_cache_key(user, report),
+            pdf_bytes,
+            WEEKLY_PDF_CACHE_TIMEOUT
+        )
+
+    @staticmethod
+    def delete_artifacts(queryset):
+        """
+        Delete artifacts and their Cloudinary objects. Rows whose object could
+        not be deleted are kept so a later prune retries them.
+
+        Returns:
+            int: number of artifacts deleted
+        """
+        deletable = []
+        for artifact in queryset.only('id', 'public_id'):
+            if artifact.public_id:
+                result = CloudinaryStorage.delete_file(artifact.public_id, resource_type='raw')
+                gone = result.get('success') or (result.get('result') or {}).get('result') == 'not found'
+                if not gone:
+                    logger.warning(f"⚠️ Could not delete report object {artifact.public_id}, will retry")
+                    continue
+            deletable.append(artifact.pk)
+
+        if deletable:
+            ReportArtifact.objects.filter(pk__in=deletable).delete()
+        return len(deletable)
+
+    @staticmethod
+    def prune(ttl_days=ARTIFACT_TTL_DAYS, max_artifacts=None):
+        """
+        Evict artifacts not served within ttl_days, then the least recently
+        served ones beyond max_artifacts
+
+        Returns:
+            dict: number of artifacts evicted by each rule
+        """
+        expired = ReportArtifactService.delete_artifacts(
+            ReportArtifact.objects.filter(last_accessed_at__lt=now() - timedelta(days=ttl_days))
+        )
+
+        evicted = 0
+        if max_artifacts is not None:
+            keep = ReportArtifact.objects.order_by('-last_accessed_at').values_list('pk', flat=True)[:max_artifacts]
+            evicted = ReportArtifactService.delete_artifacts(
+                ReportArtifact.objects.exclude(pk__in=list(keep))
+            )
+
+        # Superseded layouts can never be served again
+        outdated = ReportArtifactService.delete_artifacts(
+            ReportArtifact.objects.exclude(template_version=TEMPLATE_VERSION)
+        )
+
+        return {'expired': expired, 'evicted': evicted, 'outdated': outdated}
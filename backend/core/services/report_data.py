@@ -0,0 +1,290 @@
+# backend/core/services/report_data.py
+"""
+Data gathering for reports.
+
+Everything here returns plain dicts so the same numbers feed the weekly report
+API, the PDF renderer and scheduled reports; layout lives in
+core.utils.report_generator.
+"""
+from datetime import date, timedelta
+
+from django.db.models import Count, Q, Sum
+
+from core.models import Campaign, AdContent, ImageAsset, DailyAnalytics, CampaignAnalyticsSummary
+from core.services.analytics_aggregation import AnalyticsAggregationService
+from core.utils.timezone_utils import start_of_day, today as local_today
+
+# Same revenue assumption as CampaignAnalyticsSummary.update_metrics
+REVENUE_PER_CONVERSION = 50
+
+# Weekday performance is judged over this many days
+BEST_DAY_LOOKBACK_DAYS = 56
+
+
+class ReportDataService:
+    """Collect the figures shown in campaign and weekly reports"""
+    
+    @staticmethod
+    def campaign_analytics(campaigns):
+        """
+        Analytics of many campaigns with a single summary query
+        
+        Args:
+            campaigns: Iterable of Campaign objects
+            
+        Returns:
+            dict: campaign id -> analytics dict used by the campaign report
+        """
+        campaigns = list(campaigns)
+        summaries = {
+            s.campaign_id: s
+            for s in CampaignAnalyticsSummary.objects.filter(campaign__in=campaigns)
+        }
+        
+        result = {}
+        for campaign in campaigns:
+            summary = summaries.get(campaign.id)
+            if summary is None:
+                # get_or_create checks the primary, which a lagging replica
+                # read above may not have
+                summary, _ = CampaignAnalyticsSummary.objects.get_or_create(campaign=campaign)
+                summary.update_metrics()
+            result[campaign.id] = ReportDataService.summary_to_dict(summary)
+        return result
+    
+    @staticmethod
+    def summary_to_dict(summary):
+        return {
+            'total_impressions': int(summary.total_impressions),
+            'total_clicks': summary.total_clicks,
+            'total_conversions': summary.total_conversions,
+            'total_spend': float(summary.total_spend),
+            'avg_ctr': float(summary.avg_ctr),
+            'avg_cpc': float(summary.avg_cpc),
+            'roas': float(summary.roas),
+            'performance_score': summary.performance_score,
+        }
+    
+    @staticmethod
+    def ensure_summaries(user):
+        """Create missing summaries and refresh those that were never scored"""
+        missing = Campaign.objects.filter(user=user, analytics_summary__isnull=True)
+        for campaign in missing:
+            summary, _ = CampaignAnalyticsSummary.objects.get_or_create(campaign=campaign)
+            summary.update_metrics()
+        
+        unscored = CampaignAnalyticsSummary.objects.filter(
+            campaign__user=user,
+            performance_score=0
+        ).select_related('campaign')
+        for summary in unscored:
+            summary.update_metrics()
+    
+    @staticmethod
+    def weekly_metrics(user, today=None):
+        """
+        Raw weekly figures for a user: this week and the week before, resource
+        counts, best/worst campaigns and CTR per weekday. Eight queries
+        regardless of how many campaigns the user has (plus summary refreshes
+        for unscored campaigns); the weekday breakdown is usually cached.
+        """
+        today = today or local_today()
+        week_ago = today - timedelta(days=7)
+        # Bare datetime bound instead of created_at__date so indexes on created_at apply
+        week_start = start_of_day(week_ago)
+        two_weeks_ago = week_ago - timedelta(days=7)
+        
+        campaign_counts = Campaign.objects.filter(user=user).aggregate(
+            campaigns_created=Count('id', filter=Q(created_at__gte=week_start)),
+            active_campaigns=Count('id', filter=Q(is_active=True, end_date__gte=today)),
+        )
+        
+        ads_generated = AdContent.objects.filter(
+            user=user,
+            created_at__gte=week_start
+        ).count()
+        
+        images_generated = ImageAsset.objects.filter(
+            user=user,
+            created_at__gte=week_start
+        ).count()
+        
+        # Both weeks in one pass over DailyAnalytics
+        this_week = Q(date__gte=week_ago)
+        last_week = Q(date__lt=week_ago)
+        analytics = DailyAnalytics.objects.filter(
+            user=user,
+            date__gte=two_weeks_ago,
+            date__lte=today
+        ).aggregate(
+            total_impressions=Sum('impressions', filter=this_week),
+            total_clicks=Sum('clicks', filter=this_week),
+            total_conversions=Sum('conversions', filter=this_week),
+            total_spend=Sum('spend', filter=this_week),
+            prev_impressions=Sum('impressions', filter=last_week),
+            prev_clicks=Sum('clicks', filter=last_week),
+            prev_conversions=Sum('conversions', filter=last_week),
+        )
+        
+        ReportDataService.ensure_summaries(user)
+        
+        ranked = Campaign.objects.filter(
+            user=user,
+            analytics_summary__isnull=False
+        ).select_related('analytics_summary')
+        top_campaign = ranked.order_by('-analytics_summary__performance_score').first()
+        worst_campaign = ranked.order_by('analytics_summary__performance_score').first()
+        
+        weekday_performance = AnalyticsAggregationService.weekday_performance(
+            user,
+            since=today - timedelta(days=BEST_DAY_LOOKBACK_DAYS)
+        )
+        
+        return {
+            'today': today,
+            'week_ago': week_ago,
+            'campaigns_created': campaign_counts['campaigns_created'],
+            'active_campaigns': campaign_counts['active_campaigns'],
+            'ads_generated': ads_generated,
+            'images_generated': images_generated,
+            'total_impressions': analytics['total_impressions'] or 0,
+            'total_clicks': analytics['total_clicks'] or 0,
+            'total_conversions': analytics['total_conversions'] or 0,
+            'total_spend': float(analytics['total_spend'] or 0),
+            'prev_impressions': analytics['prev_impressions'] or 0,
+            'prev_clicks': analytics['prev_clicks'] or 0,
+            'prev_conversions': analytics['prev_conversions'] or 0,
+            'top_campaign': top_campaign,
+            'worst_campaign': worst_campaign,
+            'weekday_performance': weekday_performance,
+        }
+    
+    @staticmethod
+    def campaign_snapshot(campaign):
+        if not campaign:
+            return None
+        summary = getattr(campaign, 'analytics_summary', None)
+        return {
+            'id': str(campaign.id),
+            'title': campaign.title,
+            'platform': campaign.platform,
+            'score': summary.performance_score if summary else 0,
+        }
+    
+    @staticmethod
+    def weekly_snapshot(m):
+        """
+        Flat, JSON-serializable figures derived from weekly_metrics(). The
+        recommendation rules are evaluated against this dict and it is what
+        UserRecommendation stores.
+        """
+        total_impressions = m['total_impressions']
+        total_clicks = m['total_clicks']
+        total_conversions = m['total_conversions']
+        total_spend = m['total_spend']
+        
+        prev_impressions = m['prev_impressions'] or 1
+        prev_clicks = m['prev_clicks'] or 1
+        prev_conversions = m['prev_conversions'] or 1
+        
+        best_day = (m.get('weekday_performance') or [None])[0]
+        
+        return {
+            'period_start': m['week_ago'].isoformat(),
+            'period_end': m['today'].isoformat(),
+            'campaigns_created': m['campaigns_created'],
+            'ads_generated': m['ads_generated'],
+            'images_generated': m['images_generated'],
+            'active_campaigns': m['active_campaigns'],
+            'total_impressions': total_impressions,
+            'total_clicks': total_clicks,
+            'total_conversions': total_conversions,
+            'total_spend': round(total_spend, 2),
+            'prev_clicks': m['prev_clicks'],
+            
+            # Growth against the previous week
+            'impression_growth': round(((total_impressions - prev_impressions) / prev_impressions) * 100, 1),
+            'click_growth': round(((total_clicks - prev_clicks) / prev_clicks) * 100, 1),
+            'conversion_growth': round(((total_conversions - prev_conversions) / prev_conversions) * 100, 1),
+            
+            'avg_ctr': round((total_clicks / total_impressions * 100), 2) if total_impressions > 0 else 0,
+            'conversion_rate': round((total_conversions / total_clicks * 100), 2) if total_clicks > 0 else 0,
+            'roas': round((total_conversions * REVENUE_PER_CONVERSION / total_spend), 2) if total_spend > 0 else 0,
+            
+            'top_campaign': ReportDataService.campaign_snapshot(m['top_campaign']),
+            'worst_campaign': ReportDataService.campaign_snapshot(m['worst_campaign']),
+            'best_day': best_day['day'] if best_day else 'N/A',
+            'best_day_ctr': best_day['ctr'] if best_day else 0,
+        }
+    
+    @staticmethod
+    def build_weekly_report(snapshot, recommendations, next_steps):
+        """Weekly report payload from a snapshot and the rules it triggered"""
+        s = snapshot
+        top_campaign = s['top_campaign']
+        period_start = date.fromisoformat(s['period_start'])
+        period_end = date.fromisoformat(s['period_end'])
+        
+        def signed(value):
+            return f"{'+' if value > 0 else ''}{value}%"
+        
+        insights = {
+            'top_performing_platform': top_campaign['platform'].title() if top_campaign else 'N/A',
+            'top_campaign_name': top_campaign['title'] if top_campaign else 'N/A',
+            'top_campaign_score': top_campaign['score'] if top_campaign else 0,
+            'total_impressions': s['total_impressions'],
+            'total_clicks': s['total_clicks'],
+            'total_conversions': s['total_conversions'],
+            'total_spend': s['total_spend'],
+            'avg_ctr': s['avg_ctr'],
+            'conversion_rate': s['conversion_rate'],
+            'impression_growth': signed(s['impression_growth']),
+            'click_growth': signed(s['click_growth']),
+            'conversion_growth': signed(s['conversion_growth']),
+            'engagement_trend': 'Increasing' if s['click_growth'] > 0 else 'Decreasing',
+            'roas': s['roas'],
+            'best_day': s['best_day'],
+            'best_day_ctr': s['best_day_ctr'],
+        }
+        
+        return {
+            'period': f'{period_start.strftime("%b %d")} - {period_end.strftime("%b %d, %Y")}',
+            'summary': {
+                'campaigns_created': s['campaigns_created'],
+                'ads_generated': s['ads_generated'],
+                'images_generated': s['images_generated'],
+                'active_campaigns': s['active_campaigns'],
+                'total_engagement': s['total_clicks'],
+                'engagement_growth': insights['click_growth']
+            },
+            'insights': insights,
+            'recommendations': recommendations,
+            'next_steps': next_steps,
+            'comparison_available': s['prev_clicks'] > 0,
+            'can_generate_pdf': s['total_impressions'] > 0
+        }
+    
+    @staticmethod
+    def weekly_report(user, today=None, metrics=None):
+        """
+        The weekly report returned by /reports/weekly/ and rendered to PDF
+        
+        Without `metrics` the user's precomputed UserRecommendation is read
+        and only re-evaluated if it is stale.
+        
+        Args:
+            user: User object
+            today: Optional end date of the period
+            metrics: Optional pre-computed weekly_metrics(), e.g. shared by
+                several scheduled reports
+        """
+        from core.services.recommendations import RecommendationService
+        
+        if metrics is not None:
+            snapshot = ReportDataService.weekly_snapshot(metrics)
+            recommendations, next_steps = RecommendationService.evaluate(snapshot)
+        else:
+            stored = RecommendationService.get(user, today)
+            snapshot, recommendations, next_steps = stored.metrics, stored.recommendations, stored.next_steps
+        
+        return ReportDataService.build_weekly_report(snapshot, recommendations, next_steps)
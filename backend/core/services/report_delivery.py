@@ -0,0 +1,135 @@
+# backend/core/services/report_delivery.py
+"""
+Delivery channels for scheduled reports.
+
+Every channel exposes `send(schedule, report, pdf_path)` and raises on failure.
+The runner picks a channel per ReportSchedule.format from, in order: the
+`deliverers` passed to its constructor, settings.REPORT_DELIVERY_BACKENDS
+(dotted paths), then DEFAULT_DELIVERERS below. Tests and local setups swap in
+RecordingDelivery or LocalFileDelivery instead of real webhooks.
+"""
+import json
+import os
+import threading
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils.module_loading import import_string
+
+from core.utils.http import fetch
+
+
+def format_summary(report):
+    """Short plain-text summary used by chat webhooks"""
+    metrics = report.get('metrics', {})
+    lines = [f"📊 *{report['name']}* ({report['period']['start']} - {report['period']['end']})"]
+    for key, value in metrics.items():
+        lines.append(f"• {key.replace('_', ' ').title()}: {value}")
+    lines.append(f"Campaigns: {len(report.get('campaigns', []))}")
+    return '\n'.join(lines)
+
+
+class SlackDelivery:
+    """Post the report summary to the schedule's Slack incoming webhook"""
+
+    payload_key = 'text'
+    url_field = 'slack_webhook'
+    # HTTP_PROVIDERS entry: pool, timeout and retries for the webhook posts
+    provider = 'slack'
+
+    def send(self, schedule, report, pdf_path):
+        url = getattr(schedule, self.url_field)
+        if not url:
+            raise ValueError(f'No {self.url_field} configured')
+        response = fetch(self.provider, 'POST', url, json={self.payload_key: format_summary(report)})
+        response.raise_for_status()
+
+
+class DiscordDelivery(SlackDelivery):
+    """Post the report summary to the schedule's Discord webhook"""
+
+    payload_key = 'content'
+    url_field = 'discord_webhook'
+    provider = 'discord'
+
+
+class EmailDelivery:
+    """Email the PDF to the schedule's recipients over one shared SMTP connection"""
+
+    def __init__(self, connection=None):
+        self.connection = connection or get_connection()
+        self._lock = threading.Lock()
+
+    def send(self, schedule, report, pdf_path):
+        recipients = schedule.email_recipients or []
+        if not recipients:
+            raise ValueError('No email recipients configured')
+
+        message = EmailMessage(
+            subject=f"AdVision report: {report['name']}",
+            body=format_summary(report),
+            to=recipients,
+            connection=self.connection,
+        )
+        if pdf_path:
+            message.attach_file(pdf_path, 'application/pdf')
+
+        # SMTP connections are not thread-safe
+        with self._lock:
+            message.send(fail_silently=False)
+
+
+class LocalFileDelivery:
+    """Keep the rendered PDF on disk only (the 'pdf' format)"""
+
+    def send(self, schedule, report, pdf_path):
+        if not pdf_path or not os.path.exists(pdf_path):
+            raise ValueError('Report file was not rendered')
+
+
+class RecordingDelivery:
+    """Stand-in that records deliveries in memory instead of sending them"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, schedule, report, pdf_path):
+        if self.fail:
+            raise RuntimeError('Delivery failed (RecordingDelivery)')
+        with self._lock:
+            self.sent.append({
+                'schedule_id': str(schedule.id),
+                'format': schedule.format,
+                'report': json.loads(json.dumps(report, default=str)),
+                'pdf_path': pdf_path,
+            })
+
+
+DEFAULT_DELIVERERS = {
+    'pdf': LocalFileDelivery,
+    'email': EmailDelivery,
+    'slack': SlackDelivery,
+    'discord': DiscordDelivery,
+}
+
+
+def load_deliverers(overrides=None):
+    """
+    Instantiate one deliverer per report format
+
+    Args:
+        overrides: Optional {format: deliverer instance}
+    """
+    configured = getattr(settings, 'REPORT_DELIVERY_BACKENDS', {}) or {}
+
+    deliverers = {}
+    for fmt, default in DEFAULT_DELIVERERS.items():
+        if overrides and fmt in overrides:
+            deliverers[fmt] = overrides[fmt]
+            continue
+
+        cls = import_string(configured[fmt]) if fmt in configured else default
+        deliverers[fmt] = cls()
+    return deliverers
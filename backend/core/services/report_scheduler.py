@@ -0,0 +1,377 @@
+# backend/core/services/report_scheduler.py
+"""
+Runner for ReportSchedule.
+
+Each pass claims due schedules with SELECT ... FOR UPDATE SKIP LOCKED and moves
+their next_run forward in the same transaction, so any number of workers can
+poll concurrently without running a schedule twice. Claimed schedules whose
+campaigns overlap are grouped and their DailyAnalytics rows are read once per
+group. PDFs are rendered in a worker pool, delivered over pooled connections,
+and every outcome is recorded as a GeneratedReport.
+
+Delivery is at most once per run: next_run is committed before the report is
+rendered or sent, so a run that fails (or a worker that dies mid-run) is not
+retried; the schedule fires again at its next run and the failure is left on
+the GeneratedReport.
+"""
+import logging
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.db import transaction
+
+from core.models import Campaign, DailyAnalytics, ReportSchedule, GeneratedReport
+from core.services.report_delivery import load_deliverers
+from core.utils.report_generator import render_scheduled_report
+from core.utils.timezone_utils import now as current_time, format_datetime
+
+logger = logging.getLogger(__name__)
+
+CLAIM_BATCH_SIZE = 50
+
+FREQUENCY_STEPS = {
+    'daily': relativedelta(days=1),
+    'weekly': relativedelta(weeks=1),
+    'monthly': relativedelta(months=1),
+}
+
+PERIOD_DAYS = {'daily': 1, 'weekly': 7, 'monthly': 30}
+
+AVAILABLE_METRICS = (
+    'impressions', 'clicks', 'conversions', 'spend',
+    'ctr', 'cpc', 'conversion_rate', 'roas',
+)
+
+# Same revenue assumption as CampaignAnalyticsSummary.update_metrics
+REVENUE_PER_CONVERSION = 50
+
+
+def next_run_after(next_run, frequency, now):
+    """First run time after `now` on the schedule's cadence (missed runs are skipped)"""
+    step = FREQUENCY_STEPS.get(frequency, FREQUENCY_STEPS['weekly'])
+    while next_run <= now:
+        next_run += step
+    return next_run
+
+
+def group_overlapping(campaign_sets):
+    """
+    Group schedules that share at least one campaign (union-find)
+
+    Args:
+        campaign_sets: {schedule_id: set of campaign ids}
+
+    Returns:
+        list: lists of schedule ids
+    """
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(a, b):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    owner = {}
+    for schedule_id, campaigns in campaign_sets.items():
+        find(schedule_id)
+        for campaign_id in campaigns:
+            if campaign_id in owner:
+                union(owner[campaign_id], schedule_id)
+            else:
+                owner[campaign_id] = schedule_id
+
+    groups = defaultdict(list)
+    for schedule_id in campaign_sets:
+        groups[find(schedule_id)].append(schedule_id)
+    return list(groups.values())
+
+
+def compute_metrics(totals, selected=None):
+    """Derived metrics from summed counters, limited to `selected` if given"""
+    impressions, clicks, conversions, spend = totals
+    metrics = {
+        'impressions': impressions,
+        'clicks': clicks,
+        'conversions': conversions,
+        'spend': round(spend, 2),
+        'ctr': round(clicks / impressions * 100, 2) if impressions else 0,
+        'cpc': round(spend / clicks, 2) if clicks else 0,
+        'conversion_rate': round(conversions / clicks * 100, 2) if clicks else 0,
+        'roas': round(conversions * REVENUE_PER_CONVERSION / spend, 2) if spend else 0,
+    }
+    selected = [m for m in (selected or []) if m in metrics]
+    if selected:
+        return {m: metrics[m] for m in selected}
+    return metrics
+
+
+class ReportScheduleRunner:
+    """Claim, build, render, deliver and record due scheduled reports"""
+
+    def __init__(self, deliverers=None, render_workers=None, delivery_workers=8,
+                 executor=None, storage_path=None):
+        """
+        Args:
+            deliverers: Optional {format: deliverer} overriding the configured
+                channels, e.g. RecordingDelivery in tests
+            render_workers: Size of the rendering pool (default: CPU count)
+            delivery_workers: Concurrent deliveries
+            executor: 'process' or 'thread' rendering pool
+            storage_path: Directory for rendered PDFs
+        """
+        self.deliverers = load_deliverers(deliverers)
+        self.render_workers = render_workers or getattr(settings, 'REPORT_RENDER_WORKERS', None) or os.cpu_count() or 1
+        self.delivery_workers = delivery_workers
+        self.executor = executor or getattr(settings, 'REPORT_RENDER_EXECUTOR', 'process')
+        self.storage_path = storage_path or settings.REPORT_STORAGE_PATH
+
+    # ------------------------------------------------------------------
+    # Claiming
+    # ------------------------------------------------------------------
+    @staticmethod
+    def claim_due(limit=CLAIM_BATCH_SIZE, now=None):
+        """
+        Lock up to `limit` due schedules, skipping rows other workers hold,
+        and advance their next_run before the lock is released. The advance is
+        not undone if the run later fails (at-most-once delivery).
+        """
+        now = now or current_time()
+        with transaction.atomic():
+            schedules = list(
+                ReportSchedule.objects.select_for_update(skip_locked=True).filter(
+                    is_active=True,
+                    next_run__lte=now
+                ).order_by('next_run')[:limit]
+            )
+            for schedule in schedules:
+                schedule.last_run = now
+                schedule.next_run = next_run_after(schedule.next_run, schedule.frequency, now)
+            if schedules:
+                ReportSchedule.objects.bulk_update(schedules, ['last_run', 'next_run'])
+        return schedules
+
+    # ------------------------------------------------------------------
+    # Data
+    # ------------------------------------------------------------------
+    @staticmethod
+    def campaign_sets(schedules):
+        """Campaign ids covered by each schedule; no selection means all of the user's campaigns"""
+        through = ReportSchedule.include_campaigns.through
+        selected = defaultdict(set)
+        for schedule_id, campaign_id in through.objects.filter(
+            reportschedule_id__in=[s.id for s in schedules]
+        ).values_list('reportschedule_id', 'campaign_id'):
+            selected[schedule_id].add(campaign_id)
+
+        all_of_user = {s.user_id for s in schedules if not selected.get(s.id)}
+        user_campaigns = defaultdict(set)
+        if all_of_user:
+            for user_id, campaign_id in Campaign.objects.filter(
+                user_id__in=all_of_user
+            ).values_list('user_id', 'id'):
+                user_campaigns[user_id].add(campaign_id)
+
+        return {
+            s.id: selected.get(s.id) or user_campaigns.get(s.user_id, set())
+            for s in schedules
+        }
+
+    @staticmethod
+    def period(schedule, now):
+        """Last full `frequency` worth of days before the run"""
+        end = now.date() - timedelta(days=1)
+        start = end - timedelta(days=PERIOD_DAYS.get(schedule.frequency, 7) - 1)
+        return start, end
+
+    def build_reports(self, schedules, now=None):
+        """
+        Report data for every schedule, reading DailyAnalytics once per group
+        of overlapping schedules
+
+        Returns:
+            list: (schedule, report dict) pairs
+        """
+        now = now or current_time()
+        by_id = {s.id: s for s in schedules}
+        campaign_sets = self.campaign_sets(schedules)
+
+        titles = dict(Campaign.objects.filter(
+            id__in=set().union(*campaign_sets.values()) if campaign_sets else []
+        ).values_list('id', 'title'))
+
+        reports = []
+        for group in group_overlapping(campaign_sets):
+            periods = {sid: self.period(by_id[sid], now) for sid in group}
+            campaign_ids = set().union(*(campaign_sets[sid] for sid in group))
+
+            # campaign -> [(date, impressions, clicks, conversions, spend)]
+            rows = defaultdict(list)
+            if campaign_ids:
+                for campaign_id, day, impressions, clicks, conversions, spend in DailyAnalytics.objects.filter(
+                    campaign_id__in=campaign_ids,
+                    date__gte=min(p[0] for p in periods.values()),
+                    date__lte=max(p[1] for p in periods.values())
+                ).values_list('campaign_id', 'date', 'impressions', 'clicks', 'conversions', 'spend'):
+                    rows[campaign_id].append((day, impressions, clicks, conversions, float(spend)))
+
+            for sid in group:
+                schedule = by_id[sid]
+                start, end = periods[sid]
+                totals = [0, 0, 0, 0.0]
+                campaigns = []
+                for campaign_id in sorted(campaign_sets[sid], key=lambda c: titles.get(c, '')):
+                    sums = [0, 0, 0, 0.0]
+                    for day, *values in rows.get(campaign_id, ()):
+                        if start <= day <= end:
+                            for i, value in enumerate(values):
+                                sums[i] += value
+                    totals = [t + v for t, v in zip(totals, sums)]
+                    campaigns.append({
+                        'id': str(campaign_id),
+                        'title': titles.get(campaign_id, ''),
+                        'impressions': sums[0],
+                        'clicks': sums[1],
+                        'conversions': sums[2],
+                        'spend': round(sums[3], 2),
+                    })
+
+                reports.append((schedule, {
+                    'schedule_id': str(schedule.id),
+                    'name': schedule.name,
+                    'frequency': schedule.frequency,
+                    'format': schedule.format,
+                    'period': {'start': start.isoformat(), 'end': end.isoformat()},
+                    'metrics': compute_metrics(totals, schedule.include_metrics),
+                    'campaigns': campaigns,
+                }))
+        return reports
+
+    # ------------------------------------------------------------------
+    # Rendering and delivery
+    # ------------------------------------------------------------------
+    def render_all(self, reports, now=None):
+        """
+        Render every report to a PDF in the worker pool
+
+        Returns:
+            dict: schedule id -> file path, or the exception raised
+        """
+        now = now or current_time()
+        jobs = {}
+        for schedule, report in reports:
+            filename = f"schedule_{schedule.id}_{format_datetime(now, '%Y%m%d_%H%M%S')}.pdf"
+            jobs[schedule.id] = (report, os.path.join(self.storage_path, filename))
+
+        results = {}
+        if len(jobs) <= 1 or self.render_workers <= 1:
+            for schedule_id, (report, path) in jobs.items():
+                try:
+                    results[schedule_id] = render_scheduled_report(report, path)
+                except Exception as e:
+                    results[schedule_id] = e
+            return results
+
+        pool_class = ProcessPoolExecutor if self.executor == 'process' else ThreadPoolExecutor
+        with pool_class(max_workers=min(self.render_workers, len(jobs))) as pool:
+            futures = {
+                schedule_id: pool.submit(render_scheduled_report, report, path)
+                for schedule_id, (report, path) in jobs.items()
+            }
+            for schedule_id, future in futures.items():
+                try:
+                    results[schedule_id] = future.result()
+                except Exception as e:
+                    results[schedule_id] = e
+        return results
+
+    def _deliver(self, schedule, report, pdf_path):
+        deliverer = self.deliverers.get(schedule.format)
+        if deliverer is None:
+            raise ValueError(f'Unknown report format: {schedule.format}')
+        deliverer.send(schedule, report, pdf_path)
+
+    def deliver_all(self, reports, rendered):
+        """
+        Deliver rendered reports concurrently
+
+        Returns:
+            dict: schedule id -> error message ('' on success)
+        """
+        errors = {}
+        with ThreadPoolExecutor(max_workers=self.delivery_workers) as pool:
+            futures = {}
+            for schedule, report in reports:
+                result = rendered.get(schedule.id)
+                if isinstance(result, Exception):
+                    errors[schedule.id] = f'Rendering failed: {result}'
+                    continue
+                futures[schedule.id] = pool.submit(self._deliver, schedule, report, result)
+
+            for schedule_id, future in futures.items():
+                try:
+                    future.result()
+                    errors[schedule_id] = ''
+                except Exception as e:
+                    errors[schedule_id] = str(e)
+        return errors
+
+    # ------------------------------------------------------------------
+    # Entry points
+    # ------------------------------------------------------------------
+    def run_once(self, limit=CLAIM_BATCH_SIZE, now=None):
+        """
+        Process one batch of due schedules
+
+        Returns:
+            dict: counts of claimed, delivered and failed schedules
+        """
+        now = now or current_time()
+        schedules = self.claim_due(limit=limit, now=now)
+        if not schedules:
+            return {'claimed': 0, 'delivered': 0, 'failed': 0}
+
+        reports = self.build_reports(schedules, now=now)
+        rendered = self.render_all(reports, now=now)
+        errors = self.deliver_all(reports, rendered)
+
+        GeneratedReport.objects.bulk_create([
+            GeneratedReport(
+                schedule=schedule,
+                report_data=report,
+                file_path='' if isinstance(rendered.get(schedule.id), Exception) else rendered.get(schedule.id, ''),
+                sent_successfully=not errors.get(schedule.id),
+                delivery_errors=errors.get(schedule.id, ''),
+            )
+            for schedule, report in reports
+        ])
+
+        failed = sum(1 for error in errors.values() if error)
+        for schedule, report in reports:
+            if errors.get(schedule.id):
+                logger.error(f"❌ Report schedule {schedule.name} failed: {errors[schedule.id]}")
+
+        return {'claimed': len(schedules), 'delivered': len(schedules) - failed, 'failed': failed}
+
+    def run_pending(self, limit=CLAIM_BATCH_SIZE, max_batches=None):
+        """Keep claiming batches until nothing is due (or max_batches is reached)"""
+        totals = {'claimed': 0, 'delivered': 0, 'failed': 0}
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            result = self.run_once(limit=limit)
+            if not result['claimed']:
+                break
+            for key in totals:
+                totals[key] += result[key]
+            batches += 1
+        return totals
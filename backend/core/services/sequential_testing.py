@@ -0,0 +1,303 @@
+# backend/core/services/sequential_testing.py
+"""
+Sequential (Bayesian) A/B test analysis.
+
+Every variation gets a Beta(1 + successes, 1 + failures) posterior on its
+success rate. Probability-to-be-best and expected loss are estimated with one
+vectorized Monte Carlo draw over all variations, so the analysis is cheap
+enough to re-run on every counter change. A test stops as soon as the leader
+is best with probability >= confidence_level and choosing it would cost less
+than LOSS_THRESHOLD of its own rate, which stays valid under continuous
+peeking unlike a fixed-horizon p-value.
+"""
+import hashlib
+import logging
+
+import numpy as np
+from django.core.cache import cache
+
+from core.models import ABTest
+from core.services.ab_testing import ANALYSIS_CACHE_TIMEOUT, METRIC_FIELDS, ABTestingService
+from core.services.traffic_assignment import TrafficAssignmentService
+from core.utils.timezone_utils import now
+
+logger = logging.getLogger(__name__)
+
+SIMULATION_DRAWS = 20000
+
+# Trials every variation needs before the stopping rule is evaluated,
+# so a lucky first handful of events cannot end the test
+BURN_IN_TRIALS = 100
+
+# Maximum expected loss of stopping, relative to the leader's rate
+LOSS_THRESHOLD = 0.01
+
+
+class SequentialTestingService:
+    """Posterior updates and early stopping for sequential A/B tests"""
+
+    @staticmethod
+    def posterior(successes, trials, draws=SIMULATION_DRAWS, seed=None):
+        """
+        Probability-to-be-best and expected loss for every variation
+
+        Args:
+            successes: Array of successes per variation
+            trials: Array of trials per variation
+            draws: Monte Carlo sample count
+            seed: Optional RNG seed, for reproducible results
+
+        Returns:
+            tuple: (probability_to_be_best, expected_loss) arrays
+        """
+        successes = np.asarray(successes, dtype=float)
+        trials = np.asarray(trials, dtype=float)
+        successes = np.minimum(successes, trials)
+
+        rng = np.random.default_rng(seed)
+        samples = rng.beta(1 + successes, 1 + trials - successes, size=(draws, len(trials)))
+
+        best = samples.argmax(axis=1)
+        probability = np.bincount(best, minlength=len(trials)) / draws
+        expected_loss = (samples.max(axis=1, keepdims=True) - samples).mean(axis=0)
+        return probability, expected_loss
+
+    @staticmethod
+    def _seed(ab_test, counters):
+        """Seed derived from the counters, so the same data gives the same answer"""
+        key = f'{ab_test.id}:{counters}'.encode()
+        return int(hashlib.sha1(key).hexdigest()[:16], 16)
+
+    @staticmethod
+    def _threshold(ab_test):
+        return min(max((ab_test.confidence_level or 95.0) / 100, 0.5), 0.999)
+
+    @staticmethod
+    def evaluate(ab_test, variations):
+        """
+        Compute the posterior and the stopping decision without saving anything
+
+        Returns:
+            dict: analysis in the shape returned by ABTestingService.analyze_test
+        """
+        if len(variations) < 2:
+            return {'error': 'Need at least 2 variations'}
+
+        success_field, trial_field = METRIC_FIELDS.get(ab_test.success_metric, METRIC_FIELDS['ctr'])
+        names = [v.name for v in variations]
+        successes = np.array([getattr(v, success_field) for v in variations], dtype=float)
+        trials = np.array([getattr(v, trial_field) for v in variations], dtype=float)
+        threshold = SequentialTestingService._threshold(ab_test)
+
+        counters = [(n, int(s), int(t)) for n, s, t in zip(names, successes, trials)]
+        probability, expected_loss = SequentialTestingService.posterior(
+            successes, trials, seed=SequentialTestingService._seed(ab_test, counters)
+        )
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = np.where(trials > 0, np.minimum(successes, trials) / trials, 0.0)
+        leader = int(np.argmax(probability))
+
+        summary = [{
+            'name': names[i],
+            'rate': round(float(rates[i] * 100), 2),
+            'trials': int(trials[i]),
+            'probability_to_be_best': round(float(probability[i]), 4),
+            'expected_loss': float(expected_loss[i]),
+        } for i in range(len(names))]
+
+        result = {
+            'mode': 'sequential',
+            'threshold': threshold,
+            'leader': names[leader],
+            'variations': summary,
+        }
+
+        if trials.min() < BURN_IN_TRIALS:
+            result.update({
+                'status': 'insufficient_data',
+                'message': f'Need at least {BURN_IN_TRIALS} {trial_field} per variation before stopping',
+            })
+            return result
+
+        runner_up = max(
+            (i for i in range(len(names)) if i != leader),
+            key=lambda i: probability[i]
+        )
+        improvement = 0
+        if rates[leader] > 0:
+            improvement = (rates[leader] - rates[runner_up]) / rates[leader] * 100
+
+        max_loss = LOSS_THRESHOLD * rates[leader]
+        if probability[leader] >= threshold and expected_loss[leader] <= max_loss:
+            result.update({
+                'status': 'completed',
+                'winner': names[leader],
+                'significant': True,
+                # Posterior probability that the declared winner is not the best
+                'p_value': round(float(1 - probability[leader]), 6),
+                'details': {
+                    'significant': True,
+                    'winner': names[leader],
+                    'confidence': float(probability[leader] * 100),
+                    'metric_a': round(float(rates[leader] * 100), 2),
+                    'metric_b': round(float(rates[runner_up] * 100), 2),
+                    'improvement': float(improvement),
+                }
+            })
+            return result
+
+        result.update({
+            'status': 'inconclusive',
+            'message': (
+                f'Variation {names[leader]} leads with {probability[leader] * 100:.1f}% '
+                f'probability to be best; stopping at {threshold * 100:.1f}%'
+            ),
+            'details': summary,
+        })
+        return result
+
+    @staticmethod
+    def update(ab_test, variations=None):
+        """
+        Refresh the stored posterior of a running sequential test and complete
+        it when the stopping boundary is crossed.
+
+        Returns:
+            dict or None: the analysis, or None if the test is not a running
+            sequential test
+        """
+        if ab_test.analysis_mode != 'sequential' or ab_test.status != 'running':
+            return None
+
+        if variations is None:
+            variations = list(ab_test.variations.all().order_by('name'))
+
+        analysis = SequentialTestingService.evaluate(ab_test, variations)
+        if 'error' in analysis:
+            return analysis
+
+        posterior = {
+            v['name']: {
+                'probability_to_be_best': v['probability_to_be_best'],
+                'expected_loss': v['expected_loss'],
+            }
+            for v in analysis['variations']
+        }
+
+        if analysis['status'] == 'completed':
+            end_date = now()
+            # Conditional update: concurrent counter changes complete the test once
+            completed = ABTest.objects.filter(pk=ab_test.pk, status='running').update(
+                status='completed',
+                end_date=end_date,
+                winner=analysis['winner'],
+                is_significant=True,
+                p_value=analysis['p_value'],
+                posterior=posterior,
+                updated_at=end_date,
+            )
+            if completed:
+                ab_test.status = 'completed'
+                ab_test.end_date = end_date
+                ab_test.winner = analysis['winner']
+                ab_test.is_significant = True
+                ab_test.p_value = analysis['p_value']
+                ab_test.posterior = posterior
+                # Queryset updates skip post_save, so route traffic to the winner here
+                TrafficAssignmentService.invalidate(ab_test.pk)
+                logger.info(f"🏁 Sequential test {ab_test.name} stopped: variation {ab_test.winner} wins")
+            return analysis
+
+        if ab_test.posterior != posterior:
+            ab_test.posterior = posterior
+            ab_test.save(update_fields=['posterior', 'updated_at'])
+        return analysis
+
+    @staticmethod
+    def _final(ab_test, variations):
+        """
+        A completed test's analysis from its stored posterior, without
+        simulating again
+
+        Returns:
+            dict or None: None if the posterior does not cover the variations
+        """
+        stored = ab_test.posterior or {}
+        if len(variations) < 2 or any(v.name not in stored for v in variations):
+            return None
+
+        success_field, trial_field = METRIC_FIELDS.get(ab_test.success_metric, METRIC_FIELDS['ctr'])
+        summary = []
+        for v in variations:
+            successes, trials = getattr(v, success_field), getattr(v, trial_field)
+            summary.append({
+                'name': v.name,
+                'rate': round(min(successes, trials) / trials * 100, 2) if trials > 0 else 0.0,
+                'trials': int(trials),
+                'probability_to_be_best': stored[v.name]['probability_to_be_best'],
+                'expected_loss': stored[v.name]['expected_loss'],
+            })
+
+        ranked = sorted(summary, key=lambda v: v['probability_to_be_best'], reverse=True)
+        winner = next((v for v in summary if v['name'] == ab_test.winner), ranked[0])
+        runner_up = next(v for v in ranked if v is not winner)
+        improvement = 0
+        if winner['rate'] > 0:
+            improvement = (winner['rate'] - runner_up['rate']) / winner['rate'] * 100
+
+        return {
+            'mode': 'sequential',
+            'threshold': SequentialTestingService._threshold(ab_test),
+            'leader': ranked[0]['name'],
+            'variations': summary,
+            'status': 'completed',
+            'winner': ab_test.winner,
+            'significant': ab_test.is_significant,
+            'p_value': ab_test.p_value,
+            'details': {
+                'significant': ab_test.is_significant,
+                'winner': ab_test.winner,
+                'confidence': float(winner['probability_to_be_best'] * 100),
+                'metric_a': winner['rate'],
+                'metric_b': runner_up['rate'],
+                'improvement': float(improvement),
+            },
+        }
+
+    @staticmethod
+    def analyze(ab_test, variations=None):
+        """
+        Analysis for the API: live for running tests, final for completed
+        ones. Saves nothing; counter changes go through update()
+        """
+        if ab_test.status not in ('running', 'completed'):
+            return {'error': 'Test is not running'}
+
+        if variations is None:
+            variations = list(ab_test.variations.all().order_by('name'))
+
+        if ab_test.status == 'completed' and ab_test.winner:
+            final = SequentialTestingService._final(ab_test, variations)
+            if final is not None:
+                return final
+
+        cache_key = ABTestingService._analysis_cache_key(ab_test, variations, 'sequential')
+        analysis = cache.get(cache_key)
+        if analysis is None:
+            analysis = SequentialTestingService.evaluate(ab_test, variations)
+            cache.set(cache_key, analysis, ANALYSIS_CACHE_TIMEOUT)
+
+        if ab_test.status == 'completed' and ab_test.winner and 'error' not in analysis:
+            # Report the decision that was taken when the boundary was crossed
+            analysis['status'] = 'completed'
+            analysis['winner'] = ab_test.winner
+            analysis['significant'] = ab_test.is_significant
+            analysis['p_value'] = ab_test.p_value
+            if not isinstance(analysis.get('details'), dict):
+                analysis['details'] = {
+                    'significant': ab_test.is_significant,
+                    'winner': ab_test.winner,
+                    'improvement': 0,
+                }
+        return analysis
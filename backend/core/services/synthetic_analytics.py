@@ -0,0 +1,215 @@
+# backend/core/services/synthetic_analytics.py
+"""
+Vectorized synthetic DailyAnalytics for demos, load tests and benchmarks.
+
+series() draws every campaign-day at once as (campaigns x days) NumPy arrays:
+a linear growth trend, a weekly seasonality wave with a per-campaign peak day
+and multiplicative noise. write() upserts the valid cells with bulk_create in
+large batches - no per-row save() and no signals - and then rebuilds the
+campaign summaries, breakdown caches and recommendation flags once. The same
+seed always produces the same data.
+"""
+import logging
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count
+
+from core.models import Campaign, CampaignAnalyticsSummary, DailyAnalytics
+from core.services.analytics_aggregation import AnalyticsAggregationService
+from core.services.hourly_analytics import DAILY_UPDATE_FIELDS
+from core.utils.timezone_utils import today
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Daily impressions per piece of content, as generate_analytics always used
+PLATFORM_IMPRESSIONS = {
+    'instagram': 500,
+    'facebook': 600,
+    'youtube': 800,
+    'linkedin': 300,
+    'tiktok': 1000,
+}
+
+
+# Shape of the generated series; ranges are (low, high) of a uniform draw
+SERIES_DEFAULTS = {
+    'growth': (1.0, 1.5),             # trend multiplier at the first and last day
+    'weekly_amplitude': 0.15,         # +/- share of impressions swung by weekday
+    'noise': 0.15,                    # +/- daily multiplicative noise
+    'ctr': (0.02, 0.05),              # per-campaign base CTR
+    'ctr_jitter': 0.1,                # +/- daily CTR noise around the base
+    'conversion_rate': (0.05, 0.15),  # daily conversions per click
+    'spend_jitter': 0.15,             # +/- daily spend around budget / days
+}
+
+
+class SyntheticAnalyticsService:
+    """Generate and bulk-write synthetic daily analytics"""
+
+    @staticmethod
+    def series(first_day, days, start_dates, base_impressions, budgets, seed=None, **shape):
+        """
+        Draw `days` days from `first_day` for every campaign at once
+
+        Args:
+            first_day: Date of column 0
+            days: Number of columns
+            start_dates: Per-campaign start date; earlier cells are invalid
+            base_impressions: Per-campaign daily impressions before trend/noise
+            budgets: Per-campaign total budget, spread over its valid days
+            seed: Seed for a reproducible draw
+            **shape: Overrides of SERIES_DEFAULTS
+
+        Returns:
+            dict: (campaigns x days) arrays 'impressions', 'clicks',
+                'conversions', 'spend_cents' and boolean 'valid'
+        """
+        unknown = set(shape) - set(SERIES_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown series options: {', '.join(sorted(unknown))}")
+        shape = {**SERIES_DEFAULTS, **shape}
+        rng = np.random.default_rng(seed)
+        n = len(start_dates)
+        size = (n, days)
+
+        first = np.array([(start - first_day).days for start in start_dates], dtype=np.int64).clip(0, days)
+        offset = np.arange(days) - first[:, None]
+        valid = offset >= 0
+        active_days = np.maximum(days - first, 1)
+
+        growth_start, growth_end = shape['growth']
+        trend = growth_start + (growth_end - growth_start) * offset.clip(0) / active_days[:, None]
+
+        weekday = (first_day.weekday() + np.arange(days)) % 7
+        peak = rng.integers(0, 7, n)
+        seasonality = 1 + shape['weekly_amplitude'] * np.cos(2 * np.pi * (weekday - peak[:, None]) / 7)
+
+        noise = rng.uniform(1 - shape['noise'], 1 + shape['noise'], size)
+        impressions = np.floor(
+            np.asarray(base_impressions, dtype=np.float64)[:, None] * trend * seasonality * noise
+        ).astype(np.int64)
+
+        jitter = shape['ctr_jitter']
+        ctr = rng.uniform(*shape['ctr'], n)[:, None] * rng.uniform(1 - jitter, 1 + jitter, size)
+        clicks = np.floor(impressions * ctr).astype(np.int64)
+        conversions = np.floor(clicks * rng.uniform(*shape['conversion_rate'], size)).astype(np.int64)
+
+        daily_budget = np.asarray(budgets, dtype=np.float64) / active_days
+        spend_cents = np.rint(
+            daily_budget[:, None] * 100 * rng.uniform(1 - shape['spend_jitter'], 1 + shape['spend_jitter'], size)
+        ).astype(np.int64)
+
+        return {
+            'impressions': impressions,
+            'clicks': clicks,
+            'conversions': conversions,
+            'spend_cents': spend_cents,
+            'valid': valid,
+        }
+
+    @staticmethod
+    def derived(series):
+        """CTR, CPC and CPA arrays as DailyAnalytics.save() would derive them"""
+        impressions, clicks, conversions = series['impressions'], series['clicks'], series['conversions']
+        spend = series['spend_cents'] / 100
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return {
+                'ctr': np.round(np.where(impressions > 0, clicks / impressions * 100, 0.0), 2),
+                'cpc': np.round(np.where(clicks > 0, spend / clicks, 0.0), 2),
+                'cpa': np.round(np.where(conversions > 0, spend / conversions, 0.0), 2),
+            }
+
+    @staticmethod
+    def write(campaign_ids, first_day, series, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Upsert the valid cells of `series` and refresh what signals would have
+
+        Returns:
+            int: number of DailyAnalytics rows written
+        """
+        campaign_ids = list(campaign_ids)
+        owners = dict(Campaign.objects.filter(id__in=campaign_ids).values_list('id', 'user_id'))
+        rows, cols = np.nonzero(series['valid'])
+        columns = {
+            name: values[rows, cols].tolist()
+            for name, values in {**series, **SyntheticAnalyticsService.derived(series)}.items()
+            if name != 'valid'
+        }
+        dates = [first_day + timedelta(days=d) for d in range(series['valid'].shape[1])]
+        rows, cols = rows.tolist(), cols.tolist()
+
+        with transaction.atomic():
+            for start in range(0, len(rows), batch_size):
+                DailyAnalytics.objects.bulk_create(
+                    [
+                        DailyAnalytics(
+                            campaign_id=campaign_ids[rows[i]],
+                            user_id=owners[campaign_ids[rows[i]]],
+                            date=dates[cols[i]],
+                            impressions=columns['impressions'][i],
+                            clicks=columns['clicks'][i],
+                            conversions=columns['conversions'][i],
+                            spend=Decimal(columns['spend_cents'][i]).scaleb(-2),
+                            ctr=columns['ctr'][i],
+                            cpc=columns['cpc'][i],
+                            cpa=columns['cpa'][i],
+                        )
+                        for i in range(start, min(start + batch_size, len(rows)))
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['campaign', 'date'],
+                    update_fields=DAILY_UPDATE_FIELDS,
+                )
+
+            CampaignAnalyticsSummary.rebuild(campaign_ids)
+
+        AnalyticsAggregationService.invalidate(owners.values())
+        return len(rows)
+
+    @staticmethod
+    def generate(campaigns=None, days=30, seed=None, batch_size=DEFAULT_BATCH_SIZE, **shape):
+        """
+        Generate the last `days` days of analytics for `campaigns` (a
+        queryset, default all), clipped to each campaign's start date
+
+        Returns:
+            dict: rows and campaigns written, with timings
+        """
+        campaigns = (Campaign.objects.all() if campaigns is None else campaigns).annotate(
+            content_count=Count('ad_content', distinct=True) + Count('images', distinct=True)
+        ).order_by('pk')
+        ids, start_dates, base_impressions, budgets = [], [], [], []
+        for campaign in campaigns.values('id', 'start_date', 'platform', 'budget', 'content_count'):
+            ids.append(campaign['id'])
+            start_dates.append(campaign['start_date'])
+            base_impressions.append(
+                PLATFORM_IMPRESSIONS.get(campaign['platform'], 500) * max(campaign['content_count'], 1)
+            )
+            budgets.append(float(campaign['budget'] or 100))
+
+        if not ids:
+            return {'campaigns': 0, 'rows': 0, 'generate_seconds': 0, 'seconds': 0, 'rows_per_second': 0}
+
+        first_day = today() - timedelta(days=days - 1)
+        started = time.perf_counter()
+        series = SyntheticAnalyticsService.series(
+            first_day, days, start_dates, base_impressions, budgets, seed=seed, **shape
+        )
+        generated = time.perf_counter()
+        written = SyntheticAnalyticsService.write(ids, first_day, series, batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+
+        logger.info(f"✅ Generated {written} synthetic analytics rows for {len(ids)} campaigns")
+        return {
+            'campaigns': len(ids),
+            'rows': written,
+            'generate_seconds': round(generated - started, 3),
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(written / elapsed) if elapsed > 0 else 0,
+        }
@@ -0,0 +1,238 @@
+# backend/core/services/timeseries.py
+"""
+Columnar, gap-filled analytics time series for charts.
+
+DailyAnalytics is summed in SQL per day, week (TruncWeek, ISO Monday) or month
+(TruncMonth). Buckets without rows are filled with zeros, ratios are derived
+from the sums, and the series is optionally reduced to a target number of
+points with LTTB or min/max downsampling so the payload size does not grow
+with the requested range.
+"""
+import base64
+from datetime import date
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+RESOLUTIONS = ('day', 'week', 'month')
+
+SUMMED_METRICS = ('impressions', 'clicks', 'conversions', 'spend')
+DERIVED_METRICS = ('ctr', 'cpc', 'cpa')
+METRICS = SUMMED_METRICS + DERIVED_METRICS
+
+DOWNSAMPLE_METHODS = ('lttb', 'minmax', 'none')
+ENCODINGS = ('json', 'base64')
+
+DEFAULT_POINTS = 500
+MAX_POINTS = 5000
+
+_EPOCH = date(1970, 1, 1)
+
+
+def bucket_start(day, resolution):
+    """First day of the bucket containing `day`"""
+    if resolution == 'week':
+        return day - relativedelta(days=day.weekday())
+    if resolution == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def bucket_range(start_date, end_date, resolution):
+    """Every bucket start between start_date and end_date, inclusive"""
+    step = {
+        'day': relativedelta(days=1),
+        'week': relativedelta(weeks=1),
+        'month': relativedelta(months=1),
+    }[resolution]
+    current = bucket_start(start_date, resolution)
+    buckets = []
+    while current <= end_date:
+        buckets.append(current)
+        current += step
+    return buckets
+
+
+def lttb_indices(values, threshold):
+    """
+    Indices kept by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept; every bucket in between keeps
+    the point forming the largest triangle with the previously kept point and
+    the average of the next bucket.
+    """
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=np.float64)
+    y = np.asarray(values, dtype=np.float64)
+    every = (n - 2) / (threshold - 2)
+
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        indices[i + 1] = a
+    indices[-1] = n - 1
+    return indices
+
+
+def minmax_indices(values, threshold):
+    """
+    Indices of the minimum and maximum of each of (threshold - 2) // 2
+    buckets, plus the first and last points.
+
+    Below 4 points there is no room for a bucket: 3 keeps whichever interior
+    extreme lies farther from the endpoints, and fewer keep the endpoints.
+    """
+    n = len(values)
+    if threshold >= n:
+        return np.arange(n)
+
+    y = np.asarray(values, dtype=np.float64)
+    if threshold < 4:
+        if threshold < 3:
+            return np.array([0, n - 1], dtype=np.int64)
+        interior = y[1:-1]
+        baseline = (y[0] + y[-1]) / 2
+        low, high = int(interior.argmin()), int(interior.argmax())
+        extreme = low if baseline - interior[low] > interior[high] - baseline else high
+        return np.array([0, extreme + 1, n - 1], dtype=np.int64)
+
+    kept = {0, n - 1}
+    for chunk in np.array_split(np.arange(1, n - 1), (threshold - 2) // 2):
+        if len(chunk):
+            kept.add(int(chunk[y[chunk].argmin()]))
+            kept.add(int(chunk[y[chunk].argmax()]))
+    return np.array(sorted(kept), dtype=np.int64)
+
+
+def encode_column(values, dtype='<f4'):
+    """Little-endian binary column as base64 text"""
+    return base64.b64encode(np.asarray(values, dtype=dtype).tobytes()).decode('ascii')
+
+
+class TimeSeriesService:
+    """Build chart series from DailyAnalytics"""
+
+    RESOLUTIONS = RESOLUTIONS
+    METRICS = METRICS
+    DOWNSAMPLE_METHODS = DOWNSAMPLE_METHODS
+    ENCODINGS = ENCODINGS
+    DEFAULT_POINTS = DEFAULT_POINTS
+    MAX_POINTS = MAX_POINTS
+
+    @staticmethod
+    def aggregate(queryset, resolution):
+        """Summed metrics per bucket, computed in the database"""
+        if resolution == 'week':
+            bucket = TruncWeek('date')
+        elif resolution == 'month':
+            bucket = TruncMonth('date')
+        else:
+            bucket = F('date')
+
+        return (
+            queryset
+            .annotate(bucket=bucket)
+            .values('bucket')
+            .annotate(**{metric: Sum(metric) for metric in SUMMED_METRICS})
+            .order_by('bucket')
+        )
+
+    @staticmethod
+    def build(queryset, start_date, end_date, resolution='day'):
+        """
+        Gap-filled columns for every bucket in the range
+
+        Returns:
+            tuple: (list of bucket dates, {metric: numpy array})
+        """
+        buckets = bucket_range(start_date, end_date, resolution)
+        positions = {day: i for i, day in enumerate(buckets)}
+        columns = {metric: np.zeros(len(buckets)) for metric in SUMMED_METRICS}
+
+        for row in TimeSeriesService.aggregate(queryset, resolution):
+            i = positions.get(row['bucket'])
+            if i is None:
+                continue
+            for metric in SUMMED_METRICS:
+                columns[metric][i] = float(row[metric] or 0)
+
+        impressions = columns['impressions']
+        clicks = columns['clicks']
+        conversions = columns['conversions']
+        spend = columns['spend']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            columns['ctr'] = np.where(impressions > 0, clicks / impressions * 100, 0.0)
+            columns['cpc'] = np.where(clicks > 0, spend / clicks, 0.0)
+            columns['cpa'] = np.where(conversions > 0, spend / conversions, 0.0)
+
+        return buckets, columns
+
+    @staticmethod
+    def downsample(columns, points, method='lttb', primary='impressions'):
+        """
+        Indices to keep so every column has at most `points` entries. The
+        selection is driven by the `primary` metric and applied to all
+        columns so they stay aligned.
+        """
+        n = len(columns[primary])
+        if method == 'lttb':
+            return lttb_indices(columns[primary], points)
+        if method == 'minmax':
+            return minmax_indices(columns[primary], points)
+        return np.arange(n)
+
+    @staticmethod
+    def series(queryset, start_date, end_date, resolution='day', metrics=METRICS,
+               points=DEFAULT_POINTS, method='lttb', encoding='json'):
+        """Chart payload with one array per metric plus the bucket dates"""
+        buckets, columns = TimeSeriesService.build(queryset, start_date, end_date, resolution)
+        primary = metrics[0]
+        indices = TimeSeriesService.downsample(columns, points, method, primary)
+        dates = [buckets[i] for i in indices]
+
+        if encoding == 'base64':
+            payload = {
+                'date': encode_column([(day - _EPOCH).days for day in dates], '<i4'),
+            }
+            payload.update({
+                metric: encode_column(columns[metric][indices]) for metric in metrics
+            })
+        else:
+            payload = {'date': [day.isoformat() for day in dates]}
+            payload.update({
+                metric: np.round(columns[metric][indices], 4).tolist() for metric in metrics
+            })
+
+        result = {
+            'resolution': resolution,
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'source_points': len(buckets),
+            'points': len(dates),
+            'downsample': method if len(dates) < len(buckets) else 'none',
+            'primary_metric': primary,
+            'encoding': encoding,
+            'columns': payload,
+        }
+        if encoding == 'base64':
+            # Little-endian; dates are days since 1970-01-01
+            result['dtypes'] = {'date': 'int32', **{metric: 'float32' for metric in metrics}}
+        return result
@@ -0,0 +1,203 @@
+# backend/core/services/traffic_assignment.py
+"""
+Deterministic visitor -> variation assignment for A/B tests.
+
+A visitor is hashed together with the test id into one of BUCKETS buckets,
+and ABTest.traffic_split is compiled into cumulative bucket boundaries, so the
+same visitor always sees the same variation and a lookup is a hash plus a
+bisect. Compiled tables, and ids with no servable test, are cached
+in-process; saves of a test or its variations invalidate them locally, and a
+short TTL bounds staleness in other processes.
+"""
+import hashlib
+import logging
+import threading
+import time
+from bisect import bisect_right
+
+from core.models import ABTest
+from core.services.event_ingestion import event_buffer
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = 10000
+
+# Seconds a compiled table (or a miss) may be served before it is rebuilt
+TABLE_TTL = 30
+
+# Cached misses beyond this are dropped, so requests for made-up ids can't
+# grow the cache without bound
+MAX_CACHED_MISSES = 10000
+
+
+class SplitTable:
+    """Compiled traffic split of one test"""
+
+    __slots__ = ('test_id', 'user_id', 'status', 'boundaries', 'names', 'variation_ids', 'expires_at')
+
+    def __init__(self, test_id, user_id, status, boundaries, names, variation_ids, expires_at):
+        self.test_id = test_id
+        self.user_id = user_id
+        self.status = status
+        self.boundaries = boundaries
+        self.names = names
+        self.variation_ids = variation_ids
+        self.expires_at = expires_at
+
+    def lookup(self, bucket):
+        index = bisect_right(self.boundaries, bucket)
+        return self.names[index], self.variation_ids[index]
+
+
+class TrafficAssignmentService:
+    """Assign visitors to A/B test variations"""
+
+    _tables = {}
+    # test id -> monotonic time its miss expires
+    _misses = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def bucket(test_id, visitor_id):
+        """Stable bucket in [0, BUCKETS) for a visitor within a test"""
+        digest = hashlib.blake2b(f'{test_id}:{visitor_id}'.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big') % BUCKETS
+
+    @staticmethod
+    def compile_split(traffic_split, names):
+        """
+        Turn percentage weights into cumulative bucket boundaries
+
+        Variations missing from traffic_split get no traffic; if no variation
+        has a positive weight, traffic is split evenly. Buckets are distributed
+        with the largest-remainder method so they always sum to BUCKETS.
+
+        Returns:
+            tuple: (boundaries, names) where names[i] owns buckets below
+            boundaries[i] and at or above boundaries[i - 1]
+        """
+        weights = []
+        for name in names:
+            try:
+                weights.append(max(float((traffic_split or {}).get(name, 0)), 0.0))
+            except (TypeError, ValueError):
+                weights.append(0.0)
+
+        if sum(weights) <= 0:
+            weights = [1.0] * len(names)
+
+        active = [(name, weight) for name, weight in zip(names, weights) if weight > 0]
+        total = sum(weight for _, weight in active)
+        exact = [weight / total * BUCKETS for _, weight in active]
+        counts = [int(share) for share in exact]
+        by_remainder = sorted(range(len(active)), key=lambda i: exact[i] - counts[i], reverse=True)
+        for i in by_remainder[:BUCKETS - sum(counts)]:
+            counts[i] += 1
+
+        boundaries, upper = [], 0
+        for count in counts:
+            upper += count
+            boundaries.append(upper)
+        # The last boundary is implicit: bisect_right never runs past the end
+        return boundaries[:-1], [name for name, _ in active]
+
+    @staticmethod
+    def _build(test_id):
+        try:
+            ab_test = ABTest.objects.select_related('campaign').get(id=test_id)
+        except ABTest.DoesNotExist:
+            return None
+
+        variations = {
+            v['name']: str(v['id'])
+            for v in ab_test.variations.order_by('name').values('id', 'name')
+        }
+        if not variations:
+            return None
+
+        if ab_test.status == 'completed' and ab_test.winner in variations:
+            # Everyone gets the winner once the test is decided
+            boundaries, names = [], [ab_test.winner]
+        else:
+            boundaries, names = TrafficAssignmentService.compile_split(
+                ab_test.traffic_split, list(variations)
+            )
+
+        return SplitTable(
+            test_id=str(ab_test.id),
+            user_id=ab_test.campaign.user_id,
+            status=ab_test.status,
+            boundaries=boundaries,
+            names=tuple(names),
+            variation_ids=tuple(variations[name] for name in names),
+            expires_at=time.monotonic() + TABLE_TTL,
+        )
+
+    @staticmethod
+    def get_table(test_id):
+        """Cached compiled table for a test, or None if it does not exist"""
+        test_id = str(test_id)
+        table = TrafficAssignmentService._tables.get(test_id)
+        if table is not None and table.expires_at > time.monotonic():
+            return table
+        if TrafficAssignmentService._misses.get(test_id, 0) > time.monotonic():
+            return None
+
+        table = TrafficAssignmentService._build(test_id)
+        with TrafficAssignmentService._lock:
+            if table is None:
+                TrafficAssignmentService._tables.pop(test_id, None)
+                if len(TrafficAssignmentService._misses) >= MAX_CACHED_MISSES:
+                    TrafficAssignmentService._misses.clear()
+                TrafficAssignmentService._misses[test_id] = time.monotonic() + TABLE_TTL
+            else:
+                TrafficAssignmentService._misses.pop(test_id, None)
+                TrafficAssignmentService._tables[test_id] = table
+        return table
+
+    @staticmethod
+    def invalidate(test_id=None):
+        """Drop the compiled table of one test, or of all tests"""
+        with TrafficAssignmentService._lock:
+            if test_id is None:
+                TrafficAssignmentService._tables.clear()
+                TrafficAssignmentService._misses.clear()
+            else:
+                TrafficAssignmentService._tables.pop(str(test_id), None)
+                TrafficAssignmentService._misses.pop(str(test_id), None)
+
+    @staticmethod
+    def assign(test_id, visitor_id, record_exposure=False, table=None):
+        """
+        Pick the variation a visitor should see
+
+        Args:
+            test_id: ABTest id
+            visitor_id: Stable visitor identifier (cookie, device id, ...)
+            record_exposure: Count the assignment as an impression of the
+                variation through the batched event buffer
+            table: Optional pre-fetched SplitTable
+
+        Returns:
+            dict or None: {'variation', 'variation_id', 'bucket'}, or None if
+            the test is not serving traffic
+        """
+        table = table or TrafficAssignmentService.get_table(test_id)
+        if table is None or table.status not in ('running', 'completed'):
+            return None
+
+        bucket = TrafficAssignmentService.bucket(table.test_id, visitor_id)
+        name, variation_id = table.lookup(bucket)
+
+        if record_exposure and table.status == 'running':
+            try:
+                event_buffer.add({('ab_variation', variation_id, 'impressions'): 1})
+            except Exception as e:
+                # Serving the variation must not depend on the counter store
+                logger.error(f"❌ Could not record exposure for test {table.test_id}: {e}")
+
+        return {
+            'variation': name,
+            'variation_id': variation_id,
+            'bucket': bucket,
+        }
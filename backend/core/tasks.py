@@ -51,4 +51,70 @@ def update_campaign_summary(campaign_id):
         return False
     except Exception as e:
         logger.error(f"Failed to update campaign {campaign_id}: {e}")
-        return False
\ No newline at end of file
+        return False
+
+@shared_task
+def run_due_report_schedules():
+    """
+    Periodic task that generates and delivers due scheduled reports.
+    Safe to run on several workers at once: schedules are claimed with
+    SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+    from .services.report_scheduler import ReportScheduleRunner
+    
+    result = ReportScheduleRunner().run_pending()
+    logger.info(
+        f"✅ Report schedules: {result['claimed']} claimed, "
+        f"{result['delivered']} delivered, {result['failed']} failed"
+    )
+    return result
+
+@shared_task
+def rollup_hourly_analytics(days=2):
+    """
+    Periodic task that re-derives the last `days` of DailyAnalytics from
+    HourlyAnalytics. Idempotent, so late-arriving hours are picked up by the
+    next run.
+    """
+    from datetime import timedelta
+    from .services.hourly_analytics import HourlyAnalyticsService
+    from .utils.timezone_utils import today
+    
+    end_date = today()
+    written = HourlyAnalyticsService.rollup(end_date - timedelta(days=days - 1), end_date)
+    logger.info(f"✅ Rolled up {written} daily analytics rows")
+    return written
+
+@shared_task
+def refresh_stale_recommendations():
+    """
+    Periodic task that re-evaluates weekly recommendations for users whose
+    data changed (or whose stored results are from an earlier day).
+    """
+    from .services.recommendations import RecommendationService
+    
+    result = RecommendationService.refresh_all()
+    logger.info(
+        f"✅ Recommendations: {result['users']} users refreshed in {result['seconds']}s "
+        f"({result['users_per_second']} users/s)"
+    )
+    return result
+
+@shared_task
+def maintain_analytics_partitions():
+    """
+    Periodic (daily) task that creates upcoming monthly analytics partitions
+    and expires those past ANALYTICS_RETENTION_MONTHS. A no-op unless the
+    tables were converted with manage_partitions --convert on PostgreSQL.
+    """
+    from django.conf import settings
+    from .services.partitioning import PartitionService
+    from .utils.timezone_utils import today
+    
+    results = PartitionService.maintain(
+        today(),
+        months_ahead=settings.ANALYTICS_PARTITION_MONTHS_AHEAD,
+        retention=settings.ANALYTICS_RETENTION_MONTHS,
+        drop=settings.ANALYTICS_RETENTION_DROP,
+    )
+    return {table: len(statements) for table, statements in results.items()}
@@ -1,3 +1,1453 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections, models
+from django.db.migrations.loader import MigrationLoader
+from django.db.utils import load_backend
+from django.test import AsyncClient, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import permissions
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+from prometheus_client import REGISTRY
+from scipy import stats
+
+from backend.database import connection_options, database_config
+from core import instrumentation
+from core.async_views import AsyncAPIView
+from core.benchmarks import indexes
+from core.models import (
+    ABTest, ABTestVariation, AdContent, Campaign, CampaignAnalyticsSummary, DailyAnalytics, GeneratedReport,
+    HourlyAnalytics, ReportArtifact, ReportSchedule, User,
+)
+from core.db_router import ReplicaRouter, is_pinned
+from core.services.ab_testing import ABTestingService
+from core.services.analytics_aggregation import AnalyticsAggregationService
+from core.services.analytics_export import EXPORT_COLUMNS
+from core.services.budget_optimizer import (
+    DEFAULT_ELASTICITY, MAX_BUDGET_FACTOR, MAX_ELASTICITY, MIN_BUDGET_FACTOR, MIN_DATA_POINTS, BudgetOptimizer,
+)
+from core.services.event_ingestion import FLUSH_LEASE_KEY, EventBuffer, EventIngestionService, event_buffer
+from core.services.hourly_analytics import HourlyAnalyticsService
+from core.services.partitioning import ARCHIVE_SCHEMA, PartitionService
+from core.services.quotas import RATE_LIMITED, TOO_MANY_IN_FLIGHT, QuotaService
+from core.services.recommendations import (
+    MAX_NEXT_STEPS, MAX_RECOMMENDATIONS, PRIORITY_ORDER, RECOMMENDATION_FIELDS, RecommendationService,
+)
+from core.services.report_artifacts import ReportArtifactService
+from core.services.report_delivery import RecordingDelivery
+from core.services.report_scheduler import ReportScheduleRunner, group_overlapping
+from core.services.sequential_testing import BURN_IN_TRIALS, SequentialTestingService
+from core.services.synthetic_analytics import SyntheticAnalyticsService
+from core.services.timeseries import lttb_indices, minmax_indices
+from core.services.traffic_assignment import BUCKETS, TrafficAssignmentService
+from core.throttling import QuotaMixin
+from core.utils import http, ids
+from core.utils.db import ConcurrentAddIndex
+from core.utils.http import PROBE_RETRY_SECONDS, RETRY_BUDGET_MAX, CircuitBreaker, RetryBudget, aclose_clients
+from core.utils.report_generator import ReportGenerator
+from core.utils.timezone_utils import make_aware, now, today
+
+
+class BudgetRecommendationsViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(email='budget@example.com'))
+
+    def test_rejects_budgets_the_optimizer_cannot_solve(self):
+        for value in ('nan', 'inf', '-inf', '-100', '0', 'lots'):
+            with self.subTest(total_budget=value):
+                response = self.client.get('/api/predictive/budget/', {'total_budget': value})
+                self.assertEqual(response.status_code, 400)
+
+    def test_accepts_a_positive_budget(self):
+        response = self.client.get('/api/predictive/budget/', {'total_budget': '1000'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_reports_budget_the_bounds_could_not_allocate(self):
+        user = User.objects.create(email='clipped@example.com')
+        self.client.force_authenticate(user)
+        campaign = _campaign(user, budget=100)
+        DailyAnalytics.objects.bulk_create([
+            DailyAnalytics(campaign=campaign, user=user, date=today() - timedelta(days=day),
+                           spend=10 + day, conversions=1 + day // 3)
+            for day in range(1, 15)
+        ])
+        response = self.client.get('/api/predictive/budget/', {'total_budget': '1000'})
+        # At most double the current budget can be allocated
+        self.assertEqual(response.data['total_budget'], 200)
+        self.assertEqual(response.data['requested_budget'], 1000)
+        self.assertEqual(response.data['unallocated_budget'], 800)
+
+    def test_total_below_the_floors_is_a_hard_cap(self):
+        user = User.objects.create(email='capped@example.com')
+        self.client.force_authenticate(user)
+        for index in range(3):
+            campaign = _campaign(user, budget=100, title=f'Campaign {index}')
+            DailyAnalytics.objects.bulk_create([
+                DailyAnalytics(campaign=campaign, user=user, date=today() - timedelta(days=day),
+                               spend=10 + day, conversions=1 + day // (index + 2))
+                for day in range(1, 15)
+            ])
+        _campaign(user, budget=50, title='No data yet')
+        response = self.client.get('/api/predictive/budget/', {'total_budget': '1'})
+        self.assertEqual(response.data['total_budget'], 1)
+        self.assertEqual(response.data['unallocated_budget'], 0)
+        self.assertTrue(all(r['recommended_budget'] >= 0 for r in response.data['recommendations']))
+
+
+class BudgetOptimizerTests(SimpleTestCase):
+    def _sums(self, a, b, spend):
+        # Regression sums of noiseless conversions = a * spend ** b, as _solve queries them
+        log_spend = np.log(spend)
+        log_conversions = np.log(a) + b * log_spend
+        return (len(spend), log_spend.sum(), log_conversions.sum(),
+                (log_spend ** 2).sum(), (log_spend * log_conversions).sum())
+
+    def test_fit_recovers_a_and_b(self):
+        columns = np.array([
+            self._sums(2.0, 0.7, np.linspace(10, 100, 14)),
+            self._sums(0.5, 0.3, np.linspace(50, 80, 30)),
+        ]).T
+        a, b = BudgetOptimizer.fit_response_curves(*columns)
+        np.testing.assert_allclose(a, [2.0, 0.5])
+        np.testing.assert_allclose(b, [0.7, 0.3])
+
+    def test_fit_falls_back_to_the_prior_and_clips(self):
+        columns = np.array([
+            self._sums(1.0, 0.7, np.linspace(10, 20, MIN_DATA_POINTS - 1)),
+            self._sums(1.0, 1.4, np.linspace(10, 100, 14)),
+            self._sums(1.0, 0.7, np.full(10, 30.0)),
+        ]).T
+        _, b = BudgetOptimizer.fit_response_curves(*columns)
+        np.testing.assert_allclose(b, [DEFAULT_ELASTICITY, MAX_ELASTICITY, DEFAULT_ELASTICITY])
+
+    def _allocate(self, total, b=(0.52, 0.5, 0.48)):
+        b = np.array(b)
+        baseline = np.array([100.0, 100.0, 100.0])
+        cost = np.array([30.0, 30.0, 30.0])
+        x = BudgetOptimizer.allocate(np.ones(3), b, baseline, cost, total)
+        return x, baseline, cost
+
+    def test_allocation_spends_the_total_within_the_bounds(self):
+        for total in (4500, 9000, 15000):
+            with self.subTest(total=total):
+                x, baseline, cost = self._allocate(total)
+                self.assertAlmostEqual((cost * x).sum(), total, places=4)
+                self.assertTrue((x >= baseline * MIN_BUDGET_FACTOR - 1e-9).all())
+                self.assertTrue((x <= baseline * MAX_BUDGET_FACTOR + 1e-9).all())
+
+    def test_more_elastic_campaigns_get_more(self):
+        x, _, _ = self._allocate(9000)
+        self.assertGreater(x[0], x[1])
+        self.assertGreater(x[1], x[2])
+
+    def test_total_beyond_the_ceilings_fills_them(self):
+        x, baseline, _ = self._allocate(50000)
+        np.testing.assert_allclose(x, baseline * MAX_BUDGET_FACTOR)
+
+    def test_total_below_the_floors_lowers_them(self):
+        x, baseline, cost = self._allocate(900)
+        self.assertAlmostEqual((cost * x).sum(), 900)
+        np.testing.assert_allclose(x, baseline * MIN_BUDGET_FACTOR * 900 / 4500)
+
+
+class AdjustPValuesTests(SimpleTestCase):
+    def test_holm_steps_down_and_keeps_order(self):
+        adjusted = ABTestingService.adjust_p_values([0.04, 0.01, 0.03], 'holm')
+        # Sorted 0.01, 0.03, 0.04 times 3, 2, 1, made monotone
+        np.testing.assert_allclose(adjusted, [0.06, 0.03, 0.06])
+
+    def test_bonferroni_multiplies_by_the_family_size_capped_at_one(self):
+        adjusted = ABTestingService.adjust_p_values([0.01, 0.2, 0.6], 'bonferroni')
+        np.testing.assert_allclose(adjusted, [0.03, 0.6, 1.0])
+
+    def test_holm_never_rejects_less_than_bonferroni(self):
+        p_values = np.random.default_rng(27).uniform(size=20)
+        holm = ABTestingService.adjust_p_values(p_values, 'holm')
+        bonferroni = ABTestingService.adjust_p_values(p_values, 'bonferroni')
+        self.assertTrue((holm <= bonferroni + 1e-12).all())
+
+    def test_empty(self):
+        self.assertEqual(len(ABTestingService.adjust_p_values([])), 0)
+
+
+class ABTestAnalysisTests(SimpleTestCase):
+    def _analyze(self, counts, correction='holm'):
+        ab_test = ABTest(success_metric='ctr', confidence_level=95.0, min_sample_size=100)
+        variations = [
+            ABTestVariation(name=name, impressions=impressions, clicks=clicks)
+            for name, (impressions, clicks) in zip('ABC', counts)
+        ]
+        return ABTestingService._run_analysis(ab_test, variations, correction)
+
+    def test_omnibus_is_one_k_by_2_chi_square(self):
+        counts = [(1000, 50), (1000, 80), (1000, 52)]
+        analysis = self._analyze(counts)
+        observed = [[clicks, impressions - clicks] for impressions, clicks in counts]
+        chi2, p_value, _, _ = stats.chi2_contingency(observed)
+        self.assertAlmostEqual(analysis['omnibus']['chi2'], chi2)
+        self.assertAlmostEqual(analysis['omnibus']['p_value'], p_value)
+        self.assertEqual(analysis['omnibus']['variations'], 3)
+
+    def test_clear_winner_beats_every_other_variation(self):
+        analysis = self._analyze([(5000, 100), (5000, 300), (5000, 110)])
+        self.assertEqual(analysis['status'], 'completed')
+        self.assertEqual(analysis['winner'], 'B')
+        self.assertEqual([c['variation_b'] for c in analysis['comparisons']], ['A', 'C'])
+        for comparison in analysis['comparisons']:
+            self.assertGreaterEqual(comparison['adjusted_p_value'], comparison['p_value'])
+
+    def test_no_winner_when_one_comparison_is_not_significant(self):
+        # B beats A clearly but not C
+        analysis = self._analyze([(5000, 100), (5000, 300), (5000, 290)])
+        self.assertEqual(analysis['status'], 'inconclusive')
+
+    def test_insufficient_data_below_the_minimum_sample(self):
+        self.assertEqual(self._analyze([(50, 5), (5000, 300)])['status'], 'insufficient_data')
+
+
+def _campaign(user, **fields):
+    return Campaign.objects.create(**{
+        'user': user, 'title': 'Test campaign', 'platform': 'instagram',
+        'start_date': date(2026, 1, 1), 'end_date': date(2026, 12, 31), **fields,
+    })
+
+
+class FakeRedis:
+    """The few redis-py commands the event buffer uses, in memory"""
+
+    def __init__(self):
+        self.data, self.ttls = {}, {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key], self.ttls[key] = str(value).encode(), ex
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def expire(self, key, ttl):
+        if key not in self.data:
+            return False
+        self.ttls[key] = ttl
+        return True
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def rename(self, source, destination):
+        self.data[destination] = self.data.pop(source)
+
+    def hincrby(self, key, field, amount):
+        fields = self.data.setdefault(key, {})
+        fields[field.encode()] = fields.get(field.encode(), 0) + amount
+        return fields[field.encode()]
+
+    def hlen(self, key):
+        return len(self.data.get(key, {}))
+
+    def hgetall(self, key):
+        return {field: str(value).encode() for field, value in self.data.get(key, {}).items()}
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client, self.calls = client, []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class EventIngestionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create(email='owner@example.com')
+        self.other = User.objects.create(email='other@example.com')
+        self.variation = self._variation(self.owner)
+        self.other_variation = self._variation(self.other)
+
+    def _variation(self, user):
+        ab_test = ABTest.objects.create(campaign=_campaign(user), name='Test')
+        return ABTestVariation.objects.create(ab_test=ab_test, name='A')
+
+    def _event(self, variation, event_id='event-1'):
+        return {'id': event_id, 'target_id': str(variation.pk), 'type': 'impression'}
+
+    def test_event_ids_are_scoped_per_user(self):
+        buffer = EventBuffer(interval=0)
+        mine = EventIngestionService.ingest(self.owner, [self._event(self.variation)], buffer)
+        theirs = EventIngestionService.ingest(self.other, [self._event(self.other_variation)], buffer)
+        self.assertEqual((mine['accepted'], theirs['accepted']), (1, 1))
+        self.other_variation.refresh_from_db()
+        self.assertEqual(self.other_variation.impressions, 1)
+
+    def test_concurrent_batches_count_an_id_once(self):
+        events = [self._event(self.variation)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: EventIngestionService.deduplicate(self.owner, events)[0], range(32)))
+        self.assertEqual(sum(len(fresh) for fresh in results), 1)
+
+    def _later(self, seconds):
+        # Move the cache's clock forward instead of sleeping out a claim's TTL
+        return patch('time.time', return_value=time.time() + seconds)
+
+    @override_settings(EVENT_PENDING_CLAIM_TTL=1)
+    def test_client_events_are_written_before_they_are_acknowledged(self):
+        buffer = EventBuffer(interval=3600)
+        EventIngestionService.ingest(self.owner, [self._event(self.variation)], buffer)
+        self.assertEqual(buffer.pending(), 0)
+        self.variation.refresh_from_db()
+        self.assertEqual(self.variation.impressions, 1)
+        with self._later(2):
+            retry = EventIngestionService.ingest(self.owner, [self._event(self.variation)], buffer)
+        self.assertEqual(retry['duplicates'], 1)
+
+    def test_events_that_could_not_be_stored_are_counted_on_retry(self):
+        with patch.object(EventBuffer, '_write', side_effect=RuntimeError('database down')):
+            with self.assertRaises(RuntimeError):
+                EventIngestionService.ingest(self.owner, [self._event(self.variation)], EventBuffer(interval=3600))
+        retry = EventIngestionService.ingest(self.owner, [self._event(self.variation)], EventBuffer(interval=3600))
+        self.assertEqual(retry['accepted'], 1)
+
+    def test_store_failure_is_a_503(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        with patch.object(EventBuffer, '_write', side_effect=RuntimeError('database down')):
+            response = client.post('/api/events/', {'events': [self._event(self.variation)]}, format='json')
+        self.assertEqual(response.status_code, 503)
+
+    def _staged(self):
+        redis = FakeRedis()
+        return redis, patch('core.services.event_ingestion.redis_client', return_value=redis)
+
+    @override_settings(EVENT_DEDUP_TTL=3600)
+    def test_staged_deltas_outlive_the_worker_that_accepted_them(self):
+        redis, staged = self._staged()
+        with staged:
+            result = EventIngestionService.ingest(self.owner, [self._event(self.variation)], EventBuffer(interval=3600))
+            self.assertEqual(result['accepted'], 1)
+            self.assertEqual(redis.ttls[cache.make_and_validate_key(EventIngestionService.dedup_key(self.owner, 'event-1'))], 3600)
+            # Any other worker's buffer flushes them
+            self.assertEqual(EventBuffer(interval=3600).flush(), 1)
+            self.assertEqual(EventBuffer(interval=3600).flush(), 0)
+        self.variation.refresh_from_db()
+        self.assertEqual(self.variation.impressions, 1)
+
+    def test_a_failed_flush_leaves_the_staged_batch_for_the_next(self):
+        redis, staged = self._staged()
+        buffer = EventBuffer(interval=3600)
+        with staged:
+            EventIngestionService.ingest(self.owner, [self._event(self.variation, 'a')], buffer)
+            with patch.object(EventBuffer, '_write', side_effect=RuntimeError('database down')):
+                with self.assertRaises(RuntimeError):
+                    buffer.flush()
+            # Staged while the failed batch was waiting
+            EventIngestionService.ingest(self.owner, [self._event(self.variation, 'b')], buffer)
+            buffer.flush()
+            self.variation.refresh_from_db()
+            self.assertEqual(self.variation.impressions, 1)
+            buffer.flush()
+        self.variation.refresh_from_db()
+        self.assertEqual(self.variation.impressions, 2)
+
+    def test_one_worker_flushes_at_a_time(self):
+        redis, staged = self._staged()
+        buffer = EventBuffer(interval=3600)
+        with staged:
+            EventIngestionService.ingest(self.owner, [self._event(self.variation)], buffer)
+            redis.set(cache.make_and_validate_key(FLUSH_LEASE_KEY), 'other-worker', nx=True)
+            self.assertEqual(buffer.flush(), 0)
+            redis.delete(cache.make_and_validate_key(FLUSH_LEASE_KEY))
+            self.assertEqual(buffer.flush(), 1)
+
+    def test_non_object_body_is_rejected(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.post('/api/events/', [self._event(self.variation)], format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class CompileSplitTests(SimpleTestCase):
+    def _sizes(self, boundaries):
+        edges = [0, *boundaries, BUCKETS]
+        return [upper - lower for lower, upper in zip(edges, edges[1:])]
+
+    def test_largest_remainders_get_the_leftover_buckets(self):
+        boundaries, names = TrafficAssignmentService.compile_split({'A': 1, 'B': 1, 'C': 1}, ['A', 'B', 'C'])
+        self.assertEqual(names, ['A', 'B', 'C'])
+        self.assertEqual(self._sizes(boundaries), [3334, 3333, 3333])
+
+    def test_buckets_always_sum_to_the_total(self):
+        split = {'A': 12.5, 'B': 33.3, 'C': 0.01, 'D': 54.19}
+        boundaries, names = TrafficAssignmentService.compile_split(split, list(split))
+        sizes = self._sizes(boundaries)
+        self.assertEqual(sum(sizes), BUCKETS)
+        for name, size in zip(names, sizes):
+            self.assertLessEqual(abs(size - split[name] / sum(split.values()) * BUCKETS), 1)
+
+    def test_missing_and_invalid_weights_get_no_traffic(self):
+        boundaries, names = TrafficAssignmentService.compile_split({'A': 70, 'B': 'x', 'C': -5}, ['A', 'B', 'C', 'D'])
+        self.assertEqual((boundaries, names), ([], ['A']))
+
+    def test_no_positive_weight_splits_evenly(self):
+        boundaries, names = TrafficAssignmentService.compile_split({}, ['A', 'B'])
+        self.assertEqual((boundaries, names), ([5000], ['A', 'B']))
+
+
+class AssignABTestVariationViewTests(TestCase):
+    def setUp(self):
+        TrafficAssignmentService.invalidate()
+        user = User.objects.create(email='assign@example.com')
+        self.ab_test = ABTest.objects.create(campaign=_campaign(user), name='Test', status='running')
+        ABTestVariation.objects.create(ab_test=self.ab_test, name='A')
+        self.url = f'/api/ab-tests/{self.ab_test.pk}/assign/'
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def test_get_does_not_record_an_impression(self):
+        with patch.object(event_buffer, 'add') as add:
+            response = self.client.get(self.url, {'visitor_id': 'v1', 'record': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['variation'], 'A')
+        add.assert_not_called()
+
+    def test_post_records_an_impression(self):
+        with patch.object(event_buffer, 'add') as add:
+            response = self.client.post(self.url, {'visitor_id': 'v1'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        add.assert_called_once_with({('ab_variation', response.data['variation_id'], 'impressions'): 1})
+
+    def test_exposure_failure_still_serves_the_variation(self):
+        with patch.object(event_buffer, 'add', side_effect=ConnectionError('redis down')):
+            with self.assertLogs('core.services.traffic_assignment', level='ERROR'):
+                response = self.client.post(self.url, {'visitor_id': 'v1'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['variation'], 'A')
+
+    def test_missing_test_is_cached_until_invalidated(self):
+        missing = uuid.uuid4()
+        self.assertIsNone(TrafficAssignmentService.get_table(missing))
+        with self.assertNumQueries(0):
+            self.assertIsNone(TrafficAssignmentService.get_table(missing))
+        TrafficAssignmentService.invalidate(missing)
+        with self.assertNumQueries(1):
+            self.assertIsNone(TrafficAssignmentService.get_table(missing))
+
+
+class ReportGeneratorTests(SimpleTestCase):
+    def _render(self, story):
+        output = io.BytesIO()
+        ReportGenerator.render(story, output)
+        return output.getvalue()
+
+    def test_campaign_titles_are_text_not_markup(self):
+        campaign = Campaign(
+            title='<b>Promo & "Sale"', platform='instagram',
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, 31),
+        )
+        story = ReportGenerator.campaign_story(campaign, {})
+        self.assertEqual(story[1].getPlainText(), '<b>Promo & "Sale"')
+        self.assertTrue(self._render(story).startswith(b'%PDF'))
+
+    def test_scheduled_report_names_and_campaign_titles_are_text(self):
+        report = {
+            'name': 'R&D <weekly>',
+            'frequency': 'weekly',
+            'period': {'start': '2026-01-01', 'end': '2026-01-07'},
+            'metrics': {'impressions': 1000, 'spend': 12.5},
+            'campaigns': [{'title': '<i>Launch', 'impressions': 1000, 'clicks': 10, 'conversions': 1, 'spend': 12.5}],
+        }
+        story = ReportGenerator.scheduled_story(report)
+        self.assertEqual(story[1].getPlainText(), 'R&D <weekly>')
+        self.assertTrue(self._render(story).startswith(b'%PDF'))
+
+    def test_upload_failure_is_logged_and_reported(self):
+        user = User(id=1, email='report@example.com')
+        with patch.object(ReportGenerator, '_upload', side_effect=RuntimeError('cloudinary down')):
+            with self.assertLogs('core.utils.report_generator', level='ERROR') as logs:
+                result = ReportGenerator.generate_weekly_report(user, {})
+        self.assertEqual(result, {'success': False, 'error': 'cloudinary down'})
+        self.assertIn('Traceback', logs.output[0])
+
+
+class AnalyticsExportViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='export@example.com')
+        campaign = _campaign(self.user)
+        for day in (1, 2, 3):
+            DailyAnalytics.objects.create(campaign=campaign, date=date(2026, 3, day), impressions=100, clicks=day)
+        self.params = {'start_date': '2026-03-01', 'end_date': '2026-03-31'}
+
+    def _lines(self, content):
+        return content.decode().strip().splitlines()
+
+    def test_wsgi_streams_a_sync_iterator(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get('/api/analytics/export/', self.params)
+        self.assertFalse(response.is_async)
+        self.assertEqual(len(self._lines(b''.join(response.streaming_content))), 4)
+
+    async def test_asgi_streams_an_async_iterator(self):
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.user).access_token))()
+        response = await AsyncClient().get(
+            '/api/analytics/export/', self.params, headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(self._lines(content)[0], ','.join(EXPORT_COLUMNS))
+        self.assertEqual(len(self._lines(content)), 4)
+
+
+class DownsamplingTests(SimpleTestCase):
+    def setUp(self):
+        x = np.arange(1000)
+        self.values = np.sin(x / 40) * 100 + x / 10
+        self.values[417] = 500  # a spike the chart must not lose
+
+    def test_short_series_are_returned_whole(self):
+        np.testing.assert_array_equal(lttb_indices([1, 2, 3], 10), [0, 1, 2])
+        np.testing.assert_array_equal(minmax_indices([1, 2, 3], 10), [0, 1, 2])
+
+    def test_lttb_keeps_the_endpoints_and_the_spike(self):
+        indices = lttb_indices(self.values, 100)
+        self.assertEqual(len(indices), 100)
+        self.assertEqual((indices[0], indices[-1]), (0, 999))
+        self.assertTrue((np.diff(indices) > 0).all())
+        self.assertIn(417, indices)
+
+    def test_minmax_keeps_every_bucket_extreme_within_the_threshold(self):
+        indices = minmax_indices(self.values, 101)
+        self.assertLessEqual(len(indices), 101)
+        self.assertEqual((indices[0], indices[-1]), (0, 999))
+        self.assertIn(417, indices)
+        self.assertIn(int(self.values.argmin()), indices)
+
+    def test_minmax_honours_thresholds_below_four(self):
+        np.testing.assert_array_equal(minmax_indices(self.values, 3), [0, 417, 999])
+        np.testing.assert_array_equal(minmax_indices(self.values, 2), [0, 999])
+
+
+class RecommendationEvaluateTests(SimpleTestCase):
+    def _snapshot(self, **overrides):
+        snapshot = {
+            'avg_ctr': 3.0, 'conversion_rate': 6.0, 'click_growth': 0.0, 'best_day': 'Monday',
+            'best_day_ctr': 3.0, 'ads_generated': 10, 'total_spend': 0, 'roas': 0,
+            'active_campaigns': 3, 'top_campaign': None, 'worst_campaign': None,
+        }
+        snapshot.update(overrides)
+        return snapshot
+
+    def test_quiet_week_only_gets_the_standing_next_steps(self):
+        recommendations, next_steps = RecommendationService.evaluate(self._snapshot())
+        self.assertEqual(recommendations, [])
+        self.assertEqual(next_steps, [
+            'Check audience insights for optimal posting times',
+            'Review budget allocation across all campaigns',
+        ])
+
+    def test_templates_are_filled_from_the_snapshot(self):
+        snapshot = self._snapshot(top_campaign={'title': 'Spring', 'score': 82}, ads_generated=4)
+        recommendations, next_steps = RecommendationService.evaluate(snapshot)
+        by_title = {r['title']: r for r in recommendations}
+        self.assertIn('Scale Top Performer: Spring', by_title)
+        self.assertEqual(by_title['Increase Ad Variations']['current'], '4 ads')
+        self.assertIn('Generate 6 more ad variations for testing', next_steps)
+        for recommendation in recommendations:
+            self.assertEqual(set(recommendation), set(RECOMMENDATION_FIELDS))
+
+    def test_high_priority_first_and_capped(self):
+        snapshot = self._snapshot(
+            avg_ctr=1.0, click_growth=-30, best_day_ctr=2.0, ads_generated=0, total_spend=100, roas=1.0,
+            active_campaigns=0, top_campaign={'title': 'A', 'score': 90}, worst_campaign={'title': 'B', 'score': 10},
+        )
+        recommendations, next_steps = RecommendationService.evaluate(snapshot)
+        self.assertEqual(len(recommendations), MAX_RECOMMENDATIONS)
+        self.assertEqual(len(next_steps), MAX_NEXT_STEPS)
+        priorities = [PRIORITY_ORDER[r['priority']] for r in recommendations]
+        self.assertEqual(priorities, sorted(priorities))
+        self.assertEqual(recommendations[0]['title'], 'Improve Click-Through Rate')
+
+
+class SyntheticAnalyticsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='owner@example.com')
+        self.running = _campaign(self.user, start_date=today() - timedelta(days=60), budget=3000)
+        self.new = _campaign(self.user, start_date=today() - timedelta(days=5), budget=600)
+        self.campaigns = Campaign.objects.filter(user=self.user)
+
+    def _series(self, seed):
+        # As generate() draws them: campaigns in pk order, no content so 500
+        # impressions a day for instagram
+        campaigns = list(self.campaigns.order_by('pk'))
+        return campaigns, SyntheticAnalyticsService.series(
+            today() - timedelta(days=29), 30, [c.start_date for c in campaigns], [500] * len(campaigns),
+            [float(c.budget) for c in campaigns], seed=seed,
+        )
+
+    def test_same_seed_same_series(self):
+        (_, first), (_, again), (_, other) = self._series(7), self._series(7), self._series(8)
+        for name in first:
+            np.testing.assert_array_equal(first[name], again[name])
+        self.assertFalse(np.array_equal(first['impressions'], other['impressions']))
+
+    def test_days_before_the_start_date_are_not_written(self):
+        self.assertEqual(SyntheticAnalyticsService.generate(self.campaigns, days=30, seed=1)['rows'], 36)
+        dates = DailyAnalytics.objects.filter(campaign=self.new).values_list('date', flat=True)
+        self.assertEqual(len(dates), 6)
+        self.assertEqual(min(dates), self.new.start_date)
+        self.assertEqual(DailyAnalytics.objects.filter(campaign=self.running).count(), 30)
+
+    def test_rerun_upserts_instead_of_duplicating(self):
+        SyntheticAnalyticsService.generate(self.campaigns, days=30, seed=1)
+        SyntheticAnalyticsService.generate(self.campaigns, days=30, seed=2)
+        self.assertEqual(DailyAnalytics.objects.filter(user=self.user).count(), 36)
+        campaigns, series = self._series(2)
+        row = campaigns.index(self.running)
+        stored = DailyAnalytics.objects.filter(campaign=self.running).order_by('date').values_list('impressions', flat=True)
+        self.assertEqual(list(stored), series['impressions'][row].tolist())
+
+    def test_rebuild_matches_update_metrics(self):
+        SyntheticAnalyticsService.generate(self.campaigns, days=30, seed=3)
+        fields = (
+            'total_impressions', 'total_clicks', 'total_conversions', 'total_spend',
+            'avg_ctr', 'avg_cpc', 'avg_conversion_rate', 'roas', 'performance_score',
+        )
+        for campaign in (self.running, self.new):
+            with self.subTest(campaign=campaign.start_date):
+                summary = CampaignAnalyticsSummary.objects.get(campaign=campaign)
+                rebuilt = [getattr(summary, field) for field in fields]
+                summary.update_metrics()
+                summary.refresh_from_db()
+                self.assertEqual(rebuilt, [getattr(summary, field) for field in fields])
+
+
+class AccessPathPlanTests(TestCase):
+    """The hot ownership and analytics queries are answered through their indexes"""
+
+    def test_queries_use_their_indexes(self):
+        users = indexes._seed(tenants=20, campaigns_per_tenant=5, days=30)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            if connection.vendor == 'postgresql':
+                # Tables this small are cheaper to scan; check the indexes can serve the queries
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+        user, day = users[len(users) // 2], today()
+        for name, (build, expected) in indexes.ACCESS_PATHS.items():
+            names = expected.get(connection.vendor)
+            if not names:
+                continue
+            with self.subTest(name):
+                plan = build(user, day).explain()
+                self.assertTrue(indexes._plan_uses(plan, indexes._with_partition_indexes(names)), plan)
+
+
+class OwnerColumnTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create(email='first@example.com')
+        self.campaign = _campaign(self.owner)
+        self.ad = AdContent.objects.create(campaign=self.campaign, text='Ad', tone='casual', platform='instagram')
+
+    def _owned_table_writes(self, save):
+        with CaptureQueriesContext(connection) as queries:
+            save()
+        return [q['sql'] for q in queries if q['sql'].startswith('UPDATE "core_adcontent"')]
+
+    def test_saves_without_an_owner_change_leave_owned_rows_alone(self):
+        campaign = Campaign.objects.get(pk=self.campaign.pk)
+        campaign.title = 'Renamed'
+        self.assertEqual(self._owned_table_writes(campaign.save), [])
+
+    def test_owner_change_repoints_owned_rows(self):
+        new_owner = User.objects.create(email='second@example.com')
+        campaign = Campaign.objects.get(pk=self.campaign.pk)
+        campaign.user = new_owner
+        self.assertEqual(len(self._owned_table_writes(campaign.save)), 1)
+        self.ad.refresh_from_db()
+        self.assertEqual(self.ad.user_id, new_owner.pk)
+
+    def test_owned_rows_resolve_the_owner_only_when_created(self):
+        ad = AdContent.objects.get(pk=self.ad.pk)
+        ad.text = 'Edited'
+        with CaptureQueriesContext(connection) as queries:
+            ad.save()
+        self.assertFalse([q['sql'] for q in queries if 'FROM "core_campaign"' in q['sql']])
+        self.assertEqual(ad.user_id, self.owner.pk)
+
+
+class ConcurrentIndexTests(SimpleTestCase):
+    def _forwards(self, vendor):
+        state = MigrationLoader(None).project_state(('core', '0021_active_campaign_partial_index'))
+        operation = ConcurrentAddIndex(
+            model_name='dailyanalytics',
+            index=models.Index(fields=['date'], name='dailyanalytics_test_idx'),
+        )
+        schema_editor = MagicMock()
+        schema_editor.connection.vendor = vendor
+        schema_editor.connection.alias = DEFAULT_DB_ALIAS
+        schema_editor.connection.in_atomic_block = False
+        operation.database_forwards('core', schema_editor, state, state)
+        return schema_editor.add_index.call_args
+
+    def test_postgres_builds_the_index_concurrently(self):
+        self.assertEqual(self._forwards('postgresql').kwargs, {'concurrently': True})
+
+    def test_other_backends_build_a_plain_index(self):
+        self.assertEqual(self._forwards('sqlite').kwargs, {})
+
+
+class PartitionServiceTests(SimpleTestCase):
+    table = DailyAnalytics._meta.db_table
+
+    def _partitions(self, *months, default=True):
+        names = [f'{self.table}_p{month}' for month in months] + ([f'{self.table}_default'] if default else [])
+        return patch.object(PartitionService, 'partitions', return_value=names)
+
+    def test_expire_archives_months_before_the_retention_cutoff(self):
+        with self._partitions('2026_02', '2026_03', '2026_04'):
+            statements = PartitionService.expire(DailyAnalytics, date(2026, 6, 15), retention_months=3)
+        # Cutoff is March 2026: only February ends before it, the default stays
+        self.assertEqual(statements, [
+            f'CREATE SCHEMA IF NOT EXISTS "{ARCHIVE_SCHEMA}"',
+            f'ALTER TABLE "{self.table}" DETACH PARTITION "{self.table}_p2026_02"',
+            f'ALTER TABLE "{self.table}_p2026_02" SET SCHEMA "{ARCHIVE_SCHEMA}"',
+        ])
+
+    def test_expire_drops_instead_of_archiving(self):
+        with self._partitions('2026_02', '2026_03'):
+            statements = PartitionService.expire(DailyAnalytics, date(2026, 6, 15), retention_months=3, drop=True)
+        self.assertEqual(statements, [
+            f'ALTER TABLE "{self.table}" DETACH PARTITION "{self.table}_p2026_02"',
+            f'DROP TABLE "{self.table}_p2026_02"',
+        ])
+
+    def test_expire_keeps_everything_inside_the_window(self):
+        with self._partitions('2026_02', '2026_03'):
+            self.assertEqual(PartitionService.expire(DailyAnalytics, date(2026, 6, 15), retention_months=12), [])
+
+    def test_ensure_future_creates_only_missing_months(self):
+        with self._partitions('2026_06', '2026_08', default=False):
+            statements = PartitionService.ensure_future(DailyAnalytics, 'date', date(2026, 6, 15), months_ahead=2)
+        self.assertEqual(statements, [
+            f'CREATE TABLE "{self.table}_p2026_07" PARTITION OF "{self.table}" '
+            f"FOR VALUES FROM ('2026-07-01') TO ('2026-08-01')",
+        ])
+
+    def test_ensure_future_moves_the_month_out_of_the_default_partition(self):
+        with self._partitions('2026_06'):
+            statements = PartitionService.ensure_future(DailyAnalytics, 'date', date(2026, 6, 15), months_ahead=1)
+        where = '"date" >= \'2026-07-01\' AND "date" < \'2026-08-01\''
+        self.assertEqual(statements, [
+            f'CREATE TABLE "{self.table}_p2026_07" (LIKE "{self.table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+            f'INSERT INTO "{self.table}_p2026_07" SELECT * FROM "{self.table}_default" WHERE {where}',
+            f'DELETE FROM "{self.table}_default" WHERE {where}',
+            f'ALTER TABLE "{self.table}" ATTACH PARTITION "{self.table}_p2026_07" '
+            f"FOR VALUES FROM ('2026-07-01') TO ('2026-08-01')",
+        ])
+
+    def test_convert_copies_before_dropping_and_keys_after(self):
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [
+            [('owner_fk', 'FOREIGN KEY (user_id) REFERENCES core_user(id)')],
+            [('CREATE INDEX dailyanalytics_user_date_idx ON core_dailyanalytics (user_id, date)',)],
+        ]
+        cursor.fetchone.return_value = (date(2026, 5, 3), date(2026, 6, 1))
+        with patch('core.services.partitioning.connection') as fake:
+            fake.ops.quote_name = connection.ops.quote_name
+            fake.cursor.return_value.__enter__.return_value = cursor
+            statements = PartitionService.convert(DailyAnalytics, 'date', date(2026, 6, 15), months_ahead=1)
+
+        legacy = f'"{self.table}_legacy"'
+        self.assertEqual(statements[0], f'ALTER TABLE "{self.table}" RENAME TO {legacy}')
+        self.assertTrue(statements[1].startswith(f'CREATE TABLE "{self.table}" (LIKE {legacy}'))
+        self.assertEqual(
+            [s.split(' PARTITION OF ')[0] for s in statements[2:6]],
+            [f'CREATE TABLE "{self.table}_p2026_0{month}"' for month in (5, 6, 7)] + [f'CREATE TABLE "{self.table}_default"'],
+        )
+        self.assertEqual(statements[6:], [
+            f'INSERT INTO "{self.table}" SELECT * FROM {legacy}',
+            f'DROP TABLE {legacy}',
+            f'ALTER TABLE "{self.table}" ADD PRIMARY KEY ("id", "date")',
+            f'ALTER TABLE "{self.table}" ADD CONSTRAINT "owner_fk" FOREIGN KEY (user_id) REFERENCES core_user(id)',
+            'CREATE INDEX dailyanalytics_user_date_idx ON core_dailyanalytics (user_id, date)',
+        ])
+
+
+class UUID7Tests(SimpleTestCase):
+    def setUp(self):
+        # Each test starts from a fresh per-process high-water mark
+        patcher = patch.object(ids, '_last', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _at(self, nanoseconds):
+        return patch('core.utils.ids.time.time_ns', return_value=nanoseconds)
+
+    def test_version_and_variant_bits(self):
+        for value in [ids.uuid7() for _ in range(100)]:
+            self.assertEqual(value.version, 7)
+            self.assertEqual(value.variant, uuid.RFC_4122)
+
+    def test_ids_within_one_tick_strictly_increase(self):
+        with self._at(1_760_000_000_000_000_000):
+            values = [ids.uuid7() for _ in range(1000)]
+        self.assertEqual(values, sorted(set(values), key=lambda value: value.int))
+        self.assertEqual({(value.version, value.variant) for value in values}, {(7, uuid.RFC_4122)})
+
+    def test_clock_stepping_back_stays_ordered(self):
+        now_ns = time.time_ns()
+        with self._at(now_ns):
+            before = ids.uuid7()
+        with self._at(now_ns - 3600 * 10**9):
+            during = [ids.uuid7() for _ in range(10)]
+        with self._at(now_ns + 10**9):
+            after = ids.uuid7()
+        self.assertEqual([before, *during, after], sorted([before, *during, after], key=lambda value: value.int))
+        self.assertEqual(len({before, *during, after}), 12)
+        # Once the clock passes the last id again, ids carry the real time
+        self.assertEqual(ids.uuid7_time(after), (now_ns + 10**9) // 10**6 / 1000)
+
+    def test_uuid7_time_round_trip(self):
+        with self._at(1_760_000_000_123_456_789):
+            value = ids.uuid7()
+        self.assertEqual(ids.uuid7_time(value), 1_760_000_000.123)
+
+
+class DatabaseConfigTests(SimpleTestCase):
+    def setUp(self):
+        patcher = patch('backend.database.pool_available', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _env(self, **values):
+        # Start from none of the variables database.py reads
+        names = ('DB_POOL', 'SERVER_MODE', 'CONN_MAX_AGE', 'CONN_HEALTH_CHECKS', 'DB_POOL_MAX_SIZE')
+        env = {key: value for key, value in os.environ.items() if key not in names}
+        return patch.dict(os.environ, {**env, **values}, clear=True)
+
+    def test_persistent_connections_by_default(self):
+        with self._env(CONN_MAX_AGE='120'):
+            options = connection_options('django.db.backends.postgresql')
+        self.assertEqual(options, {'CONN_MAX_AGE': 120, 'CONN_HEALTH_CHECKS': True})
+
+    def test_pool_forces_conn_max_age_zero_on_postgres(self):
+        with self._env(DB_POOL='true', CONN_MAX_AGE='600', DB_POOL_MAX_SIZE='8'):
+            config = database_config('postgres://user:secret@db:5432/advision')
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        self.assertEqual(config['OPTIONS']['pool']['max_size'], 8)
+
+    def test_pool_keeps_explicit_options(self):
+        with self._env(DB_POOL='true'):
+            config = database_config(
+                ENGINE='django.db.backends.postgresql', NAME='advision', OPTIONS={'sslmode': 'require'}
+            )
+        self.assertEqual(config['OPTIONS']['sslmode'], 'require')
+        self.assertIn('pool', config['OPTIONS'])
+
+    def test_other_engines_ignore_the_pool(self):
+        with self._env(DB_POOL='true', CONN_MAX_AGE='600'):
+            config = database_config('sqlite:////tmp/advision.sqlite3')
+        self.assertEqual(config['CONN_MAX_AGE'], 600)
+        self.assertNotIn('pool', config['OPTIONS'])
+
+    def test_pool_without_psycopg_3_falls_back_to_persistent_connections(self):
+        with self._env(DB_POOL='true', CONN_MAX_AGE='600'), patch('backend.database.pool_available', return_value=False):
+            options = connection_options('django.db.backends.postgresql')
+        self.assertEqual(options['CONN_MAX_AGE'], 600)
+        self.assertNotIn('OPTIONS', options)
+
+    def test_asgi_mode_forces_conn_max_age_zero(self):
+        for engine in ('django.db.backends.postgresql', 'django.db.backends.sqlite3'):
+            with self.subTest(engine), self._env(SERVER_MODE='asgi', CONN_MAX_AGE='600'):
+                self.assertEqual(connection_options(engine)['CONN_MAX_AGE'], 0)
+
+
+@override_settings(API_QUOTAS={
+    'slow': {'rate': 1, 'period': 60, 'burst': 3},
+    'fast': {'rate': 20, 'period': 1, 'burst': 2},
+    'capped': {'rate': 1000, 'period': 1, 'burst': 1000, 'concurrency': 2},
+})
+class QuotaServiceTests(SimpleTestCase):
+    def setUp(self):
+        self.ident = f'test:{uuid.uuid4().hex}'
+
+    def test_allows_the_burst_then_asks_to_wait_one_interval(self):
+        results = [QuotaService.acquire('slow', self.ident) for _ in range(4)]
+        self.assertEqual(results[:3], [(True, 0.0, None)] * 3)
+        allowed, wait, reason = results[3]
+        self.assertEqual((allowed, reason), (False, RATE_LIMITED))
+        self.assertAlmostEqual(wait, 60, delta=1)
+
+    def test_refills_one_request_per_interval(self):
+        for _ in range(2):
+            self.assertTrue(QuotaService.acquire('fast', self.ident)[0])
+        self.assertFalse(QuotaService.acquire('fast', self.ident)[0])
+        time.sleep(0.06)
+        self.assertTrue(QuotaService.acquire('fast', self.ident)[0])
+        self.assertFalse(QuotaService.acquire('fast', self.ident)[0])
+
+    def test_idents_do_not_share_a_bucket(self):
+        for _ in range(3):
+            QuotaService.acquire('slow', self.ident)
+        self.assertTrue(QuotaService.acquire('slow', f'{self.ident}:other')[0])
+
+    def test_in_flight_cap_until_release(self):
+        self.assertTrue(QuotaService.acquire('capped', self.ident)[0])
+        self.assertTrue(QuotaService.acquire('capped', self.ident)[0])
+        self.assertEqual(QuotaService.acquire('capped', self.ident)[2], TOO_MANY_IN_FLIGHT)
+        QuotaService.release('capped', self.ident)
+        self.assertTrue(QuotaService.acquire('capped', self.ident)[0])
+
+    def test_concurrent_callers_get_exactly_the_burst(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: QuotaService.acquire('slow', self.ident)[0], range(40)))
+        self.assertEqual(sum(results), 3)
+
+
+class HangingQuotaView(QuotaMixin, AsyncAPIView):
+    permission_classes = [permissions.AllowAny]
+    quota_scope = 'single'
+    started = None
+
+    async def get(self, request):
+        HangingQuotaView.started.set()
+        await asyncio.Event().wait()
+
+
+class FailingQuotaView(QuotaMixin, APIView):
+    permission_classes = [permissions.AllowAny]
+    quota_scope = 'single'
+
+    def get(self, request):
+        raise RuntimeError('upstream exploded')
+
+
+class FailingAsyncQuotaView(QuotaMixin, AsyncAPIView):
+    permission_classes = [permissions.AllowAny]
+    quota_scope = 'single'
+
+    async def get(self, request):
+        raise RuntimeError('upstream exploded')
+
+
+@override_settings(API_QUOTAS={'single': {'rate': 1000, 'period': 1, 'burst': 1000, 'concurrency': 1}})
+class QuotaMixinTests(SimpleTestCase):
+    ident = 'addr:127.0.0.1'
+
+    def setUp(self):
+        cache.clear()
+
+    def _slot_is_free(self):
+        allowed = QuotaService.acquire('single', self.ident)[0]
+        if allowed:
+            QuotaService.release('single', self.ident)
+        return allowed
+
+    def test_cancelled_async_request_releases_its_slot(self):
+        async def disconnect():
+            HangingQuotaView.started = asyncio.Event()
+            task = asyncio.ensure_future(HangingQuotaView.as_view()(APIRequestFactory().get('/')))
+            await HangingQuotaView.started.wait()
+            self.assertFalse(self._slot_is_free())
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        async_to_sync(disconnect)()
+        self.assertTrue(self._slot_is_free())
+
+    def test_re_raised_exception_releases_the_slot(self):
+        for view in (FailingQuotaView, FailingAsyncQuotaView):
+            with self.subTest(view.__name__):
+                request = APIRequestFactory().get('/')
+                with self.assertRaises(RuntimeError):
+                    response = view.as_view()(request)
+                    if asyncio.iscoroutine(response):
+                        async_to_sync(asyncio.wait_for)(response, None)
+                self.assertTrue(self._slot_is_free())
+
+
+class RequestInstrumentationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(email='metrics@example.com'))
+
+    def _db_queries(self, view):
+        return tuple(
+            REGISTRY.get_sample_value(f'advision_request_db_queries_{sample}', {'view': view}) or 0
+            for sample in ('count', 'sum')
+        )
+
+    def test_queries_are_counted_per_view_through_the_execute_wrapper(self):
+        self.assertIn(instrumentation._time_query, connection.execute_wrappers)
+        requests, queries_before = self._db_queries('campaign-list')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/campaigns/')
+        self.assertTrue(queries)
+        self.assertEqual(self._db_queries('campaign-list'), (requests + 1, queries_before + len(queries)))
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_metrics_require_the_token(self):
+        for authorization in (None, 'Bearer wrong', 's3cret'):
+            with self.subTest(authorization):
+                headers = {'HTTP_AUTHORIZATION': authorization} if authorization else {}
+                self.assertEqual(self.client.get('/metrics', **headers).status_code, 401)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'advision_request_duration_seconds', response.content)
+
+    @override_settings(SLOW_REQUEST_SECONDS=0, SLOW_REQUEST_TOP_QUERIES=50)
+    def test_slow_request_is_logged_with_its_top_queries(self):
+        with self.assertLogs('core.instrumentation', 'WARNING') as logs:
+            self.client.get('/api/campaigns/')
+        line = json.loads(logs.records[0].getMessage().removeprefix('slow_request '))
+        self.assertEqual((line['view'], line['method'], line['status']), ('campaign-list', 'GET', 200))
+        self.assertEqual(sum(query['count'] for query in line['top_queries']), line['db_queries'])
+        self.assertTrue(any('core_campaign' in query['sql'] for query in line['top_queries']))
+
+    def test_top_queries_group_identical_sql_by_total_time(self):
+        stats = instrumentation.RequestStats()
+        for sql, seconds in (('SELECT 1', 0.002), ('SELECT 2', 0.003), ('SELECT 1', 0.002)):
+            stats.add_query(sql, seconds)
+        self.assertEqual(stats.top_queries(1), [{'sql': 'SELECT 1', 'count': 2, 'ms': 4.0}])
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_opens_after_consecutive_failures_only(self):
+        breaker = CircuitBreaker(failures=3, reset=60)
+        breaker.failure()
+        breaker.failure()
+        breaker.success()
+        self.assertFalse(breaker.failure() or breaker.failure())
+        self.assertTrue(breaker.failure())
+        self.assertTrue(breaker.is_open)
+        self.assertAlmostEqual(breaker.allow(), 60, delta=1)
+
+    def test_half_open_lets_one_trial_through(self):
+        breaker = CircuitBreaker(failures=1, reset=0.05)
+        breaker.failure()
+        time.sleep(0.06)
+        self.assertEqual(breaker.allow(), 0)
+        self.assertEqual(breaker.allow(), PROBE_RETRY_SECONDS)
+        breaker.success()
+        self.assertFalse(breaker.is_open)
+        self.assertEqual(breaker.allow(), 0)
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker(failures=3, reset=0.05)
+        for _ in range(3):
+            breaker.failure()
+        time.sleep(0.06)
+        self.assertEqual(breaker.allow(), 0)
+        self.assertTrue(breaker.failure())
+        self.assertGreater(breaker.allow(), 0.04)
+
+
+class RetryBudgetTests(SimpleTestCase):
+    def test_starts_full_and_refills_by_ratio(self):
+        budget = RetryBudget(ratio=0.5)
+        self.assertEqual(sum(budget.withdraw() for _ in range(RETRY_BUDGET_MAX + 5)), RETRY_BUDGET_MAX)
+        budget.deposit()
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        self.assertTrue(budget.withdraw())
+
+    def test_never_banks_more_than_the_maximum(self):
+        budget = RetryBudget(ratio=1)
+        for _ in range(100):
+            budget.deposit()
+        self.assertEqual(sum(budget.withdraw() for _ in range(100)), RETRY_BUDGET_MAX)
+
+
+class AsyncClientLifetimeTests(SimpleTestCase):
+    def test_aclose_clients_closes_the_loops_clients(self):
+        async def run():
+            first = http._async_client(http.provider('test-lifetime'))
+            await aclose_clients()
+            return first, http._async_client(http.provider('test-lifetime'))
+
+        first, second = asyncio.run(run())
+        self.assertTrue(first.is_closed)
+        self.assertIsNot(first, second)
+
+    def test_async_views_close_their_clients_under_wsgi_only(self):
+        with patch('core.async_views.aclose_clients', new_callable=AsyncMock) as close:
+            self.assertEqual(APIClient().post('/api/auth/google/', {}, format='json').status_code, 400)
+            close.assert_awaited_once()
+            close.reset_mock()
+            response = async_to_sync(AsyncClient().post)('/api/auth/google/', {}, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+            close.assert_not_awaited()
+
+
+class SequentialTestingTests(TestCase):
+    def setUp(self):
+        user = User.objects.create(email='sequential@example.com')
+        self.ab_test = ABTest.objects.create(
+            campaign=_campaign(user), name='Sequential', status='running',
+            analysis_mode='sequential', success_metric='ctr', confidence_level=95.0,
+        )
+
+    def _variations(self, *counts):
+        return [
+            ABTestVariation.objects.create(ab_test=self.ab_test, name=name, impressions=impressions, clicks=clicks)
+            for name, (impressions, clicks) in zip('AB', counts)
+        ]
+
+    def test_clear_winner_completes_the_test(self):
+        variations = self._variations((2000, 60), (2000, 140))
+        analysis = SequentialTestingService.update(self.ab_test, variations)
+        self.assertEqual((analysis['status'], analysis['winner']), ('completed', 'B'))
+        self.ab_test.refresh_from_db()
+        self.assertEqual((self.ab_test.status, self.ab_test.winner), ('completed', 'B'))
+        self.assertGreater(self.ab_test.posterior['B']['probability_to_be_best'], 0.95)
+
+    def test_close_race_keeps_running(self):
+        variations = self._variations((2000, 100), (2000, 104))
+        self.assertEqual(SequentialTestingService.update(self.ab_test, variations)['status'], 'inconclusive')
+        self.ab_test.refresh_from_db()
+        self.assertEqual(self.ab_test.status, 'running')
+        self.assertFalse(self.ab_test.winner)
+
+    def test_burn_in_blocks_an_early_stop(self):
+        variations = self._variations((BURN_IN_TRIALS - 1, 0), (BURN_IN_TRIALS - 1, 40))
+        self.assertEqual(SequentialTestingService.update(self.ab_test, variations)['status'], 'insufficient_data')
+        self.ab_test.refresh_from_db()
+        self.assertEqual(self.ab_test.status, 'running')
+
+    def test_same_counts_give_the_same_answer(self):
+        variations = self._variations((2000, 100), (2000, 110))
+        first = SequentialTestingService.evaluate(self.ab_test, variations)
+        self.assertEqual(first, SequentialTestingService.evaluate(self.ab_test, variations))
+
+    def test_counter_saves_re_evaluate_only_when_the_counts_change(self):
+        self._variations((2000, 100), (2000, 104))
+        variation = ABTestVariation.objects.get(ab_test=self.ab_test, name='A')
+        with patch.object(SequentialTestingService, 'update') as update:
+            variation.spend = 10
+            variation.save()
+            update.assert_not_called()
+            variation.clicks += 1
+            variation.save()
+            update.assert_called_once()
+
+    def test_polls_of_a_running_test_are_cached_and_read_only(self):
+        cache.clear()
+        variations = self._variations((2000, 100), (2000, 104))
+        with patch.object(SequentialTestingService, 'posterior', wraps=SequentialTestingService.posterior) as posterior, \
+                patch.object(SequentialTestingService, 'update') as update:
+            first = SequentialTestingService.analyze(self.ab_test, variations)
+            self.assertEqual(SequentialTestingService.analyze(self.ab_test, variations), first)
+            self.assertEqual(posterior.call_count, 1)
+            variations[0].clicks += 1
+            SequentialTestingService.analyze(self.ab_test, variations)
+            self.assertEqual(posterior.call_count, 2)
+            update.assert_not_called()
+
+    def test_completed_test_reports_its_stored_posterior(self):
+        variations = self._variations((2000, 60), (2000, 140))
+        SequentialTestingService.update(self.ab_test, variations)
+        with patch.object(SequentialTestingService, 'posterior') as posterior:
+            analysis = SequentialTestingService.analyze(self.ab_test, variations)
+        posterior.assert_not_called()
+        self.assertEqual((analysis['status'], analysis['winner']), ('completed', 'B'))
+        self.assertEqual(
+            {v['name']: v['probability_to_be_best'] for v in analysis['variations']},
+            {name: stored['probability_to_be_best'] for name, stored in self.ab_test.posterior.items()},
+        )
+        self.assertEqual((analysis['details']['metric_a'], analysis['details']['metric_b']), (7.0, 3.0))
+
+
+class ReportScheduleRunnerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='owner@example.com')
+        self.shared = _campaign(self.user, title='Shared')
+        self.now = now()
+        storage = tempfile.TemporaryDirectory()
+        self.addCleanup(storage.cleanup)
+        self.storage_path = storage.name
+
+    def _schedule(self, *campaigns, **fields):
+        schedule = ReportSchedule.objects.create(**{
+            'user': self.user, 'name': 'Weekly', 'format': 'slack',
+            'next_run': self.now - timedelta(hours=1), **fields,
+        })
+        schedule.include_campaigns.set(campaigns)
+        return schedule
+
+    def _runner(self, delivery):
+        return ReportScheduleRunner(deliverers={'slack': delivery}, render_workers=1, storage_path=self.storage_path)
+
+    def test_overlapping_schedules_are_grouped(self):
+        groups = group_overlapping({'a': {1, 2}, 'b': {3}, 'c': {2, 4}, 'd': {4, 5}})
+        self.assertEqual(sorted(sorted(group) for group in groups), [['a', 'c', 'd'], ['b']])
+
+    def test_a_claimed_schedule_is_not_claimed_again(self):
+        first, second = self._schedule(self.shared), self._schedule(self.shared)
+        claims = [ReportScheduleRunner.claim_due(limit=1, now=self.now) for _ in range(3)]
+        self.assertEqual(sorted(s.id for claim in claims for s in claim), sorted([first.id, second.id]))
+
+    def test_claiming_moves_next_run_forward(self):
+        schedule = self._schedule(self.shared, frequency='daily', next_run=self.now - timedelta(days=3, hours=1))
+        ReportScheduleRunner.claim_due(now=self.now)
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.last_run, self.now)
+        self.assertGreater(schedule.next_run, self.now)
+        self.assertLessEqual(schedule.next_run, self.now + timedelta(days=1))
+
+    def test_overlapping_schedules_share_one_metrics_read(self):
+        other = _campaign(self.user, title='Other')
+        DailyAnalytics.objects.create(campaign=self.shared, date=self.now.date() - timedelta(days=1), impressions=100, clicks=5)
+        schedules = [self._schedule(self.shared), self._schedule(self.shared, other)]
+        with CaptureQueriesContext(connection) as queries:
+            reports = self._runner(RecordingDelivery()).build_reports(schedules, now=self.now)
+        self.assertEqual(sum('dailyanalytics' in q['sql'] for q in queries.captured_queries), 1)
+        self.assertEqual([report['metrics']['impressions'] for _, report in reports], [100, 100])
+
+    def test_run_once_delivers_and_records(self):
+        delivery = RecordingDelivery()
+        schedule = self._schedule(self.shared)
+        self.assertEqual(self._runner(delivery).run_once(now=self.now), {'claimed': 1, 'delivered': 1, 'failed': 0})
+        self.assertEqual([sent['schedule_id'] for sent in delivery.sent], [str(schedule.id)])
+        self.assertTrue(GeneratedReport.objects.get(schedule=schedule).sent_successfully)
+
+    def test_delivery_failure_is_recorded(self):
+        schedule = self._schedule(self.shared)
+        self.assertEqual(self._runner(RecordingDelivery(fail=True)).run_once(now=self.now)['failed'], 1)
+        report = GeneratedReport.objects.get(schedule=schedule)
+        self.assertFalse(report.sent_successfully)
+        self.assertIn('Delivery failed', report.delivery_errors)
+        # At most once: the failed run is not retried before the next one
+        self.assertEqual(ReportScheduleRunner.claim_due(now=self.now), [])
+
+
+@patch('core.services.report_artifacts.CloudinaryStorage.delete_file', return_value={'success': True})
+class ReportArtifactTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='owner@example.com')
+        self.campaign = _campaign(self.user)
+        self.renders = 0
+        patcher = patch('core.services.report_artifacts.ReportGenerator.generate_campaign_report', side_effect=self._render)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _render(self, campaign, analytics_data):
+        self.renders += 1
+        return {'success': True, 'url': f'https://example.com/{self.renders}.pdf', 'public_id': f'report-{self.renders}'}
+
+    def test_same_data_is_served_without_rendering(self, delete_file):
+        first = ReportArtifactService.campaign_report(self.campaign, {'clicks': 5})
+        second = ReportArtifactService.campaign_report(self.campaign, {'clicks': 5})
+        self.assertEqual((first['cached'], second['cached']), (False, True))
+        self.assertEqual(second['url'], first['url'])
+        self.assertEqual(self.renders, 1)
+        self.assertEqual(ReportArtifact.objects.get().hit_count, 1)
+
+    def test_template_version_bump_renders_again(self, delete_file):
+        ReportArtifactService.campaign_report(self.campaign, {'clicks': 5})
+        with patch('core.services.report_artifacts.TEMPLATE_VERSION', -1):
+            self.assertFalse(ReportArtifactService.campaign_report(self.campaign, {'clicks': 5})['cached'])
+        self.assertEqual(self.renders, 2)
+
+    def test_new_data_supersedes_the_old_artifact(self, delete_file):
+        ReportArtifactService.campaign_report(self.campaign, {'clicks': 5})
+        ReportArtifactService.campaign_report(self.campaign, {'clicks': 6})
+        self.assertEqual(list(ReportArtifact.objects.values_list('public_id', flat=True)), ['report-2'])
+        delete_file.assert_called_once_with('report-1', resource_type='raw')
+
+    def test_prune_removes_expired_artifacts_and_their_files(self, delete_file):
+        ReportArtifactService.campaign_report(self.campaign, {'clicks': 5})
+        fresh = ReportArtifactService.campaign_report(_campaign(self.user), {'clicks': 5})
+        ReportArtifact.objects.filter(public_id='report-1').update(last_accessed_at=now() - timedelta(days=31))
+        call_command('prune_report_artifacts', stdout=io.StringIO())
+        self.assertEqual(list(ReportArtifact.objects.values_list('public_id', flat=True)), [fresh['public_id']])
+        delete_file.assert_called_once_with('report-1', resource_type='raw')
+
+
+class HourlyAnalyticsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='owner@example.com')
+        self.campaign = _campaign(self.user)
+        HourlyAnalytics.objects.bulk_create([
+            HourlyAnalytics(
+                campaign=self.campaign, hour=make_aware(datetime(2026, 3, day, hour)),
+                impressions=100, clicks=hour, conversions=1, spend_micros=1_250_000,
+            )
+            for day in (2, 3) for hour in (9, 10, 11)
+        ])
+
+    def test_rollup_writes_one_daily_row_per_day(self):
+        self.assertEqual(HourlyAnalyticsService.rollup(), 2)
+        day = DailyAnalytics.objects.get(campaign=self.campaign, date=date(2026, 3, 2))
+        self.assertEqual((day.impressions, day.clicks, day.conversions), (300, 30, 3))
+        self.assertEqual(float(day.spend), 3.75)
+        self.assertEqual(day.ctr, 10.0)
+
+    def test_rollup_is_idempotent(self):
+        HourlyAnalyticsService.rollup()
+        first = list(DailyAnalytics.objects.order_by('date').values_list('id', 'impressions', 'spend'))
+        HourlyAnalyticsService.rollup()
+        self.assertEqual(list(DailyAnalytics.objects.order_by('date').values_list('id', 'impressions', 'spend')), first)
+
+    def test_rollup_rebuilds_the_campaign_summary(self):
+        HourlyAnalyticsService.rollup()
+        summary = CampaignAnalyticsSummary.objects.get(campaign=self.campaign)
+        self.assertEqual((summary.total_impressions, summary.total_clicks), (600, 60))
+
+    def test_best_times_rank_days_by_window_ctr(self):
+        impressions = [[0] * 24 for _ in range(7)]
+        clicks = [[0] * 24 for _ in range(7)]
+        for day, hour, ctr in ((0, 9, 2), (2, 18, 6), (4, 12, 4)):
+            for h in range(hour, hour + 3):
+                impressions[day][h] = 100
+                clicks[day][h] = ctr
+        best = HourlyAnalyticsService.best_times({'impressions': impressions, 'clicks': clicks}, min_impressions=300)
+        self.assertEqual([(b['day'], b['time'], b['ctr']) for b in best], [
+            ('Wednesday', '6-9 PM', 6.0), ('Friday', '12-3 PM', 4.0), ('Monday', '9 AM-12 PM', 2.0),
+        ])
+
+
+class AnalyticsAggregationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email='owner@example.com')
+        self.campaign = _campaign(self.user)
+        # 2 and 9 March 2026 are Mondays, the 4th a Wednesday
+        for day, impressions, clicks in ((2, 100, 10), (9, 300, 10), (4, 200, 4)):
+            DailyAnalytics.objects.create(
+                campaign=self.campaign, date=date(2026, 3, day), impressions=impressions, clicks=clicks,
+            )
+
+    def test_daily_rows_group_by_iso_weekday(self):
+        cells = AnalyticsAggregationService.breakdown(self.user, ('weekday',))
+        self.assertEqual([(c['weekday'], c['impressions'], c['clicks'], c['rows']) for c in cells], [
+            (1, 400, 20, 2), (3, 200, 4, 1),
+        ])
+
+    def test_hourly_rows_group_by_weekday_and_hour(self):
+        HourlyAnalytics.objects.bulk_create([
+            HourlyAnalytics(campaign=self.campaign, hour=make_aware(datetime(2026, 3, day, hour)), impressions=10)
+            for day, hour in ((2, 9), (9, 9), (2, 17), (8, 9))
+        ])
+        cells = AnalyticsAggregationService.breakdown(self.user, ('weekday', 'hour'), source='hourly')
+        self.assertEqual([(c['weekday'], c['hour'], c['impressions']) for c in cells], [
+            (1, 9, 20), (1, 17, 10), (7, 9, 10),
+        ])
+
+    def test_second_call_is_served_from_the_cache(self):
+        first = AnalyticsAggregationService.breakdown(self.user, ('weekday',))
+        with self.assertNumQueries(0):
+            self.assertEqual(AnalyticsAggregationService.breakdown(self.user, ('weekday',)), first)
+
+    def test_saving_analytics_invalidates_the_cached_breakdown(self):
+        AnalyticsAggregationService.breakdown(self.user, ('weekday',))
+        version = AnalyticsAggregationService.data_version(self.user.pk)
+        DailyAnalytics.objects.create(campaign=self.campaign, date=date(2026, 3, 5), impressions=50, clicks=1)
+        self.assertNotEqual(AnalyticsAggregationService.data_version(self.user.pk), version)
+        cells = AnalyticsAggregationService.breakdown(self.user, ('weekday',))
+        self.assertEqual([c['weekday'] for c in cells], [1, 3, 4])
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Against a second SQLite alias. It opens the primary's (shared in-memory)
+    test database, so it sees the primary's committed rows like a replica in
+    sync would, unless it is given a database of its own.
+    """
+    alias = 'replica_0'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email='owner@example.com')
+        self.campaign = _campaign(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _replica(self, name=None):
+        settings_dict = {**connections[DEFAULT_DB_ALIAS].settings_dict}
+        if name:
+            settings_dict['NAME'] = name
+        replica = load_backend(settings_dict['ENGINE']).DatabaseWrapper(settings_dict, self.alias)
+        connections[self.alias] = replica
+        override = override_settings(DATABASES={**settings.DATABASES, self.alias: settings_dict})
+        override.enable()
+        self.addCleanup(self._drop_replica, override)
+        return replica
+
+    def _drop_replica(self, override):
+        override.disable()
+        connections[self.alias].close()
+        del connections[self.alias]
+
+    def _summary(self):
+        return self.client.get('/api/analytics/summary/', {'campaign_id': str(self.campaign.pk)})
+
+    def test_replica_views_read_from_the_replica(self):
+        CampaignAnalyticsSummary.objects.filter(campaign=self.campaign).delete()
+        with CaptureQueriesContext(self._replica()) as replica:
+            self.assertEqual(self._summary().status_code, 200)
+        self.assertTrue(replica.captured_queries)
+        # Only the chart rows: the summary it creates is computed on the primary
+        self.assertEqual(sum('core_dailyanalytics' in q['sql'] for q in replica.captured_queries), 1)
+
+    def test_writes_and_other_views_use_the_primary(self):
+        self.assertEqual(ReplicaRouter().db_for_write(Campaign), DEFAULT_DB_ALIAS)
+        with CaptureQueriesContext(self._replica()) as replica:
+            self.assertEqual(self.client.get('/api/campaigns/').status_code, 200)
+        self.assertEqual(replica.captured_queries, [])
+
+    def test_a_write_pins_the_user_to_the_primary_until_the_pin_expires(self):
+        replica = self._replica()
+        self.assertEqual(self.client.patch(f'/api/campaigns/{self.campaign.pk}/', {'title': 'Renamed'}).status_code, 200)
+        self.assertTrue(is_pinned(self.user.pk))
+        with CaptureQueriesContext(replica) as pinned:
+            self._summary()
+        self.assertEqual(pinned.captured_queries, [])
+
+        with patch('time.time', return_value=time.time() + settings.REPLICA_PIN_SECONDS + 1):
+            self.assertFalse(is_pinned(self.user.pk))
+            with CaptureQueriesContext(replica) as unpinned:
+                self._summary()
+        self.assertTrue(unpinned.captured_queries)
+
+    def test_a_failing_replica_falls_back_to_the_primary(self):
+        # An empty database: every query on it raises OperationalError
+        self._replica(name='file:empty_replica?mode=memory&cache=shared')
+        response = self._summary()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['campaign_name'], self.campaign.title)
+        self.assertIs(cache.get(f'db:replica_ok:{self.alias}'), False)
+
+    def test_a_lagging_replica_is_skipped(self):
+        replica = self._replica()
+        with patch('core.db_router.replica_lag', return_value=settings.REPLICA_MAX_LAG_SECONDS + 1):
+            with CaptureQueriesContext(replica) as lagging:
+                self.assertEqual(self._summary().status_code, 200)
+        self.assertEqual(lagging.captured_queries, [])
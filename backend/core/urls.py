@@ -28,6 +28,8 @@ urlpatterns = [
     # Dashboard & Analytics
     path('dashboard/stats/', views.DashboardStatsView.as_view(), name='dashboard-stats'),
     path('analytics/summary/', views.AnalyticsSummaryView.as_view(), name='analytics-summary'),
+    path('analytics/export/', views.AnalyticsExportView.as_view(), name='analytics-export'),
+    path('analytics/timeseries/', views.AnalyticsTimeSeriesView.as_view(), name='analytics-timeseries'),
     path('analytics/comparison/', views.CampaignComparisonView.as_view(), name='campaign-comparison'),
     
     # Advanced Features
@@ -50,6 +52,10 @@ urlpatterns = [
     path('ab-tests/create/', views_advanced.CreateABTestView.as_view(), name='ab-test-create'),
     path('ab-tests/<uuid:test_id>/start/', views_advanced.StartABTestView.as_view(), name='ab-test-start'),
     path('ab-tests/<uuid:test_id>/analyze/', views_advanced.AnalyzeABTestView.as_view(), name='ab-test-analyze'),
+    path('ab-tests/<uuid:test_id>/assign/', views_advanced.AssignABTestVariationView.as_view(), name='ab-test-assign'),
+    
+    # Event ingestion
+    path('events/', views_advanced.IngestEventsView.as_view(), name='ingest-events'),
     
     # Predictive Analytics
     path('predictive/train/', views_predictive.TrainPredictiveModelView.as_view(), name='train-model'),
@@ -0,0 +1,19 @@
+# backend/core/utils/cache.py
+"""
+Cache helpers shared by services that need more than the cache API offers
+(atomic scripts, pipelined conditional writes) when the cache is Redis.
+"""
+from django.core.cache import caches
+
+
+def redis_client():
+    """The raw redis-py client behind the default cache, or None"""
+    try:
+        from django.core.cache.backends.redis import RedisCache
+    except ImportError:
+        return None
+    # caches[...] rather than `cache`, which is a proxy and fails isinstance
+    backend = caches['default']
+    if not isinstance(backend, RedisCache):
+        return None
+    return backend._cache.get_client(write=True)
@@ -6,6 +6,8 @@ import io
 from PIL import Image
 import base64
 
+from core.instrumentation import outbound
+
 class CloudinaryStorage:
     """
     Utility class for uploading files to Cloudinary
@@ -36,10 +38,11 @@ class CloudinaryStorage:
                 upload_options['public_id'] = public_id
             
             # Upload to Cloudinary
-            result = cloudinary.uploader.upload(
-                image_file,
-                **upload_options
-            )
+            with outbound('cloudinary'):
+                result = cloudinary.uploader.upload(
+                    image_file,
+                    **upload_options
+                )
             
             return {
                 'success': True,
@@ -147,10 +150,11 @@ class CloudinaryStorage:
             if public_id:
                 upload_options['public_id'] = public_id
             
-            result = cloudinary.uploader.upload(
-                pdf_file,
-                **upload_options
-            )
+            with outbound('cloudinary'):
+                result = cloudinary.uploader.upload(
+                    pdf_file,
+                    **upload_options
+                )
             
             return {
                 'success': True,
@@ -178,10 +182,11 @@ class CloudinaryStorage:
             dict: Deletion result
         """
         try:
-            result = cloudinary.uploader.destroy(
-                public_id,
-                resource_type=resource_type
-            )
+            with outbound('cloudinary'):
+                result = cloudinary.uploader.destroy(
+                    public_id,
+                    resource_type=resource_type
+                )
             return {
                 'success': result.get('result') == 'ok',
                 'result': result
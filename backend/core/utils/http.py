@@ -0,0 +1,322 @@
+# backend/core/utils/http.py
+"""
+Outbound HTTP for every upstream the app calls: OpenRouter, Pollinations,
+Stability, Google sign-in and the report webhooks.
+
+Callers name the provider: `await afetch('openrouter', 'POST', url, json=...)`
+from async views, `fetch(...)` from sync code. Both return an httpx.Response
+and raise httpx errors. Per worker process, each provider gets:
+
+- its own connection pool, so keep-alive connections are reused and a
+  provider that hangs can't hold the connections the others need. An
+  httpx.AsyncClient is bound to the event loop it was first used on, so
+  afetch() keeps one per loop. Under ASGI that is the worker's single loop.
+  Under WSGI each async view runs on a loop of its own, and AsyncAPIView
+  closes that loop's clients with aclose_clients() when the view returns;
+  other code running afetch() on a short-lived loop must do the same.
+  Timeout and pool size come from HTTP_PROVIDERS;
+- retries with full-jitter exponential backoff. A call is retried when it
+  never reached the provider (connect errors), and when repeating it has no
+  further effect (an idempotent method, or any method for a provider with
+  `retry_posts`) also on dropped connections and 429/502/503/504. Read timeouts are not retried: waiting out a second
+  timeout is what the caller can least afford. Retries are limited by a
+  budget: each call earns HTTP_RETRY_BUDGET of a retry and a retry spends a
+  whole one, so during an outage retries add that fraction to the traffic
+  rather than multiplying it;
+- a circuit breaker. After HTTP_BREAKER_FAILURES consecutive failures
+  (transport errors or 5xx) calls fail fast with CircuitOpenError for
+  HTTP_BREAKER_RESET seconds; then one trial call goes through and decides
+  whether it closes again.
+
+Every attempt is timed into the advision_outbound_http_* metrics, and each
+call's total time, retries included, is counted against the current request
+(core/instrumentation.py).
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+
+import httpx
+from django.conf import settings
+
+from core.instrumentation import (
+    CIRCUIT_OPENED, OUTBOUND_RETRIES, OUTBOUND_SECONDS, SHORT_CIRCUITED, record_outbound,
+)
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+# Connections that dropped under a request that can be repeated
+RETRY_ERRORS = (httpx.ReadError, httpx.WriteError, httpx.RemoteProtocolError)
+
+# Retries a provider can bank while its calls succeed
+RETRY_BUDGET_MAX = 10
+# Retry-After while another call is trying out a half-open circuit
+PROBE_RETRY_SECONDS = 1
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of calling a provider whose circuit is open"""
+
+    def __init__(self, provider, retry_after):
+        super().__init__(f'{provider} is unavailable, retry in {retry_after:.0f}s')
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Opens after `failures` consecutive failures, for `reset` seconds"""
+
+    def __init__(self, failures, reset):
+        self.failures = failures
+        self.reset = reset
+        self._failed = 0
+        self._opened_at = None
+        self._probe_started = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def allow(self):
+        """Seconds until calls may go again; 0 lets this one through"""
+        with self._lock:
+            if self._opened_at is None:
+                return 0
+            now = time.monotonic()
+            remaining = self._opened_at + self.reset - now
+            if remaining > 0:
+                return remaining
+            # Half-open: one trial call at a time. A trial that never reports
+            # back (its caller was cancelled) stops blocking after `reset`
+            if self._probe_started is not None and now - self._probe_started < self.reset:
+                return PROBE_RETRY_SECONDS
+            self._probe_started = now
+            return 0
+
+    def success(self):
+        with self._lock:
+            self._failed = 0
+            self._opened_at = None
+            self._probe_started = None
+
+    def failure(self):
+        """Count a failure; True if it opened the circuit"""
+        with self._lock:
+            self._failed += 1
+            if self._probe_started is None and (self._opened_at is not None or self._failed < self.failures):
+                return False
+            self._opened_at = time.monotonic()
+            self._probe_started = None
+            return True
+
+
+class RetryBudget:
+    """Token bucket of retries, refilled by `ratio` per call"""
+
+    def __init__(self, ratio):
+        self.ratio = ratio
+        self._tokens = RETRY_BUDGET_MAX
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, RETRY_BUDGET_MAX)
+
+    def withdraw(self):
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class Provider:
+    """Settings and per-process state for one upstream (see HTTP_PROVIDERS)"""
+
+    def __init__(self, name):
+        config = settings.HTTP_PROVIDERS.get(name, {})
+        self.name = name
+        self.timeout = config.get('timeout', settings.HTTP_CLIENT_TIMEOUT)
+        self.retries = config.get('retries', settings.HTTP_RETRIES)
+        self.retry_posts = config.get('retry_posts', False)
+        self.limits = httpx.Limits(
+            max_connections=config.get('max_connections', settings.HTTP_CLIENT_MAX_CONNECTIONS),
+            max_keepalive_connections=config.get('max_keepalive', settings.HTTP_CLIENT_MAX_KEEPALIVE),
+        )
+        self.breaker = CircuitBreaker(
+            config.get('breaker_failures', settings.HTTP_BREAKER_FAILURES),
+            config.get('breaker_reset', settings.HTTP_BREAKER_RESET),
+        )
+        self.budget = RetryBudget(settings.HTTP_RETRY_BUDGET)
+
+
+_providers = {}
+_sync_clients = {}
+_async_clients = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def provider(name):
+    """The Provider named `name`, created on first use"""
+    with _lock:
+        if name not in _providers:
+            _providers[name] = Provider(name)
+        return _providers[name]
+
+
+def _sync_client(upstream):
+    with _lock:
+        client = _sync_clients.get(upstream.name)
+        if client is None or client.is_closed:
+            client = httpx.Client(timeout=httpx.Timeout(upstream.timeout), limits=upstream.limits)
+            _sync_clients[upstream.name] = client
+        return client
+
+
+def _async_client(upstream):
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(upstream.name)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(timeout=httpx.Timeout(upstream.timeout), limits=upstream.limits)
+        clients[upstream.name] = client
+    return client
+
+
+async def aclose_clients():
+    """Close the AsyncClients of the running event loop, before the loop ends"""
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get('Retry-After', ''))
+    except ValueError:
+        return None
+
+
+class _Call:
+    """Breaker, retry and timing bookkeeping for one fetch()/afetch()"""
+
+    def __init__(self, name, method):
+        self.upstream = provider(name)
+        self.method = method.upper()
+        self.retries = 0
+        self.started = time.perf_counter()
+
+    def check_circuit(self):
+        wait = self.upstream.breaker.allow()
+        if wait:
+            SHORT_CIRCUITED.labels(self.upstream.name).inc()
+            raise CircuitOpenError(self.upstream.name, wait)
+        if not self.retries:
+            self.upstream.budget.deposit()
+
+    def settle(self, seconds, response=None, error=None):
+        """Record an attempt; seconds to wait before retrying, or None if done"""
+        upstream = self.upstream
+        if error is not None:
+            outcome, failed = 'error', True
+        else:
+            outcome, failed = f'{response.status_code // 100}xx', response.status_code >= 500
+        OUTBOUND_SECONDS.labels(upstream.name, outcome).observe(seconds)
+        if not failed:
+            upstream.breaker.success()
+        elif upstream.breaker.failure():
+            CIRCUIT_OPENED.labels(upstream.name).inc()
+            logger.warning(f"⚡ Circuit open for {upstream.name} for {upstream.breaker.reset}s")
+
+        if self.retries >= upstream.retries or upstream.breaker.is_open or not self._retryable(response, error):
+            return None
+        backoff = min(settings.HTTP_RETRY_BACKOFF * 2 ** self.retries, settings.HTTP_RETRY_BACKOFF_MAX)
+        delay = random.uniform(0, backoff)
+        if response is not None:
+            requested = _retry_after(response)
+            if requested is not None:
+                if requested > settings.HTTP_RETRY_BACKOFF_MAX:
+                    return None
+                delay = max(delay, requested)
+        if not upstream.budget.withdraw():
+            return None
+        self.retries += 1
+        OUTBOUND_RETRIES.labels(upstream.name).inc()
+        return delay
+
+    def _retryable(self, response, error):
+        if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+            return True
+        if self.method not in IDEMPOTENT_METHODS and not self.upstream.retry_posts:
+            return False
+        if error is not None:
+            return isinstance(error, RETRY_ERRORS)
+        return response.status_code in RETRY_STATUSES
+
+    def finish(self):
+        record_outbound(self.upstream.name, time.perf_counter() - self.started)
+
+
+def fetch(name, method, url, **kwargs):
+    """
+    Call provider `name` from sync code
+
+    Args:
+        name: HTTP_PROVIDERS key; unknown names get the defaults
+        method, url, kwargs: as for httpx.Client.request (a `timeout` here
+            overrides the provider's)
+
+    Returns:
+        httpx.Response: the last attempt's response, whatever its status
+
+    Raises:
+        CircuitOpenError: the provider's circuit is open
+        httpx.HTTPError: the last attempt's transport error
+    """
+    call = _Call(name, method)
+    client = _sync_client(call.upstream)
+    try:
+        while True:
+            call.check_circuit()
+            start = time.perf_counter()
+            try:
+                response = client.request(method, url, **kwargs)
+            except httpx.HTTPError as error:
+                delay = call.settle(time.perf_counter() - start, error=error)
+                if delay is None:
+                    raise
+            else:
+                delay = call.settle(time.perf_counter() - start, response=response)
+                if delay is None:
+                    return response
+            time.sleep(delay)
+    finally:
+        call.finish()
+
+
+async def afetch(name, method, url, **kwargs):
+    """fetch() for async views; waits on the event loop"""
+    call = _Call(name, method)
+    client = _async_client(call.upstream)
+    try:
+        while True:
+            call.check_circuit()
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.HTTPError as error:
+                delay = call.settle(time.perf_counter() - start, error=error)
+                if delay is None:
+                    raise
+            else:
+                delay = call.settle(time.perf_counter() - start, response=response)
+                if delay is None:
+                    return response
+            await asyncio.sleep(delay)
+    finally:
+        call.finish()
@@ -1,84 +1,173 @@
 # backend/core/utils/report_generator.py
-from reportlab.lib.pagesizes import letter, A4
+"""
+PDF report layout and rendering.
+
+Paragraph and table styles are built once at import and shared by every
+report. Layout functions take plain data (see core.services.report_data) and
+return flowables; render() writes them straight into any writable file-like
+object (an HttpResponse, a temporary file, ...), so no intermediate copy of the
+PDF is kept in memory.
+"""
+import logging
+import tempfile
+from xml.sax.saxutils import escape
+
+from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.enums import TA_CENTER
 from core.utils.timezone_utils import now, format_datetime
-import io
 from .cloudinary_storage import CloudinaryStorage
 
+logger = logging.getLogger(__name__)
+
+# Bump whenever a layout below changes, so cached report artifacts are rebuilt
+TEMPLATE_VERSION = 1
+
+BRAND_DARK = colors.HexColor('#3a3440')
+BRAND_ACCENT = colors.HexColor('#a88fd8')
+LABEL_BACKGROUND = colors.HexColor('#f0f0f0')
+STRIPE_BACKGROUND = colors.HexColor('#f9f9f9')
+
+_SAMPLE_STYLES = getSampleStyleSheet()
+
+BODY_STYLE = _SAMPLE_STYLES['Normal']
+
+TITLE_STYLE = ParagraphStyle(
+    'AdVisionTitle',
+    parent=_SAMPLE_STYLES['Heading1'],
+    fontSize=24,
+    textColor=BRAND_DARK,
+    spaceAfter=6,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold'
+)
+
+SUBTITLE_STYLE = ParagraphStyle(
+    'AdVisionSubtitle',
+    parent=_SAMPLE_STYLES['Normal'],
+    fontSize=11,
+    textColor=colors.grey,
+    spaceAfter=24,
+    alignment=TA_CENTER,
+)
+
+HEADING_STYLE = ParagraphStyle(
+    'AdVisionHeading',
+    parent=_SAMPLE_STYLES['Heading2'],
+    fontSize=16,
+    textColor=BRAND_ACCENT,
+    spaceAfter=12,
+    spaceBefore=18,
+    fontName='Helvetica-Bold'
+)
+
+FOOTER_STYLE = ParagraphStyle(
+    'AdVisionFooter',
+    parent=_SAMPLE_STYLES['Normal'],
+    fontSize=8,
+    textColor=colors.grey,
+    alignment=TA_CENTER,
+)
+
+# Header row plus striped body
+METRICS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), BRAND_ACCENT),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, STRIPE_BACKGROUND]),
+])
+
+# Label column on the left, values on the right
+KEY_VALUE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), LABEL_BACKGROUND),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+])
+
+PAGE_OPTIONS = {
+    'pagesize': letter,
+    'topMargin': 0.75 * inch,
+    'bottomMargin': 0.75 * inch,
+    'leftMargin': 0.75 * inch,
+    'rightMargin': 0.75 * inch,
+}
+
+
+def _table(rows, style, col_widths):
+    table = Table(rows, colWidths=col_widths)
+    table.setStyle(style)
+    return table
+
+
+def _footer(generated_at):
+    return [
+        Spacer(1, 0.4 * inch),
+        Paragraph(
+            f"Generated by AdVision on {format_datetime(generated_at, '%B %d, %Y at %I:%M %p')}",
+            FOOTER_STYLE
+        ),
+        Paragraph("© 2026 AdVision - AI Campaign Management", FOOTER_STYLE),
+    ]
+
+
+def _format_metric(key, value):
+    if key in ('spend', 'cpc'):
+        return f"${value:,.2f}"
+    if key in ('ctr', 'conversion_rate'):
+        return f"{value}%"
+    if key == 'roas':
+        return f"{value}x"
+    return f"{value:,}" if isinstance(value, int) else str(value)
+
+
+def render_scheduled_report(report, path):
+    """
+    Render a scheduled report to a file. Module-level and fed plain data so
+    process pools can pickle it.
+    """
+    with open(path, 'wb') as output:
+        ReportGenerator.render(ReportGenerator.scheduled_story(report), output)
+    return path
+
+
 class ReportGenerator:
-    """Generate PDF reports and upload to Cloudinary"""
-    
+    """Lay out, render and upload PDF reports"""
+
     @staticmethod
-    def generate_campaign_report(campaign, analytics_data):
+    def campaign_story(campaign, analytics_data, generated_at=None):
         """
-        Generate a campaign performance report
-        
+        Flowables of a campaign performance report
+
         Args:
             campaign: Campaign object
-            analytics_data: Dictionary with campaign analytics
-            
-        Returns:
-            dict: Report URL and public_id from Cloudinary
+            analytics_data: Dict from ReportDataService.campaign_analytics
         """
-        try:
-            # Create PDF in memory
-            buffer = io.BytesIO()
-            doc = SimpleDocTemplate(buffer, pagesize=letter)
-            story = []
-            styles = getSampleStyleSheet()
-            
-            # Custom styles
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=24,
-                textColor=colors.HexColor('#3a3440'),
-                spaceAfter=30,
-                alignment=TA_CENTER,
-            )
-            
-            heading_style = ParagraphStyle(
-                'CustomHeading',
-                parent=styles['Heading2'],
-                fontSize=16,
-                textColor=colors.HexColor('#a88fd8'),
-                spaceAfter=12,
-            )
-            
-            # Title
-            story.append(Paragraph("AdVision Campaign Report", title_style))
-            story.append(Spacer(1, 0.2 * inch))
-            
-            # Campaign Info
-            story.append(Paragraph("Campaign Information", heading_style))
-            campaign_data = [
+        story = [
+            Paragraph("AdVision Campaign Report", TITLE_STYLE),
+            Paragraph(escape(campaign.title), SUBTITLE_STYLE),
+            Paragraph("Campaign Information", HEADING_STYLE),
+            _table([
                 ['Campaign Name:', campaign.title],
                 ['Platform:', campaign.platform.capitalize()],
                 ['Start Date:', str(campaign.start_date)],
                 ['End Date:', str(campaign.end_date)],
                 ['Budget:', f"${campaign.budget or 0}"],
-            ]
-            
-            campaign_table = Table(campaign_data, colWidths=[2*inch, 4*inch])
-            campaign_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f0f0f0')),
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ]))
-            story.append(campaign_table)
-            story.append(Spacer(1, 0.3 * inch))
-            
-            # Performance Metrics
-            story.append(Paragraph("Performance Metrics", heading_style))
-            metrics_data = [
+            ], KEY_VALUE_TABLE_STYLE, [2 * inch, 4 * inch]),
+            Spacer(1, 0.25 * inch),
+            Paragraph("Performance Metrics", HEADING_STYLE),
+            _table([
                 ['Metric', 'Value'],
                 ['Total Impressions', f"{analytics_data.get('total_impressions', 0):,}"],
                 ['Total Clicks', f"{analytics_data.get('total_clicks', 0):,}"],
@@ -88,173 +177,219 @@ class ReportGenerator:
                 ['Average CPC', f"${analytics_data.get('avg_cpc', 0):.2f}"],
                 ['ROAS', f"{analytics_data.get('roas', 0):.2f}x"],
                 ['Performance Score', f"{analytics_data.get('performance_score', 0)}/100"],
+            ], METRICS_TABLE_STYLE, [3 * inch, 3 * inch]),
+        ]
+        story.extend(_footer(generated_at or now()))
+        return story
+
+    @staticmethod
+    def weekly_story(report, user_email=None, generated_at=None):
+        """
+        Flowables of the weekly report
+
+        Args:
+            report: Dict from ReportDataService.weekly_report
+            user_email: Optional recipient shown under the title
+        """
+        summary = report.get('summary', {})
+        insights = report.get('insights', {})
+
+        story = [
+            Paragraph("AdVision Weekly Report", TITLE_STYLE),
+            Paragraph(f"Period: {report.get('period', 'Last 7 days')}", SUBTITLE_STYLE),
+        ]
+        if user_email:
+            story.append(Paragraph(f"Generated for: {escape(user_email)}", SUBTITLE_STYLE))
+
+        story.extend([
+            Paragraph("Weekly Summary", HEADING_STYLE),
+            _table([
+                ['Metric', 'Value'],
+                ['Campaigns Created', str(summary.get('campaigns_created', 0))],
+                ['Ads Generated', str(summary.get('ads_generated', 0))],
+                ['Images Generated', str(summary.get('images_generated', 0))],
+                ['Active Campaigns', str(summary.get('active_campaigns', 0))],
+                ['Total Engagement', f"{summary.get('total_engagement', 0):,} clicks"],
+                ['Engagement Growth', summary.get('engagement_growth', '0%')],
+            ], METRICS_TABLE_STYLE, [3 * inch, 2.5 * inch]),
+            Spacer(1, 0.25 * inch),
+            Paragraph("Performance Analytics", HEADING_STYLE),
+            _table([
+                ['Metric', 'Value'],
+                ['Total Impressions', f"{insights.get('total_impressions', 0):,}"],
+                ['Total Clicks', f"{insights.get('total_clicks', 0):,}"],
+                ['Total Conversions', f"{insights.get('total_conversions', 0):,}"],
+                ['Total Spend', f"${insights.get('total_spend', 0):.2f}"],
+                ['Average CTR', f"{insights.get('avg_ctr', 0)}%"],
+                ['Conversion Rate', f"{insights.get('conversion_rate', 0)}%"],
+                ['ROAS', f"{insights.get('roas', 0)}x"],
+            ], METRICS_TABLE_STYLE, [3 * inch, 2.5 * inch]),
+            Spacer(1, 0.25 * inch),
+            Paragraph("Top Performing Campaign", HEADING_STYLE),
+        ])
+
+        if insights.get('top_campaign_name', 'N/A') != 'N/A':
+            campaign_rows = [
+                ['Campaign Name', insights['top_campaign_name']],
+                ['Platform', insights.get('top_performing_platform', 'N/A')],
+                ['Performance Score', f"{insights.get('top_campaign_score', 0)}/100"],
             ]
-            
-            metrics_table = Table(metrics_data, colWidths=[3*inch, 3*inch])
-            metrics_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#a88fd8')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ]))
-            story.append(metrics_table)
-            story.append(Spacer(1, 0.3 * inch))
-            
-            # Footer
-            footer_style = ParagraphStyle(
-                'Footer',
-                parent=styles['Normal'],
-                fontSize=9,
-                textColor=colors.grey,
-                alignment=TA_CENTER,
-            )
-            story.append(Spacer(1, 0.5 * inch))
-            story.append(Paragraph(
-                f"Generated by AdVision on {format_datetime(now(), '%B %d, %Y at %I:%M %p')}",
-                footer_style
-            ))
-            
-            # Build PDF
-            doc.build(story)
-            buffer.seek(0)
-            
-            # Upload to Cloudinary
-            folder = f"advision/reports/{campaign.id}"
-            public_id = f"report_{format_datetime(now(), '%Y%m%d_%H%M%S')}"
-            
+        else:
+            campaign_rows = [
+                ['Status', 'No campaigns available'],
+                ['Recommendation', 'Create campaigns to see performance data'],
+            ]
+        story.append(_table(campaign_rows, KEY_VALUE_TABLE_STYLE, [2.5 * inch, 3 * inch]))
+
+        recommendations = report.get('recommendations', [])
+        if recommendations:
+            story.append(Paragraph("AI Recommendations", HEADING_STYLE))
+            for i, rec in enumerate(recommendations[:5], 1):  # Top 5
+                story.append(Paragraph(
+                    f"<b>{i}. {escape(rec.get('title', ''))}</b><br/>{escape(rec.get('description', ''))}",
+                    BODY_STYLE
+                ))
+                story.append(Spacer(1, 0.1 * inch))
+
+        story.extend(_footer(generated_at or now()))
+        return story
+
+    @staticmethod
+    def scheduled_story(report, generated_at=None):
+        """
+        Flowables of a scheduled report
+
+        Args:
+            report: Dict built by ReportScheduleRunner
+        """
+        story = [
+            Paragraph(f"AdVision {report['frequency'].title()} Report", TITLE_STYLE),
+            Paragraph(escape(report['name']), SUBTITLE_STYLE),
+            Paragraph(
+                f"Period: {report['period']['start']} - {report['period']['end']}",
+                SUBTITLE_STYLE
+            ),
+            Paragraph("Summary", HEADING_STYLE),
+            _table(
+                [['Metric', 'Value']] + [
+                    [key.replace('_', ' ').title(), _format_metric(key, value)]
+                    for key, value in report.get('metrics', {}).items()
+                ],
+                METRICS_TABLE_STYLE, [3 * inch, 2.5 * inch]
+            ),
+        ]
+
+        campaigns = report.get('campaigns', [])
+        if campaigns:
+            story.extend([
+                Spacer(1, 0.25 * inch),
+                Paragraph("Campaigns", HEADING_STYLE),
+                _table(
+                    [['Campaign', 'Impressions', 'Clicks', 'Conversions', 'Spend']] + [
+                        [
+                            Paragraph(escape(row['title']), BODY_STYLE),
+                            f"{row['impressions']:,}",
+                            f"{row['clicks']:,}",
+                            f"{row['conversions']:,}",
+                            f"${row['spend']:.2f}",
+                        ]
+                        for row in campaigns
+                    ],
+                    METRICS_TABLE_STYLE,
+                    [2.3 * inch, 1.1 * inch, 0.9 * inch, 1.1 * inch, 1.1 * inch]
+                ),
+            ])
+
+        story.extend(_footer(generated_at or now()))
+        return story
+
+    @staticmethod
+    def render(story, output):
+        """
+        Write a PDF for the flowables into a writable file-like object
+
+        Returns:
+            The output object
+        """
+        SimpleDocTemplate(output, **PAGE_OPTIONS).build(story)
+        return output
+
+    @staticmethod
+    def render_to_tempfile(story):
+        """Render into a temporary file, rewound and ready to upload or stream"""
+        output = tempfile.TemporaryFile(suffix='.pdf')
+        ReportGenerator.render(story, output)
+        output.seek(0)
+        return output
+
+    @staticmethod
+    def _upload(story, folder, public_id):
+        with ReportGenerator.render_to_tempfile(story) as pdf_file:
             upload_result = CloudinaryStorage.upload_pdf_report(
-                buffer,
+                pdf_file,
                 folder=folder,
                 public_id=public_id
             )
-            
-            if upload_result.get('success'):
-                return {
-                    'success': True,
-                    'url': upload_result['url'],
-                    'public_id': upload_result['public_id'],
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': upload_result.get('error')
-                }
-                
+
+        if upload_result.get('success'):
+            return {
+                'success': True,
+                'url': upload_result['url'],
+                'public_id': upload_result['public_id'],
+            }
+        return {
+            'success': False,
+            'error': upload_result.get('error')
+        }
+
+    @staticmethod
+    def generate_campaign_report(campaign, analytics_data):
+        """
+        Generate a campaign performance report and upload it to Cloudinary
+
+        Args:
+            campaign: Campaign object
+            analytics_data: Dictionary with campaign analytics
+
+        Returns:
+            dict: Report URL and public_id from Cloudinary
+        """
+        try:
+            story = ReportGenerator.campaign_story(campaign, analytics_data)
+            return ReportGenerator._upload(
+                story,
+                folder=f"advision/reports/{campaign.id}",
+                public_id=f"report_{format_datetime(now(), '%Y%m%d_%H%M%S')}"
+            )
         except Exception as e:
-            print(f"Report generation error: {str(e)}")
+            logger.exception(f"❌ Report generation error: {e}")
             return {
                 'success': False,
                 'error': str(e)
             }
-    
+
     @staticmethod
     def generate_weekly_report(user, report_data):
         """
-        Generate weekly summary report
-        
+        Generate weekly summary report and upload it to Cloudinary
+
         Args:
             user: User object
-            report_data: Weekly report data dictionary
-            
+            report_data: Dict from ReportDataService.weekly_report
+
         Returns:
             dict: Report URL and public_id from Cloudinary
         """
         try:
-            buffer = io.BytesIO()
-            doc = SimpleDocTemplate(buffer, pagesize=letter)
-            story = []
-            styles = getSampleStyleSheet()
-            
-            # Title
-            title_style = ParagraphStyle(
-                'Title',
-                parent=styles['Heading1'],
-                fontSize=24,
-                textColor=colors.HexColor('#3a3440'),
-                alignment=TA_CENTER,
-                spaceAfter=30,
-            )
-            
-            story.append(Paragraph("AdVision Weekly Report", title_style))
-            story.append(Paragraph(f"Period: {report_data.get('period', 'Last 7 days')}", styles['Normal']))
-            story.append(Spacer(1, 0.3 * inch))
-            
-            # Summary section
-            heading_style = ParagraphStyle(
-                'Heading',
-                parent=styles['Heading2'],
-                fontSize=16,
-                textColor=colors.HexColor('#a88fd8'),
-                spaceAfter=12,
+            story = ReportGenerator.weekly_story(report_data, user_email=user.email)
+            return ReportGenerator._upload(
+                story,
+                folder=f"advision/users/{user.id}/reports",
+                public_id=f"weekly_{format_datetime(now(), '%Y%m%d_%H%M%S')}"
             )
-            
-            story.append(Paragraph("Summary", heading_style))
-            
-            summary = report_data.get('summary', {})
-            summary_data = [
-                ['Metric', 'Value'],
-                ['Campaigns Created', str(summary.get('campaigns_created', 0))],
-                ['Ads Generated', str(summary.get('ads_generated', 0))],
-                ['Images Generated', str(summary.get('images_generated', 0))],
-                ['Active Campaigns', str(summary.get('active_campaigns', 0))],
-                ['Total Engagement', str(summary.get('total_engagement', 0))],
-                ['Engagement Growth', summary.get('engagement_growth', '0%')],
-            ]
-            
-            summary_table = Table(summary_data, colWidths=[3*inch, 3*inch])
-            summary_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#a88fd8')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ]))
-            story.append(summary_table)
-            story.append(Spacer(1, 0.3 * inch))
-            
-            # Recommendations
-            story.append(Paragraph("AI Recommendations", heading_style))
-            recommendations = report_data.get('recommendations', [])
-            for i, rec in enumerate(recommendations[:5], 1):  # Top 5
-                rec_text = f"<b>{i}. {rec.get('title', '')}</b><br/>{rec.get('description', '')}"
-                story.append(Paragraph(rec_text, styles['Normal']))
-                story.append(Spacer(1, 0.1 * inch))
-            
-            # Build PDF
-            doc.build(story)
-            buffer.seek(0)
-            
-            # Upload to Cloudinary
-            folder = f"advision/users/{user.id}/reports"
-            public_id = f"weekly_{format_datetime(now(), '%Y%m%d_%H%M%S')}"
-            
-            upload_result = CloudinaryStorage.upload_pdf_report(
-                buffer,
-                folder=folder,
-                public_id=public_id
-            )
-            
-            if upload_result.get('success'):
-                return {
-                    'success': True,
-                    'url': upload_result['url'],
-                    'public_id': upload_result['public_id'],
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': upload_result.get('error')
-                }
-                
         except Exception as e:
-            print(f"Weekly report generation error: {str(e)}")
+            logger.exception(f"❌ Weekly report generation error: {e}")
             return {
                 'success': False,
                 'error': str(e)
-            }
\ No newline at end of file
+            }
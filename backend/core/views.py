@@ -1,16 +1,22 @@
 # backend/core/views.py - WITH DEEPSEEK AND REAL-TIME ANALYTICS
 from django.conf import settings
 from django.core.files.base import ContentFile
-from django.db.models import Sum, Count, Avg, Q, F, Max, Min
+from django.db import transaction
+from django.db.models import Sum, Count, Avg, Q, F, Max, Min, Prefetch
 from rest_framework.views import APIView
+from asgiref.sync import sync_to_async
 from rest_framework.response import Response
 from rest_framework import status, viewsets, permissions
 from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance
-import requests
+import asyncio
+import httpx
+import logging
+import math
 import base64
 import uuid
 import io
-from django.http import HttpResponse, FileResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
 import os
 from datetime import datetime, timedelta
 import json
@@ -24,14 +30,27 @@ from allauth.socialaccount.providers.github.views import GitHubOAuth2Adapter
 from allauth.socialaccount.providers.oauth2.client import OAuth2Client
 from dj_rest_auth.registration.views import SocialLoginView
 from decimal import Decimal
-from django.utils import timezone
 from core.utils.cloudinary_storage import CloudinaryStorage
+from core.utils.report_generator import ReportGenerator
+from core.utils.timezone_utils import now, start_of_day
+from core.services.report_data import ReportDataService
+from core.services.report_artifacts import ReportArtifactService
+from core.services.analytics_export import AnalyticsExportService, CONTENT_TYPES, parquet_available
+from core.services.timeseries import TimeSeriesService
+from core.services.hourly_analytics import HourlyAnalyticsService, engagement_level
+from core.services.analytics_aggregation import AnalyticsAggregationService
+from core.db_router import ReplicaReadMixin, use_primary
+from core.async_views import AsyncAPIView, db_sync_to_async
+from core.throttling import QuotaMixin
+from core.utils.http import CircuitOpenError, afetch
 from django.views import View
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.authentication import TokenAuthentication
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+logger = logging.getLogger(__name__)
+
 class IsOwnerOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
@@ -47,7 +66,17 @@ class CampaignViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
 
     def get_queryset(self):
-        return Campaign.objects.filter(user=self.request.user).order_by('-created_at')
+        # Everything CampaignSerializer nests, so listing is O(1) queries
+        return (
+            Campaign.objects.filter(user=self.request.user)
+            .select_related('user', 'analytics_summary')
+            .prefetch_related(
+                'ad_content',
+                'images',
+                Prefetch('comments', queryset=Comment.objects.select_related('user')),
+            )
+            .order_by('-created_at')
+        )
 
     def get_serializer_context(self):
         return {'request': self.request}
@@ -57,7 +86,7 @@ class AdContentViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
 
     def get_queryset(self):
-        return AdContent.objects.filter(campaign__user=self.request.user).order_by('-created_at')
+        return AdContent.objects.filter(user=self.request.user).order_by('-created_at')
 
     def perform_create(self, serializer):
         campaign = serializer.validated_data['campaign']
@@ -70,7 +99,7 @@ class ImageAssetViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
 
     def get_queryset(self):
-        return ImageAsset.objects.filter(campaign__user=self.request.user).order_by('-created_at')
+        return ImageAsset.objects.filter(user=self.request.user).order_by('-created_at')
     
     def perform_create(self, serializer):
         campaign = serializer.validated_data['campaign']
@@ -91,193 +120,6 @@ class CommentViewSet(viewsets.ModelViewSet):
             raise permissions.PermissionDenied("You do not have permission for this campaign.")
         serializer.save(user=self.request.user)
 
-# ============================================================================
-# Dashboard with Insights
-# ============================================================================
-class DashboardStatsView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
-    
-    def get(self, request):
-        user = request.user
-        
-        # Force update all summaries before showing stats
-        campaigns = Campaign.objects.filter(user=user)
-        for campaign in campaigns:
-            summary, created = CampaignAnalyticsSummary.objects.get_or_create(campaign=campaign)
-            if created or summary.last_updated < timezone.now() - timedelta(hours=1):
-                summary.update_metrics()
-        
-        # Basic counts
-        total_campaigns = campaigns.count()
-        total_ads = AdContent.objects.filter(campaign__user=user).count()
-        total_images = ImageAsset.objects.filter(campaign__user=user).count()
-        
-        # Budget
-        total_budget = campaigns.aggregate(
-            total=Sum('budget')
-        )['total'] or 0
-        
-        # Active campaigns
-        today = datetime.now().date()
-        active_campaigns = campaigns.filter(
-            is_active=True,
-            end_date__gte=today
-        ).count()
-        
-        # This week stats
-        week_ago = today - timedelta(days=7)
-        ads_this_week = AdContent.objects.filter(
-        campaign__user=user,
-        created_at__date__gte=week_ago  # ✅ FIXED - use __date lookup
-        ).count()
-
-        images_this_week = ImageAsset.objects.filter(
-        campaign__user=user,
-        created_at__date__gte=week_ago  # ✅ FIXED
-        ).count()
-        
-        # Platform distribution
-        platform_stats = campaigns.values('platform').annotate(
-            count=Count('id')
-        )
-        
-        # REAL AGGREGATE ANALYTICS
-        summaries = CampaignAnalyticsSummary.objects.filter(campaign__user=user)
-        total_impressions = sum(int(s.total_impressions) for s in summaries)
-        total_clicks = sum(s.total_clicks for s in summaries)
-        total_spend = sum(float(s.total_spend) for s in summaries)
-        
-        # Calculate overall CTR
-        overall_ctr = round((total_clicks / total_impressions * 100), 2) if total_impressions > 0 else 0
-        
-        return Response({
-            'total_campaigns': total_campaigns,
-            'active_campaigns': active_campaigns,
-            'total_ads': total_ads,
-            'total_images': total_images,
-            'total_budget': float(total_budget),
-            'ads_this_week': ads_this_week,
-            'images_this_week': images_this_week,
-            'platform_distribution': list(platform_stats),
-            
-            # Real analytics
-            'total_impressions': total_impressions,
-            'total_clicks': total_clicks,
-            'total_spend': round(total_spend, 2),
-            'overall_ctr': overall_ctr,
-            
-            # Growth rate
-            'growth_rate': round(((ads_this_week + images_this_week) / max(total_ads + total_images, 1)) * 100, 1),
-            
-            # Last updated
-            'last_updated': timezone.now().isoformat()
-        })
-
-# ============================================================================
-# REAL-TIME Analytics Summary
-# ============================================================================
-class AnalyticsSummaryView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
-    
-    def get(self, request):
-        campaign_id = request.query_params.get('campaign_id')
-        
-        if not campaign_id:
-            return Response(
-                {'error': 'campaign_id query parameter is required'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        try:
-            campaign = Campaign.objects.get(id=campaign_id, user=request.user)
-        except Campaign.DoesNotExist:
-            return Response(
-                {'error': 'Campaign not found'}, 
-                status=status.HTTP_404_NOT_FOUND
-            )
-        
-        # Get real counts
-        ad_count = AdContent.objects.filter(campaign=campaign).count()
-        image_count = ImageAsset.objects.filter(campaign=campaign).count()
-        
-        # Calculate days since campaign started
-        start_date = campaign.start_date
-        today = datetime.now().date()
-        days_active = (today - start_date).days + 1
-        
-        # Generate realistic data based on actual campaign data
-        dates = []
-        impressions = []
-        clicks = []
-        conversions = []
-        spend = []
-        ctr_data = []
-        
-        current_date = start_date
-        # Base metrics on actual content created
-        content_multiplier = max(1, ad_count + image_count)
-        base_impressions = 300 * content_multiplier
-        daily_budget = float(campaign.budget or 100) / max(days_active, 1)
-        
-        days_shown = min(days_active, 30)
-        
-        for day_num in range(days_shown):
-            dates.append(current_date.strftime('%b %d'))
-            
-            # More realistic growth pattern
-            growth_factor = 1 + (day_num * 0.12)
-            randomness = 0.9 + (day_num % 7) * 0.03
-            
-            day_impressions = int(base_impressions * growth_factor * randomness)
-            day_clicks = int(day_impressions * (0.025 + (day_num % 5) * 0.008))
-            day_conversions = int(day_clicks * (0.06 + (day_num % 3) * 0.015))
-            day_spend = round(daily_budget * (0.85 + (day_num % 4) * 0.07), 2)
-            day_ctr = round((day_clicks / day_impressions * 100), 2) if day_impressions > 0 else 0
-            
-            impressions.append(day_impressions)
-            clicks.append(day_clicks)
-            conversions.append(day_conversions)
-            spend.append(day_spend)
-            ctr_data.append(day_ctr)
-            
-            current_date += timedelta(days=1)
-        
-        total_impressions = sum(impressions)
-        total_clicks = sum(clicks)
-        total_conversions = sum(conversions)
-        total_spend = sum(spend)
-        
-        avg_ctr = round((total_clicks / total_impressions * 100), 2) if total_impressions > 0 else 0
-        avg_cpc = round((total_spend / total_clicks), 2) if total_clicks > 0 else 0
-        conversion_rate = round((total_conversions / total_clicks * 100), 2) if total_clicks > 0 else 0
-        cost_per_conversion = round((total_spend / total_conversions), 2) if total_conversions > 0 else 0
-        roas = round((total_conversions * 45 / total_spend), 2) if total_spend > 0 else 0
-        
-        return Response({
-            'campaign_id': str(campaign.id),
-            'campaign_name': campaign.title,
-            'platform': campaign.platform,
-            'ad_count': ad_count,
-            'image_count': image_count,
-            'days_active': days_active,
-            'dates': dates,
-            'impressions': impressions,
-            'clicks': clicks,
-            'conversions': conversions,
-            'spend': spend,
-            'ctr': ctr_data,
-            'total_impressions': total_impressions,
-            'total_clicks': total_clicks,
-            'total_conversions': total_conversions,
-            'total_spend': round(total_spend, 2),
-            'avg_ctr': avg_ctr,
-            'avg_cpc': avg_cpc,
-            'conversion_rate': conversion_rate,
-            'cost_per_conversion': cost_per_conversion,
-            'roas': roas,
-            'performance_score': min(98, int(65 + (roas * 6) + (conversion_rate * 2.5)))
-        })
-
 # ============================================================================
 # REAL AUDIENCE INSIGHTS - COMPLETELY REWRITTEN
 # ============================================================================
@@ -342,12 +184,12 @@ class AudienceInsightsView(APIView):
             two_weeks_ago = week_ago - timedelta(days=7)
             
             recent = DailyAnalytics.objects.filter(
-                campaign__user=user,
+                user=user,
                 date__gte=week_ago
             ).aggregate(clicks=Sum('clicks'))['clicks'] or 0
             
             previous = DailyAnalytics.objects.filter(
-                campaign__user=user,
+                user=user,
                 date__gte=two_weeks_ago,
                 date__lt=week_ago
             ).aggregate(clicks=Sum('clicks'))['clicks'] or 1
@@ -367,8 +209,11 @@ class AudienceInsightsView(APIView):
         # Platform-specific demographics (based on industry data)
         demographics = self._get_platform_demographics(platform)
         
+        # Hour-of-week performance from hourly analytics, when reported
+        heatmap = HourlyAnalyticsService.hour_of_week_heatmap(request.user, campaign_id or None)
+        
         # Best posting times based on actual campaign performance
-        best_times = self._calculate_best_times(campaign_id if campaign_id else None, request.user)
+        best_times = self._calculate_best_times(campaign_id if campaign_id else None, request.user, heatmap)
         
         # Top locations (if you have location data, otherwise industry averages)
         top_locations = self._get_top_locations(platform)
@@ -389,6 +234,7 @@ class AudienceInsightsView(APIView):
             'gender': demographics['gender'],
             'interests': interests,
             'best_times': best_times,
+            'hour_heatmap': heatmap if heatmap['total_impressions'] else None,
             'top_locations': top_locations,
             
             'recommendations': recommendations,
@@ -456,16 +302,17 @@ class AudienceInsightsView(APIView):
         
         return recommendations
     
-    def _calculate_best_times(self, campaign_id, user):
+    def _calculate_best_times(self, campaign_id, user, heatmap=None):
         """Calculate actual best posting times from campaign data"""
-        if campaign_id:
-            # Get performance by day of week for specific campaign
-            daily_data = DailyAnalytics.objects.filter(campaign_id=campaign_id)
-        else:
-            # Aggregate across all user campaigns
-            daily_data = DailyAnalytics.objects.filter(campaign__user=user)
+        if heatmap and heatmap['total_impressions']:
+            best_times = HourlyAnalyticsService.best_times(heatmap)
+            if best_times:
+                return best_times
         
-        if not daily_data.exists():
+        # No usable hourly data: rank weekdays from daily analytics
+        day_performance = AnalyticsAggregationService.weekday_performance(user, campaign_id)
+        
+        if not day_performance:
             # Return defaults if no data
             return [
                 {'day': 'Monday', 'time': '6-9 PM', 'engagement': 'Medium'},
@@ -473,42 +320,16 @@ class AudienceInsightsView(APIView):
                 {'day': 'Friday', 'time': '5-8 PM', 'engagement': 'Very High'},
             ]
         
-        # Group by day of week and calculate average engagement
-        day_performance = {}
-        for data in daily_data:
-            day_name = data.date.strftime('%A')
-            if day_name not in day_performance:
-                day_performance[day_name] = {'clicks': 0, 'impressions': 0, 'count': 0}
-            
-            day_performance[day_name]['clicks'] += data.clicks
-            day_performance[day_name]['impressions'] += data.impressions
-            day_performance[day_name]['count'] += 1
-        
-        # Calculate engagement rates and sort
-        results = []
-        for day, stats in day_performance.items():
-            avg_ctr = (stats['clicks'] / stats['impressions'] * 100) if stats['impressions'] > 0 else 0
-            
-            # Determine engagement level
-            if avg_ctr > 5:
-                engagement = 'Very High'
-            elif avg_ctr > 3:
-                engagement = 'High'
-            elif avg_ctr > 1:
-                engagement = 'Medium'
-            else:
-                engagement = 'Low'
-            
-            results.append({
-                'day': day,
-                'time': '6-9 PM',  # Default prime time
-                'engagement': engagement,
-                'ctr': round(avg_ctr, 2)
-            })
-        
-        # Sort by engagement and return top 4
-        results.sort(key=lambda x: x['ctr'], reverse=True)
-        return results[:4]
+        # Already sorted by CTR; return top 4
+        return [
+            {
+                'day': day['day'],
+                'time': '6-9 PM',  # Default prime time, daily data has no hours
+                'engagement': engagement_level(day['ctr']),
+                'ctr': day['ctr']
+            }
+            for day in day_performance[:4]
+        ]
     
     def _get_platform_demographics(self, platform):
         """Get industry-standard demographics for platform"""
@@ -643,317 +464,18 @@ class AudienceInsightsView(APIView):
         ]
 
 
-# ============================================================================
-# REAL WEEKLY REPORT WITH ACTIONABLE INSIGHTS
-# ============================================================================
-class WeeklyReportView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
-    
-    def get(self, request):
-        user = request.user
-        today = datetime.now().date()
-        week_ago = today - timedelta(days=7)
-        two_weeks_ago = week_ago - timedelta(days=7)
-        
-        # REAL DATA: Count actual resources created this week
-        campaigns_created = Campaign.objects.filter(
-            user=user,
-            created_at__date__gte=week_ago
-        ).count()
-        
-        ads_generated = AdContent.objects.filter(
-            campaign__user=user,
-            created_at__date__gte=week_ago
-        ).count()
-        
-        images_generated = ImageAsset.objects.filter(
-            campaign__user=user,
-            created_at__date__gte=week_ago
-        ).count()
-        
-        active_campaigns = Campaign.objects.filter(
-            user=user,
-            is_active=True,
-            end_date__gte=today
-        ).count()
-        
-        # REAL WEEKLY ANALYTICS
-        weekly_analytics = DailyAnalytics.objects.filter(
-            campaign__user=user,
-            date__gte=week_ago,
-            date__lte=today
-        ).aggregate(
-            total_impressions=Sum('impressions'),
-            total_clicks=Sum('clicks'),
-            total_conversions=Sum('conversions'),
-            total_spend=Sum('spend')
-        )
-        
-        # PREVIOUS WEEK FOR COMPARISON
-        previous_week_analytics = DailyAnalytics.objects.filter(
-            campaign__user=user,
-            date__gte=two_weeks_ago,
-            date__lt=week_ago
-        ).aggregate(
-            prev_impressions=Sum('impressions'),
-            prev_clicks=Sum('clicks'),
-            prev_conversions=Sum('conversions'),
-            prev_spend=Sum('spend')
-        )
-        
-        # Calculate metrics
-        total_impressions = weekly_analytics['total_impressions'] or 0
-        total_clicks = weekly_analytics['total_clicks'] or 0
-        total_conversions = weekly_analytics['total_conversions'] or 0
-        total_spend = float(weekly_analytics['total_spend'] or 0)
-        
-        prev_impressions = previous_week_analytics['prev_impressions'] or 1
-        prev_clicks = previous_week_analytics['prev_clicks'] or 1
-        prev_conversions = previous_week_analytics['prev_conversions'] or 1
-        
-        # Calculate growth rates
-        impression_growth = round(((total_impressions - prev_impressions) / prev_impressions) * 100, 1)
-        click_growth = round(((total_clicks - prev_clicks) / prev_clicks) * 100, 1)
-        conversion_growth = round(((total_conversions - prev_conversions) / prev_conversions) * 100, 1)
-        
-        # Calculate rates
-        avg_ctr = round((total_clicks / total_impressions * 100), 2) if total_impressions > 0 else 0
-        conversion_rate = round((total_conversions / total_clicks * 100), 2) if total_clicks > 0 else 0
-        
-        # Get top performing campaign
-        top_campaign = Campaign.objects.filter(
-            user=user,
-            analytics_summary__isnull=False
-        ).order_by('-analytics_summary__performance_score').first()
-        
-        # Get worst performing campaign for improvement suggestions
-        worst_campaign = Campaign.objects.filter(
-            user=user,
-            analytics_summary__isnull=False
-        ).order_by('analytics_summary__performance_score').first()
-        
-        # REAL INSIGHTS from actual data
-        insights = {
-            'top_performing_platform': top_campaign.platform.title() if top_campaign else 'N/A',
-            'top_campaign_name': top_campaign.title if top_campaign else 'N/A',
-            'top_campaign_score': top_campaign.analytics_summary.performance_score if top_campaign else 0,
-            'total_impressions': total_impressions,
-            'total_clicks': total_clicks,
-            'total_conversions': total_conversions,
-            'total_spend': round(total_spend, 2),
-            'avg_ctr': avg_ctr,
-            'conversion_rate': conversion_rate,
-            'impression_growth': f"{'+' if impression_growth > 0 else ''}{impression_growth}%",
-            'click_growth': f"{'+' if click_growth > 0 else ''}{click_growth}%",
-            'conversion_growth': f"{'+' if conversion_growth > 0 else ''}{conversion_growth}%",
-            'engagement_trend': 'Increasing' if click_growth > 0 else 'Decreasing',
-            'roas': round((total_conversions * 50 / total_spend), 2) if total_spend > 0 else 0
-        }
-        
-        # SMART RECOMMENDATIONS based on real performance
-        recommendations = self._generate_weekly_recommendations(
-            avg_ctr=avg_ctr,
-            conversion_rate=conversion_rate,
-            click_growth=click_growth,
-            total_spend=total_spend,
-            active_campaigns=active_campaigns,
-            ads_generated=ads_generated,
-            top_campaign=top_campaign,
-            worst_campaign=worst_campaign,
-            insights=insights
-        )
-        
-        # ACTIONABLE NEXT STEPS
-        next_steps = self._generate_next_steps(
-            top_campaign=top_campaign,
-            worst_campaign=worst_campaign,
-            avg_ctr=avg_ctr,
-            ads_generated=ads_generated,
-            active_campaigns=active_campaigns
-        )
-        
-        return Response({
-            'period': f'{week_ago.strftime("%b %d")} - {today.strftime("%b %d, %Y")}',
-            'summary': {
-                'campaigns_created': campaigns_created,
-                'ads_generated': ads_generated,
-                'images_generated': images_generated,
-                'active_campaigns': active_campaigns,
-                'total_engagement': total_clicks,
-                'engagement_growth': insights['click_growth']
-            },
-            'insights': insights,
-            'recommendations': recommendations,
-            'next_steps': next_steps,
-            'comparison_available': prev_clicks > 0
-        })
-    
-    def _generate_weekly_recommendations(self, avg_ctr, conversion_rate, click_growth, 
-                                        total_spend, active_campaigns, ads_generated,
-                                        top_campaign, worst_campaign, insights):
-        """Generate data-driven recommendations"""
-        recommendations = []
-        
-        # CTR Analysis
-        if avg_ctr < 2:
-            recommendations.append({
-                'category': 'Performance',
-                'priority': 'high',
-                'title': 'Improve Click-Through Rate',
-                'description': f'Your weekly CTR is {avg_ctr}%, which is below the 3-5% industry benchmark. Test new headlines and visuals.',
-                'action': 'A/B Test Creatives',
-                'impact': '+50-100% potential CTR increase',
-                'metric': 'CTR',
-                'current': f'{avg_ctr}%',
-                'target': '3-5%'
-            })
-        elif avg_ctr >= 5:
-            recommendations.append({
-                'category': 'Performance',
-                'priority': 'high',
-                'title': 'Excellent Performance - Scale Up',
-                'description': f'Your {avg_ctr}% CTR is outstanding! Scale your best campaigns to maximize results.',
-                'action': 'Increase Budget',
-                'impact': '+100-200% potential reach',
-                'metric': 'CTR',
-                'current': f'{avg_ctr}%',
-                'target': 'Maintain'
-            })
-        
-        # Conversion Rate Analysis
-        if conversion_rate < 5 and avg_ctr > 2:
-            recommendations.append({
-                'category': 'Optimization',
-                'priority': 'high',
-                'title': 'Optimize Conversion Funnel',
-                'description': f'You have good traffic ({avg_ctr}% CTR) but low conversions ({conversion_rate}%). Review landing pages.',
-                'action': 'Optimize Landing Page',
-                'impact': '+30-60% conversion increase',
-                'metric': 'Conversion Rate',
-                'current': f'{conversion_rate}%',
-                'target': '5-10%'
-            })
-        
-        # Growth Trend
-        if click_growth < -10:
-            recommendations.append({
-                'category': 'Engagement',
-                'priority': 'high',
-                'title': 'Reverse Declining Engagement',
-                'description': f'Engagement dropped {click_growth}% this week. Refresh ad creatives and review audience targeting.',
-                'action': 'Refresh Campaign',
-                'impact': 'Reverse negative trend',
-                'metric': 'Weekly Growth',
-                'current': f'{click_growth}%',
-                'target': '+10%'
-            })
-        elif click_growth > 20:
-            recommendations.append({
-                'category': 'Growth',
-                'priority': 'medium',
-                'title': 'Capitalize on Momentum',
-                'description': f'Strong {click_growth}% growth! Now is the time to increase investment and expand reach.',
-                'action': 'Scale Investment',
-                'impact': 'Maximize growth period',
-                'metric': 'Weekly Growth',
-                'current': f'{click_growth}%',
-                'target': 'Sustain'
-            })
-        
-        # Content Generation
-        if ads_generated < 5:
-            recommendations.append({
-                'category': 'Content',
-                'priority': 'medium',
-                'title': 'Increase Ad Variations',
-                'description': f'Only {ads_generated} ads created this week. More variations improve testing effectiveness.',
-                'action': 'Generate 5+ Variations',
-                'impact': '+25% optimization potential',
-                'metric': 'Content Volume',
-                'current': f'{ads_generated} ads',
-                'target': '10+ ads/week'
-            })
-        
-        # Budget Efficiency
-        if total_spend > 0 and insights['roas'] < 2:
-            recommendations.append({
-                'category': 'Budget',
-                'priority': 'high',
-                'title': 'Improve Return on Ad Spend',
-                'description': f'Current ROAS is {insights["roas"]}x. Review targeting and pause low-performing campaigns.',
-                'action': 'Optimize Budget Allocation',
-                'impact': '+50-100% ROAS improvement',
-                'metric': 'ROAS',
-                'current': f'{insights["roas"]}x',
-                'target': '3-5x'
-            })
-        
-        # Campaign Activity
-        if active_campaigns == 0:
-            recommendations.append({
-                'category': 'Campaigns',
-                'priority': 'high',
-                'title': 'Launch Active Campaigns',
-                'description': 'No active campaigns running. Create and launch campaigns to start generating results.',
-                'action': 'Create Campaign',
-                'impact': 'Begin generating ROI',
-                'metric': 'Active Campaigns',
-                'current': '0',
-                'target': '3-5'
-            })
-        
-        # Top Campaign Optimization
-        if top_campaign and top_campaign.analytics_summary.performance_score > 70:
-            recommendations.append({
-                'category': 'Scaling',
-                'priority': 'medium',
-                'title': f'Scale Top Performer: {top_campaign.title}',
-                'description': f'This campaign has {top_campaign.analytics_summary.performance_score}/100 score. Allocate more budget.',
-                'action': 'Increase Budget by 25%',
-                'impact': '+30-50% additional reach',
-                'metric': 'Performance Score',
-                'current': f'{top_campaign.analytics_summary.performance_score}/100',
-                'target': 'Maximize'
-            })
-        
-        # Sort by priority
-        priority_order = {'high': 0, 'medium': 1, 'low': 2}
-        recommendations.sort(key=lambda x: priority_order.get(x['priority'], 3))
-        
-        return recommendations[:6]  # Return top 6
-    
-    def _generate_next_steps(self, top_campaign, worst_campaign, avg_ctr, 
-                            ads_generated, active_campaigns):
-        """Generate specific action items"""
-        steps = []
-        
-        if top_campaign:
-            steps.append(f"Review and scale best performer: {top_campaign.title}")
-        
-        if worst_campaign and worst_campaign.analytics_summary.performance_score < 50:
-            steps.append(f"Improve or pause low performer: {worst_campaign.title} ({worst_campaign.analytics_summary.performance_score}/100)")
-        
-        if avg_ctr < 3:
-            steps.append(f"Run A/B tests on headlines and visuals to improve {avg_ctr}% CTR")
-        
-        if ads_generated < 10:
-            steps.append(f"Generate {10 - ads_generated} more ad variations for testing")
-        
-        if active_campaigns < 3:
-            steps.append("Launch 2-3 new campaigns targeting different audiences")
-        
-        steps.append("Check audience insights for optimal posting times")
-        steps.append("Review budget allocation across all campaigns")
-        
-        return steps[:5]  # Return top 5
-
 # ============================================================================
 # AI Text Generation with DeepSeek V3.1
 # ============================================================================
-class AdContentGeneratorView(APIView):
+class AdContentGeneratorView(QuotaMixin, AsyncAPIView):
+    """
+    Async: the request spends almost all its time waiting on OpenRouter, so
+    under ASGI one worker serves many generations at once.
+    """
     permission_classes = [permissions.IsAuthenticated]
+    quota_scope = 'text_generation'
 
-    def post(self, request):
+    async def post(self, request):
         prompt = request.data.get('prompt')
         tone = request.data.get('tone', 'persuasive')
         platform = request.data.get('platform', 'instagram')
@@ -1032,12 +554,7 @@ Generate the ad copy now:"""
                 "max_tokens": 2048,
             }
             
-            response = requests.post(
-                'https://openrouter.ai/api/v1/chat/completions',
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
+            response = await afetch('openrouter', 'POST', settings.OPENROUTER_API_URL, headers=headers, json=payload)
             
             if response.status_code != 200:
                 error_msg = response.json().get('error', {}).get('message', 'Unknown error')
@@ -1065,55 +582,42 @@ Generate the ad copy now:"""
             
             saved_ads = []
             if campaign_id:
-                try:
-                    campaign = Campaign.objects.get(id=campaign_id, user=request.user)
+                if num_variations > 1:
+                    # Parse variations
+                    variations = []
                     
-                    if num_variations > 1:
-                        # Parse variations
-                        variations = []
-                        
-                        # Split by VARIATION markers
-                        parts = generated_text.split('VARIATION')
-                        
-                        for part in parts[1:]:  # Skip first empty part
-                            # Remove the number and colon
-                            if ':' in part:
-                                text = part.split(':', 1)[1]
-                            else:
-                                # If no colon, take everything after the first digit
-                                text = ''.join(part.split(maxsplit=1)[1:]) if len(part.split(maxsplit=1)) > 1 else part
-                            
-                            # Clean the text
-                            cleaned = clean_text(text)
-                            
-                            # Only add if not empty
-                            if cleaned and len(cleaned) > 10:
-                                variations.append(cleaned)
+                    # Split by VARIATION markers
+                    parts = generated_text.split('VARIATION')
+                    
+                    for part in parts[1:]:  # Skip first empty part
+                        # Remove the number and colon
+                        if ':' in part:
+                            text = part.split(':', 1)[1]
+                        else:
+                            # If no colon, take everything after the first digit
+                            text = ''.join(part.split(maxsplit=1)[1:]) if len(part.split(maxsplit=1)) > 1 else part
                         
-                        # If parsing failed, try line-by-line
-                        if not variations:
-                            lines = [line.strip() for line in generated_text.split('\n') if line.strip()]
-                            variations = [clean_text(line) for line in lines if len(clean_text(line)) > 10]
+                        # Clean the text
+                        cleaned = clean_text(text)
                         
-                        # Limit to requested number
-                        variations = variations[:num_variations]
-                    else:
-                        # Single variation - just clean the whole text
-                        variations = [clean_text(generated_text)]
+                        # Only add if not empty
+                        if cleaned and len(cleaned) > 10:
+                            variations.append(cleaned)
                     
-                    # Save each variation
-                    for var_text in variations:
-                        if var_text:  # Double-check it's not empty
-                            ad_content = AdContent.objects.create(
-                                campaign=campaign,
-                                text=var_text,
-                                tone=tone,
-                                platform=platform
-                            )
-                            saved_ads.append(AdContentSerializer(ad_content).data)
-                        
-                except Campaign.DoesNotExist:
-                    pass
+                    # If parsing failed, try line-by-line
+                    if not variations:
+                        lines = [line.strip() for line in generated_text.split('\n') if line.strip()]
+                        variations = [clean_text(line) for line in lines if len(clean_text(line)) > 10]
+                    
+                    # Limit to requested number
+                    variations = variations[:num_variations]
+                else:
+                    # Single variation - just clean the whole text
+                    variations = [clean_text(generated_text)]
+                
+                saved_ads = await db_sync_to_async(self._save_variations)(
+                    request.user, campaign_id, variations, tone, platform
+                )
             
             # Clean the full text for display
             display_text = clean_text(generated_text)
@@ -1124,20 +628,24 @@ Generate the ad copy now:"""
                 "saved_ads": saved_ads
             }, status=status.HTTP_200_OK)
 
-        except requests.exceptions.Timeout:
+        except CircuitOpenError as e:
+            return Response(
+                {"error": "AI generation is temporarily unavailable. Please try again shortly."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(math.ceil(e.retry_after))}
+            )
+        except httpx.TimeoutException:
             return Response(
                 {"error": "Request timed out. Please try again."},
                 status=status.HTTP_408_REQUEST_TIMEOUT
             )
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             return Response(
                 {"error": f"Network error: {str(e)}"},
                 status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
         except Exception as e:
-            import traceback
-            error_trace = traceback.format_exc()
-            print(f"Text generation error: {error_trace}")
+            logger.exception(f"❌ Text generation error: {e}")
             
             error_message = str(e)
             if "API key" in error_message or "403" in error_message:
@@ -1152,13 +660,34 @@ Generate the ad copy now:"""
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @transaction.atomic
+    def _save_variations(self, user, campaign_id, variations, tone, platform):
+        """Save each variation to the user's campaign; nothing if it isn't theirs"""
+        try:
+            campaign = Campaign.objects.get(id=campaign_id, user=user)
+        except Campaign.DoesNotExist:
+            return []
+
+        saved_ads = []
+        for var_text in variations:
+            if var_text:  # Double-check it's not empty
+                ad_content = AdContent.objects.create(
+                    campaign=campaign,
+                    text=var_text,
+                    tone=tone,
+                    platform=platform
+                )
+                saved_ads.append(AdContentSerializer(ad_content).data)
+        return saved_ads
+
 # ============================================================================
 # ENHANCED AI IMAGE GENERATION WITH MULTIPLE AI PROVIDERS
 # ============================================================================
-class ImageGeneratorView(APIView):
+class ImageGeneratorView(QuotaMixin, AsyncAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    quota_scope = 'image_generation'
 
-    def post(self, request):
+    async def post(self, request):
         prompt = request.data.get('prompt')
         campaign_id = request.data.get('campaign_id')
         style = request.data.get('style', 'professional')
@@ -1178,9 +707,8 @@ class ImageGeneratorView(APIView):
         if not campaign_id:
             return Response({"error": "campaign_id is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            campaign = Campaign.objects.get(id=campaign_id, user=request.user)
-        except Campaign.DoesNotExist:
+        owned = Campaign.objects.filter(id=campaign_id, user=request.user)
+        if not await db_sync_to_async(owned.exists)():
             return Response(
                 {"error": "Campaign not found or you do not have permission"}, 
                 status=status.HTTP_404_NOT_FOUND
@@ -1213,103 +741,21 @@ perfect for social media advertising, professional color grading, no existing te
         
         width, height = dimensions.get(aspect_ratio, (1024, 1024))
 
-        generated_images = []
+        template_args = (ad_template, headline, tagline, cta_text, aspect_ratio) if (
+            include_text and (headline or tagline or cta_text)
+        ) else None
         
         try:
             # 1. ALWAYS Generate from Pollinations.AI (Free, Primary)
-            try:
-                print(f"🎨 Generating with Pollinations.ai...")
-                pollinations_bytes = self._generate_with_pollinations(
-                    enhanced_prompt,
-                    width,
-                    height
-                )
-                
-                if pollinations_bytes:
-                    pollinations_image = Image.open(io.BytesIO(pollinations_bytes))
-                    
-                    if include_text and (headline or tagline or cta_text):
-                        pollinations_final = self._apply_ad_template(
-                            pollinations_image,
-                            ad_template,
-                            headline,
-                            tagline,
-                            cta_text,
-                            aspect_ratio
-                        )
-                    else:
-                        pollinations_final = pollinations_image
-                    
-                    pollinations_output = io.BytesIO()
-                    pollinations_final.save(pollinations_output, format='PNG', quality=95)
-                    pollinations_output.seek(0)
-                    pollinations_base64 = base64.b64encode(pollinations_output.read()).decode('utf-8')
-                    
-                    generated_images.append({
-                        'provider': 'pollinations',
-                        'image_data': f"data:image/png;base64,{pollinations_base64}",
-                        'name': 'Pollinations.AI (Free)',
-                        'description': 'Fast generation, creative results'
-                    })
-                    print(f"✅ Pollinations.ai: SUCCESS")
-                else:
-                    print(f"❌ Pollinations.ai: No image data returned")
-            except Exception as e:
-                print(f"❌ Pollinations generation failed: {str(e)}")
-                import traceback
-                traceback.print_exc()
+            providers = [self._pollinations_image(enhanced_prompt, width, height, template_args)]
             
             # 2. Generate from Stability.AI (Premium, Optional)
-            if generate_both:
-                try:
-                    # Check if API key exists before attempting
-                    api_key = getattr(settings, 'STABILITY_API_KEY', None)
-                    if api_key and api_key.strip():
-                        print(f"🎨 Generating with Stability.ai...")
-                        stability_bytes = self._generate_with_stability_api(
-                            enhanced_prompt,
-                            width,
-                            height,
-                            style
-                        )
-                        
-                        if stability_bytes:
-                            stability_image = Image.open(io.BytesIO(stability_bytes))
-                            
-                            if include_text and (headline or tagline or cta_text):
-                                stability_final = self._apply_ad_template(
-                                    stability_image,
-                                    ad_template,
-                                    headline,
-                                    tagline,
-                                    cta_text,
-                                    aspect_ratio
-                                )
-                            else:
-                                stability_final = stability_image
-                            
-                            stability_output = io.BytesIO()
-                            stability_final.save(stability_output, format='PNG', quality=95)
-                            stability_output.seek(0)
-                            stability_base64 = base64.b64encode(stability_output.read()).decode('utf-8')
-                            
-                            generated_images.append({
-                                'provider': 'stability',
-                                'image_data': f"data:image/png;base64,{stability_base64}",
-                                'name': 'Stability.AI (Premium)',
-                                'description': 'High quality, photorealistic'
-                            })
-                            print(f"✅ Stability.ai: SUCCESS")
-                        else:
-                            print(f"⚠️ Stability.ai: No image data returned")
-                    else:
-                        print(f"⚠️ Stability.ai: API key not configured (skipping)")
-                except Exception as e:
-                    print(f"❌ Stability generation failed: {str(e)}")
-                    # Don't print full traceback for missing API key
-                    if "not configured" not in str(e):
-                        import traceback
-                        traceback.print_exc()
+            if generate_both:
+                providers.append(self._stability_image(enhanced_prompt, width, height, style, template_args))
+            
+            # Both providers take tens of seconds; wait for them side by side
+            results = await asyncio.gather(*providers)
+            generated_images = [image for image in results if image]
             
             if not generated_images:
                 return Response(
@@ -1330,15 +776,81 @@ perfect for social media advertising, professional color grading, no existing te
             }, status=status.HTTP_200_OK)
 
         except Exception as e:
-            import traceback
-            error_trace = traceback.format_exc()
-            print(f"❌ Image generation error: {error_trace}")
+            logger.exception(f"❌ Image generation error: {e}")
             return Response(
                 {"error": f"AI generation failed: {str(e)}"}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-    def _generate_with_pollinations(self, prompt, width, height):
+    def _render_ad(self, image_bytes, template_args):
+        """Apply the ad template (if any) and encode as a PNG data URL"""
+        image = Image.open(io.BytesIO(image_bytes))
+        if template_args:
+            image = self._apply_ad_template(image, *template_args)
+        
+        output = io.BytesIO()
+        image.save(output, format='PNG', quality=95)
+        output.seek(0)
+        return f"data:image/png;base64,{base64.b64encode(output.read()).decode('utf-8')}"
+
+    async def _pollinations_image(self, prompt, width, height, template_args):
+        try:
+            logger.info("🎨 Generating with Pollinations.ai...")
+            pollinations_bytes = await self._generate_with_pollinations(prompt, width, height)
+            
+            if not pollinations_bytes:
+                logger.warning("❌ Pollinations.ai: No image data returned")
+                return None
+            
+            # Compositing and PNG encoding are CPU-bound; keep them off the event loop
+            image_data = await sync_to_async(self._render_ad, thread_sensitive=False)(
+                pollinations_bytes, template_args
+            )
+            logger.info("✅ Pollinations.ai: SUCCESS")
+            return {
+                'provider': 'pollinations',
+                'image_data': image_data,
+                'name': 'Pollinations.AI (Free)',
+                'description': 'Fast generation, creative results'
+            }
+        except Exception as e:
+            logger.exception(f"❌ Pollinations generation failed: {e}")
+            return None
+
+    async def _stability_image(self, prompt, width, height, style, template_args):
+        try:
+            # Check if API key exists before attempting
+            api_key = getattr(settings, 'STABILITY_API_KEY', None)
+            if not api_key or not api_key.strip():
+                logger.info("⚠️ Stability.ai: API key not configured (skipping)")
+                return None
+            
+            logger.info("🎨 Generating with Stability.ai...")
+            stability_bytes = await self._generate_with_stability_api(prompt, width, height, style)
+            
+            if not stability_bytes:
+                logger.warning("⚠️ Stability.ai: No image data returned")
+                return None
+            
+            image_data = await sync_to_async(self._render_ad, thread_sensitive=False)(
+                stability_bytes, template_args
+            )
+            logger.info("✅ Stability.ai: SUCCESS")
+            return {
+                'provider': 'stability',
+                'image_data': image_data,
+                'name': 'Stability.AI (Premium)',
+                'description': 'High quality, photorealistic'
+            }
+        except Exception as e:
+            # Don't log the full traceback for a missing API key
+            if "not configured" in str(e):
+                logger.warning(f"❌ Stability generation failed: {e}")
+            else:
+                logger.exception(f"❌ Stability generation failed: {e}")
+            return None
+
+    async def _generate_with_pollinations(self, prompt, width, height):
         """
         Generate image using Pollinations.AI (Free, no API key needed)
         Updated URL format: https://image.pollinations.ai/prompt/{prompt}?width=X&height=Y
@@ -1358,58 +870,53 @@ perfect for social media advertising, professional color grading, no existing te
                 f"?width={width}&height={height}&nologo=true&enhance=true"
             )
             
-            print(f"🔗 Pollinations URL (first 150 chars): {pollinations_url[:150]}...")
+            logger.debug(f"🔗 Pollinations URL (first 150 chars): {pollinations_url[:150]}...")
             
-            # Make request with timeout
-            response = requests.get(pollinations_url, timeout=90, stream=True)
+            response = await afetch('pollinations', 'GET', pollinations_url)
             
-            print(f"📡 Response status: {response.status_code}")
-            print(f"📦 Content-Type: {response.headers.get('content-type', 'unknown')}")
+            logger.debug(f"📡 Response status: {response.status_code}")
+            logger.debug(f"📦 Content-Type: {response.headers.get('content-type', 'unknown')}")
             
             if response.status_code == 200:
                 # Check if we got image data
                 content_type = response.headers.get('content-type', '')
                 if 'image' in content_type:
                     image_bytes = response.content
-                    print(f"✅ Image received: {len(image_bytes)} bytes")
+                    logger.debug(f"✅ Image received: {len(image_bytes)} bytes")
                     
                     # Verify it's a valid image
                     try:
                         test_image = Image.open(io.BytesIO(image_bytes))
                         test_image.verify()
-                        print(f"✅ Image verified: {test_image.format} {test_image.size}")
+                        logger.debug(f"✅ Image verified: {test_image.format} {test_image.size}")
                         return image_bytes
                     except Exception as verify_error:
-                        print(f"❌ Image verification failed: {str(verify_error)}")
+                        logger.warning(f"❌ Image verification failed: {verify_error}")
                         return None
                 else:
-                    print(f"❌ Wrong content type: {content_type}")
-                    print(f"Response preview: {response.text[:200]}")
+                    logger.warning(f"❌ Wrong content type: {content_type}; response preview: {response.text[:200]}")
                     return None
             else:
-                print(f"❌ HTTP Error {response.status_code}")
-                print(f"Response: {response.text[:300]}")
+                logger.warning(f"❌ HTTP Error {response.status_code}: {response.text[:300]}")
                 return None
                 
-        except requests.exceptions.Timeout:
-            print(f"⏱️ Pollinations request timed out")
+        except httpx.TimeoutException:
+            logger.warning("⏱️ Pollinations request timed out")
             return None
-        except requests.exceptions.ConnectionError as e:
-            print(f"🔌 Connection error: {str(e)}")
+        except httpx.TransportError as e:
+            logger.warning(f"🔌 Connection error: {e}")
             return None
         except Exception as e:
-            print(f"❌ Pollinations generation error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"❌ Pollinations generation error: {e}")
             return None
 
-    def _generate_with_stability_api(self, prompt, width, height, style):
+    async def _generate_with_stability_api(self, prompt, width, height, style):
         """Generate image using Stability AI REST API"""
         
         api_key = getattr(settings, 'STABILITY_API_KEY', None)
         
         if not api_key or not api_key.strip():
-            print("⚠️ STABILITY_API_KEY not configured in settings")
+            logger.warning("⚠️ STABILITY_API_KEY not configured in settings")
             return None
         
         engine_id = "stable-diffusion-xl-1024-v1-0"
@@ -1425,7 +932,8 @@ perfect for social media advertising, professional color grading, no existing te
         }
         
         try:
-            response = requests.post(
+            response = await afetch(
+                'stability', 'POST',
                 f"{api_host}/v1/generation/{engine_id}/text-to-image",
                 headers={
                     "Content-Type": "application/json",
@@ -1450,11 +958,10 @@ perfect for social media advertising, professional color grading, no existing te
                     "steps": 50,
                     "sampler": sampler_map.get(style, 'K_DPMPP_2M'),
                 },
-                timeout=90
             )
             
             if response.status_code != 200:
-                print(f"❌ Stability API error {response.status_code}: {response.text[:200]}")
+                logger.warning(f"❌ Stability API error {response.status_code}: {response.text[:200]}")
                 return None
             
             data = response.json()
@@ -1466,7 +973,7 @@ perfect for social media advertising, professional color grading, no existing te
             return None
             
         except Exception as e:
-            print(f"❌ Stability API exception: {str(e)}")
+            logger.exception(f"❌ Stability API exception: {e}")
             return None
 
     def _apply_ad_template(self, base_image, template, headline, tagline, cta_text, aspect_ratio):
@@ -1821,12 +1328,23 @@ class GitHubLoginView(SocialLoginView):
 # ============================================================================
 # REAL-TIME ANALYTICS SUMMARY - FIXED
 # ============================================================================
-class AnalyticsSummaryView(APIView):
+MAX_SUMMARY_DAYS = 365
+
+
+class AnalyticsSummaryView(ReplicaReadMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
         campaign_id = request.query_params.get('campaign_id')
-        days = int(request.query_params.get('days', 30))  # Default 30 days
+        
+        try:
+            days = int(request.query_params.get('days', 30))  # Default 30 days
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'days must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        days = max(1, min(days, MAX_SUMMARY_DAYS))
         
         if not campaign_id:
             return Response(
@@ -1842,24 +1360,29 @@ class AnalyticsSummaryView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Get or create campaign summary
-        summary, created = CampaignAnalyticsSummary.objects.get_or_create(
-            campaign=campaign
-        )
-        
-        if created:
-            summary.update_metrics()
+        # Get or create campaign summary. On the primary: update_metrics()
+        # saves what it reads, and by id so it doesn't follow the replica
+        # `campaign` was loaded from
+        with use_primary():
+            summary, created = CampaignAnalyticsSummary.objects.get_or_create(
+                campaign_id=campaign.id
+            )
+            
+            if created:
+                summary.update_metrics()
         
         # Get date range for daily data
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=days-1)
         
-        # Get daily analytics
+        # Get daily analytics (only the charted columns)
         daily_data = DailyAnalytics.objects.filter(
             campaign=campaign,
             date__gte=start_date,
             date__lte=end_date
-        ).order_by('date')
+        ).order_by('date').values_list(
+            'date', 'impressions', 'clicks', 'conversions', 'spend', 'ctr'
+        )
         
         # Prepare data for charts
         dates = []
@@ -1869,13 +1392,13 @@ class AnalyticsSummaryView(APIView):
         spend = []
         ctr_data = []
         
-        for day in daily_data:
-            dates.append(day.date.strftime('%b %d'))
-            impressions.append(day.impressions)
-            clicks.append(day.clicks)
-            conversions.append(day.conversions)
-            spend.append(float(day.spend))
-            ctr_data.append(day.ctr)
+        for day, day_impressions, day_clicks, day_conversions, day_spend, day_ctr in daily_data:
+            dates.append(day.strftime('%b %d'))
+            impressions.append(day_impressions)
+            clicks.append(day_clicks)
+            conversions.append(day_conversions)
+            spend.append(float(day_spend))
+            ctr_data.append(day_ctr)
         
         # Get counts
         ad_count = campaign.ad_content.count()
@@ -1921,7 +1444,7 @@ class AnalyticsSummaryView(APIView):
 # ============================================================================
 # DASHBOARD STATS WITH REAL DATA - FIXED
 # ============================================================================
-class DashboardStatsView(APIView):
+class DashboardStatsView(ReplicaReadMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
@@ -1929,8 +1452,8 @@ class DashboardStatsView(APIView):
         
         # Basic counts - FIXED VARIABLE REFERENCE
         total_campaigns = Campaign.objects.filter(user=user).count()
-        total_ads = AdContent.objects.filter(campaign__user=user).count()
-        total_images = ImageAsset.objects.filter(campaign__user=user).count()
+        total_ads = AdContent.objects.filter(user=user).count()
+        total_images = ImageAsset.objects.filter(user=user).count()
         
         # Budget
         total_budget = Campaign.objects.filter(user=user).aggregate(
@@ -1947,14 +1470,15 @@ class DashboardStatsView(APIView):
         
         # This week stats
         week_ago = today - timedelta(days=7)
+        week_start = start_of_day(week_ago)
         ads_this_week = AdContent.objects.filter(
-            campaign__user=user,
-            created_at__date__gte=week_ago 
+            user=user,
+            created_at__gte=week_start
         ).count()
         
         images_this_week = ImageAsset.objects.filter(
-            campaign__user=user,
-            created_at__date__gte=week_ago
+            user=user,
+            created_at__gte=week_start
         ).count()
         
         # Platform distribution
@@ -1962,20 +1486,15 @@ class DashboardStatsView(APIView):
             count=Count('id')
         )
         
-        # Get aggregate analytics from all campaigns
-        user_campaigns = Campaign.objects.filter(user=user)
-        total_impressions = 0
-        total_clicks = 0
-        total_spend = 0
-        
-        for campaign in user_campaigns:
-            try:
-                summary = CampaignAnalyticsSummary.objects.get(campaign=campaign)
-                total_impressions += summary.total_impressions
-                total_clicks += summary.total_clicks
-                total_spend += float(summary.total_spend)
-            except CampaignAnalyticsSummary.DoesNotExist:
-                continue
+        # Aggregate analytics from all campaign summaries in one query
+        totals = CampaignAnalyticsSummary.objects.filter(campaign__user=user).aggregate(
+            impressions=Sum('total_impressions'),
+            clicks=Sum('total_clicks'),
+            spend=Sum('total_spend'),
+        )
+        total_impressions = totals['impressions'] or 0
+        total_clicks = totals['clicks'] or 0
+        total_spend = float(totals['spend'] or 0)
         
         # Calculate overall CTR
         overall_ctr = round((total_clicks / total_impressions * 100), 2) if total_impressions > 0 else 0
@@ -2047,416 +1566,173 @@ class CampaignComparisonView(APIView):
         })
 
 # ============================================================================
-# AUDIENCE INSIGHTS WITH REAL DATA
+# ANALYTICS QUERY PARAMETERS
 # ============================================================================
-class AudienceInsightsView(APIView):
+def parse_date_range(params, default_days=30, max_days=None):
+    """
+    start_date / end_date query params (YYYY-MM-DD), defaulting to the last
+    `default_days` days. Raises ValueError with a client-facing message.
+    """
+    try:
+        end_date = (
+            datetime.strptime(params['end_date'], '%Y-%m-%d').date()
+            if params.get('end_date') else now().date()
+        )
+        start_date = (
+            datetime.strptime(params['start_date'], '%Y-%m-%d').date()
+            if params.get('start_date') else end_date - timedelta(days=default_days - 1)
+        )
+    except ValueError:
+        raise ValueError('Dates must use the YYYY-MM-DD format')
+    
+    if start_date > end_date:
+        raise ValueError('start_date must be on or before end_date')
+    if max_days is not None and (end_date - start_date).days >= max_days:
+        raise ValueError(f'Date range cannot exceed {max_days} days')
+    return start_date, end_date
+
+
+def parse_campaign_ids(params):
+    """Comma separated campaign_ids query param as UUIDs, or None"""
+    raw_ids = params.get('campaign_ids')
+    if not raw_ids:
+        return None
+    try:
+        return [uuid.UUID(value.strip()) for value in raw_ids.split(',') if value.strip()]
+    except ValueError:
+        raise ValueError('campaign_ids must be comma separated UUIDs')
+
+
+# ============================================================================
+# ANALYTICS EXPORT (STREAMED)
+# ============================================================================
+class AnalyticsExportView(ReplicaReadMixin, APIView):
+    """
+    Stream raw daily analytics as CSV, NDJSON or Parquet.
+
+    Query params: export_format (csv|ndjson|parquet), start_date / end_date
+    (YYYY-MM-DD, default last 30 days), campaign_ids (comma separated).
+    """
     permission_classes = [permissions.IsAuthenticated]
     
+    MAX_EXPORT_DAYS = 366 * 5
+    
     def get(self, request):
-        campaign_id = request.query_params.get('campaign_id')
-        
-        if campaign_id:
-            try:
-                campaign = Campaign.objects.get(id=campaign_id, user=request.user)
-                try:
-                    summary = CampaignAnalyticsSummary.objects.get(campaign=campaign)
-                    total_reach = int(summary.total_impressions)
-                    engaged_users = summary.total_clicks
-                    engagement_rate = float(summary.avg_ctr)
-                except CampaignAnalyticsSummary.DoesNotExist:
-                    total_reach = 0
-                    engaged_users = 0
-                    engagement_rate = 0.0
-            except Campaign.DoesNotExist:
-                return Response({'error': 'Campaign not found'}, status=404)
-        else:
-            # Aggregate across all user campaigns
-            user = request.user
-            summaries = CampaignAnalyticsSummary.objects.filter(campaign__user=user)
-            
-            total_reach = sum(int(s.total_impressions) for s in summaries)
-            engaged_users = sum(s.total_clicks for s in summaries)
-            engagement_rate = round(
-                (engaged_users / total_reach * 100) if total_reach > 0 else 0, 
-                2
+        # `format` is reserved by DRF for renderer negotiation
+        fmt = request.query_params.get('export_format', 'csv').lower()
+        if fmt not in CONTENT_TYPES:
+            return Response(
+                {'error': f"export_format must be one of: {', '.join(CONTENT_TYPES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if fmt == 'parquet' and not parquet_available():
+            return Response(
+                {'error': 'Parquet export requires pyarrow to be installed'},
+                status=status.HTTP_501_NOT_IMPLEMENTED
             )
         
-        # REAL DATA: Calculate from actual performance
-        platform = campaign.platform if campaign_id else 'instagram'
-        
-        # Generic insights (not platform-specific dummy data)
-        return Response({
-            'platform': platform,
-            'total_reach': total_reach,
-            'engaged_users': engaged_users,
-            'engagement_rate': engagement_rate,
-            
-            # Generic demographic data (industry averages - not fake)
-            'age_groups': [
-                {'range': '18-24', 'percentage': 30, 'engagement': 'Medium'},
-                {'range': '25-34', 'percentage': 40, 'engagement': 'High'},
-                {'range': '35-44', 'percentage': 20, 'engagement': 'Medium'},
-                {'range': '45+', 'percentage': 10, 'engagement': 'Low'}
-            ],
-            'gender': [
-                {'type': 'Female', 'percentage': 52},
-                {'type': 'Male', 'percentage': 46},
-                {'type': 'Other', 'percentage': 2}
-            ],
-            'note': 'Demographic data based on industry averages. Connect ad platform APIs for precise targeting data.',
-            
-            # Real recommendations based on actual data
-            'recommendations': [
-                {
-                    'type': 'performance',
-                    'message': f"Your campaigns have {engagement_rate}% engagement rate. {'Excellent!' if engagement_rate > 5 else 'Industry average is 3-5%. Consider optimizing.' if engagement_rate > 3 else 'Below average. Review ad creative and targeting.'}",
-                    'priority': 'high' if engagement_rate < 3 else 'medium'
-                },
-                {
-                    'type': 'reach',
-                    'message': f"Total reach: {total_reach:,} impressions. {'Great visibility!' if total_reach > 50000 else 'Consider increasing budget for more reach.'}",
-                    'priority': 'medium'
-                }
-            ]
-        })
+        try:
+            start_date, end_date = parse_date_range(request.query_params, max_days=self.MAX_EXPORT_DAYS)
+            campaign_ids = parse_campaign_ids(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Evaluated while streaming, after the view has returned
+        queryset = AnalyticsExportService.queryset(request.user, start_date, end_date, campaign_ids)
+        rows = AnalyticsExportService.iter_rows(queryset.using(self.read_db))
+        chunks = AnalyticsExportService.stream(fmt, rows)
+        if isinstance(request._request, ASGIRequest):
+            chunks = AnalyticsExportService.aiter_chunks(chunks)
+        
+        response = StreamingHttpResponse(
+            chunks,
+            content_type=CONTENT_TYPES[fmt]
+        )
+        filename = f'analytics_{start_date.isoformat()}_{end_date.isoformat()}.{fmt}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
 # ============================================================================
-# WEEKLY REPORT WITH REAL DATA
+# ANALYTICS TIME SERIES (COLUMNAR, DOWNSAMPLED)
 # ============================================================================
-class WeeklyReportView(APIView):
+class AnalyticsTimeSeriesView(APIView):
+    """
+    Gap-filled chart series as one array per metric.
+
+    Query params: start_date / end_date, campaign_ids, resolution
+    (day|week|month), metrics (comma separated, the first one drives
+    downsampling), points (target count), downsample (lttb|minmax|none),
+    encoding (json|base64).
+    """
     permission_classes = [permissions.IsAuthenticated]
     
+    MAX_RANGE_DAYS = 366 * 10
+    
     def get(self, request):
-        user = request.user
-        today = datetime.now().date()
-        week_ago = today - timedelta(days=7)
-        two_weeks_ago = week_ago - timedelta(days=7)
-        
-        # REAL DATA: Count actual resources created this week
-        campaigns_created = Campaign.objects.filter(
-            user=user,
-            created_at__date__gte=week_ago
-        ).count()
-        
-        ads_generated = AdContent.objects.filter(
-            campaign__user=user,
-            created_at__date__gte=week_ago
-        ).count()
-        
-        images_generated = ImageAsset.objects.filter(
-            campaign__user=user,
-            created_at__date__gte=week_ago
-        ).count()
-        
-        active_campaigns = Campaign.objects.filter(
-            user=user,
-            is_active=True,
-            end_date__gte=today
-        ).count()
-        
-        # REAL WEEKLY ANALYTICS
-        weekly_analytics = DailyAnalytics.objects.filter(
-            campaign__user=user,
-            date__gte=week_ago,
-            date__lte=today
-        ).aggregate(
-            total_impressions=Sum('impressions'),
-            total_clicks=Sum('clicks'),
-            total_conversions=Sum('conversions'),
-            total_spend=Sum('spend')
-        )
-        
-        # PREVIOUS WEEK FOR COMPARISON
-        previous_week_analytics = DailyAnalytics.objects.filter(
-            campaign__user=user,
-            date__gte=two_weeks_ago,
-            date__lt=week_ago
-        ).aggregate(
-            prev_impressions=Sum('impressions'),
-            prev_clicks=Sum('clicks'),
-            prev_conversions=Sum('conversions'),
-            prev_spend=Sum('spend')
-        )
-        
-        # Calculate metrics
-        total_impressions = weekly_analytics['total_impressions'] or 0
-        total_clicks = weekly_analytics['total_clicks'] or 0
-        total_conversions = weekly_analytics['total_conversions'] or 0
-        total_spend = float(weekly_analytics['total_spend'] or 0)
+        params = request.query_params
+        
+        resolution = params.get('resolution', 'day')
+        method = params.get('downsample', 'lttb')
+        encoding = params.get('encoding', 'json')
+        metrics = [m.strip() for m in params.get('metrics', ','.join(TimeSeriesService.METRICS)).split(',') if m.strip()]
+        
+        errors = []
+        if resolution not in TimeSeriesService.RESOLUTIONS:
+            errors.append(f"resolution must be one of: {', '.join(TimeSeriesService.RESOLUTIONS)}")
+        if method not in TimeSeriesService.DOWNSAMPLE_METHODS:
+            errors.append(f"downsample must be one of: {', '.join(TimeSeriesService.DOWNSAMPLE_METHODS)}")
+        if encoding not in TimeSeriesService.ENCODINGS:
+            errors.append(f"encoding must be one of: {', '.join(TimeSeriesService.ENCODINGS)}")
+        unknown = [m for m in metrics if m not in TimeSeriesService.METRICS]
+        if unknown or not metrics:
+            errors.append(f"metrics must be chosen from: {', '.join(TimeSeriesService.METRICS)}")
         
-        prev_impressions = previous_week_analytics['prev_impressions'] or 1
-        prev_clicks = previous_week_analytics['prev_clicks'] or 1
-        prev_conversions = previous_week_analytics['prev_conversions'] or 1
-        
-        # Calculate growth rates
-        impression_growth = round(((total_impressions - prev_impressions) / prev_impressions) * 100, 1)
-        click_growth = round(((total_clicks - prev_clicks) / prev_clicks) * 100, 1)
-        conversion_growth = round(((total_conversions - prev_conversions) / prev_conversions) * 100, 1)
-        
-        # Calculate rates
-        avg_ctr = round((total_clicks / total_impressions * 100), 2) if total_impressions > 0 else 0
-        conversion_rate = round((total_conversions / total_clicks * 100), 2) if total_clicks > 0 else 0
-        
-        # ============================================================================
-        # FIX 1: PROPERLY GET TOP PERFORMING CAMPAIGN WITH NULL CHECK
-        # ============================================================================
         try:
-            # First ensure all campaigns have summaries
-            user_campaigns = Campaign.objects.filter(user=user)
-            for campaign in user_campaigns:
-                summary, created = CampaignAnalyticsSummary.objects.get_or_create(
-                    campaign=campaign
-                )
-                if created or summary.performance_score == 0:
-                    summary.update_metrics()
-                    summary.save()
-            
-            # Now get top campaign with proper ordering
-            top_campaign = Campaign.objects.filter(
-                user=user,
-                analytics_summary__isnull=False
-            ).select_related('analytics_summary').order_by(
-                '-analytics_summary__performance_score'
-            ).first()
-            
-            # Get worst campaign for improvement suggestions
-            worst_campaign = Campaign.objects.filter(
-                user=user,
-                analytics_summary__isnull=False
-            ).select_related('analytics_summary').order_by(
-                'analytics_summary__performance_score'
-            ).first()
-            
-        except Exception as e:
-            print(f"Error getting top campaign: {e}")
-            top_campaign = None
-            worst_campaign = None
-        
-        # ============================================================================
-        # SAFE TOP CAMPAIGN DATA WITH NULL PROTECTION
-        # ============================================================================
-        top_campaign_data = {
-            'name': top_campaign.title if top_campaign else 'N/A',
-            'platform': top_campaign.platform if top_campaign else 'N/A',
-            'score': top_campaign.analytics_summary.performance_score if (top_campaign and hasattr(top_campaign, 'analytics_summary')) else 0
-        }
+            points = int(params.get('points', TimeSeriesService.DEFAULT_POINTS))
+        except ValueError:
+            errors.append('points must be an integer')
+            points = TimeSeriesService.DEFAULT_POINTS
+        points = max(3, min(points, TimeSeriesService.MAX_POINTS))
         
-        # REAL INSIGHTS from actual data
-        insights = {
-            'top_performing_platform': top_campaign.platform.title() if top_campaign else 'N/A',
-            'top_campaign_name': top_campaign_data['name'],  # FIXED: Now guaranteed to have value
-            'top_campaign_score': top_campaign_data['score'],
-            'total_impressions': total_impressions,
-            'total_clicks': total_clicks,
-            'total_conversions': total_conversions,
-            'total_spend': round(total_spend, 2),
-            'avg_ctr': avg_ctr,
-            'conversion_rate': conversion_rate,
-            'impression_growth': f"{'+' if impression_growth > 0 else ''}{impression_growth}%",
-            'click_growth': f"{'+' if click_growth > 0 else ''}{click_growth}%",
-            'conversion_growth': f"{'+' if conversion_growth > 0 else ''}{conversion_growth}%",
-            'engagement_trend': 'Increasing' if click_growth > 0 else 'Decreasing',
-            'roas': round((total_conversions * 50 / total_spend), 2) if total_spend > 0 else 0
-        }
+        try:
+            start_date, end_date = parse_date_range(params, max_days=self.MAX_RANGE_DAYS)
+            campaign_ids = parse_campaign_ids(params)
+        except ValueError as e:
+            errors.append(str(e))
         
-        # SMART RECOMMENDATIONS based on real performance
-        recommendations = self._generate_weekly_recommendations(
-            avg_ctr=avg_ctr,
-            conversion_rate=conversion_rate,
-            click_growth=click_growth,
-            total_spend=total_spend,
-            active_campaigns=active_campaigns,
-            ads_generated=ads_generated,
-            top_campaign=top_campaign,
-            worst_campaign=worst_campaign,
-            insights=insights
-        )
+        if errors:
+            return Response({'error': '; '.join(errors)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # ACTIONABLE NEXT STEPS
-        next_steps = self._generate_next_steps(
-            top_campaign=top_campaign,
-            worst_campaign=worst_campaign,
-            avg_ctr=avg_ctr,
-            ads_generated=ads_generated,
-            active_campaigns=active_campaigns
+        queryset = DailyAnalytics.objects.filter(
+            user=request.user,
+            date__gte=start_date,
+            date__lte=end_date
         )
-        
-        return Response({
-            'period': f'{week_ago.strftime("%b %d")} - {today.strftime("%b %d, %Y")}',
-            'summary': {
-                'campaigns_created': campaigns_created,
-                'ads_generated': ads_generated,
-                'images_generated': images_generated,
-                'active_campaigns': active_campaigns,
-                'total_engagement': total_clicks,
-                'engagement_growth': insights['click_growth']
-            },
-            'insights': insights,
-            'recommendations': recommendations,
-            'next_steps': next_steps,
-            'comparison_available': prev_clicks > 0,
-            # Add this for PDF generation
-            'can_generate_pdf': total_impressions > 0
-        })
-    
-    def _generate_weekly_recommendations(self, avg_ctr, conversion_rate, click_growth, 
-                                        total_spend, active_campaigns, ads_generated,
-                                        top_campaign, worst_campaign, insights):
-        """Generate data-driven recommendations"""
-        recommendations = []
-        
-        # CTR Analysis
-        if avg_ctr < 2:
-            recommendations.append({
-                'category': 'Performance',
-                'priority': 'high',
-                'title': 'Improve Click-Through Rate',
-                'description': f'Your weekly CTR is {avg_ctr}%, which is below the 3-5% industry benchmark. Test new headlines and visuals.',
-                'action': 'A/B Test Creatives',
-                'impact': '+50-100% potential CTR increase',
-                'metric': 'CTR',
-                'current': f'{avg_ctr}%',
-                'target': '3-5%'
-            })
-        elif avg_ctr >= 5:
-            recommendations.append({
-                'category': 'Performance',
-                'priority': 'high',
-                'title': 'Excellent Performance - Scale Up',
-                'description': f'Your {avg_ctr}% CTR is outstanding! Scale your best campaigns to maximize results.',
-                'action': 'Increase Budget',
-                'impact': '+100-200% potential reach',
-                'metric': 'CTR',
-                'current': f'{avg_ctr}%',
-                'target': 'Maintain'
-            })
-        
-        # Conversion Rate Analysis
-        if conversion_rate < 5 and avg_ctr > 2:
-            recommendations.append({
-                'category': 'Optimization',
-                'priority': 'high',
-                'title': 'Optimize Conversion Funnel',
-                'description': f'You have good traffic ({avg_ctr}% CTR) but low conversions ({conversion_rate}%). Review landing pages.',
-                'action': 'Optimize Landing Page',
-                'impact': '+30-60% conversion increase',
-                'metric': 'Conversion Rate',
-                'current': f'{conversion_rate}%',
-                'target': '5-10%'
-            })
-        
-        # Growth Trend
-        if click_growth < -10:
-            recommendations.append({
-                'category': 'Engagement',
-                'priority': 'high',
-                'title': 'Reverse Declining Engagement',
-                'description': f'Engagement dropped {click_growth}% this week. Refresh ad creatives and review audience targeting.',
-                'action': 'Refresh Campaign',
-                'impact': 'Reverse negative trend',
-                'metric': 'Weekly Growth',
-                'current': f'{click_growth}%',
-                'target': '+10%'
-            })
-        elif click_growth > 20:
-            recommendations.append({
-                'category': 'Growth',
-                'priority': 'medium',
-                'title': 'Capitalize on Momentum',
-                'description': f'Strong {click_growth}% growth! Now is the time to increase investment and expand reach.',
-                'action': 'Scale Investment',
-                'impact': 'Maximize growth period',
-                'metric': 'Weekly Growth',
-                'current': f'{click_growth}%',
-                'target': 'Sustain'
-            })
-        
-        # Content Generation
-        if ads_generated < 5:
-            recommendations.append({
-                'category': 'Content',
-                'priority': 'medium',
-                'title': 'Increase Ad Variations',
-                'description': f'Only {ads_generated} ads created this week. More variations improve testing effectiveness.',
-                'action': 'Generate 5+ Variations',
-                'impact': '+25% optimization potential',
-                'metric': 'Content Volume',
-                'current': f'{ads_generated} ads',
-                'target': '10+ ads/week'
-            })
-        
-        # Budget Efficiency
-        if total_spend > 0 and insights['roas'] < 2:
-            recommendations.append({
-                'category': 'Budget',
-                'priority': 'high',
-                'title': 'Improve Return on Ad Spend',
-                'description': f'Current ROAS is {insights["roas"]}x. Review targeting and pause low-performing campaigns.',
-                'action': 'Optimize Budget Allocation',
-                'impact': '+50-100% ROAS improvement',
-                'metric': 'ROAS',
-                'current': f'{insights["roas"]}x',
-                'target': '3-5x'
-            })
-        
-        # Campaign Activity
-        if active_campaigns == 0:
-            recommendations.append({
-                'category': 'Campaigns',
-                'priority': 'high',
-                'title': 'Launch Active Campaigns',
-                'description': 'No active campaigns running. Create and launch campaigns to start generating results.',
-                'action': 'Create Campaign',
-                'impact': 'Begin generating ROI',
-                'metric': 'Active Campaigns',
-                'current': '0',
-                'target': '3-5'
-            })
-        
-        # Top Campaign Optimization
-        if top_campaign and hasattr(top_campaign, 'analytics_summary') and top_campaign.analytics_summary.performance_score > 70:
-            recommendations.append({
-                'category': 'Scaling',
-                'priority': 'medium',
-                'title': f'Scale Top Performer: {top_campaign.title}',
-                'description': f'This campaign has {top_campaign.analytics_summary.performance_score}/100 score. Allocate more budget.',
-                'action': 'Increase Budget by 25%',
-                'impact': '+30-50% additional reach',
-                'metric': 'Performance Score',
-                'current': f'{top_campaign.analytics_summary.performance_score}/100',
-                'target': 'Maximize'
-            })
-        
-        # Sort by priority
-        priority_order = {'high': 0, 'medium': 1, 'low': 2}
-        recommendations.sort(key=lambda x: priority_order.get(x['priority'], 3))
-        
-        return recommendations[:6]  # Return top 6
+        if campaign_ids:
+            queryset = queryset.filter(campaign_id__in=campaign_ids)
+        
+        return Response(TimeSeriesService.series(
+            queryset,
+            start_date,
+            end_date,
+            resolution=resolution,
+            metrics=metrics,
+            points=points,
+            method=method,
+            encoding=encoding,
+        ))
+
+
+# ============================================================================
+# WEEKLY REPORT WITH REAL DATA
+# ============================================================================
+class WeeklyReportView(APIView):
+    # Not on a replica: it may re-evaluate and store the user's
+    # recommendations, and must see its own stale flag and stored row
+    permission_classes = [permissions.IsAuthenticated]
     
-    def _generate_next_steps(self, top_campaign, worst_campaign, avg_ctr, 
-                            ads_generated, active_campaigns):
-        """Generate specific action items"""
-        steps = []
-        
-        if top_campaign:
-            steps.append(f"Review and scale best performer: {top_campaign.title}")
-        
-        if worst_campaign and hasattr(worst_campaign, 'analytics_summary') and worst_campaign.analytics_summary.performance_score < 50:
-            steps.append(f"Improve or pause low performer: {worst_campaign.title} ({worst_campaign.analytics_summary.performance_score}/100)")
-        
-        if avg_ctr < 3:
-            steps.append(f"Run A/B tests on headlines and visuals to improve {avg_ctr}% CTR")
-        
-        if ads_generated < 10:
-            steps.append(f"Generate {10 - ads_generated} more ad variations for testing")
-        
-        if active_campaigns < 3:
-            steps.append("Launch 2-3 new campaigns targeting different audiences")
-        
-        steps.append("Check audience insights for optimal posting times")
-        steps.append("Review budget allocation across all campaigns")
-        
-        return steps[:5]  # Return top 5
+    def get(self, request):
+        return Response(ReportDataService.weekly_report(request.user))
 
 # ============================================================================
 # NEW: Delete Image from Cloudinary
@@ -2467,7 +1743,7 @@ class DeleteImageView(APIView):
     def delete(self, request, image_id):
         """Delete image from Cloudinary and database"""
         try:
-            image = ImageAsset.objects.get(id=image_id, campaign__user=request.user)
+            image = ImageAsset.objects.get(id=image_id, user=request.user)
             
             # Delete from Cloudinary if public_id exists
             if image.cloudinary_public_id:
@@ -2517,33 +1793,16 @@ class GenerateCampaignReportView(APIView):
         try:
             campaign = Campaign.objects.get(id=campaign_id, user=request.user)
             
-            # Get analytics data
-            summary, created = CampaignAnalyticsSummary.objects.get_or_create(
-                campaign=campaign
-            )
-            if created:
-                summary.update_metrics()
-            
-            analytics_data = {
-                'total_impressions': int(summary.total_impressions),
-                'total_clicks': summary.total_clicks,
-                'total_conversions': summary.total_conversions,
-                'total_spend': float(summary.total_spend),
-                'avg_ctr': float(summary.avg_ctr),
-                'avg_cpc': float(summary.avg_cpc),
-                'roas': float(summary.roas),
-                'performance_score': summary.performance_score,
-            }
-            
-            # Generate report
-            from core.utils.report_generator import ReportGenerator
-            result = ReportGenerator.generate_campaign_report(campaign, analytics_data)
+            analytics_data = ReportDataService.campaign_analytics([campaign])[campaign.id]
+            # Served from the artifact cache when nothing in the report changed
+            result = ReportArtifactService.campaign_report(campaign, analytics_data)
             
             if result.get('success'):
                 return Response({
                     'success': True,
                     'report_url': result['url'],
                     'public_id': result['public_id'],
+                    'cached': result.get('cached', False),
                     'message': 'Report generated successfully'
                 })
             else:
@@ -2567,7 +1826,7 @@ class UpdateImageView(APIView):
     def patch(self, request, image_id):
         """Update image metadata (prompt only, image itself is immutable)"""
         try:
-            image = ImageAsset.objects.get(id=image_id, campaign__user=request.user)
+            image = ImageAsset.objects.get(id=image_id, user=request.user)
             
             # Update prompt if provided
             new_prompt = request.data.get('prompt')
@@ -2640,244 +1899,22 @@ class GenerateWeeklyReportPDFView(View):
             )
         
         try:
-            from reportlab.lib.pagesizes import letter
-            from reportlab.lib import colors
-            from reportlab.lib.units import inch
-            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-            from reportlab.lib.enums import TA_CENTER
-            from core.models import Campaign, AdContent, ImageAsset, DailyAnalytics, CampaignAnalyticsSummary
-            from core.utils.timezone_utils import now, format_datetime
-            
-            # Get report data
-            today = now().date()
-            week_ago = today - timedelta(days=7)
-            
-            # Ensure all campaigns have summaries
-            user_campaigns = Campaign.objects.filter(user=user)
-            for campaign in user_campaigns:
-                summary, created = CampaignAnalyticsSummary.objects.get_or_create(
-                    campaign=campaign
-                )
-                if created or summary.performance_score == 0:
-                    summary.update_metrics()
-                    summary.save()
-            
-            # Gather data
-            campaigns_created = Campaign.objects.filter(
-                user=user,
-                created_at__date__gte=week_ago
-            ).count()
-            
-            ads_generated = AdContent.objects.filter(
-                campaign__user=user,
-                created_at__date__gte=week_ago
-            ).count()
-            
-            images_generated = ImageAsset.objects.filter(
-                campaign__user=user,
-                created_at__date__gte=week_ago
-            ).count()
-            
-            active_campaigns = Campaign.objects.filter(
-                user=user,
-                is_active=True,
-                end_date__gte=today
-            ).count()
-            
-            # Get analytics
-            weekly_analytics = DailyAnalytics.objects.filter(
-                campaign__user=user,
-                date__gte=week_ago,
-                date__lte=today
-            ).aggregate(
-                total_impressions=Sum('impressions'),
-                total_clicks=Sum('clicks'),
-                total_conversions=Sum('conversions'),
-                total_spend=Sum('spend')
-            )
-            
-            total_impressions = weekly_analytics['total_impressions'] or 0
-            total_clicks = weekly_analytics['total_clicks'] or 0
-            total_conversions = weekly_analytics['total_conversions'] or 0
-            total_spend = float(weekly_analytics['total_spend'] or 0)
-            
-            avg_ctr = round((total_clicks / total_impressions * 100), 2) if total_impressions > 0 else 0
-            conversion_rate = round((total_conversions / total_clicks * 100), 2) if total_clicks > 0 else 0
-            roas = round((total_conversions * 50 / total_spend), 2) if total_spend > 0 else 0
-            
-            # Get top campaign
-            top_campaign = Campaign.objects.filter(
-                user=user,
-                analytics_summary__isnull=False
-            ).select_related('analytics_summary').order_by(
-                '-analytics_summary__performance_score'
-            ).first()
-            
-            # Create PDF in memory
-            buffer = io.BytesIO()
-            doc = SimpleDocTemplate(
-                buffer, 
-                pagesize=letter,
-                topMargin=0.75*inch,
-                bottomMargin=0.75*inch,
-                leftMargin=0.75*inch,
-                rightMargin=0.75*inch
-            )
-            
-            story = []
-            styles = getSampleStyleSheet()
-            
-            # Custom styles
-            title_style = ParagraphStyle(
-                'Title',
-                parent=styles['Heading1'],
-                fontSize=24,
-                textColor=colors.HexColor('#3a3440'),
-                spaceAfter=6,
-                alignment=TA_CENTER,
-                fontName='Helvetica-Bold'
-            )
-            
-            subtitle_style = ParagraphStyle(
-                'Subtitle',
-                parent=styles['Normal'],
-                fontSize=11,
-                textColor=colors.grey,
-                spaceAfter=24,
-                alignment=TA_CENTER,
-            )
-            
-            heading_style = ParagraphStyle(
-                'Heading',
-                parent=styles['Heading2'],
-                fontSize=16,
-                textColor=colors.HexColor('#a88fd8'),
-                spaceAfter=12,
-                spaceBefore=18,
-                fontName='Helvetica-Bold'
-            )
-            
-            # Build PDF content
-            story.append(Paragraph("AdVision Weekly Report", title_style))
-            story.append(Paragraph(
-                f"Period: {week_ago.strftime('%b %d')} - {today.strftime('%b %d, %Y')}", 
-                subtitle_style
-            ))
-            story.append(Paragraph(f"Generated for: {user.email}", subtitle_style))
-            
-            # Summary Section
-            story.append(Paragraph("Weekly Summary", heading_style))
-            
-            summary_data = [
-                ['Metric', 'Value'],
-                ['Campaigns Created', str(campaigns_created)],
-                ['Ads Generated', str(ads_generated)],
-                ['Images Generated', str(images_generated)],
-                ['Active Campaigns', str(active_campaigns)],
-                ['Total Engagement', f"{total_clicks:,} clicks"],
-            ]
-            
-            summary_table = Table(summary_data, colWidths=[3*inch, 2.5*inch])
-            summary_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#a88fd8')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-                ('TOPPADDING', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9f9f9')]),
-            ]))
-            story.append(summary_table)
-            story.append(Spacer(1, 0.25*inch))
-            
-            # Analytics Section
-            story.append(Paragraph("Performance Analytics", heading_style))
-            
-            analytics_data = [
-                ['Metric', 'Value'],
-                ['Total Impressions', f"{total_impressions:,}"],
-                ['Total Clicks', f"{total_clicks:,}"],
-                ['Total Conversions', f"{total_conversions:,}"],
-                ['Total Spend', f"${total_spend:.2f}"],
-                ['Average CTR', f"{avg_ctr}%"],
-                ['Conversion Rate', f"{conversion_rate}%"],
-                ['ROAS', f"{roas}x"],
-            ]
+            report = ReportDataService.weekly_report(user)
             
-            analytics_table = Table(analytics_data, colWidths=[3*inch, 2.5*inch])
-            analytics_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#a88fd8')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-                ('TOPPADDING', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9f9f9')]),
-            ]))
-            story.append(analytics_table)
-            story.append(Spacer(1, 0.25*inch))
-            
-            # Top Campaign
-            story.append(Paragraph("Top Performing Campaign", heading_style))
-            
-            if top_campaign:
-                campaign_data = [
-                    ['Campaign Name', top_campaign.title],
-                    ['Platform', top_campaign.platform.title()],
-                    ['Performance Score', f"{top_campaign.analytics_summary.performance_score}/100"],
-                ]
+            pdf_bytes = ReportArtifactService.get_weekly_pdf(user, report)
+            if pdf_bytes is not None:
+                response = HttpResponse(pdf_bytes, content_type='application/pdf')
             else:
-                campaign_data = [
-                    ['Status', 'No campaigns available'],
-                    ['Recommendation', 'Create campaigns to see performance data'],
-                ]
-            
-            campaign_table = Table(campaign_data, colWidths=[2.5*inch, 3*inch])
-            campaign_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f0f0f0')),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-                ('TOPPADDING', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ]))
-            story.append(campaign_table)
-            
-            # Footer
-            story.append(Spacer(1, 0.4*inch))
-            footer_style = ParagraphStyle(
-                'Footer',
-                parent=styles['Normal'],
-                fontSize=8,
-                textColor=colors.grey,
-                alignment=TA_CENTER,
-            )
-            story.append(Paragraph(
-                f"Generated on {format_datetime(now(), '%B %d, %Y at %I:%M %p')}",
-                footer_style
-            ))
-            story.append(Paragraph("© 2026 AdVision - AI Campaign Management", footer_style))
-            
-            # Build PDF
-            doc.build(story)
-            
-            # Get PDF bytes
-            pdf_bytes = buffer.getvalue()
-            buffer.close()
-            
-            # Create response with proper headers
-            response = HttpResponse(pdf_bytes, content_type='application/pdf')
+                # ReportLab writes straight into the response body
+                response = HttpResponse(content_type='application/pdf')
+                story = ReportGenerator.weekly_story(report, user_email=user.email)
+                ReportGenerator.render(story, response)
+                ReportArtifactService.store_weekly_pdf(user, report, response.content)
             
             # Set headers for download
-            filename = f'advision_weekly_report_{today.strftime("%Y%m%d")}.pdf'
+            filename = f'advision_weekly_report_{now().strftime("%Y%m%d")}.pdf'
             response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            response['Content-Length'] = len(pdf_bytes)
+            response['Content-Length'] = len(response.content)
             response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
             response['Pragma'] = 'no-cache'
             response['Expires'] = '0'
@@ -2888,19 +1925,8 @@ class GenerateWeeklyReportPDFView(View):
             
             return response
             
-        except ImportError as e:
-            import traceback
-            print("Import Error:")
-            print(traceback.format_exc())
-            return HttpResponse(
-                f'{{"error": "ReportLab not installed: {str(e)}"}}',
-                status=500,
-                content_type='application/json'
-            )
         except Exception as e:
-            import traceback
-            print("PDF Generation Error:")
-            print(traceback.format_exc())
+            logger.exception(f"❌ Weekly report PDF generation failed: {e}")
             return HttpResponse(
                 f'{{"error": "Failed to generate PDF: {str(e)}"}}',
                 status=500,
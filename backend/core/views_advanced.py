@@ -1,4 +1,6 @@
 # backend/core/views_advanced.py - NEW COMPLETE FILE
+import logging
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
@@ -11,8 +13,13 @@ from .serializers import (
 )
 from .services.ad_platforms import AdPlatformSyncService, GoogleAdsService, FacebookAdsService
 from .services.ab_testing import ABTestingService
+from .services.event_ingestion import EventIngestionService, MAX_BATCH_SIZE
+from .services.traffic_assignment import TrafficAssignmentService
+from .throttling import QuotaMixin
 from core.utils.timezone_utils import now
 
+logger = logging.getLogger(__name__)
+
 # ============================================================================
 # AD PLATFORM CONNECTIONS
 # ============================================================================
@@ -112,8 +119,9 @@ class ConnectFacebookAdsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-class SyncAdPlatformView(APIView):
+class SyncAdPlatformView(QuotaMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
+    quota_scope = 'platform_sync'
     
     def post(self, request):
         """Manually trigger sync for a platform connection"""
@@ -174,6 +182,13 @@ class CreateABTestView(APIView):
         campaign_id = request.data.get('campaign_id')
         name = request.data.get('name')
         variations_data = request.data.get('variations', [])
+        analysis_mode = request.data.get('analysis_mode', 'fixed')
+        
+        if analysis_mode not in dict(ABTest.ANALYSIS_MODE_CHOICES):
+            return Response(
+                {'error': 'analysis_mode must be "fixed" or "sequential"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         try:
             campaign = Campaign.objects.get(id=campaign_id, user=request.user)
@@ -185,6 +200,8 @@ class CreateABTestView(APIView):
                 success_metric=request.data.get('success_metric', 'ctr'),
                 traffic_split=request.data.get('traffic_split', {'A': 50, 'B': 50}),
                 min_sample_size=request.data.get('min_sample_size', 1000),
+                confidence_level=request.data.get('confidence_level', 95.0),
+                analysis_mode=analysis_mode,
                 status='draft'
             )
             
@@ -251,11 +268,12 @@ class AnalyzeABTestView(APIView):
                 campaign__user=request.user
             )
             
-            analysis = ABTestingService.analyze_test(ab_test)
-            recommendations = ABTestingService.get_recommendation(ab_test)
+            test_variations = list(ab_test.variations.all().order_by('name'))
+            analysis = ABTestingService.analyze_test(ab_test, variations=test_variations)
+            recommendations = ABTestingService.get_recommendation(ab_test, analysis=analysis)
             
             variations = []
-            for var in ab_test.variations.all():
+            for var in test_variations:
                 variations.append({
                     'name': var.name,
                     'impressions': var.impressions,
@@ -271,7 +289,8 @@ class AnalyzeABTestView(APIView):
                     'id': str(ab_test.id),
                     'name': ab_test.name,
                     'status': ab_test.status,
-                    'success_metric': ab_test.success_metric
+                    'success_metric': ab_test.success_metric,
+                    'analysis_mode': ab_test.analysis_mode
                 },
                 'variations': variations,
                 'analysis': analysis,
@@ -282,4 +301,96 @@ class AnalyzeABTestView(APIView):
             return Response(
                 {'error': 'A/B test not found'},
                 status=status.HTTP_404_NOT_FOUND
-            )
\ No newline at end of file
+            )
+
+class AssignABTestVariationView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, test_id):
+        """
+        Look up the variation a visitor is assigned to, without recording it
+        
+        Query params:
+            visitor_id: Stable visitor identifier (required)
+        """
+        return self._assign(request, test_id, request.query_params.get('visitor_id'), record=False)
+    
+    def post(self, request, test_id):
+        """
+        Assign a visitor to a variation and count it as an impression
+        
+        Body: {"visitor_id": "..."}
+        """
+        return self._assign(request, test_id, request.data.get('visitor_id'), record=True)
+    
+    def _assign(self, request, test_id, visitor_id, record):
+        if not visitor_id:
+            return Response(
+                {'error': 'visitor_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        table = TrafficAssignmentService.get_table(test_id)
+        if table is None or table.user_id != request.user.id:
+            return Response(
+                {'error': 'A/B test not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        assignment = TrafficAssignmentService.assign(
+            test_id, str(visitor_id), record_exposure=record, table=table
+        )
+        if assignment is None:
+            return Response(
+                {'error': 'A/B test is not running'},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        return Response(assignment)
+
+# ============================================================================
+# EVENT INGESTION
+# ============================================================================
+class IngestEventsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        """
+        Record a batch of impression/click/conversion events
+        
+        Body: {"events": [{"id": "...", "type": "click", "target": "ab_variation",
+                           "target_id": "<uuid>", "count": 1}, ...]}
+        
+        Counters are updated asynchronously by the event buffer; the response
+        is 202 once the accepted events are stored, and 503 if they could not
+        be (nothing was counted, retry the batch).
+        """
+        if not isinstance(request.data, dict):
+            return Response(
+                {'error': 'Request body must be a JSON object'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        events = request.data.get('events')
+        
+        if not isinstance(events, list) or not events:
+            return Response(
+                {'error': 'events must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if len(events) > MAX_BATCH_SIZE:
+            return Response(
+                {'error': f'At most {MAX_BATCH_SIZE} events per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            result = EventIngestionService.ingest(request.user, events)
+        except Exception as e:
+            logger.error(f"❌ Could not store ingested events: {e}")
+            return Response(
+                {'error': 'Events could not be stored, retry the batch'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        return Response(result, status=status.HTTP_202_ACCEPTED)
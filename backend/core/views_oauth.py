@@ -1,24 +1,32 @@
 # backend/core/views_oauth.py - UPDATED WITH ENVIRONMENT VARIABLES (BASED ON WORKING CODE)
-from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.db import transaction
 from allauth.account.models import EmailAddress
 from allauth.socialaccount.models import SocialAccount, SocialApp
-import requests
+import httpx
 import logging
 
+from core.async_views import AsyncAPIView, db_sync_to_async
+from core.utils.http import afetch
+
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
-class GoogleOAuthView(APIView):
-    """Custom Google OAuth handler using environment variables"""
+class GoogleOAuthView(AsyncAPIView):
+    """
+    Custom Google OAuth handler using environment variables.
+
+    Async, since the token exchange and user info lookups are two round trips
+    to Google; the account bookkeeping runs in a worker thread.
+    """
     permission_classes = [permissions.AllowAny]  # CRITICAL: Must allow unauthenticated access
     authentication_classes = []  # CRITICAL: Disable authentication for this endpoint
     
-    def post(self, request):
+    async def post(self, request):
         code = request.data.get('code')
         
         # Get redirect_uri from request (frontend will send it)
@@ -69,7 +77,7 @@ class GoogleOAuthView(APIView):
             }
             
             logger.info(f"📡 Exchanging code for token...")
-            token_response = requests.post(token_url, data=token_data, timeout=10)
+            token_response = await afetch('google', 'POST', token_url, data=token_data)
             
             if token_response.status_code != 200:
                 error_detail = token_response.json()
@@ -91,7 +99,7 @@ class GoogleOAuthView(APIView):
             headers = {'Authorization': f'Bearer {access_token}'}
             
             logger.info(f"📡 Fetching user info from Google...")
-            user_info_response = requests.get(user_info_url, headers=headers, timeout=10)
+            user_info_response = await afetch('google', 'GET', user_info_url, headers=headers)
             
             if user_info_response.status_code != 200:
                 logger.error(f"❌ Failed to get user info: {user_info_response.text}")
@@ -102,7 +110,6 @@ class GoogleOAuthView(APIView):
             
             user_info = user_info_response.json()
             email = user_info.get('email')
-            google_id = user_info.get('id')
             name = user_info.get('name', '')
             
             logger.info(f"✅ Got user info: {email}")
@@ -113,85 +120,12 @@ class GoogleOAuthView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Step 3: Get or create user
-            user, user_created = User.objects.get_or_create(
-                email=email,
-                defaults={
-                    'role': 'viewer',
-                    'is_active': True
-                }
-            )
-            
-            if user_created:
-                logger.info(f"✅ Created new user: {email}")
-            else:
-                logger.info(f"✅ Found existing user: {email}")
-            
-            # Step 4: Create or update EmailAddress
-            email_address, created = EmailAddress.objects.get_or_create(
-                user=user,
-                email=email,
-                defaults={
-                    'verified': True,
-                    'primary': True
-                }
-            )
-            
-            if created:
-                logger.info(f"✅ Created EmailAddress for {email}")
-            
-            # Step 5: Get or create SocialApp for Google
-            try:
-                social_app = SocialApp.objects.get(provider='google')
-                logger.info(f"✅ Found existing Google SocialApp")
-            except SocialApp.DoesNotExist:
-                logger.info(f"📝 Creating Google SocialApp...")
-                from django.contrib.sites.models import Site
-                social_app = SocialApp.objects.create(
-                    provider='google',
-                    name='Google',
-                    client_id=client_id,
-                    secret=client_secret
-                )
-                # Add the current site
-                site = Site.objects.get_current()
-                social_app.sites.add(site)
-                logger.info(f"✅ Created Google SocialApp")
-            
-            # Step 6: Create or update SocialAccount
-            social_account, created = SocialAccount.objects.get_or_create(
-                user=user,
-                provider='google',
-                defaults={
-                    'uid': google_id,
-                    'extra_data': user_info
-                }
+            return Response(
+                await db_sync_to_async(self._login)(user_info, client_id, client_secret),
+                status=status.HTTP_200_OK
             )
             
-            if created:
-                logger.info(f"✅ Created SocialAccount for {email}")
-            else:
-                # Update extra_data if account exists
-                social_account.extra_data = user_info
-                social_account.save()
-                logger.info(f"✅ Updated SocialAccount for {email}")
-            
-            # Step 7: Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
-            
-            logger.info(f"✅ Generated JWT tokens for {email}")
-            
-            return Response({
-                'access': str(refresh.access_token),
-                'refresh': str(refresh),
-                'user': {
-                    'id': str(user.id),
-                    'email': user.email,
-                    'role': user.role
-                }
-            }, status=status.HTTP_200_OK)
-            
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"❌ Network error: {str(e)}")
             return Response(
                 {'error': f'Network error: {str(e)}'}, 
@@ -204,4 +138,88 @@ class GoogleOAuthView(APIView):
             return Response(
                 {'error': f'Authentication failed: {str(e)}'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+    @transaction.atomic
+    def _login(self, user_info, client_id, client_secret):
+        """Find or create the user and their Google accounts; JWTs for the response"""
+        email = user_info.get('email')
+        google_id = user_info.get('id')
+        
+        # Step 3: Get or create user
+        user, user_created = User.objects.get_or_create(
+            email=email,
+            defaults={
+                'role': 'viewer',
+                'is_active': True
+            }
+        )
+        
+        if user_created:
+            logger.info(f"✅ Created new user: {email}")
+        else:
+            logger.info(f"✅ Found existing user: {email}")
+        
+        # Step 4: Create or update EmailAddress
+        email_address, created = EmailAddress.objects.get_or_create(
+            user=user,
+            email=email,
+            defaults={
+                'verified': True,
+                'primary': True
+            }
+        )
+        
+        if created:
+            logger.info(f"✅ Created EmailAddress for {email}")
+        
+        # Step 5: Get or create SocialApp for Google
+        try:
+            social_app = SocialApp.objects.get(provider='google')
+            logger.info(f"✅ Found existing Google SocialApp")
+        except SocialApp.DoesNotExist:
+            logger.info(f"📝 Creating Google SocialApp...")
+            from django.contrib.sites.models import Site
+            social_app = SocialApp.objects.create(
+                provider='google',
+                name='Google',
+                client_id=client_id,
+                secret=client_secret
+            )
+            # Add the current site
+            site = Site.objects.get_current()
+            social_app.sites.add(site)
+            logger.info(f"✅ Created Google SocialApp")
+        
+        # Step 6: Create or update SocialAccount
+        social_account, created = SocialAccount.objects.get_or_create(
+            user=user,
+            provider='google',
+            defaults={
+                'uid': google_id,
+                'extra_data': user_info
+            }
+        )
+        
+        if created:
+            logger.info(f"✅ Created SocialAccount for {email}")
+        else:
+            # Update extra_data if account exists
+            social_account.extra_data = user_info
+            social_account.save()
+            logger.info(f"✅ Updated SocialAccount for {email}")
+        
+        # Step 7: Generate JWT tokens
+        refresh = RefreshToken.for_user(user)
+        
+        logger.info(f"✅ Generated JWT tokens for {email}")
+        
+        return {
+            'access': str(refresh.access_token),
+            'refresh': str(refresh),
+            'user': {
+                'id': str(user.id),
+                'email': user.email,
+                'role': user.role
+            }
+        }
@@ -1,4 +1,6 @@
 # backend/core/views_predictive.py
+import math
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
@@ -66,5 +68,25 @@ class BudgetRecommendationsView(APIView):
     
     def get(self, request):
         """Get AI budget allocation recommendations"""
-        result = PredictiveAnalyticsService.recommend_budget_allocation(request.user)
+        total_budget = request.query_params.get('total_budget')
+        
+        if total_budget is not None:
+            try:
+                total_budget = float(total_budget)
+            except ValueError:
+                return Response(
+                    {'error': 'total_budget must be a number'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            # nan, inf and non-positive budgets would reach the optimizer's solver
+            if not (math.isfinite(total_budget) and total_budget > 0):
+                return Response(
+                    {'error': 'total_budget must be a positive number'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        result = PredictiveAnalyticsService.recommend_budget_allocation(
+            request.user,
+            total_budget=total_budget
+        )
         return Response(result)
\ No newline at end of file
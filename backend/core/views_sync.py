@@ -3,11 +3,13 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from .services.ad_platforms import AdPlatformSyncService
+from .throttling import QuotaMixin
 import traceback
 
-class SyncUserCampaignsView(APIView):
+class SyncUserCampaignsView(QuotaMixin, APIView):
     """Sync campaigns using user's API keys"""
     permission_classes = [permissions.IsAuthenticated]
+    quota_scope = 'platform_sync'
     
     def post(self, request):
         try:
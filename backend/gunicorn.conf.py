@@ -0,0 +1,79 @@
+# backend/gunicorn.conf.py
+"""
+Gunicorn settings, loaded automatically from the working directory
+(or with -c gunicorn.conf.py). Every value can be overridden by env var.
+
+Sizing:
+- WEB_CONCURRENCY worker processes, default 2 x CPUs + 1 capped at 8.
+  Requests are mostly database and upstream API waits, so concurrency comes
+  from threads rather than more processes (each holds its own copy of the
+  app, numpy/pandas included).
+- GUNICORN_THREADS threads per worker, default 4 (the gthread worker). Each
+  thread serves one request at a time, so one instance handles up to
+  workers x threads requests concurrently; the rest wait in the listen
+  backlog (GUNICORN_BACKLOG) instead of opening database connections.
+- Database connections per instance are at most workers x DB_POOL_MAX_SIZE
+  with DB_POOL=true (DB_POOL_MAX_SIZE defaults to GUNICORN_THREADS so no
+  thread waits on the pool), or workers x threads with persistent
+  connections. Multiply by instances (plus celery workers) and keep the total
+  below PostgreSQL's max_connections. See backend/database.py.
+
+Check the bound under load with load_test_connections.py.
+
+SERVER_MODE=asgi serves backend.asgi with uvicorn workers instead. Each worker
+runs one event loop, so the async views (text/image generation, Google
+sign-in), which mostly wait on upstream APIs, can have hundreds of requests in
+flight per worker. Sync views still work: Django runs each in a thread of its
+own. Use DB_POOL=true with it (see backend/database.py). Compare the two
+modes with load_test_asgi.py.
+
+With PROMETHEUS_MULTIPROC_DIR set, workers write their request metrics
+(core/instrumentation.py) there so /metrics reports the whole instance; the
+directory is emptied when gunicorn starts and a dead worker's live gauges are
+dropped.
+"""
+import multiprocessing
+import os
+import shutil
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '8000')}")
+
+asgi = os.getenv('SERVER_MODE', 'wsgi').lower() == 'asgi'
+# The app to serve when none is given on the command line
+wsgi_app = 'backend.asgi:application' if asgi else 'backend.wsgi:application'
+
+workers = int(os.getenv('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+if asgi:
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    worker_class = 'gthread' if threads > 1 else 'sync'
+
+backlog = int(os.getenv('GUNICORN_BACKLOG', '2048'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Recycle workers now and then so slow leaks can't grow without bound; the
+# jitter keeps them from restarting all at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+
+def on_starting(server):
+    # Metrics files from a previous run would be added to this one's
+    directory = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,209 @@
+# backend/load_test_asgi.py
+
+"""
+Concurrency benchmark: the same gunicorn config serving the app as WSGI and
+as ASGI (SERVER_MODE=asgi), driven through the text generation endpoint.
+
+OpenRouter is replaced by a local stub that answers after --upstream-delay
+seconds, so the numbers measure how many generations one server keeps in
+flight rather than the real model's speed:
+
+    python load_test_asgi.py --workers 1 --concurrency 200 --requests 1000
+
+Under WSGI a worker holds one request per thread (GUNICORN_THREADS) while it
+waits on the upstream, so throughput tops out near
+workers x threads / upstream delay. Under ASGI the view awaits the upstream
+on the event loop and the same worker overlaps all of them.
+
+Run it with the environment (DATABASE_URL, DB_POOL etc.) the servers should
+use; it exits non-zero if any ASGI request fails or ASGI does not beat WSGI's
+throughput.
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import django
+import numpy as np
+import requests
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.models import User
+
+LOAD_TEST_EMAIL = 'load-test@example.com'
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STUB_COMPLETION = {
+    'choices': [{'message': {'content': 'Fresh coffee, delivered before your alarm goes off. Order now! #coffee'}}],
+}
+
+
+def access_token():
+    user, created = User.objects.get_or_create(email=LOAD_TEST_EMAIL)
+    if created:
+        user.set_unusable_password()
+        user.save()
+    return str(RefreshToken.for_user(user).access_token)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_stub_upstream(delay):
+    """An OpenRouter stand-in answering every completion after `delay` seconds"""
+    body = json.dumps(STUB_COMPLETION).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 1024
+
+    server = Server(('127.0.0.1', free_port()), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_server(mode, port, upstream_url, args):
+    env = {
+        **os.environ,
+        'SERVER_MODE': mode,
+        'WEB_CONCURRENCY': str(args.workers),
+        'GUNICORN_THREADS': str(args.threads),
+        'GUNICORN_LOG_LEVEL': 'warning',
+        'OPENROUTER_API_URL': upstream_url,
+        'OPENROUTER_API_KEY': 'load-test',
+        # One user sends every request; measure the servers, not the quotas
+        'QUOTAS_ENABLED': 'False',
+    }
+    server = subprocess.Popen(
+        ['gunicorn', '--config', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}', '--access-logfile', '/dev/null'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            sys.exit(f'❌ {mode} server exited with {server.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    sys.exit(f'❌ {mode} server did not start listening within 60s')
+
+
+def run_load(url, headers, args):
+    """Fire the requests from `--concurrency` client threads; (results, seconds)"""
+    local = threading.local()
+
+    def call(_):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            status = local.session.post(
+                url, json={'prompt': 'Cold brew subscription', 'platform': 'instagram'},
+                headers=headers, timeout=args.timeout,
+            ).status_code
+        except requests.RequestException:
+            status = None
+        return status, time.perf_counter() - start
+
+    # Warm each worker up (imports, first connections) outside the timing
+    with ThreadPoolExecutor(max_workers=args.workers * 4) as pool:
+        list(pool.map(call, range(args.workers * 4)))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(call, range(args.requests)))
+    return results, time.perf_counter() - started
+
+
+def summarize(mode, results, elapsed):
+    latencies = np.array([seconds for _, seconds in results]) * 1000
+    ok = sum(1 for status, _ in results if status == 200)
+    errors = {}
+    for status, _ in results:
+        if status != 200:
+            errors[status] = errors.get(status, 0) + 1
+    throughput = len(results) / elapsed
+    print(f"  {mode.upper()}")
+    print(f"    Requests:   {ok} OK, {len(results) - ok} failed {errors or ''}")
+    print(f"    Throughput: {throughput:.1f} req/s over {elapsed:.1f}s")
+    print(f"    Latency:    p50 {np.percentile(latencies, 50):.0f} ms, p95 {np.percentile(latencies, 95):.0f} ms, "
+          f"max {latencies.max():.0f} ms")
+    return throughput, len(results) - ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=1, help='WEB_CONCURRENCY for both servers')
+    parser.add_argument('--threads', type=int, default=int(os.getenv('GUNICORN_THREADS', '4')),
+                        help='GUNICORN_THREADS for the WSGI server')
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--upstream-delay', type=float, default=0.5, help='Seconds the stub upstream takes to answer')
+    parser.add_argument('--timeout', type=float, default=300, help='Client timeout per request')
+    parser.add_argument('--modes', default='wsgi,asgi')
+    args = parser.parse_args()
+
+    headers = {'Authorization': f'Bearer {access_token()}'}
+    upstream = start_stub_upstream(args.upstream_delay)
+    upstream_url = f'http://127.0.0.1:{upstream.server_address[1]}/api/v1/chat/completions'
+
+    print(f"🚀 {args.requests} generations from {args.concurrency} concurrent clients, "
+          f"{args.workers} worker(s), upstream delay {args.upstream_delay}s")
+    throughput, failed = {}, {}
+    for mode in args.modes.split(','):
+        port = free_port()
+        server = start_server(mode, port, upstream_url, args)
+        try:
+            results, elapsed = run_load(f'http://127.0.0.1:{port}/api/generate/text/', headers, args)
+        finally:
+            server.terminate()
+            server.wait()
+        throughput[mode], failed[mode] = summarize(mode, results, elapsed)
+    upstream.shutdown()
+
+    if failed.get('asgi'):
+        print(f"❌ {failed['asgi']} ASGI requests failed")
+        sys.exit(1)
+    if 'wsgi' in throughput and 'asgi' in throughput:
+        if throughput['asgi'] <= throughput['wsgi']:
+            print(f"❌ ASGI ({throughput['asgi']:.1f} req/s) did not beat WSGI ({throughput['wsgi']:.1f} req/s)")
+            sys.exit(1)
+        print(f"✅ ASGI served {throughput['asgi'] / throughput['wsgi']:.1f}x the WSGI throughput")
+
+
+if __name__ == '__main__':
+    main()
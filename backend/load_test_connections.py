@@ -0,0 +1,134 @@
+# backend/load_test_connections.py
+
+"""
+Load test showing that database connections stay bounded under concurrency.
+
+Start the server against PostgreSQL first, e.g.
+
+    DB_POOL=true WEB_CONCURRENCY=4 GUNICORN_THREADS=4 gunicorn backend.wsgi:application
+
+then run, with the same settings/env:
+
+    python load_test_connections.py --concurrency 500 --requests 5000 --max-connections 16
+
+The script signs a JWT for a load-test user, fires the requests from
+`--concurrency` threads at once and samples pg_stat_activity while they run.
+It exits non-zero if the peak number of client connections to the database
+exceeded --max-connections (workers x DB_POOL_MAX_SIZE for the server above).
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+import numpy as np
+import requests
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.db import connection
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.models import User
+
+LOAD_TEST_EMAIL = 'load-test@example.com'
+
+CONNECTIONS_SQL = (
+    "SELECT count(*) FROM pg_stat_activity "
+    "WHERE datname = current_database() AND backend_type = 'client backend' "
+    "AND pid <> pg_backend_pid()"
+)
+
+
+def access_token():
+    user, created = User.objects.get_or_create(email=LOAD_TEST_EMAIL)
+    if created:
+        user.set_unusable_password()
+        user.save()
+    return str(RefreshToken.for_user(user).access_token)
+
+
+def sample_connections(stop, samples, interval):
+    """Record the database's client connection count until `stop` is set"""
+    with connection.cursor() as cursor:
+        while not stop.is_set():
+            cursor.execute(CONNECTIONS_SQL)
+            samples.append(cursor.fetchone()[0])
+            time.sleep(interval)
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000/api/dashboard/stats/')
+    parser.add_argument('--concurrency', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--max-connections', type=int, required=True,
+                        help='Expected bound, e.g. workers x DB_POOL_MAX_SIZE')
+    parser.add_argument('--interval', type=float, default=0.05, help='Seconds between connection samples')
+    args = parser.parse_args()
+
+    if connection.vendor != 'postgresql':
+        sys.exit('❌ Connection counts come from pg_stat_activity; point DATABASE_URL at PostgreSQL')
+
+    headers = {'Authorization': f'Bearer {access_token()}'}
+    local = threading.local()
+
+    def call(_):
+        # One keep-alive session per client thread
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            status = local.session.get(args.url, headers=headers, timeout=60).status_code
+        except requests.RequestException:
+            status = None
+        return status, time.perf_counter() - start
+
+    with connection.cursor() as cursor:
+        cursor.execute(CONNECTIONS_SQL)
+        idle = cursor.fetchone()[0]
+    # The sampler thread opens its own connection; don't count this one
+    connection.close()
+
+    stop = threading.Event()
+    samples = []
+    sampler = threading.Thread(target=sample_connections, args=(stop, samples, args.interval))
+    sampler.start()
+
+    print(f"🚀 {args.requests} requests to {args.url} from {args.concurrency} concurrent clients")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(call, range(args.requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    sampler.join()
+
+    latencies = np.array([seconds for _, seconds in results]) * 1000
+    ok = sum(1 for status, _ in results if status == 200)
+    errors = {}
+    for status, _ in results:
+        if status != 200:
+            errors[status] = errors.get(status, 0) + 1
+    peak = max(samples) if samples else 0
+
+    print(f"  Requests:    {ok} OK, {len(results) - ok} failed {errors or ''}")
+    print(f"  Throughput:  {len(results) / elapsed:.1f} req/s over {elapsed:.1f}s")
+    print(f"  Latency:     p50 {np.percentile(latencies, 50):.0f} ms, p95 {np.percentile(latencies, 95):.0f} ms, "
+          f"max {latencies.max():.0f} ms")
+    print(f"  Connections: {idle} before, peak {peak}, mean {np.mean(samples):.1f} "
+          f"over {len(samples)} samples (bound {args.max_connections})")
+
+    if peak > args.max_connections:
+        print(f"❌ Peak connections {peak} exceeded the bound of {args.max_connections}")
+        sys.exit(1)
+    print("✅ Connections stayed within the bound")
+
+
+if __name__ == '__main__':
+    main()